@@ -56,6 +56,48 @@ def _system_metrics() -> dict:
         metrics["disk_percent"]   = psutil.disk_usage("/").percent
     except ImportError:
         pass
+    try:
+        from ..ml.inference import batching_stats
+        ml_batching = batching_stats()
+        if ml_batching is not None:
+            metrics["ml_batching"] = ml_batching
+    except Exception:
+        pass
+    try:
+        from ..ml.prediction_cache import prediction_cache
+        metrics["ml_prediction_cache"] = prediction_cache.stats()
+    except Exception:
+        pass
+    try:
+        from ..services.response_cache import response_cache
+        metrics["response_cache"] = response_cache.stats()
+    except Exception:
+        pass
+    try:
+        from .viewsets.misc import whatsapp_inbox
+        metrics["whatsapp_queue"] = whatsapp_inbox.stats()
+    except Exception:
+        pass
+    try:
+        from ..services.tts_audio_cache import tts_audio_store
+        metrics["tts_audio"] = tts_audio_store.stats()
+    except Exception:
+        pass
+    try:
+        from ..services.session_memory_service import session_memory
+        metrics["session_write_behind"] = session_memory.stats()
+    except Exception:
+        pass
+    try:
+        from ..services.interaction_log_sink import interaction_log_sink
+        metrics["interaction_log_sink"] = interaction_log_sink.stats()
+    except Exception:
+        pass
+    try:
+        from ..services.circuit_breaker import breaker_stats
+        metrics["circuit_breakers"] = breaker_stats()
+    except Exception:
+        pass
     return metrics
 
 
@@ -280,18 +322,28 @@ def data_freshness(request):
         }
     except Exception as exc:
         result["market"] = {"error": str(exc)}
+    try:
+        from advisory.services.data_gov_mandi_client import data_gov_mandi_client
+        result["market"]["data_gov_cache_stats"] = dict(data_gov_mandi_client.stats)
+    except Exception:
+        pass
 
     # ── Weather (Open-Meteo) ──────────────────────────────────
     try:
-        from django.core.cache import caches
-        _wcache = caches["weather_cache"]
-        # Probe Delhi to check if weather cache is populated
-        probe = _wcache.get("weather:delhi:hi")
+        import time as _time
+        from advisory.services.unified_realtime_service import (
+            _weather_grid_cell, weather_service,
+        )
+        # Probe Delhi's grid cell to check if the forecast cache is populated
+        cell  = _weather_grid_cell(28.6139, 77.2090)
+        probe = weather_service._read_section(weather_service._forecast_key("current", cell))
         result["weather"] = {
             "cache_populated": probe is not None,
+            "cache_age_min": round((_time.time() - probe["ts"]) / 60, 1) if probe else None,
+            "cache_stats": dict(weather_service.stats),
             "primary_source": "Open-Meteo (free, no key)",
             "fallback_source": "OpenWeatherMap (OPENWEATHER_API_KEY)",
-            "note": "Weather cache is per-location; probe checks Delhi as sentinel.",
+            "note": "Weather cache is per grid cell; probe checks Delhi as sentinel.",
         }
     except Exception as exc:
         result["weather"] = {"error": str(exc)}
@@ -30,6 +30,11 @@ from ..location_utils import attach_location_metadata, resolve_request_location
 from ..validation import MAX_CHAT_QUERY_LENGTH, query_too_long
 from ...services.chat_intelligence_service import chat_intelligence_service, _current_season
 from ...services.session_memory_service import session_memory
+from ...services.interaction_log_sink import (
+    INTERACTION_LOG_SINK,
+    interaction_log_sink,
+    interaction_row,
+)
 from ..auth_utils import _cors_for_request, _resolve_user_id
 
 logger = logging.getLogger(__name__)
@@ -79,6 +84,23 @@ def _dispatch_writes(
     When Redis is absent (local dev / CI) the writes happen synchronously so
     the dev experience is unchanged.
     """
+    interaction = interaction_row(
+        session_id=session_id,
+        phone_number=phone_number,
+        location_name=location_name,
+        state=state,
+        latitude=latitude,
+        longitude=longitude,
+        query=user_query,
+        response=ai_response,
+        intent=intent,
+        language=language,
+        crops_detected=crops_detected,
+        ai_tier=ai_tier,
+        data_source=data_source,
+        season=season,
+        response_time_ms=response_time_ms,
+    )
     if _USE_CELERY:
         from ...tasks import persist_turn, log_interaction
         if session_id:
@@ -94,23 +116,8 @@ def _dispatch_writes(
                 longitude=longitude,
                 context_update=context_update,
             )
-        log_interaction.delay(
-            session_id=session_id or "anon",
-            phone_number=phone_number,
-            location_name=location_name,
-            state=state,
-            latitude=latitude,
-            longitude=longitude,
-            query=user_query,
-            response=ai_response,
-            intent=intent,
-            language=language,
-            crops_detected=crops_detected,
-            ai_tier=ai_tier,
-            data_source=data_source,
-            season=season,
-            response_time_ms=response_time_ms,
-        )
+        if not INTERACTION_LOG_SINK:
+            log_interaction.delay(**interaction)
     else:
         # Synchronous inline path — identical to original behaviour
         if session_id:
@@ -126,27 +133,16 @@ def _dispatch_writes(
                 longitude=longitude,
             )
             session_memory.update_session_context(session_id, context_update)
-        try:
-            from ...models import FarmerInteractionLog
-            FarmerInteractionLog.objects.create(
-                session_id=session_id or "anon",
-                phone_number=phone_number or "",
-                location_name=location_name or "",
-                state=state or "",
-                latitude=latitude,
-                longitude=longitude,
-                query=user_query,
-                response=ai_response,
-                intent=intent or "",
-                language=language or "hi",
-                crops_detected=crops_detected or [],
-                ai_tier=ai_tier or "",
-                data_source=data_source or "",
-                season=season or "",
-                response_time_ms=response_time_ms,
-            )
-        except Exception as log_exc:
-            logger.debug("Interaction log write failed (non-fatal): %s", log_exc)
+        if not INTERACTION_LOG_SINK:
+            try:
+                from ...models import FarmerInteractionLog
+                FarmerInteractionLog.objects.create(**interaction)
+            except Exception as log_exc:
+                logger.debug("Interaction log write failed (non-fatal): %s", log_exc)
+    if INTERACTION_LOG_SINK:
+        # Batched with every other turn in this process (bulk_create + spool)
+        # instead of one INSERT — or one log_interaction message — per turn.
+        interaction_log_sink.add(interaction)
 
 
 # ── Shared request-parsing helper ────────────────────────────
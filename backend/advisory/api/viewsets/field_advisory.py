@@ -224,10 +224,10 @@ class FieldAdvisoryViewSet(viewsets.ViewSet):
             ctx = resolve_request_location(request)
             lang = normalise_language_code(request.query_params.get("language", "hi"))
 
-            om  = field_sensor_service._fetch_open_meteo_soil_weather(ctx.latitude, ctx.longitude)
-            gov = field_sensor_service._fetch_soil_health_card(ctx.latitude, ctx.longitude, ctx.state)
+            fetched = field_sensor_service.fetch_field_sources(ctx.latitude, ctx.longitude, ctx.state)
+            om = fetched["open_meteo"]
 
-            soil = field_sensor_service._merge_soil_data(om, gov, None)
+            soil = field_sensor_service._merge_soil_data(om, fetched["govt_soil"], None, fetched["climate"])
             weather_analysis = field_sensor_service._analyse_weather_for_farming(
                 om.get("forecast", []), om.get("current", {})
             )
@@ -238,6 +238,7 @@ class FieldAdvisoryViewSet(viewsets.ViewSet):
                 "weather_current": om.get("current", {}),
                 "weather_alerts": weather_analysis.get("alerts", []),
                 "data_sources":   soil.get("data_sources", []),
+                "upstreams":      fetched["report"],
                 "timestamp":      datetime.now(tz=timezone.utc).isoformat(),
             }, ctx))
 
@@ -316,9 +317,11 @@ class FieldAdvisoryViewSet(viewsets.ViewSet):
             sensors_clean = _parse_sensor_floats(raw_sensors)
 
             # Build soil profile
-            om  = field_sensor_service._fetch_open_meteo_soil_weather(ctx.latitude, ctx.longitude)
-            gov = field_sensor_service._fetch_soil_health_card(ctx.latitude, ctx.longitude, ctx.state)
-            soil = field_sensor_service._merge_soil_data(om, gov, {"sensors": sensors_clean} if sensors_clean else None)
+            fetched = field_sensor_service.fetch_field_sources(ctx.latitude, ctx.longitude, ctx.state)
+            soil = field_sensor_service._merge_soil_data(
+                fetched["open_meteo"], fetched["govt_soil"],
+                {"sensors": sensors_clean} if sensors_clean else None, fetched["climate"],
+            )
 
             # Crop requirements
             req = CROP_SOIL_REQUIREMENTS.get(crop, {})
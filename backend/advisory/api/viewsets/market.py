@@ -16,6 +16,37 @@ from ...services.unified_realtime_service import market_service
 logger = logging.getLogger(__name__)
 
 
+def _mandi_geo_context(mandi: str, ctx, commodity=None) -> dict:
+    """Where the selected mandi is, how far from the farmer, and the nearest alternatives."""
+    try:
+        from ...services.mandi_index import get_mandi_index
+
+        index = get_mandi_index()
+        row = index.lookup(mandi)
+        if not row:
+            return {}
+        info = {
+            "name":      row["name"],
+            "district":  row.get("district", ""),
+            "state":     row.get("state", ""),
+            "latitude":  row["latitude"],
+            "longitude": row["longitude"],
+        }
+        if ctx.latitude is not None and ctx.longitude is not None:
+            dist = index.distances(ctx.latitude, ctx.longitude, [mandi])[0]
+            info["distance_km"] = round(dist, 1) if dist is not None else None
+        nearby = [
+            {"name": r["name"], "district": r.get("district", ""), "distance_km": round(d, 1),
+             "specialty": r.get("specialty", "")}
+            for d, r in index.nearest(row["latitude"], row["longitude"], k=4, commodity=commodity)
+            if r is not row
+        ][:3]
+        return {"mandi_location": info, "nearby_mandis": nearby}
+    except Exception as exc:
+        logger.debug("Mandi geo context failed for %s: %s", mandi, exc)
+        return {}
+
+
 class MarketPricesViewSet(viewsets.ViewSet):
     permission_classes = [AllowAny]
 
@@ -67,7 +98,8 @@ class MarketPricesViewSet(viewsets.ViewSet):
     def mandis(self, request):
         """
         Nearby mandi list sorted by distance from user's GPS.
-        Returns the closest mandis first. Use ?radius_km=200 to expand range.
+        Returns the closest mandis first. Use ?radius_km=200 to expand range,
+        ?crop=onion to keep only reference mandis that trade it.
         """
         try:
             ctx = resolve_request_location(request)
@@ -76,6 +108,8 @@ class MarketPricesViewSet(viewsets.ViewSet):
                 radius_km = max(10, min(radius_km, 500))   # clamp 10–500 km
             except (ValueError, TypeError):
                 radius_km = 150
+            crop = (request.GET.get("crop") or request.GET.get("commodity") or "").strip()
+            norm = crop_catalog.normalize(crop) if crop else None
 
             data = market_service.list_mandis(
                 ctx.query_label,
@@ -83,6 +117,7 @@ class MarketPricesViewSet(viewsets.ViewSet):
                 lon=ctx.longitude,
                 state=ctx.state or None,
                 radius_km=radius_km,
+                commodity=(norm["name"] if norm else crop) or None,
             )
             return Response(attach_location_metadata(data, ctx))
         except Exception as exc:
@@ -144,6 +179,7 @@ class MarketPricesViewSet(viewsets.ViewSet):
                 row.setdefault("mandi_name", row.get("mandi_name") or mandi)
 
             data["selected_mandi"] = mandi
+            data.update(_mandi_geo_context(mandi, ctx, commodity))
             data["fetched_at"] = datetime.now(tz=timezone.utc).isoformat()
             data["refresh_interval_seconds"] = 300  # tell frontend when to refresh
 
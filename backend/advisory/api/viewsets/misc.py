@@ -3,10 +3,13 @@ KrishiMitra — WhatsApp, SMS/IVR, TTS, User, Forum viewsets
 ============================================================
 
 WhatsApp integration uses Meta Cloud API (free up to 1000 conversations/month).
-Flow: Farmer sends WhatsApp → Meta webhook → /api/sms-ivr/whatsapp/ → chatbot → reply
+Flow: Farmer sends WhatsApp → Meta webhook → /api/sms-ivr/whatsapp/ → queued
+      (services/whatsapp_inbox.py) → 200 to Meta at once
+      → worker: transcribe voice note → chatbot → reply via Graph API
 
 TTS uses gTTS (no API key needed, built-in) to convert advisory text to speech
-so IVR callers can hear the advice.
+so IVR callers can hear the advice.  Audio is content-addressed per sentence
+and reused across requests (services/tts_audio_cache.py); long answers stream.
 
 Setup (5 min):
   1. Create a Meta Developer app at developers.facebook.com
@@ -24,7 +27,6 @@ For Twilio SMS (alternative):
 import hashlib
 import hmac
 import html
-import io
 import json
 import logging
 import os
@@ -38,6 +40,9 @@ from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 
 from ..errors import safe_error_message
+from ...services.tts_audio_cache import TTS_MAX_CHARS, tts_audio_store
+from ...services.whatsapp_inbox import WhatsAppInbox
+
 logger = logging.getLogger(__name__)
 
 # ── Environment config ────────────────────────────────────────────────────────
@@ -49,6 +54,9 @@ TWILIO_SID            = os.getenv("TWILIO_ACCOUNT_SID", "")
 TWILIO_TOKEN          = os.getenv("TWILIO_AUTH_TOKEN", "")
 TWILIO_FROM           = os.getenv("TWILIO_FROM_NUMBER", "")
 GROQ_API_KEY          = os.getenv("GROQ_API_KEY", "")   # for Whisper STT (free tier)
+# Overridable for a local fake provider (scripts/bench_whatsapp_webhook.py)
+WHATSAPP_API_BASE     = os.getenv("WHATSAPP_API_BASE", "https://graph.facebook.com").rstrip("/")
+GROQ_API_BASE         = os.getenv("GROQ_API_BASE", "https://api.groq.com").rstrip("/")
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -90,7 +98,12 @@ class SMSIVRViewSet(viewsets.ViewSet):
         return Response({"error": "Verification failed"}, status=status.HTTP_403_FORBIDDEN)
 
     def _handle_whatsapp_message(self, request):
-        """Process incoming WhatsApp messages and reply via the AI chatbot."""
+        """
+        Validate the delivery and queue its messages — transcription, the
+        chat pipeline and the reply run on the WhatsApp inbox, not on this
+        request thread.  Redelivered message ids are dropped; when the queue
+        is full the webhook answers 503 so Meta redelivers later.
+        """
         try:
             # Optional signature verification
             if WHATSAPP_APP_SECRET:
@@ -107,65 +120,76 @@ class SMSIVRViewSet(viewsets.ViewSet):
                     return Response({"error": "Invalid signature"}, status=status.HTTP_401_UNAUTHORIZED)
 
             body = request.data
-            entry = (body.get("entry") or [{}])[0]
-            changes = (entry.get("changes") or [{}])[0]
-            value = changes.get("value", {})
-            messages = value.get("messages", [])
-
+            messages = [
+                msg
+                for entry in body.get("entry") or []
+                for change in entry.get("changes") or []
+                for msg in (change.get("value") or {}).get("messages") or []
+            ]
             if not messages:
                 return Response({"status": "no_message"})
 
-            msg      = messages[0]
-            wa_id    = msg.get("from")          # farmer's WhatsApp number
-            msg_type = msg.get("type", "text")
-
-            # ── Resolve message text ──────────────────────────────────────────
-            if msg_type == "text":
-                text = msg.get("text", {}).get("body", "").strip()
-
-            elif msg_type == "audio":
-                # Voice message — attempt Groq Whisper STT (free: 7200 sec/day)
-                audio_id = msg.get("audio", {}).get("id", "")
-                text = self._transcribe_whatsapp_audio(audio_id)
-                if text:
-                    logger.info("Voice transcribed: %s", text[:60])
-                else:
-                    # Friendly prompt to type instead
-                    text = "मेरी बात सुनी नहीं गई। कृपया अपना सवाल टाइप करें।"
-
-            elif msg_type == "image":
-                # Image with caption — treat caption as question
-                text = (msg.get("image", {}).get("caption") or "").strip()
-                if not text:
-                    text = "मेरी फसल की फोटो देखिए — क्या बीमारी है?"
+            outcomes = [whatsapp_inbox.submit(msg) for msg in messages]
+            counts = {o: outcomes.count(o) for o in set(outcomes)}
+            if "busy" in counts:
+                # Meta redelivers the whole batch; the queued ones come back as duplicates.
+                return Response({"status": "busy", **counts}, status=status.HTTP_503_SERVICE_UNAVAILABLE,
+                                headers={"Retry-After": "30"})
+            return Response({"status": "queued" if "queued" in counts else "ignored", **counts})
 
+        except Exception as exc:
+            logger.error("WhatsApp handler error: %s", exc)
+            return Response({"status": "error"}, status=status.HTTP_200_OK)   # always 200 to Meta
+
+    def _process_whatsapp_message(self, msg: dict) -> str:
+        """Answer one inbound message (runs on the WhatsApp inbox workers)."""
+        wa_id    = msg.get("from")          # farmer's WhatsApp number
+        msg_type = msg.get("type", "text")
+
+        # ── Resolve message text ──────────────────────────────────────────
+        if msg_type == "text":
+            text = msg.get("text", {}).get("body", "").strip()
+
+        elif msg_type == "audio":
+            # Voice message — attempt Groq Whisper STT (free: 7200 sec/day)
+            audio_id = msg.get("audio", {}).get("id", "")
+            text = self._transcribe_whatsapp_audio(audio_id)
+            if text:
+                logger.info("Voice transcribed: %s", text[:60])
             else:
-                text = msg.get("caption") or msg.get("body") or ""
+                # Friendly prompt to type instead
+                text = "मेरी बात सुनी नहीं गई। कृपया अपना सवाल टाइप करें।"
 
-            if not text or not wa_id:
-                return Response({"status": "ignored"})
+        elif msg_type == "image":
+            # Image with caption — treat caption as question
+            text = (msg.get("image", {}).get("caption") or "").strip()
+            if not text:
+                text = "मेरी फसल की फोटो देखिए — क्या बीमारी है?"
 
-            logger.info("WhatsApp %s from %s: %s", msg_type, wa_id[:6] + "****", text[:60])
+        else:
+            text = msg.get("caption") or msg.get("body") or ""
 
-            # ── Auto-create FarmerProfile on first message ────────────────────
-            # Ensures every WhatsApp farmer is tracked from message 1.
-            # Uses get_or_create so subsequent messages are a no-op.
-            language = self._get_or_create_profile_language(wa_id)
+        if not text or not wa_id:
+            return "ignored"
 
-            # ── Get AI response via chatbot ───────────────────────────────────
-            reply = self._get_ai_reply(query=text, phone=wa_id, language=language)
+        logger.info("WhatsApp %s from %s: %s", msg_type, wa_id[:6] + "****", text[:60])
 
-            # ── Send reply back via WhatsApp Cloud API ────────────────────────
-            if WHATSAPP_TOKEN and WHATSAPP_PHONE_ID:
-                self._send_whatsapp_reply(wa_id, reply)
-            else:
-                logger.warning("WHATSAPP_TOKEN not set — reply not sent (set in .env)")
+        # ── Auto-create FarmerProfile on first message ────────────────────
+        # Ensures every WhatsApp farmer is tracked from message 1.
+        # Uses get_or_create so subsequent messages are a no-op.
+        language = self._get_or_create_profile_language(wa_id)
 
-            return Response({"status": "replied", "to": wa_id})
+        # ── Get AI response via chatbot ───────────────────────────────────
+        reply = self._get_ai_reply(query=text, phone=wa_id, language=language)
 
-        except Exception as exc:
-            logger.error("WhatsApp handler error: %s", exc)
-            return Response({"status": "error"}, status=status.HTTP_200_OK)   # always 200 to Meta
+        # ── Send reply back via WhatsApp Cloud API ────────────────────────
+        if WHATSAPP_TOKEN and WHATSAPP_PHONE_ID:
+            self._send_whatsapp_reply(wa_id, reply)
+        else:
+            logger.warning("WHATSAPP_TOKEN not set — reply not sent (set in .env)")
+            return "not_sent"
+
+        return "replied"
 
     def _get_or_create_profile_language(self, phone: str) -> str:
         """
@@ -211,7 +235,7 @@ class SMSIVRViewSet(viewsets.ViewSet):
             import tempfile
 
             # Step 1: Get the audio download URL from Meta Graph API
-            meta_url = f"https://graph.facebook.com/v18.0/{audio_id}"
+            meta_url = f"{WHATSAPP_API_BASE}/v18.0/{audio_id}"
             req = urllib.request.Request(
                 meta_url,
                 headers={"Authorization": f"Bearer {WHATSAPP_TOKEN}"},
@@ -231,8 +255,6 @@ class SMSIVRViewSet(viewsets.ViewSet):
                 audio_bytes = resp.read()
 
             # Step 3: Transcribe via Groq Whisper API
-            import http.client
-            import mimetypes
             # Build multipart/form-data manually (no external libs needed)
             boundary = "---KrishiMitraAudioBoundary"
             body_parts = [
@@ -248,19 +270,17 @@ class SMSIVRViewSet(viewsets.ViewSet):
             ]
             body = ("".join(body_parts)).encode() + audio_bytes + f"\r\n--{boundary}--\r\n".encode()
 
-            conn = http.client.HTTPSConnection("api.groq.com", timeout=30)
-            conn.request(
-                "POST",
-                "/openai/v1/audio/transcriptions",
-                body=body,
+            groq_req = urllib.request.Request(
+                f"{GROQ_API_BASE}/openai/v1/audio/transcriptions",
+                data=body,
                 headers={
                     "Authorization": f"Bearer {GROQ_API_KEY}",
                     "Content-Type": f"multipart/form-data; boundary={boundary}",
                 },
+                method="POST",
             )
-            groq_resp = conn.getresponse()
-            groq_data = json.loads(groq_resp.read())
-            conn.close()
+            with urllib.request.urlopen(groq_req, timeout=30) as resp:
+                groq_data = json.loads(resp.read())
 
             text = groq_data.get("text", "").strip()
             logger.info("Groq Whisper transcribed %d chars", len(text))
@@ -357,7 +377,7 @@ class SMSIVRViewSet(viewsets.ViewSet):
                 "text": {"body": chunk},
             }).encode("utf-8")
             req = urllib.request.Request(
-                f"https://graph.facebook.com/v19.0/{WHATSAPP_PHONE_ID}/messages",
+                f"{WHATSAPP_API_BASE}/v19.0/{WHATSAPP_PHONE_ID}/messages",
                 data=payload,
                 headers={
                     "Content-Type":  "application/json",
@@ -500,6 +520,14 @@ class SMSIVRViewSet(viewsets.ViewSet):
         return HttpResponse(twiml, content_type="text/xml")
 
 
+def process_whatsapp_message(message: dict) -> str:
+    """Answer one queued WhatsApp message (inbox worker / Celery task)."""
+    return SMSIVRViewSet()._process_whatsapp_message(message)
+
+
+whatsapp_inbox = WhatsAppInbox(handler=process_whatsapp_message)
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 #  Text-to-Speech ViewSet
 # ─────────────────────────────────────────────────────────────────────────────
@@ -537,7 +565,7 @@ class TextToSpeechViewSet(viewsets.ViewSet):
         if not text:
             return Response({"error": "text is required"}, status=status.HTTP_400_BAD_REQUEST)
 
-        return self._render_tts(text[:500], language)
+        return self._render_tts(text[:TTS_MAX_CHARS], language)
 
     @action(detail=False, methods=["post"], url_path="advisory-audio")
     def advisory_audio(self, request):
@@ -572,37 +600,37 @@ class TextToSpeechViewSet(viewsets.ViewSet):
             advice_text = "Kisan Helpline: 1800-180-1551"
 
         # Convert to speech — call the shared helper directly (avoids fake-request anti-pattern)
-        return self._render_tts(advice_text[:500], language)
+        return self._render_tts(advice_text[:TTS_MAX_CHARS], language)
 
     # ── Internal TTS helper ───────────────────────────────────────────────────
     def _render_tts(self, text: str, language: str):
-        """Render `text` as audio/mpeg via gTTS. Returns a FileResponse or error Response."""
+        """
+        Render `text` as audio/mpeg.  Fully stored audio is one response;
+        otherwise the sentences stream as gTTS synthesises them.
+        """
+        from django.http import HttpResponse, StreamingHttpResponse
         try:
-            from gtts import gTTS
+            cached, parts = tts_audio_store.render(text, language)
         except ImportError:
             return Response(
                 {"error": "gTTS not installed", "fix": "pip install gTTS"},
                 status=status.HTTP_503_SERVICE_UNAVAILABLE,
             )
-        try:
-            lang_map = {
-                "hi": "hi", "en": "en", "mr": "mr", "ta": "ta", "te": "te",
-                "gu": "gu", "pa": "pa", "bn": "bn", "kn": "kn", "ml": "ml",
-                "or": "or", "as": "as",
-            }
-            gtts_lang = lang_map.get(language, "hi")
-            tts       = gTTS(text=text, lang=gtts_lang, slow=False)
-            buf       = io.BytesIO()
-            tts.write_to_fp(buf)
-            buf.seek(0)
-            from django.http import FileResponse
-            return FileResponse(buf, content_type="audio/mpeg", as_attachment=False, filename="advisory.mp3")
+        except ValueError:
+            return Response({"error": "text has nothing to speak"}, status=status.HTTP_400_BAD_REQUEST)
         except Exception as exc:
             logger.error("TTS render failed: %s", exc)
             return Response(
                 {"error": safe_error_message(exc, context="tts")},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,
             )
+        if cached:
+            resp = HttpResponse(parts[0], content_type="audio/mpeg")
+        else:
+            resp = StreamingHttpResponse(parts, content_type="audio/mpeg")
+        resp["Content-Disposition"] = 'inline; filename="advisory.mp3"'
+        resp["X-TTS-Cache"] = "hit" if cached else "miss"
+        return resp
 
 
 # ─────────────────────────────────────────────────────────────────────────────
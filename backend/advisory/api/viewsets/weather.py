@@ -6,7 +6,8 @@ Endpoints
 GET /api/weather/         — current weather + 7-day forecast (via list → current)
 GET /api/weather/current/ — same as above
 
-Both hit Open-Meteo (free, no API key) as primary source.
+Both hit Open-Meteo (free, no API key) as primary source, through the
+grid-cell forecast cache in WeatherService; GET /api/weather/refresh/ bypasses it.
 Every response includes:
   fetched_at      — UTC ISO-8601 timestamp of this response
   is_live         — True when fresh from Open-Meteo / OWM
@@ -59,9 +60,12 @@ class WeatherViewSet(viewsets.ViewSet):
             except Exception:
                 pass
 
-        # If still no age, default to 0 for live or None for non-live
+        # Forecast-cache hits carry their age; fresh upstream fetches are 0
         if "data_age_minutes" not in data:
-            data["data_age_minutes"] = 0 if data.get("is_live") else None
+            if data.get("is_live"):
+                data["data_age_minutes"] = int(data.get("cache_age_seconds") or 0) // 60
+            else:
+                data["data_age_minutes"] = None
 
         return Response(attach_location_metadata(data, ctx))
 
@@ -95,18 +99,19 @@ class WeatherViewSet(viewsets.ViewSet):
             lang = normalise_language_code(
                 request.query_params.get("language", "hi")
             )
-            # Invalidate the Django weather_cache for this location
+            # Invalidate the geocode entry; force_refresh bypasses and rewrites
+            # the grid-cell forecast cache for this location.
             try:
                 from django.core.cache import caches
                 cache = caches["weather_cache"]
-                key_norm = (ctx.query_label or "").strip().lower().replace(" ", "_")
+                key_norm = (ctx.query_label or "").strip().lower()
                 cache.delete(f"geocode:{key_norm}")
-                cache.delete(f"weather:{key_norm}:{lang}")
             except Exception:
                 pass  # cache miss is fine — fresh fetch will repopulate
 
             data = weather_service.get_weather(
-                ctx.query_label, ctx.latitude, ctx.longitude, lang=lang
+                ctx.query_label, ctx.latitude, ctx.longitude, lang=lang,
+                force_refresh=True,
             )
             now_utc = datetime.now(tz=timezone.utc)
             data["fetched_at"]       = now_utc.isoformat()
@@ -0,0 +1,35 @@
+"""
+Management command: invalidate cached LLM answers.
+
+Run after a knowledge-base / model update, or when an advisory for one area
+must stop being served:
+    python manage.py invalidate_response_cache
+    python manage.py invalidate_response_cache --lat 26.85 --lon 80.95
+    python manage.py invalidate_response_cache --region "Uttar Pradesh"
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = "Invalidate the LLM response cache — everywhere, or for one location cell / state."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--lat", type=float, default=None)
+        parser.add_argument("--lon", type=float, default=None)
+        parser.add_argument("--region", default="", help="state name used when coordinates are unknown")
+
+    def handle(self, *args, **options):
+        from advisory.services.response_cache import location_cell, response_cache
+
+        lat, lon, region = options["lat"], options["lon"], options["region"]
+        if (lat is None) != (lon is None):
+            raise CommandError("--lat and --lon must be given together")
+
+        response_cache.invalidate(lat=lat, lon=lon, region=region)
+        if lat is None and not region:
+            self.stdout.write(self.style.SUCCESS("Response cache invalidated (all cells)"))
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                f"Response cache invalidated for cell {location_cell(lat, lon, region)}"
+            ))
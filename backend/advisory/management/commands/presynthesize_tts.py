@@ -0,0 +1,30 @@
+"""
+Management command: synthesise frequent TTS phrases ahead of traffic.
+
+Stores the fixed greetings / helpline lines (SEED_PHRASES) and the most
+requested sentences per language, so IVR callers and /api/tts/ hear them
+without waiting for gTTS.  Run on deploy or from cron:
+    python manage.py presynthesize_tts
+    python manage.py presynthesize_tts --languages hi mr pa --top 300
+"""
+
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = "Pre-synthesise seed phrases and the most requested TTS sentences per language."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--languages", nargs="+", default=["hi", "en"])
+        parser.add_argument("--top", type=int, default=100, help="most requested sentences per language")
+
+    def handle(self, *args, **options):
+        from advisory.services.tts_audio_cache import tts_audio_store
+
+        report = tts_audio_store.presynthesize(options["languages"], top=options["top"])
+        for language, done in report.items():
+            style = self.style.WARNING if done["failed"] else self.style.SUCCESS
+            self.stdout.write(style(
+                f"  {language}: {done['synthesized']} synthesised, {done['stored']} already stored, "
+                f"{done['failed']} failed"
+            ))
@@ -15,7 +15,7 @@ logger = logging.getLogger(__name__)
 
 
 class Command(BaseCommand):
-    help = "Pre-warm the Agmarknet price cache and weather geocode cache."
+    help = "Pre-warm the Agmarknet price cache and the grid-cell weather forecast cache."
 
     def handle(self, *args, **options):
         self.stdout.write("Warming mandi price cache (data.gov.in → Agmarknet → seed)...")
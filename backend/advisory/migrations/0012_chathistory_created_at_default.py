@@ -0,0 +1,26 @@
+"""
+ChatHistory.created_at: auto_now_add → default=timezone.now.
+
+auto_now_add overwrites any value on insert (bulk_create included), so
+write-behind rows got the flush time and a requeued batch could sort after
+newer turns.  With a default the turn time stamped by save_turn() is kept;
+plain creates behave as before.  No schema change.
+"""
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("advisory", "0011_iotsensorreading_latlon_created_idx"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="chathistory",
+            name="created_at",
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+    ]
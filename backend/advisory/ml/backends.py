@@ -0,0 +1,141 @@
+"""
+Inference backends for CropDiseasePredictor.
+
+  keras   the full EfficientNet-B3 (.keras) through tf.keras — needed for
+          training, evaluation and Grad-CAM
+  tflite  an int8 / float16 / dynamic-range export from export.py, run by
+          tflite_runtime (no TensorFlow import at all) or tf.lite when only
+          TensorFlow is installed.  A fraction of the Keras model's memory
+          and startup time per Gunicorn worker.
+
+Every backend takes a float32 batch (B, 224, 224, 3) in [0, 255] and returns
+(B, num_classes) probabilities.  Selected with ML_BACKEND (config.py).
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from .config import (
+    EXPORT_MANIFEST_FILENAME,
+    INFERENCE_BACKEND,
+    INFERENCE_THREADS,
+    MODEL_FILENAME,
+    TFLITE_QUANTIZATION,
+    tflite_filename,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class KerasBackend:
+    name = "keras"
+
+    def __init__(self, model_path: Path):
+        import tensorflow as tf
+
+        self.path = model_path
+        self.model = tf.keras.models.load_model(model_path)
+
+    def predict(self, batch: np.ndarray) -> np.ndarray:
+        return self.model.predict(batch, verbose=0)
+
+
+def _tflite_interpreter(path: Path, num_threads: Optional[int]):
+    try:
+        from tflite_runtime.interpreter import Interpreter
+    except ImportError:
+        import tensorflow as tf
+        Interpreter = tf.lite.Interpreter
+    return Interpreter(model_path=str(path), num_threads=num_threads)
+
+
+class TFLiteBackend:
+    """
+    One interpreter per backend, serialised by a lock (interpreters are not
+    thread-safe; the micro-batcher already funnels passes through one thread).
+    Samples are invoked one at a time on a fixed (1, H, W, 3) input — no
+    tensor reallocation per batch size, and the CPU kernels gain little from
+    larger batches.  Quantized (int8/uint8) input/output tensors are handled
+    with their scale / zero point; the default export keeps float32 I/O.
+    """
+
+    name = "tflite"
+
+    def __init__(self, model_path: Path, num_threads: Optional[int] = INFERENCE_THREADS):
+        self.path = model_path
+        self._lock = threading.Lock()
+        self._interp = _tflite_interpreter(model_path, num_threads)
+        self._interp.allocate_tensors()
+        self._input = self._interp.get_input_details()[0]
+        self._output = self._interp.get_output_details()[0]
+        self.name = f"tflite-{_manifest(model_path.parent).get('quantization', 'unknown')}"
+
+    def _to_input(self, sample: np.ndarray) -> np.ndarray:
+        dtype = self._input["dtype"]
+        if dtype in (np.int8, np.uint8):
+            scale, zero = self._input["quantization"]
+            info = np.iinfo(dtype)
+            sample = np.clip(np.round(sample / scale + zero), info.min, info.max)
+        return np.expand_dims(sample.astype(dtype), 0)
+
+    def _from_output(self, out: np.ndarray) -> np.ndarray:
+        if self._output["dtype"] in (np.int8, np.uint8):
+            scale, zero = self._output["quantization"]
+            return (out.astype(np.float32) - zero) * scale
+        return out.astype(np.float32)
+
+    def predict(self, batch: np.ndarray) -> np.ndarray:
+        rows = []
+        with self._lock:
+            for sample in np.asarray(batch, dtype=np.float32):
+                self._interp.set_tensor(self._input["index"], self._to_input(sample))
+                self._interp.invoke()
+                rows.append(self._from_output(self._interp.get_tensor(self._output["index"])[0]))
+        return np.stack(rows)
+
+
+def _manifest(model_dir: Path) -> Dict[str, Any]:
+    path = model_dir / EXPORT_MANIFEST_FILENAME
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def keras_model_path(model_dir: Path) -> Optional[Path]:
+    model_path = model_dir / MODEL_FILENAME
+    if model_path.exists():
+        return model_path
+    alt = model_dir / "checkpoints" / "best.keras"
+    return alt if alt.exists() else None
+
+
+def load_backend(
+    model_dir: Path,
+    kind: str = INFERENCE_BACKEND,
+    quantization: str = TFLITE_QUANTIZATION,
+):
+    """
+    Backend for ``model_dir`` or None when no artifact for ``kind`` exists.
+    ``auto`` prefers the TFLite export and falls back to the Keras model.
+    """
+    tflite_path = model_dir / tflite_filename(quantization)
+    if kind in ("tflite", "auto") and tflite_path.exists():
+        return TFLiteBackend(tflite_path)
+    if kind == "tflite":
+        logger.warning("ML_BACKEND=tflite but %s is missing — run: python -m advisory.ml.export", tflite_path)
+        return None
+    if kind not in ("keras", "auto"):
+        logger.warning("Unknown ML_BACKEND=%r — using keras", kind)
+
+    model_path = keras_model_path(model_dir)
+    if model_path is None:
+        return None
+    return KerasBackend(model_path)
@@ -0,0 +1,163 @@
+"""
+Dynamic micro-batching for CPU inference.
+
+Gunicorn gthread workers each handle a request on its own thread; with a
+batch-of-1 ``model.predict`` per request, N concurrent uploads mean N
+separate forward passes fighting over the same cores.  MicroBatcher puts
+one worker thread in front of the model: request threads submit a
+preprocessed sample and get a Future back, the worker drains up to
+``max_batch_size`` samples (waiting at most ``max_wait_ms`` after the first
+one arrives for company) and runs them through a single forward pass.
+
+A lone request pays at most ``max_wait_ms`` extra latency; under load the
+batch fills before the deadline and the wait disappears.
+"""
+
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class BatcherClosedError(RuntimeError):
+    """Raised by submit() after close()."""
+
+
+class MicroBatcher:
+    """
+    Coalesce concurrent single-sample calls into batched calls.
+
+    ``run_batch`` receives a stacked array of shape (B, ...) and must return
+    a sequence of B per-sample outputs in the same order.
+    """
+
+    def __init__(
+        self,
+        run_batch: Callable[[Any], Any],
+        max_batch_size: int = 8,
+        max_wait_ms: float = 10.0,
+        name: str = "ml-batcher",
+    ):
+        self._run_batch = run_batch
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait_s = max(0.0, float(max_wait_ms)) / 1000.0
+        self._queue: "queue.Queue[Optional[Tuple[Any, Future, float]]]" = queue.Queue()
+        self._closed = False
+
+        self._stats_lock = threading.Lock()
+        self._requests = 0
+        self._batches = 0
+        self._errors = 0
+        self._max_depth = 0
+        self._fill_hist: Dict[int, int] = {}
+        self._wait_ms_total = 0.0
+
+        self._thread = threading.Thread(target=self._loop, name=name, daemon=True)
+        self._thread.start()
+
+    # ── Public API ─────────────────────────────────────────────────────────────
+    def submit(self, sample: Any) -> Future:
+        """Queue one sample; the Future resolves to its row of the batch output."""
+        if self._closed:
+            raise BatcherClosedError("batcher is closed")
+        fut: Future = Future()
+        self._queue.put((sample, fut, time.monotonic()))
+        depth = self._queue.qsize()
+        with self._stats_lock:
+            self._requests += 1
+            if depth > self._max_depth:
+                self._max_depth = depth
+        return fut
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Stop accepting work, finish what is queued, join the worker."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            batched = sum(size * n for size, n in self._fill_hist.items())
+            return {
+                "max_batch_size":  self.max_batch_size,
+                "max_wait_ms":     round(self.max_wait_s * 1000, 1),
+                "queue_depth":     self._queue.qsize(),
+                "max_queue_depth": self._max_depth,
+                "requests":        self._requests,
+                "batches":         self._batches,
+                "errors":          self._errors,
+                "avg_batch_size":  round(batched / self._batches, 2) if self._batches else 0.0,
+                "avg_batch_fill":  (
+                    round(batched / (self._batches * self.max_batch_size), 3)
+                    if self._batches else 0.0
+                ),
+                "avg_queue_wait_ms": round(self._wait_ms_total / batched, 2) if batched else 0.0,
+                "batch_size_hist": dict(sorted(self._fill_hist.items())),
+            }
+
+    # ── Worker ─────────────────────────────────────────────────────────────────
+    def _collect(self, first: Tuple[Any, Future, float]) -> Tuple[List[Tuple[Any, Future, float]], bool]:
+        """Gather up to max_batch_size items, waiting at most max_wait_s past the first."""
+        items = [first]
+        deadline = time.monotonic() + self.max_wait_s
+        while len(items) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                return items, True
+            items.append(item)
+        return items, False
+
+    def _loop(self) -> None:
+        import numpy as np
+
+        stop = False
+        while not stop:
+            first = self._queue.get()
+            if first is None:
+                break
+            items, stop = self._collect(first)
+            # Callers that gave up (future cancelled) are dropped before the pass.
+            items = [it for it in items if it[1].set_running_or_notify_cancel()]
+            if not items:
+                continue
+
+            now = time.monotonic()
+            try:
+                outputs = self._run_batch(np.stack([it[0] for it in items]))
+                if len(outputs) != len(items):
+                    raise RuntimeError(f"run_batch returned {len(outputs)} rows for {len(items)} inputs")
+            except BaseException as exc:
+                logger.error("Batched inference failed (%d samples): %s", len(items), exc)
+                with self._stats_lock:
+                    self._errors += 1
+                for _, fut, _ in items:
+                    fut.set_exception(exc)
+                continue
+
+            for (_, fut, _), out in zip(items, outputs):
+                fut.set_result(out)
+            with self._stats_lock:
+                self._batches += 1
+                self._fill_hist[len(items)] = self._fill_hist.get(len(items), 0) + 1
+                self._wait_ms_total += sum((now - t) * 1000 for _, _, t in items)
+
+        # Drain anything submitted concurrently with close().
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not None and item[1].set_running_or_notify_cancel():
+                item[1].set_exception(BatcherClosedError("batcher is closed"))
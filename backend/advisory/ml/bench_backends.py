@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Inference backend benchmark: load time, resident memory and per-image latency
+of the Keras model vs each TFLite export present in --model-dir.
+
+Every backend is measured in its own child process, so RSS is what one
+Gunicorn worker would hold with only that backend loaded (TensorFlow import
+included for keras; tflite_runtime alone when it is installed).  Latency is
+measured on batches of 1 and --batch through the backend's predict(), on
+random 224×224 inputs — accuracy parity is evaluate.py's job:
+
+  python -m advisory.ml.evaluate                       # Keras → metrics.json
+  python -m advisory.ml.evaluate --backend tflite      # parity vs metrics.json
+
+Needs a trained model (train.py) and its exports (export.py).
+
+Usage (from backend/):
+  python -m advisory.ml.bench_backends
+  python -m advisory.ml.bench_backends --quantizations int8 float16 --runs 100
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+from .config import DEFAULT_MODEL_DIR, IMG_CHANNELS, IMG_SIZE, tflite_filename
+
+
+def _rss_mb() -> float:
+    with open("/proc/self/statm") as fh:
+        return int(fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1e6
+
+
+def _pct(values: List[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def _measure(model_dir: Path, kind: str, quantization: str, runs: int, batch: int) -> Dict[str, Any]:
+    """Runs inside the child process."""
+    rss0 = _rss_mb()
+    t0 = time.perf_counter()
+    import numpy as np
+
+    from .backends import load_backend
+
+    backend = load_backend(model_dir, kind, quantization)
+    load_s = time.perf_counter() - t0
+    if backend is None:
+        return {"error": "artifact missing"}
+
+    rng = np.random.default_rng(0)
+    shape = (*IMG_SIZE, IMG_CHANNELS)
+    single = rng.uniform(0, 255, size=(1, *shape)).astype(np.float32)
+    batched = rng.uniform(0, 255, size=(batch, *shape)).astype(np.float32)
+    backend.predict(single)                               # warm-up
+    one = []
+    for _ in range(runs):
+        t = time.perf_counter()
+        backend.predict(single)
+        one.append((time.perf_counter() - t) * 1000)
+    many = []
+    for _ in range(max(1, runs // batch)):
+        t = time.perf_counter()
+        backend.predict(batched)
+        many.append((time.perf_counter() - t) * 1000 / batch)
+    return {
+        "backend": backend.name,
+        "artifact_mb": round(backend.path.stat().st_size / 1e6, 1),
+        "load_s": round(load_s, 2),
+        "rss_mb": round(_rss_mb() - rss0, 1),
+        "p50_ms": round(statistics.median(one), 1),
+        "p95_ms": round(_pct(one, 0.95), 1),
+        f"per_image_ms_b{batch}": round(statistics.mean(many), 1),
+    }
+
+
+def _child(args, kind: str, quantization: str) -> Dict[str, Any]:
+    cmd = [
+        sys.executable, "-m", "advisory.ml.bench_backends", "--child", kind, quantization,
+        "--model-dir", str(args.model_dir), "--runs", str(args.runs), "--batch", str(args.batch),
+    ]
+    proc = subprocess.run(cmd, capture_output=True, text=True)
+    if proc.returncode != 0:
+        return {"error": (proc.stderr.strip().splitlines() or ["failed"])[-1]}
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def run(args) -> Dict[str, Any]:
+    targets = [("keras", "-")]
+    targets += [("tflite", q) for q in args.quantizations if (args.model_dir / tflite_filename(q)).exists()]
+    results = {f"{kind}:{q}" if kind == "tflite" else kind: _child(args, kind, q) for kind, q in targets}
+    keras = results.get("keras", {})
+    if "p50_ms" in keras:
+        for name, r in results.items():
+            if name != "keras" and "p50_ms" in r:
+                r["speedup_vs_keras"] = round(keras["p50_ms"] / r["p50_ms"], 2)
+                r["rss_vs_keras"] = round(r["rss_mb"] / keras["rss_mb"], 2) if keras["rss_mb"] else None
+    return {"config": {k: str(v) for k, v in vars(args).items()}, "backends": results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model-dir", type=Path, default=DEFAULT_MODEL_DIR)
+    parser.add_argument("--quantizations", nargs="+", default=["int8", "float16", "dynamic"])
+    parser.add_argument("--runs", type=int, default=50, help="timed batch-of-1 calls per backend")
+    parser.add_argument("--batch", type=int, default=8, help="batch size for the batched timing")
+    parser.add_argument("--child", nargs=2, metavar=("KIND", "QUANT"), help=argparse.SUPPRESS)
+    parser.add_argument("--json", default=None, help="write results to this file")
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(_measure(args.model_dir, args.child[0], args.child[1], args.runs, args.batch)))
+        return
+
+    results = run(args)
+    print(f"\nbackends in {args.model_dir}")
+    for name, r in results["backends"].items():
+        print(f"  {name:16s} " + "  ".join(f"{k}={v}" for k, v in r.items()))
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump(results, fh, indent=2)
+    raise SystemExit(1 if any("error" in r for r in results["backends"].values()) else 0)
+
+
+if __name__ == "__main__":
+    main()
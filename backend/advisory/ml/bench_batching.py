@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Micro-batching benchmark: images/sec and latency percentiles for the
+batch-of-1 path vs the MicroBatcher path under concurrent callers.
+
+Without a trained model (or without TensorFlow) a stub model stands in for
+EfficientNet-B3.  It models a CPU-bound forward pass: one pass at a time
+owns the cores (a lock), and a pass costs ``--base-ms + B × --per-image-ms``
+— the fixed per-call overhead is what batching amortises.
+
+Usage (from backend/):
+  python -m advisory.ml.bench_batching
+  python -m advisory.ml.bench_batching --concurrency 16 --requests 256 --max-batch 16
+  python -m advisory.ml.bench_batching --real      # use the trained model if present
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List
+
+import numpy as np
+
+from .config import IMG_SIZE
+from .inference import CropDiseasePredictor
+
+
+class _StubModel:
+    def __init__(self, n_classes: int, base_ms: float, per_image_ms: float):
+        self.n_classes = n_classes
+        self.base_s = base_ms / 1000.0
+        self.per_image_s = per_image_ms / 1000.0
+        self._cores = threading.Lock()
+
+    def predict(self, batch, verbose=0):
+        with self._cores:
+            time.sleep(self.base_s + self.per_image_s * len(batch))
+        logits = batch.reshape(len(batch), -1)[:, : self.n_classes].astype(np.float64)
+        exp = np.exp(logits - logits.max(axis=1, keepdims=True))
+        return exp / exp.sum(axis=1, keepdims=True)
+
+
+class _StubPredictor(CropDiseasePredictor):
+    def __init__(self, args, max_batch_size: int):
+        self._args = args
+        super().__init__(max_batch_size=max_batch_size, max_wait_ms=args.max_wait_ms)
+
+    def _load(self) -> None:
+        self.class_names = ["tomato__healthy", "tomato__late_blight", "potato__early_blight"]
+        self.model = _StubModel(len(self.class_names), self._args.base_ms, self._args.per_image_ms)
+
+    @staticmethod
+    def _preprocess(image):
+        return np.asarray(image, dtype=np.float32)
+
+
+def _run(predictor, images: List[Any], concurrency: int) -> Dict[str, Any]:
+    latencies: List[float] = []
+    lock = threading.Lock()
+
+    def one(img):
+        t0 = time.perf_counter()
+        predictor.predict(img, skip_validation=True)
+        dt = (time.perf_counter() - t0) * 1000
+        with lock:
+            latencies.append(dt)
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, images))
+    wall = time.perf_counter() - t0
+
+    latencies.sort()
+    pct = lambda q: round(latencies[min(len(latencies) - 1, int(q * len(latencies)))], 1)
+    return {
+        "images":         len(images),
+        "wall_s":         round(wall, 3),
+        "images_per_sec": round(len(images) / wall, 1),
+        "p50_ms":         pct(0.50),
+        "p95_ms":         pct(0.95),
+        "mean_ms":        round(statistics.mean(latencies), 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=128)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--max-batch", type=int, default=8)
+    parser.add_argument("--max-wait-ms", type=float, default=10.0)
+    parser.add_argument("--base-ms", type=float, default=40.0, help="stub: fixed cost per forward pass")
+    parser.add_argument("--per-image-ms", type=float, default=8.0, help="stub: marginal cost per image")
+    parser.add_argument("--real", action="store_true", help="use the trained model (needs TensorFlow)")
+    parser.add_argument("--json", default=None, help="write results to this file")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    if args.real:
+        def make(bs):
+            return CropDiseasePredictor(max_batch_size=bs, max_wait_ms=args.max_wait_ms)
+        images = [
+            rng.integers(0, 255, size=(*IMG_SIZE, 3), dtype=np.uint8) for _ in range(args.requests)
+        ]
+    else:
+        def make(bs):
+            return _StubPredictor(args, bs)
+        images = [rng.random((8, 8, 3), dtype=np.float32) for _ in range(args.requests)]
+
+    results = {}
+    for label, bs in (("batch_of_1", 1), ("micro_batched", args.max_batch)):
+        predictor = make(bs)
+        if not predictor.is_ready:
+            raise SystemExit("No trained model found — drop --real to use the stub model")
+        predictor.predict(images[0], skip_validation=True)      # warm-up
+        results[label] = _run(predictor, images, args.concurrency)
+        stats = predictor.batching_stats()
+        if stats:
+            results[label]["batching"] = {
+                k: stats[k] for k in ("batches", "avg_batch_size", "avg_batch_fill", "max_queue_depth")
+            }
+        if predictor._batcher is not None:
+            predictor._batcher.close()
+
+    base, mb = results["batch_of_1"], results["micro_batched"]
+    print(f"\n{'path':15s} {'img/s':>8s} {'p50 ms':>8s} {'p95 ms':>8s}")
+    for label, r in results.items():
+        print(f"{label:15s} {r['images_per_sec']:>8} {r['p50_ms']:>8} {r['p95_ms']:>8}")
+    print(
+        f"\nthroughput ×{mb['images_per_sec'] / base['images_per_sec']:.2f}, "
+        f"p95 {base['p95_ms']} → {mb['p95_ms']} ms "
+        f"(concurrency={args.concurrency}, max_batch={args.max_batch}, max_wait={args.max_wait_ms} ms)"
+    )
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump({"config": vars(args), "results": results}, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
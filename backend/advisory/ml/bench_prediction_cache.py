@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Prediction cache benchmark: latency of repeat uploads with and without the
+content-hash / perceptual-hash cache.
+
+A stream of --uploads synthetic leaf JPEGs, mixed like a day of farmer
+traffic:
+
+  new         a photo seen for the first time
+  repeat      the same bytes again (retry on a flaky connection)
+  re-encoded  the same photo recompressed and downscaled (WhatsApp forward)
+
+Photos are synthetic (a leaf with lesions on soil, random placement and
+colour); each upload goes through CropDiseasePredictor.predict() with a stub forward
+pass (bench_batching's, ``--base-ms + B × --per-image-ms``), once with
+the cache off and once on an explicit LocMemCache (standing in for the
+shared Redis alias).  Checked:
+
+  - repeats hit the exact tier, re-encodes the perceptual tier (photos
+    rejected as not_plant are never cached)
+  - no distinct photo is ever answered from another photo's entry
+  - every cached answer equals the uncached answer for that photo
+
+Usage (from backend/):
+  python -m advisory.ml.bench_prediction_cache
+  python -m advisory.ml.bench_prediction_cache --uploads 300 --repeat 0.5
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import statistics
+import time
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+from django.core.cache.backends.locmem import LocMemCache
+
+from .bench_batching import _StubModel
+from .inference import CropDiseasePredictor
+from .prediction_cache import PredictionCache
+from .preprocess import prepare_for_model
+
+
+class _StubPredictor(CropDiseasePredictor):
+    """Real decode/validate/resize pipeline and cache, stub forward pass."""
+
+    def __init__(self, args, cache: PredictionCache):
+        self._args = args
+        super().__init__(max_batch_size=1, cache=cache)
+
+    def _load(self) -> None:
+        self.class_names = ["tomato__healthy", "tomato__late_blight", "potato__early_blight"]
+        self.model = _StubModel(len(self.class_names), self._args.base_ms, self._args.per_image_ms)
+        self.model_version = "stub"
+
+    @staticmethod
+    def _preprocess(image):
+        return prepare_for_model(image, remove_bg=True)[0]
+
+
+def _leaf_photo(rng: np.random.Generator, width: int, height: int) -> bytes:
+    """A leaf on soil: random placement, size, tilt and lesions, plus sensor noise."""
+    import cv2
+
+    yy = np.linspace(0, 1, height, dtype=np.float32)[:, None, None]
+    soil = np.array([110, 85, 60], dtype=np.float32) + rng.uniform(-25, 25, 3)
+    img = soil * (0.75 + 0.5 * yy) * np.ones((height, width, 3), dtype=np.float32)
+    centre = (int(width * rng.uniform(0.35, 0.65)), int(height * rng.uniform(0.35, 0.65)))
+    axes = (int(width * rng.uniform(0.2, 0.35)), int(height * rng.uniform(0.12, 0.25)))
+    angle = float(rng.uniform(0, 180))
+    leaf = np.array([60, 140, 45], dtype=np.float32) + rng.uniform(-20, 20, 3)
+    cv2.ellipse(img, centre, axes, angle, 0, 360, leaf.tolist(), -1)
+    for _ in range(int(rng.integers(3, 12))):
+        spot = (int(centre[0] + rng.uniform(-0.8, 0.8) * axes[0] * 0.7),
+                int(centre[1] + rng.uniform(-0.8, 0.8) * axes[1] * 0.7))
+        cv2.circle(img, spot, int(rng.integers(15, 60)), (120, 90, 40), -1)
+    img += rng.normal(0, 6, img.shape).astype(np.float32)
+    ok, buf = cv2.imencode(".jpg", cv2.cvtColor(np.clip(img, 0, 255).astype(np.uint8), cv2.COLOR_RGB2BGR),
+                           [cv2.IMWRITE_JPEG_QUALITY, 90])
+    return buf.tobytes()
+
+
+def _reencode(raw: bytes, quality: int, scale: float) -> bytes:
+    from PIL import Image
+
+    img = Image.open(io.BytesIO(raw)).convert("RGB")
+    img = img.resize((int(img.width * scale), int(img.height * scale)), Image.Resampling.BILINEAR)
+    buf = io.BytesIO()
+    img.save(buf, format="JPEG", quality=quality)
+    return buf.getvalue()
+
+
+def _stream(args) -> List[Tuple[str, int, bytes]]:
+    """(kind, photo id, bytes) in arrival order."""
+    rng = np.random.default_rng(args.seed)
+    photos: List[bytes] = []
+    stream = []
+    for _ in range(args.uploads):
+        roll = rng.random()
+        if photos and roll < args.repeat:
+            pid = int(rng.integers(len(photos)))
+            stream.append(("repeat", pid, photos[pid]))
+        elif photos and roll < args.repeat + args.reencoded:
+            pid = int(rng.integers(len(photos)))
+            stream.append(("re-encoded", pid, _reencode(photos[pid], quality=70, scale=0.75)))
+        else:
+            photos.append(_leaf_photo(rng, args.width, args.height))
+            stream.append(("new", len(photos) - 1, photos[-1]))
+    return stream
+
+
+def _answer(result: Dict[str, Any]) -> Tuple:
+    return tuple((p["label"], p["probability"]) for p in result["top_predictions"])
+
+
+def run(args) -> Dict[str, Any]:
+    stream = _stream(args)
+    off = _StubPredictor(args, PredictionCache(enabled=False))
+    cache = PredictionCache(cache=LocMemCache("bench-pred", {"OPTIONS": {"MAX_ENTRIES": 10000}}))
+    on = _StubPredictor(args, cache)
+    off.predict(stream[0][2])                              # warm-up (imports, OpenCV init)
+
+    timings: Dict[str, Dict[str, List[float]]] = {"uncached": {}, "cached": {}}
+    truth: Dict[int, Tuple] = {}
+    cacheable: Dict[int, bool] = {}
+    failures: List[str] = []
+    matches: Dict[str, Dict[str, int]] = {}
+    for kind, pid, raw in stream:
+        t0 = time.perf_counter()
+        want = off.predict(raw)
+        timings["uncached"].setdefault(kind, []).append((time.perf_counter() - t0) * 1000)
+        truth.setdefault(pid, _answer(want))
+        cacheable.setdefault(pid, want["status"] in ("success", "low_confidence"))
+
+        t0 = time.perf_counter()
+        got = on.predict(raw)
+        timings["cached"].setdefault(kind, []).append((time.perf_counter() - t0) * 1000)
+        match = got.get("cache", {}).get("match", "miss")
+        matches.setdefault(kind, {}).setdefault(match, 0)
+        matches[kind][match] += 1
+        if _answer(got) != truth[pid]:
+            failures.append(f"{kind} upload of photo {pid}: cached answer differs ({match})")
+        if kind == "new" and match != "miss":
+            failures.append(f"new photo {pid} answered from another photo's entry ({match})")
+
+    reused = sum(1 for kind, _, _ in stream if kind != "new")
+    # not_plant verdicts are not cached: their repeats are expected misses.
+    exact = matches.get("repeat", {}).get("exact", 0)
+    expected = sum(1 for kind, pid, _ in stream if kind == "repeat" and cacheable[pid])
+    if exact != expected:
+        failures.append(f"repeat: {exact}/{expected} exact hits")
+    # The same forward re-encoded twice is byte-identical: an exact hit counts too.
+    reenc = matches.get("re-encoded", {})
+    served = reenc.get("perceptual", 0) + reenc.get("exact", 0)
+    if reenc and served < sum(reenc.values()) * args.min_perceptual:
+        failures.append(f"re-encoded: {served}/{sum(reenc.values())} served from cache")
+
+    def _summary(values: List[float]) -> Dict[str, float]:
+        return {"n": len(values), "mean_ms": round(statistics.mean(values), 1),
+                "p50_ms": round(statistics.median(values), 1)}
+
+    return {
+        "config": vars(args),
+        "latency": {mode: {kind: _summary(v) for kind, v in per.items()} for mode, per in timings.items()},
+        "matches": matches,
+        "reused_uploads": reused,
+        "cache_stats": cache.stats(),
+        "failures": failures,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--uploads", type=int, default=120)
+    parser.add_argument("--repeat", type=float, default=0.3, help="share of byte-identical re-uploads")
+    parser.add_argument("--reencoded", type=float, default=0.2, help="share of recompressed forwards")
+    parser.add_argument("--min-perceptual", type=float, default=0.9,
+                        help="share of re-encoded uploads that must be served from cache")
+    parser.add_argument("--width", type=int, default=1600)
+    parser.add_argument("--height", type=int, default=1200)
+    parser.add_argument("--base-ms", type=float, default=40.0, help="stub: fixed cost per forward pass")
+    parser.add_argument("--per-image-ms", type=float, default=8.0, help="stub: marginal cost per image")
+    parser.add_argument("--seed", type=int, default=19)
+    parser.add_argument("--json", default=None, help="write results to this file")
+    args = parser.parse_args()
+
+    results = run(args)
+    print(f"\n{args.uploads} uploads, {args.width}×{args.height} JPEG")
+    print(f"{'upload':12s} {'n':>4s} {'uncached ms':>12s} {'cached ms':>10s}  cache tier")
+    for kind in ("new", "repeat", "re-encoded"):
+        if kind not in results["latency"]["uncached"]:
+            continue
+        u, c = results["latency"]["uncached"][kind], results["latency"]["cached"][kind]
+        print(f"{kind:12s} {u['n']:>4} {u['mean_ms']:>12} {c['mean_ms']:>10}  {results['matches'][kind]}")
+    st = results["cache_stats"]
+    print(f"hit rate {st['hit_rate']} (exact {st['exact_hits']}, perceptual {st['perceptual_hits']}, "
+          f"misses {st['misses']})")
+    for f in results["failures"]:
+        print(f"  ❌ {f}")
+    if not results["failures"]:
+        print("  ✅ repeats and re-encodes served from cache, answers identical, no false matches")
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump(results, fh, indent=2)
+    raise SystemExit(1 if results["failures"] else 0)
+
+
+if __name__ == "__main__":
+    main()
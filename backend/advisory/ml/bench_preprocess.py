@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Preprocessing benchmark: per-image CPU time of the upload pipeline before and
+after decode-once, and multi-view uploads before and after batching.
+
+  single image  before: service validation (decode #1) → predictor
+                validation (decode #2) → prepare_for_model (decode #3)
+                after:  decode_image once → validate + prepare on the array
+  multi-view    --views photos of one plant: each view decoded/validated/
+                preprocessed in turn + one batch-of-1 forward pass per view,
+                vs predict_views() (parallel preprocessing, one batched pass)
+
+Synthetic leaf-coloured JPEGs (--width × --height) stand in for phone
+uploads.  The forward pass is bench_batching's stub model (one pass owns the
+cores, ``--base-ms + B × --per-image-ms``), so TensorFlow is not needed;
+Pillow and OpenCV are (requirements-ml.txt).
+
+Parity: the decode-once path must produce the same validation metrics and
+the same model input, bit for bit, as the three-decode path.
+
+Usage (from backend/):
+  python -m advisory.ml.bench_preprocess
+  python -m advisory.ml.bench_preprocess --images 50 --width 4000 --height 3000
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import statistics
+import time
+from typing import Any, Dict, List
+
+import numpy as np
+
+from .bench_batching import _StubModel
+from .image_validation import validate_plant_image
+from .inference import CropDiseasePredictor
+from .preprocess import decode_image, prepare_for_model
+
+
+class _StubPredictor(CropDiseasePredictor):
+    """Real decode/validate/resize pipeline, stub forward pass."""
+
+    def __init__(self, args):
+        self._args = args
+        super().__init__(max_batch_size=1)
+
+    def _load(self) -> None:
+        self.class_names = ["tomato__healthy", "tomato__late_blight", "potato__early_blight"]
+        self.model = _StubModel(len(self.class_names), self._args.base_ms, self._args.per_image_ms)
+
+    @staticmethod
+    def _preprocess(image):
+        # EfficientNet's preprocess_input needs TensorFlow; it is the same on both paths.
+        return prepare_for_model(image, remove_bg=True)[0]
+
+
+def _jpeg(rng: np.random.Generator, width: int, height: int) -> bytes:
+    from PIL import Image
+
+    base = np.array([70, 140, 50], dtype=np.int16)
+    noise = rng.integers(-40, 40, size=(height // 8, width // 8, 3), dtype=np.int16)
+    small = np.clip(base + noise, 0, 255).astype(np.uint8)
+    img = Image.fromarray(small).resize((width, height), Image.Resampling.BILINEAR)
+    buf = io.BytesIO()
+    img.save(buf, format="JPEG", quality=90)
+    return buf.getvalue()
+
+
+def _three_decodes(raw: bytes):
+    validate_plant_image(raw)                       # CropDiseaseMLService._validate_or_block
+    metrics = validate_plant_image(raw)[2]          # predictor.predict(skip_validation=False)
+    return metrics, prepare_for_model(raw)          # _preprocess
+
+
+def _decode_once(raw: bytes):
+    arr = decode_image(raw)
+    return validate_plant_image(arr)[2], prepare_for_model(arr)
+
+
+def _cpu_ms(fn, items: List[Any]) -> List[float]:
+    out = []
+    for it in items:
+        t0 = time.process_time()
+        fn(it)
+        out.append((time.process_time() - t0) * 1000)
+    return out
+
+
+def _summary(cpu_ms: List[float]) -> Dict[str, float]:
+    return {"mean_cpu_ms": round(statistics.mean(cpu_ms), 2), "p50_cpu_ms": round(statistics.median(cpu_ms), 2)}
+
+
+def run(args) -> Dict[str, Any]:
+    rng = np.random.default_rng(0)
+    uploads = [_jpeg(rng, args.width, args.height) for _ in range(args.images)]
+    failures: List[str] = []
+
+    # ── parity ────────────────────────────────────────────────────────
+    for i, raw in enumerate(uploads[:5]):
+        m1, x1 = _three_decodes(raw)
+        m2, x2 = _decode_once(raw)
+        if m1 != m2 or not np.array_equal(x1, x2):
+            failures.append(f"image {i}: decode-once output differs from the three-decode path")
+
+    # ── single image CPU time ─────────────────────────────────────────
+    _decode_once(uploads[0])                         # warm-up (imports, OpenCV init)
+    before = _summary(_cpu_ms(_three_decodes, uploads))
+    after = _summary(_cpu_ms(_decode_once, uploads))
+
+    # ── multi-view wall time ──────────────────────────────────────────
+    predictor = _StubPredictor(args)
+    groups = [uploads[i:i + args.views] for i in range(0, len(uploads) - args.views + 1, args.views)]
+
+    def sequential(views):
+        probs = []
+        for raw in views:
+            valid, _, _ = validate_plant_image(raw)
+            if valid:
+                sample = _StubPredictor._preprocess(raw)
+                probs.append(predictor._predict_batch(np.expand_dims(sample, 0))[0])
+        return np.mean(probs, axis=0)
+
+    predictor.predict_views(groups[0])               # warm-up the pool
+    t0 = time.perf_counter()
+    want = [sequential(g) for g in groups]
+    seq_ms = (time.perf_counter() - t0) / len(groups) * 1000
+    t0 = time.perf_counter()
+    got = [predictor.predict_views(g) for g in groups]
+    batched_ms = (time.perf_counter() - t0) / len(groups) * 1000
+    for g, (w, r) in enumerate(zip(want, got)):
+        best = r["top_predictions"][0]
+        if r["views"]["used"] != args.views or abs(best["probability"] - round(float(w.max()), 4)) > 1e-4:
+            failures.append(f"view group {g}: predict_views disagrees with the per-view average")
+
+    return {
+        "config": vars(args),
+        "single_image": {
+            "three_decodes": before,
+            "decode_once": after,
+            "cpu_saving": round(1 - after["mean_cpu_ms"] / before["mean_cpu_ms"], 3),
+        },
+        "multi_view": {
+            "views": args.views,
+            "sequential_ms": round(seq_ms, 1),
+            "parallel_batched_ms": round(batched_ms, 1),
+            "speedup": round(seq_ms / batched_ms, 2),
+        },
+        "failures": failures,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--images", type=int, default=30)
+    parser.add_argument("--width", type=int, default=1600)
+    parser.add_argument("--height", type=int, default=1200)
+    parser.add_argument("--views", type=int, default=3, help="photos per multi-view upload")
+    parser.add_argument("--base-ms", type=float, default=40.0, help="stub: fixed cost per forward pass")
+    parser.add_argument("--per-image-ms", type=float, default=8.0, help="stub: marginal cost per image")
+    parser.add_argument("--json", default=None, help="write results to this file")
+    args = parser.parse_args()
+
+    results = run(args)
+    single, multi = results["single_image"], results["multi_view"]
+    print(f"\n{args.images} uploads, {args.width}×{args.height} JPEG")
+    print(f"{'path':15s} {'mean CPU ms':>12s} {'p50 CPU ms':>11s}")
+    for label in ("three_decodes", "decode_once"):
+        r = single[label]
+        print(f"{label:15s} {r['mean_cpu_ms']:>12} {r['p50_cpu_ms']:>11}")
+    print(f"per-image CPU −{single['cpu_saving']:.0%}")
+    print(f"{multi['views']}-view upload: {multi['sequential_ms']} ms sequential → "
+          f"{multi['parallel_batched_ms']} ms parallel + one batch (×{multi['speedup']})")
+    for f in results["failures"]:
+        print(f"  ❌ {f}")
+    if not results["failures"]:
+        print("  ✅ decode-once output identical to the three-decode path")
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump(results, fh, indent=2)
+    raise SystemExit(1 if results["failures"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -31,6 +31,22 @@ SEED = 42
 # Inference
 CONFIDENCE_THRESHOLD = float(os.getenv("ML_CONFIDENCE_THRESHOLD", "0.75"))
 TOP_K = 3
+# Micro-batching: concurrent predict() calls share one forward pass.
+# ML_MAX_BATCH_SIZE=1 disables batching (direct batch-of-1 path).
+MAX_BATCH_SIZE = int(os.getenv("ML_MAX_BATCH_SIZE", "8"))
+MAX_BATCH_WAIT_MS = float(os.getenv("ML_MAX_BATCH_WAIT_MS", "10"))
+PREDICT_TIMEOUT_S = float(os.getenv("ML_PREDICT_TIMEOUT_S", "30"))
+# Threads decoding / preprocessing the views of a multi-image upload in parallel
+# (Pillow decode and the OpenCV calls release the GIL).
+PREPROCESS_WORKERS = int(os.getenv("ML_PREPROCESS_WORKERS", "4"))
+# Prediction cache (prediction_cache.py): results keyed by upload hash and
+# perceptual hash, in the shared ``prediction_cache`` alias.
+PREDICTION_CACHE_ENABLED = os.getenv("ML_PREDICTION_CACHE", "1") not in ("0", "false", "False")
+PREDICTION_CACHE_TTL_S = int(os.getenv("ML_PREDICTION_CACHE_TTL_S", str(3 * 86400)))
+# A re-encoded copy matches when its dHash is within PHASH_MAX_DISTANCE bits
+# (max 7) and its 16×16 grey thumbnail within PERCEPTUAL_MAX_MAD grey levels.
+PHASH_MAX_DISTANCE = int(os.getenv("ML_PHASH_MAX_DISTANCE", "7"))
+PERCEPTUAL_MAX_MAD = float(os.getenv("ML_PERCEPTUAL_MAX_MAD", "0.75"))
 UNKNOWN_LABEL = "unknown__unknown"
 UNKNOWN_DISPLAY = "Unknown"
 LOW_CONFIDENCE_MESSAGE = (
@@ -41,6 +57,16 @@ NOT_PLANT_MESSAGE = (
     "(not a laptop, person, or indoor object)."
 )
 
+# Inference backend: keras (full model) | tflite (quantized export, see
+# export.py) | auto (tflite when an exported artifact exists, else keras).
+INFERENCE_BACKEND = os.getenv("ML_BACKEND", "keras").lower()
+TFLITE_QUANTIZATION = os.getenv("ML_TFLITE_QUANTIZATION", "int8")     # int8 | float16 | dynamic
+INFERENCE_THREADS = int(os.getenv("ML_INFERENCE_THREADS", "0")) or None  # None → runtime default
+# Representative images for int8 calibration
+CALIBRATION_SAMPLES = int(os.getenv("ML_CALIBRATION_SAMPLES", "200"))
+# Largest top-1 accuracy drop an export may show against the Keras model
+MAX_EXPORT_ACCURACY_DROP = float(os.getenv("ML_MAX_EXPORT_ACCURACY_DROP", "0.01"))
+
 # Supported dataset folder names (under data/datasets/raw/)
 DATASET_SOURCES = (
     "plantvillage",
@@ -61,3 +87,13 @@ MODEL_FILENAME = "efficientnetb3_crop_disease.keras"
 LABELS_FILENAME = "class_labels.json"
 METRICS_FILENAME = "metrics.json"
 HISTORY_FILENAME = "training_history.json"
+EXPORT_MANIFEST_FILENAME = "export_manifest.json"
+
+
+def tflite_filename(quantization: str) -> str:
+    return f"efficientnetb3_crop_disease_{quantization}.tflite"
+
+
+def metrics_filename(backend: str) -> str:
+    """metrics.json for the Keras model, metrics_<backend>.json for exports."""
+    return METRICS_FILENAME if backend == "keras" else f"metrics_{backend}.json"
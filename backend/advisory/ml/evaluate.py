@@ -2,8 +2,14 @@
 """
 Evaluate trained model: accuracy, precision, recall, F1, confusion matrix.
 
+--backend tflite evaluates the quantized export (export.py) on the same test
+split and checks it against the Keras metrics.json: accuracy / F1 drop and
+top-1 agreement with the Keras predictions.  Exits 1 when the accuracy drop
+exceeds --max-accuracy-drop.
+
 Usage:
   python -m advisory.ml.evaluate --model-dir models/crop_disease --data-dir data/datasets
+  python -m advisory.ml.evaluate --backend tflite --quantization int8
 """
 
 from __future__ import annotations
@@ -25,12 +31,15 @@ from sklearn.metrics import (
 )
 
 from .augmentation import decode_and_resize, preprocess_val
+from .backends import load_backend
 from .config import (
     DEFAULT_DATA_DIR,
     DEFAULT_MODEL_DIR,
     LABELS_FILENAME,
+    MAX_EXPORT_ACCURACY_DROP,
     METRICS_FILENAME,
-    MODEL_FILENAME,
+    TFLITE_QUANTIZATION,
+    metrics_filename,
 )
 from .dataset_loader import build_splits
 from .labels import load_labels
@@ -52,11 +61,15 @@ def _load_test_batch(paths, labels, batch_size=32):
     return np.array(images), np.array(ys)
 
 
-def evaluate(model_dir: Path, data_dir: Path) -> dict:
-    model_path = model_dir / MODEL_FILENAME
-    if not model_path.exists():
-        model_path = model_dir / "checkpoints" / "best.keras"
-    model = tf.keras.models.load_model(model_path)
+def evaluate(
+    model_dir: Path,
+    data_dir: Path,
+    backend: str = "keras",
+    quantization: str = TFLITE_QUANTIZATION,
+) -> dict:
+    model = load_backend(model_dir, backend, quantization)
+    if model is None:
+        raise FileNotFoundError(f"No {backend} model in {model_dir}")
 
     labels_path = model_dir / LABELS_FILENAME
     if labels_path.exists():
@@ -85,7 +98,7 @@ def evaluate(model_dir: Path, data_dir: Path) -> dict:
             img, _ = preprocess_val(img, 0)
             imgs.append(img.numpy())
         X = np.stack(imgs, axis=0)
-        probs = model.predict(X, verbose=0)
+        probs = model.predict(X)
         preds = np.argmax(probs, axis=1)
         all_preds.extend(preds.tolist())
         all_true.extend(batch_y)
@@ -115,17 +128,41 @@ def evaluate(model_dir: Path, data_dir: Path) -> dict:
         "confusion_matrix": cm,
         "classification_report": report,
         "num_test_samples": len(all_true),
+        "backend": model.name,
+        "predictions": all_preds,
     }
+    if backend != "keras":
+        metrics["parity"] = _parity(model_dir, metrics)
 
-    metrics_path = model_dir / METRICS_FILENAME
+    metrics_path = model_dir / metrics_filename(backend)
     metrics_path.write_text(json.dumps(metrics, indent=2), encoding="utf-8")
-    logger.info("Accuracy=%.4f F1=%.4f — saved %s", acc, f1, metrics_path)
+    logger.info("%s: Accuracy=%.4f F1=%.4f — saved %s", model.name, acc, f1, metrics_path)
 
-    _plot_confusion_matrix(cm, class_names, model_dir / "confusion_matrix.png")
+    if backend == "keras":
+        _plot_confusion_matrix(cm, class_names, model_dir / "confusion_matrix.png")
 
     return metrics
 
 
+def _parity(model_dir: Path, metrics: dict) -> dict:
+    """Compare an exported backend's metrics with the Keras reference run."""
+    ref_path = model_dir / METRICS_FILENAME
+    if not ref_path.exists():
+        logger.warning("No %s — run the Keras evaluation first for a parity check", ref_path)
+        return {}
+    ref = json.loads(ref_path.read_text(encoding="utf-8"))
+    parity = {
+        "reference": str(ref_path),
+        "accuracy_drop": round(ref["accuracy"] - metrics["accuracy"], 5),
+        "f1_drop": round(ref["f1_weighted"] - metrics["f1_weighted"], 5),
+    }
+    ref_preds = ref.get("predictions")
+    if ref_preds and len(ref_preds) == len(metrics["predictions"]):
+        same = sum(1 for a, b in zip(ref_preds, metrics["predictions"]) if a == b)
+        parity["top1_agreement"] = round(same / len(ref_preds), 5)
+    return parity
+
+
 def _plot_confusion_matrix(cm, class_names, out_path: Path):
     try:
         import matplotlib.pyplot as plt
@@ -152,8 +189,17 @@ def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--model-dir", type=Path, default=DEFAULT_MODEL_DIR)
     parser.add_argument("--data-dir", type=Path, default=DEFAULT_DATA_DIR)
+    parser.add_argument("--backend", default="keras", choices=("keras", "tflite"))
+    parser.add_argument("--quantization", default=TFLITE_QUANTIZATION, choices=("int8", "float16", "dynamic"))
+    parser.add_argument("--max-accuracy-drop", type=float, default=MAX_EXPORT_ACCURACY_DROP)
     args = parser.parse_args()
-    evaluate(args.model_dir, args.data_dir)
+    metrics = evaluate(args.model_dir, args.data_dir, args.backend, args.quantization)
+    parity = metrics.get("parity")
+    if parity:
+        logger.info("Parity vs Keras: %s", parity)
+        if parity["accuracy_drop"] > args.max_accuracy_drop:
+            logger.error("Accuracy drop %.4f exceeds %.4f", parity["accuracy_drop"], args.max_accuracy_drop)
+            raise SystemExit(1)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Export the trained Keras model to a quantized TFLite artifact for CPU serving.
+
+  int8      full-integer weights and activations, calibrated on a
+            representative sample of the training split; float32 input and
+            output so callers do not change (~4× smaller, fastest on CPU)
+  float16   float16 weights, float32 compute (~2× smaller, near-lossless)
+  dynamic   int8 weights, float activations, no calibration data needed
+
+Writes efficientnetb3_crop_disease_<q>.tflite and export_manifest.json next to
+the Keras model; serve it with ML_BACKEND=tflite.  --check runs the test-split
+evaluation on the export and fails when accuracy drops more than
+--max-accuracy-drop below the Keras metrics.json.
+
+Usage:
+  python -m advisory.ml.export --model-dir models/crop_disease --data-dir data/datasets
+  python -m advisory.ml.export --quantization float16 --check
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import random
+import time
+from pathlib import Path
+from typing import Iterator, List
+
+import tensorflow as tf
+
+from .augmentation import preprocess_val
+from .backends import keras_model_path
+from .config import (
+    CALIBRATION_SAMPLES,
+    DEFAULT_DATA_DIR,
+    DEFAULT_MODEL_DIR,
+    EXPORT_MANIFEST_FILENAME,
+    IMG_SIZE,
+    MAX_EXPORT_ACCURACY_DROP,
+    TFLITE_QUANTIZATION,
+    tflite_filename,
+)
+from .dataset_loader import build_splits
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def _calibration_paths(data_dir: Path, samples: int, seed: int = 42) -> List[str]:
+    """Seeded random sample of the training split."""
+    dataset = build_splits(data_dir)
+    paths = [str(p) for p in dataset.train.paths]
+    random.Random(seed).shuffle(paths)
+    return paths[:samples]
+
+
+def _representative_dataset(paths: List[str]):
+    """Calibration inputs preprocessed exactly like evaluate.py's test batches."""
+
+    def gen() -> Iterator[list]:
+        for path in paths:
+            img = tf.io.decode_image(tf.io.read_file(path), channels=3, expand_animations=False)
+            img = tf.cast(tf.image.resize(img, list(IMG_SIZE)), tf.float32)
+            img, _ = preprocess_val(img, 0)
+            yield [tf.expand_dims(img, 0)]
+
+    return gen
+
+
+def export_tflite(
+    model_dir: Path,
+    data_dir: Path,
+    quantization: str = TFLITE_QUANTIZATION,
+    calibration_samples: int = CALIBRATION_SAMPLES,
+) -> Path:
+    model_path = keras_model_path(model_dir)
+    if model_path is None:
+        raise FileNotFoundError(f"No trained Keras model in {model_dir}")
+    model = tf.keras.models.load_model(model_path)
+
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    calibrated = 0
+    if quantization == "int8":
+        paths = _calibration_paths(data_dir, calibration_samples)
+        if not paths:
+            raise ValueError(f"No training images under {data_dir} for int8 calibration")
+        converter.representative_dataset = _representative_dataset(paths)
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+        calibrated = len(paths)
+    elif quantization == "float16":
+        converter.target_spec.supported_types = [tf.float16]
+    elif quantization != "dynamic":
+        raise ValueError(f"Unknown quantization {quantization!r}")
+
+    t0 = time.perf_counter()
+    flatbuffer = converter.convert()
+    out_path = model_dir / tflite_filename(quantization)
+    out_path.write_bytes(flatbuffer)
+
+    manifest = {
+        "quantization": quantization,
+        "source_model": model_path.name,
+        "tflite_model": out_path.name,
+        "calibration_samples": calibrated,
+        "keras_bytes": model_path.stat().st_size,
+        "tflite_bytes": len(flatbuffer),
+        "convert_seconds": round(time.perf_counter() - t0, 1),
+        "tensorflow": tf.__version__,
+    }
+    (model_dir / EXPORT_MANIFEST_FILENAME).write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    logger.info(
+        "Exported %s (%.1f MB, Keras %.1f MB, %d calibration images)",
+        out_path, manifest["tflite_bytes"] / 1e6, manifest["keras_bytes"] / 1e6, calibrated,
+    )
+    return out_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model-dir", type=Path, default=DEFAULT_MODEL_DIR)
+    parser.add_argument("--data-dir", type=Path, default=DEFAULT_DATA_DIR)
+    parser.add_argument("--quantization", default=TFLITE_QUANTIZATION, choices=("int8", "float16", "dynamic"))
+    parser.add_argument("--calibration-samples", type=int, default=CALIBRATION_SAMPLES)
+    parser.add_argument("--check", action="store_true", help="evaluate the export against metrics.json")
+    parser.add_argument("--max-accuracy-drop", type=float, default=MAX_EXPORT_ACCURACY_DROP)
+    args = parser.parse_args()
+
+    export_tflite(args.model_dir, args.data_dir, args.quantization, args.calibration_samples)
+    if args.check:
+        from .evaluate import evaluate
+
+        parity = evaluate(args.model_dir, args.data_dir, "tflite", args.quantization).get("parity", {})
+        logger.info("Parity vs Keras: %s", parity)
+        if parity.get("accuracy_drop", 0.0) > args.max_accuracy_drop:
+            logger.error("Accuracy drop %.4f exceeds %.4f", parity["accuracy_drop"], args.max_accuracy_drop)
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
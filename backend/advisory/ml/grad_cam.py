@@ -50,24 +50,44 @@ def compute_grad_cam(
     return heatmap.numpy()
 
 
-def save_grad_cam_overlay(
-    model: tf.keras.Model,
-    image_path: str,
-    class_index: int,
-    output_path: Path,
-) -> Path:
+def grad_cam_overlay(model: tf.keras.Model, image: np.ndarray, class_index: int) -> np.ndarray:
+    """Heatmap blended over the 224×224 model view of an RGB image (uint8 RGB)."""
     import cv2
 
-    from .preprocess import load_image_from_path, resize_and_normalize
+    from .preprocess import resize_and_normalize
 
-    rgb = resize_and_normalize(load_image_from_path(image_path), remove_bg=True)
+    rgb = resize_and_normalize(image, remove_bg=True)
     batch = np.expand_dims(rgb, 0)
     heatmap = compute_grad_cam(model, batch, class_index)
     heatmap = cv2.resize(heatmap, (224, 224))
     heatmap_uint8 = np.uint8(255 * heatmap)
     heatmap_color = cv2.applyColorMap(heatmap_uint8, cv2.COLORMAP_JET)
     heatmap_color = cv2.cvtColor(heatmap_color, cv2.COLOR_BGR2RGB)
-    overlay = cv2.addWeighted(rgb.astype(np.uint8), 0.55, heatmap_color, 0.45, 0)
+    return cv2.addWeighted(rgb.astype(np.uint8), 0.55, heatmap_color, 0.45, 0)
+
+
+def grad_cam_overlay_png(model: tf.keras.Model, image: np.ndarray, class_index: int) -> bytes:
+    """grad_cam_overlay() encoded as PNG — the form the prediction cache keeps."""
+    import cv2
+
+    overlay = grad_cam_overlay(model, image, class_index)
+    ok, buf = cv2.imencode(".png", cv2.cvtColor(overlay, cv2.COLOR_RGB2BGR))
+    if not ok:
+        raise ValueError("Grad-CAM overlay could not be encoded")
+    return buf.tobytes()
+
+
+def save_grad_cam_overlay(
+    model: tf.keras.Model,
+    image_path: str,
+    class_index: int,
+    output_path: Path,
+) -> Path:
+    import cv2
+
+    from .preprocess import load_image_from_path
+
+    overlay = grad_cam_overlay(model, load_image_from_path(image_path), class_index)
     output_path.parent.mkdir(parents=True, exist_ok=True)
     cv2.imwrite(str(output_path), cv2.cvtColor(overlay, cv2.COLOR_RGB2BGR))
     return output_path
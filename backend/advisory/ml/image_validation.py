@@ -6,7 +6,7 @@ from typing import Any, Dict, Tuple, Union
 
 import numpy as np
 
-from .preprocess import load_image_from_bytes, load_image_from_path
+from .preprocess import decode_image
 
 try:
     import cv2
@@ -100,14 +100,14 @@ def validate_plant_image(image: Union[bytes, str, np.ndarray]) -> Tuple[bool, st
     """
     Returns (is_valid, reason_code, metrics).
     reason_code: ok | not_plant | unreadable
+
+    Pass the array from preprocess.decode_image() when the caller also runs
+    inference on the image — bytes / paths are decoded here otherwise.
     """
     try:
-        if isinstance(image, bytes):
-            arr = load_image_from_bytes(image)
-        elif isinstance(image, str):
-            arr = load_image_from_path(image)
-        else:
-            arr = np.asarray(image, dtype=np.uint8)
+        arr = decode_image(image)
+        if arr.dtype != np.uint8:
+            arr = arr.astype(np.uint8)
     except Exception:
         return False, "unreadable", {}
 
@@ -8,67 +8,105 @@ Usage:
 
 from __future__ import annotations
 
+import atexit
 import base64
+import hashlib
 import json
 import logging
 import os
 import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
 
-# Lazy-loaded tensorflow and numpy to optimize worker startup latency
+import numpy as np
+
+# TensorFlow is lazy-loaded (in _load) to keep worker startup fast; numpy is
+# already pulled in by .preprocess.
 
 from .config import (
     CONFIDENCE_THRESHOLD,
     DEFAULT_MODEL_DIR,
+    INFERENCE_BACKEND,
     LABELS_FILENAME,
     LOW_CONFIDENCE_MESSAGE,
-    MODEL_FILENAME,
+    MAX_BATCH_SIZE,
+    MAX_BATCH_WAIT_MS,
     NOT_PLANT_MESSAGE,
+    PREDICT_TIMEOUT_S,
+    PREPROCESS_WORKERS,
     TOP_K,
     UNKNOWN_DISPLAY,
     UNKNOWN_LABEL,
 )
+from .backends import load_backend
 from .image_validation import validate_plant_image
 from .labels import load_labels, parse_label
-from .preprocess import prepare_for_model
+from .prediction_cache import PredictionCache, content_hash, perceptual_signature, prediction_cache
+from .preprocess import decode_image, efficientnet_preprocess, prepare_for_model
 
 logger = logging.getLogger(__name__)
 
+# Decode / validate / preprocess the views of a multi-image upload in parallel.
+_PREP_POOL = ThreadPoolExecutor(max_workers=PREPROCESS_WORKERS, thread_name_prefix="km-ml-prep")
+atexit.register(_PREP_POOL.shutdown, wait=False)
+
 
 class CropDiseasePredictor:
-    """Load EfficientNet-B3 and predict with confidence gating."""
+    """
+    Load EfficientNet-B3 and predict with confidence gating.  The model runs
+    on the backend chosen by ML_BACKEND (backends.py): the full Keras model,
+    or a quantized TFLite export.
+    """
 
-    def __init__(self, model_dir: Optional[Path] = None):
+    def __init__(
+        self,
+        model_dir: Optional[Path] = None,
+        max_batch_size: int = MAX_BATCH_SIZE,
+        max_wait_ms: float = MAX_BATCH_WAIT_MS,
+        backend: str = INFERENCE_BACKEND,
+        cache: Optional[PredictionCache] = None,
+    ):
         self.model_dir = Path(
             model_dir
             or os.getenv("CROP_DISEASE_MODEL_DIR", str(DEFAULT_MODEL_DIR))
         )
+        self.backend_kind = backend
+        self.backend: Optional[Any] = None
+        # The Keras model itself (Grad-CAM); None on the TFLite backend
         self.model: Optional[Any] = None
         self.class_names: List[str] = []
+        # Part of every prediction-cache key: a retrained / re-exported model
+        # never answers from the previous model's results.
+        self.model_version = "none"
+        self.prediction_cache = cache if cache is not None else prediction_cache
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self._batcher = None
+        self._batcher_lock = threading.Lock()
         self._load()
 
     def _load(self) -> None:
-        model_path = self.model_dir / MODEL_FILENAME
-        if not model_path.exists():
-            alt = self.model_dir / "checkpoints" / "best.keras"
-            if alt.exists():
-                model_path = alt
-            else:
-                logger.warning("No trained model at %s — ML predictions disabled", self.model_dir)
-                return
-
-        import tensorflow as tf
-        self.model = tf.keras.models.load_model(model_path)
+        self.backend = load_backend(self.model_dir, self.backend_kind)
+        if self.backend is None:
+            logger.warning("No trained model at %s — ML predictions disabled", self.model_dir)
+            return
+        self.model = getattr(self.backend, "model", None)
+        logger.info("Crop disease model: %s (%s)", self.backend.path, self.backend.name)
         labels_file = self.model_dir / LABELS_FILENAME
         if labels_file.exists():
             self.class_names = load_labels(labels_file)
         else:
             logger.warning("Missing %s", labels_file)
+        self.model_version = _model_version(self.backend, labels_file)
 
     @property
     def is_ready(self) -> bool:
-        return self.model is not None and bool(self.class_names)
+        return (self.backend is not None or self.model is not None) and bool(self.class_names)
+
+    @property
+    def cache_scope(self) -> str:
+        return f"{self.model_version}:k{TOP_K}:t{CONFIDENCE_THRESHOLD:g}"
 
     def predict(
         self,
@@ -76,60 +114,180 @@ class CropDiseasePredictor:
         save_gradcam_to: Optional[Path] = None,
         skip_validation: bool = False,
     ) -> Dict[str, Any]:
-        raw_bytes: Optional[bytes] = None
+        """
+        One image — upload bytes, base64 string, file path or an RGB array
+        from preprocess.decode_image().  The image is decoded once; validation
+        and preprocessing both work on that array.  Uploads (bytes / base64)
+        are validated unless skip_validation (the caller already did it).
+
+        Repeat uploads are answered from the prediction cache: the same bytes
+        before decoding, a re-encoded copy after (prediction_cache.py).  The
+        Grad-CAM overlay is only rendered when save_gradcam_to asks for it,
+        and cached per image and class from then on.
+        """
+        raw_bytes = self._upload_bytes(image)
+        cache = self.prediction_cache if self.is_ready and self.prediction_cache.active else None
+        scope = self.cache_scope
+        digest = content_hash(raw_bytes) if cache and raw_bytes else None
+        if digest:
+            hit = cache.get_exact(scope, digest)
+            if hit is not None:
+                return self._attach_gradcam(hit, hit["cache"]["image_id"], raw_bytes, save_gradcam_to)
+
+        arr: Optional[np.ndarray] = None
+        decode_error: Optional[Exception] = None
+        try:
+            arr = decode_image(raw_bytes if raw_bytes is not None else image)
+        except Exception as exc:
+            decode_error = exc
+
+        signature = None
+        if cache and arr is not None:
+            signature = perceptual_signature(arr)
+            hit = cache.get_similar(scope, signature, after_exact=digest is not None)
+            if hit is not None:
+                return self._attach_gradcam(hit, hit["cache"]["image_id"], arr, save_gradcam_to)
+
+        if not skip_validation and raw_bytes and arr is not None:
+            blocked = self._validate(arr)
+            if blocked:
+                return blocked
+
+        if not self.is_ready:
+            return self._model_unavailable()
+        if arr is None:
+            raise decode_error
+
+        probs = self._forward(self._preprocess(arr))
+        result, _ = self._result_from_probs(probs)
+        image_id = cache.put(scope, digest, signature, result) if cache else None
+        return self._attach_gradcam(result, image_id, arr, save_gradcam_to)
+
+    def predict_views(self, images: Sequence[Union[str, bytes, Any]], skip_validation: bool = False) -> Dict[str, Any]:
+        """
+        Several photos of one plant (close-up, leaf, whole — most informative
+        first) → one prediction.
+
+        Each view is decoded, validated and preprocessed on the shared pool in
+        parallel, the usable ones go through the model in one batched forward
+        pass, and their class probabilities are averaged.  Views that fail
+        validation or do not decode are left out; if none is usable the first
+        view's not_plant verdict (or a ValueError) is returned.
+        """
+        if not images:
+            raise ValueError("No image provided")
+        prep = self.is_ready
+        views = list(_PREP_POOL.map(lambda im: self._prepare_view(im, skip_validation, prep), images))
+
+        samples = [sample for sample, blocked in views if blocked is None and sample is not None]
+        if not samples:
+            blocked = next((b for _, b in views if b is not None), None)
+            if blocked is not None:
+                return blocked
+            if not prep:
+                return self._model_unavailable()
+            raise ValueError("None of the uploaded images could be read")
+        if not prep:
+            return self._model_unavailable()
+
+        probs = np.asarray(self._predict_batch(np.stack(samples)))
+        result, _ = self._result_from_probs(probs.mean(axis=0))
+        per_view = []
+        for row in probs:
+            best = int(np.argmax(row))
+            crop, disease = parse_label(self.class_names[best])
+            per_view.append({"crop_name": crop, "disease_name": disease,
+                             "probability": round(float(row[best]), 4)})
+        result["views"] = {"submitted": len(images), "used": len(samples), "per_view": per_view}
+        return result
+
+    # ── Pipeline pieces ────────────────────────────────────────────────────────
+    @staticmethod
+    def _upload_bytes(image: Union[str, bytes, Any]) -> Optional[bytes]:
+        """Raw bytes of an upload (bytes or base64 string); None for paths / arrays."""
         if isinstance(image, bytes):
-            raw_bytes = image
-        elif isinstance(image, str) and not image.startswith("/") and len(image) > 200:
+            return image
+        # JPEG base64 starts with "/9j/" — a leading slash does not make it a path.
+        if isinstance(image, str) and (
+            image.startswith("data:") or (len(image) > 200 and not os.path.exists(image))
+        ):
             try:
                 b64 = image.split(",", 1)[-1] if "," in image else image
-                raw_bytes = base64.b64decode(b64)
+                return base64.b64decode(b64)
             except Exception:
-                raw_bytes = None
-
+                return None
+        return None
+
+    def _prepare_view(
+        self, image: Union[str, bytes, Any], skip_validation: bool, prep: bool,
+    ) -> Tuple[Optional["np.ndarray"], Optional[Dict[str, Any]]]:
+        """(model-ready sample or None, not_plant response or None) for one view."""
+        raw_bytes = self._upload_bytes(image)
+        try:
+            arr = decode_image(raw_bytes if raw_bytes is not None else image)
+        except Exception as exc:
+            logger.debug("View skipped, not decodable: %s", exc)
+            return None, None
         if not skip_validation and raw_bytes:
-            valid, reason, metrics = validate_plant_image(raw_bytes)
-            if not valid and reason == "not_plant":
-                return {
-                    "status": "not_plant",
-                    "message": NOT_PLANT_MESSAGE,
-                    "crop_name": UNKNOWN_DISPLAY,
-                    "disease_name": None,
-                    "confidence": 0.0,
-                    "top_predictions": [],
-                    "validation": metrics,
-                }
-
-        if not self.is_ready:
+            blocked = self._validate(arr)
+            if blocked:
+                return None, blocked
+        return (self._preprocess(arr) if prep else None), None
+
+    @staticmethod
+    def _validate(arr: "np.ndarray") -> Optional[Dict[str, Any]]:
+        valid, reason, metrics = validate_plant_image(arr)
+        if not valid and reason == "not_plant":
             return {
-                "status": "model_unavailable",
-                "message": "Train model with: python -m advisory.ml.train",
-                "crop_name": None,
+                "status": "not_plant",
+                "message": NOT_PLANT_MESSAGE,
+                "crop_name": UNKNOWN_DISPLAY,
                 "disease_name": None,
                 "confidence": 0.0,
                 "top_predictions": [],
+                "validation": metrics,
             }
+        return None
 
-        batch = prepare_for_model(image, remove_bg=True)
-        from .model_builder import get_preprocess_fn
-        preprocess = get_preprocess_fn()
-        batch_pp = preprocess(batch[0])
-        import numpy as np
-        batch_pp = np.expand_dims(batch_pp, axis=0)
+    def _attach_gradcam(
+        self,
+        result: Dict[str, Any],
+        image_id: Optional[str],
+        image: Union[bytes, "np.ndarray"],
+        save_to: Optional[Path],
+    ) -> Dict[str, Any]:
+        """Write the top class's Grad-CAM overlay to save_to — from the cache
+        when this image's overlay was rendered before (Keras backend only)."""
+        if not save_to or self.model is None or not result.get("top_predictions"):
+            return result
+        try:
+            class_index = self.class_names.index(result["top_predictions"][0]["label"])
+            png = self.prediction_cache.get_gradcam(self.cache_scope, image_id, class_index) if image_id else None
+            if png is None:
+                from .grad_cam import grad_cam_overlay_png
+
+                png = grad_cam_overlay_png(self.model, decode_image(image), class_index)
+                if image_id:
+                    self.prediction_cache.put_gradcam(self.cache_scope, image_id, class_index, png)
+            result["grad_cam_path"] = str(_write_overlay(png, Path(save_to)))
+        except Exception as exc:
+            logger.warning("Grad-CAM failed: %s", exc)
+        return result
 
-        probs = self.model.predict(batch_pp, verbose=0)[0]
-        top_indices = np.argsort(probs)[::-1][:TOP_K]
+    @staticmethod
+    def _model_unavailable() -> Dict[str, Any]:
+        return {
+            "status": "model_unavailable",
+            "message": "Train model with: python -m advisory.ml.train",
+            "crop_name": None,
+            "disease_name": None,
+            "confidence": 0.0,
+            "top_predictions": [],
+        }
 
-        top_predictions = []
-        for idx in top_indices:
-            label = self.class_names[int(idx)]
-            crop, disease = parse_label(label)
-            top_predictions.append({
-                "crop_name": crop,
-                "disease_name": disease,
-                "label": label,
-                "probability": round(float(probs[idx]), 4),
-                "confidence_percent": round(float(probs[idx]) * 100, 1),
-            })
+    def _result_from_probs(self, probs: "np.ndarray") -> Tuple[Dict[str, Any], "np.ndarray"]:
+        top_indices = np.argsort(probs)[::-1][:TOP_K]
+        top_predictions = self._top_predictions(probs, top_indices)
 
         best = top_predictions[0]
         confidence = best["probability"]
@@ -142,6 +300,7 @@ class CropDiseasePredictor:
             "confidence_percent": best["confidence_percent"],
             "top_predictions": top_predictions,
             "model": "EfficientNet-B3",
+            "backend": self.backend.name if self.backend is not None else "keras",
             "threshold": CONFIDENCE_THRESHOLD,
         }
 
@@ -150,22 +309,56 @@ class CropDiseasePredictor:
             result["message"] = LOW_CONFIDENCE_MESSAGE
             result["crop_name"] = best["crop_name"] if confidence >= 0.4 else None
             result["disease_name"] = None
+        return result, top_indices
 
-        if save_gradcam_to and self.model is not None:
-            try:
-                if isinstance(image, str):
-                    from .grad_cam import save_grad_cam_overlay
-                    path = save_grad_cam_overlay(
-                        self.model,
-                        image,
-                        int(top_indices[0]),
-                        save_gradcam_to,
+    # ── Forward pass (micro-batched) ─────────────────────────────────────────
+    @staticmethod
+    def _preprocess(image: Union[str, bytes, Any]) -> "np.ndarray":
+        """Resize/normalise on the caller's thread — only the forward pass is shared.
+        Pass the decoded array (bytes / paths are decoded again otherwise)."""
+        batch = prepare_for_model(image, remove_bg=True)
+        return efficientnet_preprocess(batch[0])
+
+    def _predict_batch(self, batch: "np.ndarray") -> "np.ndarray":
+        if self.backend is not None:
+            return self.backend.predict(batch)
+        return self.model.predict(batch, verbose=0)
+
+    def _get_batcher(self):
+        if self._batcher is None:
+            with self._batcher_lock:
+                if self._batcher is None:
+                    from .batching import MicroBatcher
+                    self._batcher = MicroBatcher(
+                        self._predict_batch,
+                        max_batch_size=self.max_batch_size,
+                        max_wait_ms=self.max_wait_ms,
+                        name="crop-disease-batcher",
                     )
-                    result["grad_cam_path"] = str(path)
-            except Exception as exc:
-                logger.warning("Grad-CAM failed: %s", exc)
+        return self._batcher
 
-        return result
+    def _forward(self, sample: "np.ndarray") -> "np.ndarray":
+        """Class probabilities for one preprocessed sample (H, W, 3)."""
+        if self.max_batch_size <= 1:
+            return self._predict_batch(np.expand_dims(sample, axis=0))[0]
+        return self._get_batcher().submit(sample).result(timeout=PREDICT_TIMEOUT_S)
+
+    def batching_stats(self) -> Optional[Dict[str, Any]]:
+        return self._batcher.stats() if self._batcher is not None else None
+
+    def _top_predictions(self, probs: "np.ndarray", top_indices) -> List[Dict[str, Any]]:
+        top_predictions = []
+        for idx in top_indices:
+            label = self.class_names[int(idx)]
+            crop, disease = parse_label(label)
+            top_predictions.append({
+                "crop_name": crop,
+                "disease_name": disease,
+                "label": label,
+                "probability": round(float(probs[idx]), 4),
+                "confidence_percent": round(float(probs[idx]) * 100, 1),
+            })
+        return top_predictions
 
     def predict_base64(self, b64_string: str, **kwargs) -> Dict[str, Any]:
         if "," in b64_string:
@@ -174,6 +367,30 @@ class CropDiseasePredictor:
         return self.predict(raw, **kwargs)
 
 
+def _model_version(backend: Any, labels_file: Path) -> str:
+    """Backend name + digest of the artifact and label file identities."""
+    parts = [backend.name]
+    for path in (Path(backend.path), labels_file):
+        try:
+            st = path.stat()
+            parts.append(f"{path.name}:{st.st_size}:{st.st_mtime_ns}")
+        except OSError:
+            parts.append(path.name)
+    return f"{backend.name}-{hashlib.sha1('|'.join(parts).encode('utf-8')).hexdigest()[:12]}"
+
+
+def _write_overlay(png: bytes, path: Path) -> Path:
+    """PNG bytes → path, re-encoded when the path asks for another format."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if path.suffix.lower() in ("", ".png"):
+        path.write_bytes(png)
+    else:
+        import cv2
+
+        cv2.imwrite(str(path), cv2.imdecode(np.frombuffer(png, dtype=np.uint8), cv2.IMREAD_COLOR))
+    return path
+
+
 # FIX 5: Thread-safe singleton using double-checked locking.
 # lru_cache is NOT thread-safe on the FIRST call — two threads can both see a
 # cache miss and construct CropDiseasePredictor() simultaneously, causing TF to
@@ -194,6 +411,12 @@ def get_predictor() -> CropDiseasePredictor:
     return _predictor_instance
 
 
+def batching_stats() -> Optional[Dict[str, Any]]:
+    """Micro-batcher metrics, or None if the predictor was never loaded in this worker."""
+    predictor = _predictor_instance
+    return predictor.batching_stats() if predictor is not None else None
+
+
 def main():
     import argparse
 
@@ -201,9 +424,10 @@ def main():
     parser.add_argument("--image", required=True)
     parser.add_argument("--model-dir", type=Path, default=DEFAULT_MODEL_DIR)
     parser.add_argument("--gradcam", type=Path, default=None)
+    parser.add_argument("--backend", default=INFERENCE_BACKEND, choices=("keras", "tflite", "auto"))
     args = parser.parse_args()
 
-    predictor = CropDiseasePredictor(args.model_dir)
+    predictor = CropDiseasePredictor(args.model_dir, backend=args.backend)
     out = predictor.predict(args.image, save_gradcam_to=args.gradcam)
     print(json.dumps(out, indent=2))
 
@@ -0,0 +1,282 @@
+"""
+Prediction cache for CropDiseasePredictor.predict().
+
+Farmers re-send the same photo: retries on a flaky connection, the same
+image forwarded through WhatsApp groups.  Each re-upload would otherwise pay
+for decode, validation, preprocessing and a forward pass (and Grad-CAM).
+
+A result is filed under the model version, top-k and confidence threshold,
+and looked up two ways:
+
+  1. exact       — SHA-256 of the upload bytes, checked before decoding
+  2. perceptual  — the decoded image, so a re-encoded / recompressed /
+                   resized copy still hits.  A 64-bit difference hash (dHash)
+                   split into eight 8-bit bands indexes the entries: any image
+                   within PHASH_MAX_DISTANCE (≤ 7) bits shares a band bucket
+                   with the original.  Leaf photos look alike at 9×8 pixels,
+                   so a candidate only matches when its 16×16 grey thumbnail
+                   is within PERCEPTUAL_MAX_MAD grey levels (mean absolute
+                   difference) of the upload's — re-encodes stay well under
+                   it, distinct photos of similar leaves do not.
+
+Only model answers (success / low_confidence) are stored.  Grad-CAM overlays
+are cached separately, per image and class, and only rendered when a caller
+asks for one — a cache hit does not carry a heatmap until it is requested.
+
+Storage is the ``prediction_cache`` cache alias (Redis in production, shared
+by every worker), falling back to ``default``.  Counters are per worker.
+"""
+
+from __future__ import annotations
+
+import copy
+import hashlib
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .config import (
+    PERCEPTUAL_MAX_MAD,
+    PHASH_MAX_DISTANCE,
+    PREDICTION_CACHE_ENABLED,
+    PREDICTION_CACHE_TTL_S,
+)
+
+logger = logging.getLogger(__name__)
+
+_KEY_PREFIX = "krishimitra:pred:v1"
+_BANDS = 8
+_BAND_BITS = 64 // _BANDS
+_BUCKET_MAX = 32          # entries kept per perceptual band bucket
+_THUMB = 16
+_CACHEABLE = ("success", "low_confidence")
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def perceptual_signature(image: np.ndarray) -> Tuple[int, bytes]:
+    """
+    (64-bit dHash, 16×16 grey thumbnail bytes) of an RGB image.  The dHash
+    is one bit per horizontally adjacent pair of a grey 9×8 thumbnail (left
+    brighter than right); both survive JPEG re-encoding and rescaling.
+    """
+    arr = np.asarray(image)
+    try:
+        import cv2
+
+        grey = cv2.cvtColor(arr, cv2.COLOR_RGB2GRAY) if arr.ndim == 3 else arr
+        small = cv2.resize(grey, (9, 8), interpolation=cv2.INTER_AREA).astype(np.int16)
+        thumb = cv2.resize(grey, (_THUMB, _THUMB), interpolation=cv2.INTER_AREA)
+    except ImportError:
+        from PIL import Image
+
+        grey_img = Image.fromarray(arr).convert("L")
+        small = np.asarray(grey_img.resize((9, 8), Image.Resampling.BOX), dtype=np.int16)
+        thumb = np.asarray(grey_img.resize((_THUMB, _THUMB), Image.Resampling.BOX))
+    bits = (small[:, :-1] > small[:, 1:]).flatten()
+    return int.from_bytes(np.packbits(bits).tobytes(), "big"), np.asarray(thumb, dtype=np.uint8).tobytes()
+
+
+def _bands(phash: int) -> List[str]:
+    mask = (1 << _BAND_BITS) - 1
+    return [f"{i}:{(phash >> (i * _BAND_BITS)) & mask:02x}" for i in range(_BANDS)]
+
+
+def _thumb_mad(a: bytes, b: bytes) -> float:
+    return float(np.abs(np.frombuffer(a, np.uint8).astype(np.int16) - np.frombuffer(b, np.uint8)).mean())
+
+
+def _prediction_cache_backend():
+    try:
+        from django.core.cache import caches
+        try:
+            return caches["prediction_cache"]
+        except Exception:
+            return caches["default"]
+    except Exception:
+        return None
+
+
+class PredictionCache:
+    """Exact + perceptual result cache and lazy Grad-CAM store over a Django cache backend."""
+
+    def __init__(
+        self,
+        cache=None,
+        ttl: int = PREDICTION_CACHE_TTL_S,
+        max_distance: int = PHASH_MAX_DISTANCE,
+        max_mad: float = PERCEPTUAL_MAX_MAD,
+        enabled: bool = PREDICTION_CACHE_ENABLED,
+    ):
+        self._cache = cache
+        self.ttl = ttl
+        self.max_distance = min(max_distance, _BANDS - 1)
+        self.max_mad = max_mad
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._stats: Dict[str, int] = {
+            "lookups": 0, "exact_hits": 0, "perceptual_hits": 0, "misses": 0, "stores": 0,
+            "errors": 0, "gradcam_hits": 0, "gradcam_renders": 0,
+        }
+
+    @property
+    def cache(self):
+        return self._cache if self._cache is not None else _prediction_cache_backend()
+
+    @property
+    def active(self) -> bool:
+        return self.enabled and self.cache is not None
+
+    def _count(self, key: str, n: int = 1) -> None:
+        with self._lock:
+            self._stats[key] += n
+
+    # ── Keys ──────────────────────────────────────────────────────────
+    @staticmethod
+    def _result_key(scope: str, image_id: str) -> str:
+        return f"{_KEY_PREFIX}:{scope}:r:{image_id}"
+
+    @staticmethod
+    def _band_key(scope: str, band: str) -> str:
+        return f"{_KEY_PREFIX}:{scope}:p:{band}"
+
+    @staticmethod
+    def _gradcam_key(scope: str, image_id: str, class_index: int) -> str:
+        return f"{_KEY_PREFIX}:{scope}:g:{image_id}:{class_index}"
+
+    # ── Lookup / store ────────────────────────────────────────────────
+    def get_exact(self, scope: str, digest: str) -> Optional[Dict[str, Any]]:
+        """Cached result for these exact upload bytes.  A miss is not counted
+        yet — the perceptual lookup that follows decides."""
+        if not self.active:
+            return None
+        self._count("lookups")
+        try:
+            entry = self.cache.get(self._result_key(scope, digest))
+        except Exception as exc:
+            self._count("errors")
+            logger.debug("Prediction cache lookup failed: %s", exc)
+            return None
+        if entry is None:
+            return None
+        self._count("exact_hits")
+        return dict(copy.deepcopy(entry["result"]), cache={"match": "exact", "image_id": entry["image_id"]})
+
+    def get_similar(
+        self, scope: str, signature: Tuple[int, bytes], after_exact: bool = True,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Cached result for a perceptually near-identical image, else a counted
+        miss.  ``after_exact=False`` when there were no upload bytes to try
+        get_exact() on (file paths, decoded arrays).
+        """
+        if not self.active:
+            return None
+        if not after_exact:
+            self._count("lookups")
+        phash, thumb = signature
+        try:
+            cache = self.cache
+            keys = [self._band_key(scope, band) for band in _bands(phash)]
+            best: Optional[Tuple[float, int, str]] = None
+            for bucket in (cache.get_many(keys) or {}).values():
+                for cand, cand_thumb, image_id in bucket:
+                    dist = bin(cand ^ phash).count("1")
+                    if dist > self.max_distance:
+                        continue
+                    mad = _thumb_mad(thumb, cand_thumb)
+                    if mad <= self.max_mad and (best is None or mad < best[0]):
+                        best = (mad, dist, image_id)
+            entry = cache.get(self._result_key(scope, best[2])) if best is not None else None
+            if entry is not None:
+                mad, dist, image_id = best
+                self._count("perceptual_hits")
+                return dict(copy.deepcopy(entry["result"]), cache={
+                    "match": "perceptual", "distance": dist, "mad": round(mad, 2), "image_id": image_id,
+                })
+        except Exception as exc:
+            self._count("errors")
+            logger.debug("Prediction cache lookup failed: %s", exc)
+        self._count("misses")
+        return None
+
+    def put(
+        self,
+        scope: str,
+        digest: Optional[str],
+        signature: Optional[Tuple[int, bytes]],
+        result: Dict[str, Any],
+    ) -> Optional[str]:
+        """
+        File a model answer under its image id (the content hash, or the
+        dHash for inputs without upload bytes) and index it in its perceptual
+        band buckets.  Returns the image id.
+        """
+        if not self.active or result.get("status") not in _CACHEABLE or (digest is None and signature is None):
+            return None
+        image_id = digest or f"p{signature[0]:016x}"
+        entry = {"result": {k: v for k, v in result.items() if k not in ("grad_cam_path", "cache")},
+                 "image_id": image_id}
+        cache = self.cache
+        try:
+            cache.set(self._result_key(scope, image_id), entry, self.ttl)
+            if signature is not None:
+                # Read-modify-write of the band buckets: a lost update under a
+                # race only costs a future perceptual hit.
+                phash, thumb = signature
+                keys = [self._band_key(scope, band) for band in _bands(phash)]
+                current = cache.get_many(keys) or {}
+                cache.set_many({
+                    key: ([c for c in current.get(key, []) if c[2] != image_id]
+                          + [(phash, thumb, image_id)])[-_BUCKET_MAX:]
+                    for key in keys
+                }, self.ttl)
+            self._count("stores")
+        except Exception as exc:
+            self._count("errors")
+            logger.debug("Prediction cache store failed: %s", exc)
+        return image_id
+
+    # ── Grad-CAM overlays ─────────────────────────────────────────────
+    def get_gradcam(self, scope: str, image_id: str, class_index: int) -> Optional[bytes]:
+        if not self.active:
+            return None
+        try:
+            png = self.cache.get(self._gradcam_key(scope, image_id, class_index))
+        except Exception as exc:
+            self._count("errors")
+            logger.debug("Grad-CAM cache lookup failed: %s", exc)
+            return None
+        if png is not None:
+            self._count("gradcam_hits")
+        return png
+
+    def put_gradcam(self, scope: str, image_id: str, class_index: int, png: bytes) -> None:
+        self._count("gradcam_renders")
+        if not self.active:
+            return
+        try:
+            self.cache.set(self._gradcam_key(scope, image_id, class_index), png, self.ttl)
+        except Exception as exc:
+            self._count("errors")
+            logger.debug("Grad-CAM cache store failed: %s", exc)
+
+    # ── Metrics ───────────────────────────────────────────────────────
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            s: Dict[str, Any] = dict(self._stats)
+        hits = s["exact_hits"] + s["perceptual_hits"]
+        s["hit_rate"] = round(hits / s["lookups"], 3) if s["lookups"] else None
+        s["exact_hit_rate"] = round(s["exact_hits"] / s["lookups"], 3) if s["lookups"] else None
+        s["enabled"] = self.enabled
+        s["ttl_s"] = self.ttl
+        s["max_distance"] = self.max_distance
+        s["max_mad"] = self.max_mad
+        return s
+
+
+prediction_cache = PredictionCache()
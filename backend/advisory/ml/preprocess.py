@@ -36,6 +36,20 @@ def load_image_from_path(path: str) -> np.ndarray:
     raise RuntimeError("Pillow is required for image loading")
 
 
+def decode_image(image: Union[np.ndarray, bytes, str]) -> np.ndarray:
+    """
+    Upload bytes / file path / array → RGB uint8 HWC.
+
+    Decode an upload once and pass the array on — validation, background
+    removal and resizing all accept it (arrays are returned as-is).
+    """
+    if isinstance(image, (bytes, bytearray, memoryview)):
+        return load_image_from_bytes(bytes(image))
+    if isinstance(image, str):
+        return load_image_from_path(image)
+    return np.asarray(image)
+
+
 def remove_background_simple(image: np.ndarray) -> np.ndarray:
     """
     Simple green-plant foreground emphasis (not full segmentation).
@@ -81,17 +95,19 @@ def resize_and_normalize(
     return image.astype(np.float32)
 
 
+def efficientnet_preprocess(batch: np.ndarray) -> np.ndarray:
+    """
+    keras.applications.efficientnet.preprocess_input without importing
+    TensorFlow: it is a pass-through (EfficientNet rescales and normalises
+    inside the graph), so every backend takes float32 RGB in [0, 255].
+    """
+    return np.asarray(batch, dtype=np.float32)
+
+
 def prepare_for_model(
     image: Union[np.ndarray, bytes, str],
     remove_bg: bool = True,
 ) -> np.ndarray:
     """Single image → batch-ready float tensor (1, H, W, 3) after EfficientNet preprocess."""
-    if isinstance(image, bytes):
-        arr = load_image_from_bytes(image)
-    elif isinstance(image, str):
-        arr = load_image_from_path(image)
-    else:
-        arr = image
-
-    arr = resize_and_normalize(arr, remove_bg=remove_bg)
+    arr = resize_and_normalize(decode_image(image), remove_bg=remove_bg)
     return np.expand_dims(arr, axis=0)
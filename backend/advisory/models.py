@@ -1,5 +1,6 @@
 from django.db import models
 from django.contrib.auth.models import AbstractUser
+from django.utils import timezone
 import uuid
 
 # Create your models here.
@@ -202,8 +203,8 @@ class ChatHistory(models.Model):
     latitude = models.FloatField(null=True, blank=True, help_text="User's latitude")
     longitude = models.FloatField(null=True, blank=True, help_text="User's longitude")
     
-    # Timestamps
-    created_at = models.DateTimeField(auto_now_add=True)
+    # Timestamps — a default, not auto_now_add, so write-behind flushes keep the turn time
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
     
     class Meta:
         db_table = 'chat_history'
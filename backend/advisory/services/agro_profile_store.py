@@ -0,0 +1,364 @@
+"""
+KrishiMitra — agro-climatic profile store
+=========================================
+One read-only index over district_data.DISTRICT_PROFILES, shared by the
+crop recommendation engine, the chat prompt builder, field advisory and the
+known-city shortcut in LocationResolver.  Built once per process (the
+Gunicorn master builds it under preload_app, workers inherit it):
+
+  names     normalised district keys + common aliases (Bengaluru, Prayagraj,
+            Gurugram, Vizag …)                        → dict lookup
+  text      "Village, District, State" strings        → word n-gram lookups,
+            longest first; truncated names            → bisect over sorted keys
+  states    normalised state names + aliases (UP, MP, Orissa …) → districts
+  grid      0.25° lat/lon cells over India, each holding only the districts
+            that can be nearest to some point in the cell → a couple of
+            haversines per GPS lookup instead of one per district
+
+Profiles are frozen (MappingProxyType, tuple crop lists); resolve() hands
+callers a fresh dict, so nothing downstream can corrupt the shared copy.
+Text matches are memoised per query — the store never changes,
+so the memo cannot go stale.
+scripts/bench_agro_profile_store.py compares throughput with the linear
+resolvers this replaces.
+"""
+
+from __future__ import annotations
+
+import bisect
+import logging
+import math
+import string
+import threading
+import time
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .location_context import INDIA_LAT_MAX, INDIA_LAT_MIN, INDIA_LON_MAX, INDIA_LON_MIN
+
+logger = logging.getLogger(__name__)
+
+_GRID_DEG = 0.25
+# A GPS point further than this from every district HQ gets no district
+# profile (state / keyword defaults apply instead).
+_GRID_MAX_KM = 150.0
+# Shortest input treated as a truncated district name ("thiruvanan").
+_MIN_PREFIX = 4
+_EARTH_KM = 6371.0
+# Memoised text matches (districts, known cities) per store; the store is
+# immutable, so entries never go stale.
+_TEXT_CACHE_SIZE = 4096
+
+# Alternate / renamed spellings → DISTRICT_PROFILES key.
+DISTRICT_ALIASES: Dict[str, str] = {
+    "bengaluru": "bangalore", "mysuru": "mysore", "hubballi": "hubli", "dharwad": "hubli",
+    "kalaburagi": "gulbarga", "shivamogga": "shimoga", "ballari": "bellary", "mangaluru": "mangalore",
+    "prayagraj": "allahabad", "gurugram": "gurgaon", "ferozepur": "firozpur", "bhatinda": "bathinda",
+    "vizag": "visakhapatnam", "trivandrum": "thiruvananthapuram", "cochin": "kochi",
+    "ernakulam": "kochi", "calicut": "kozhikode", "trichur": "thrissur", "palghat": "palakkad",
+    "baroda": "vadodara", "calcutta": "kolkata", "bardhaman": "burdwan", "purnia": "purnea",
+    "tanjore": "thanjavur", "madras": "chennai", "sambhajinagar": "aurangabad", "nasik": "nashik",
+    "banaras": "varanasi", "benaras": "varanasi", "kashi": "varanasi", "dharamshala": "kangra",
+    "madgaon": "margao", "panjim": "panaji", "bhagalpore": "bhagalpur", "jammu tawi": "jammu",
+}
+
+# Abbreviations / old names → state name as used in the profiles.
+STATE_ALIASES: Dict[str, str] = {
+    "up": "Uttar Pradesh", "mp": "Madhya Pradesh", "ap": "Andhra Pradesh", "tn": "Tamil Nadu",
+    "wb": "West Bengal", "hp": "Himachal Pradesh", "jk": "Jammu and Kashmir",
+    "j and k": "Jammu and Kashmir", "kashmir": "Jammu and Kashmir", "orissa": "Odisha",
+    "uttaranchal": "Uttarakhand", "cg": "Chhattisgarh", "pondicherry": "Puducherry",
+}
+
+# ASCII punctuation → space ('&' → ' and '); str.translate beats a regex here.
+_PUNCT = str.maketrans({c: " " for c in string.punctuation} | {"&": " and "})
+
+
+def normalise_place(text: Optional[str]) -> str:
+    """Lower-case, '&' → 'and', punctuation collapsed to single spaces."""
+    return " ".join((text or "").lower().translate(_PUNCT).split())
+
+
+def _freeze(profile: Mapping[str, Any]) -> Mapping[str, Any]:
+    p = dict(profile)
+    if isinstance(p.get("priority_crops"), list):
+        p["priority_crops"] = tuple(p["priority_crops"])
+    return MappingProxyType(p)
+
+
+def _scan_ngrams(index: Mapping[str, Any], max_words: int, tokens: Sequence[str],
+                 accept: Optional[Callable[[Any], bool]] = None) -> Any:
+    """First hit among the word n-grams of ``tokens``, longest n-grams first."""
+    for size in range(min(max_words, len(tokens)), 0, -1):
+        for i in range(len(tokens) - size + 1):
+            hit = index.get(" ".join(tokens[i:i + size]))
+            if hit is not None and (accept is None or accept(hit)):
+                return hit
+    return None
+
+
+def _prefix_hit(sorted_keys: Sequence[str], text: str) -> Optional[str]:
+    if len(text) < _MIN_PREFIX:
+        return None
+    i = bisect.bisect_left(sorted_keys, text)
+    if i < len(sorted_keys) and sorted_keys[i].startswith(text):
+        return sorted_keys[i]
+    return None
+
+
+class AgroProfileStore:
+    """Immutable district profile index: names, aliases, states and a lat/lon grid."""
+
+    def __init__(
+        self,
+        profiles: Mapping[str, Mapping[str, Any]],
+        coords: Mapping[str, Tuple[float, float]],
+        places: Optional[Mapping[str, Mapping[str, Any]]] = None,
+        aliases: Mapping[str, str] = DISTRICT_ALIASES,
+        state_aliases: Mapping[str, str] = STATE_ALIASES,
+        grid_deg: float = _GRID_DEG,
+        max_km: float = _GRID_MAX_KM,
+    ):
+        t0 = time.perf_counter()
+        self._profiles: Mapping[str, Mapping[str, Any]] = MappingProxyType(
+            {k: _freeze(p) for k, p in profiles.items()}
+        )
+
+        # ── names ─────────────────────────────────────────────────────
+        names: Dict[str, str] = {normalise_place(k): k for k in profiles}
+        n_canonical = len(names)
+        for alias, key in aliases.items():
+            if key in profiles:
+                names.setdefault(normalise_place(alias), key)
+        self._names: Mapping[str, str] = MappingProxyType(names)
+        self._sorted_names: Tuple[str, ...] = tuple(sorted(names))
+        self._name_words = max((len(n.split()) for n in names), default=1)
+        self._n_aliases = len(names) - n_canonical
+
+        # ── states ────────────────────────────────────────────────────
+        by_state: Dict[str, list] = {}
+        self._state_of: Dict[str, str] = {}
+        for key, p in profiles.items():
+            st = normalise_place(p.get("state"))
+            by_state.setdefault(st, []).append(key)
+            self._state_of[key] = st
+        self._by_state: Mapping[str, Tuple[str, ...]] = MappingProxyType(
+            {s: tuple(keys) for s, keys in by_state.items()}
+        )
+        states = {s: s for s in by_state}
+        for alias, state in state_aliases.items():
+            states.setdefault(normalise_place(alias), normalise_place(state))
+        self._states: Mapping[str, str] = MappingProxyType(states)
+
+        # ── known cities (LocationResolver shortcut) ─────────────────
+        self._places: Mapping[str, Mapping[str, Any]] = MappingProxyType(
+            {normalise_place(k): MappingProxyType(dict(v)) for k, v in (places or {}).items()}
+        )
+        self._sorted_places: Tuple[str, ...] = tuple(sorted(self._places))
+        self._place_words = max((len(n.split()) for n in self._places), default=1)
+
+        # ── grid ──────────────────────────────────────────────────────
+        self._grid_keys: Tuple[str, ...] = tuple(k for k in profiles if k in coords)
+        self._grid_pts: Tuple[Tuple[float, float, float], ...] = tuple(
+            (math.radians(coords[k][0]), math.radians(coords[k][1]), math.cos(math.radians(coords[k][0])))
+            for k in self._grid_keys
+        )
+        self._deg = grid_deg
+        self._max_km = max_km
+        self._ny = int(math.ceil((INDIA_LAT_MAX - INDIA_LAT_MIN) / grid_deg))
+        self._nx = int(math.ceil((INDIA_LON_MAX - INDIA_LON_MIN) / grid_deg))
+        self._cells: Tuple[Tuple[int, ...], ...] = self._build_grid(coords)
+        self._text_key = lru_cache(maxsize=_TEXT_CACHE_SIZE)(self._match_location)
+        self._place_key = lru_cache(maxsize=_TEXT_CACHE_SIZE)(self._match_place)
+        self.build_ms = (time.perf_counter() - t0) * 1000
+
+    def _build_grid(self, coords: Mapping[str, Tuple[float, float]]) -> Tuple[Tuple[int, ...], ...]:
+        """
+        Candidate districts per cell.  With c the cell centre and r its
+        half-diagonal, any point p in the cell has |d(p,x) − d(c,x)| ≤ r, so
+        the nearest district to p is among those with d(c,x) ≤ min d(c,·) + 2r;
+        districts that cannot come within max_km of the cell are dropped.
+        """
+        if not self._grid_keys:
+            return tuple(() for _ in range(self._ny * self._nx))
+        lat = np.radians([coords[k][0] for k in self._grid_keys])
+        lon = np.radians([coords[k][1] for k in self._grid_keys])
+        clat = np.radians(INDIA_LAT_MIN + (np.arange(self._ny) + 0.5) * self._deg)
+        clon = np.radians(INDIA_LON_MIN + (np.arange(self._nx) + 0.5) * self._deg)
+        glat, glon = (a.ravel()[:, None] for a in np.meshgrid(clat, clon, indexing="ij"))
+        h = (np.sin((lat - glat) / 2) ** 2
+             + np.cos(glat) * np.cos(lat) * np.sin((lon - glon) / 2) ** 2)
+        d = 2 * _EARTH_KM * np.arcsin(np.sqrt(np.minimum(h, 1.0)))
+        r = math.radians(self._deg) * _EARTH_KM * math.sqrt(2) / 2
+        keep = (d <= d.min(axis=1, keepdims=True) + 2 * r) & (d - r <= self._max_km)
+
+        shared: Dict[Tuple[int, ...], Tuple[int, ...]] = {}
+        cells = []
+        for row in keep:
+            cand = tuple(np.flatnonzero(row).tolist())
+            cells.append(shared.setdefault(cand, cand))
+        return tuple(cells)
+
+    # ── lookups ───────────────────────────────────────────────────────
+
+    def __len__(self) -> int:
+        return len(self._profiles)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._profiles
+
+    def profile(self, key: str) -> Optional[Mapping[str, Any]]:
+        """Read-only profile for a DISTRICT_PROFILES key."""
+        return self._profiles.get(key)
+
+    def state_key(self, state: Optional[str]) -> str:
+        """Normalised state name ("UP" → "uttar pradesh"); '' if unknown."""
+        s = normalise_place(state)
+        return self._states.get(s, s)
+
+    def by_state(self, state: Optional[str]) -> Tuple[str, ...]:
+        """District keys of ``state`` in DISTRICT_PROFILES order."""
+        return self._by_state.get(self.state_key(state), ())
+
+    def match_text(self, text: Optional[str], state: Optional[str] = None) -> Optional[str]:
+        """
+        District key named in free text: whole-string name/alias, then word
+        n-grams (longest first), then a truncated-name prefix.  With ``state``,
+        fuzzy hits from another state are skipped.
+        """
+        return self._text_key(text, state)[0]
+
+    def _match_location(self, text: Optional[str], state: Optional[str]) -> Tuple[Optional[str], str, str]:
+        """(district key | None, source, normalised state) — memoised as _text_key."""
+        n = normalise_place(text)
+        st = self.state_key(state)
+        if not n:
+            return None, "", st
+        if n in self._profiles:
+            return n, "district_exact", st
+        hit = self._names.get(n)
+        if hit is not None:
+            return hit, "district_alias", st
+        accept = (lambda k: self._state_of[k] == st) if st else None
+        hit = _scan_ngrams(self._names, self._name_words, n.split(), accept)
+        if hit is None:
+            name = _prefix_hit(self._sorted_names, n)
+            if name is not None and (accept is None or accept(self._names[name])):
+                hit = self._names[name]
+        return hit, "district_fuzzy", st
+
+    def nearest(self, lat: Optional[float], lon: Optional[float]) -> Optional[Tuple[str, float]]:
+        """(district key, km) of the closest district HQ within max_km, else None."""
+        if lat is None or lon is None:
+            return None
+        try:
+            iy = int((float(lat) - INDIA_LAT_MIN) // self._deg)
+            ix = int((float(lon) - INDIA_LON_MIN) // self._deg)
+        except (TypeError, ValueError):
+            return None
+        if not (0 <= iy < self._ny and 0 <= ix < self._nx):
+            return None
+        cand = self._cells[iy * self._nx + ix]
+        if not cand:
+            return None
+        plat, plon = math.radians(lat), math.radians(lon)
+        cos_p = math.cos(plat)
+        best_i, best_h = -1, 2.0
+        for i in cand:
+            dlat, dlon, cos_d = self._grid_pts[i]
+            h = math.sin((dlat - plat) / 2) ** 2 + cos_p * cos_d * math.sin((dlon - plon) / 2) ** 2
+            if h < best_h:
+                best_i, best_h = i, h
+        km = 2 * _EARTH_KM * math.asin(math.sqrt(min(best_h, 1.0)))
+        if km > self._max_km:
+            return None
+        return self._grid_keys[best_i], km
+
+    def resolve(
+        self,
+        location: Optional[str],
+        state: Optional[str] = None,
+        latitude: Optional[float] = None,
+        longitude: Optional[float] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Best district profile for a request, as a fresh dict with ``_source``
+        (district_exact | district_alias | district_fuzzy | district_grid |
+        state_first_district), ``district`` and ``region`` (= state) added.
+        None when nothing matches — callers fall back to state keywords.
+        """
+        key, source, st = self._text_key(location, state)
+        if key is None:
+            hit = self.nearest(latitude, longitude)
+            if hit is not None and (not st or self._state_of[hit[0]] == st):
+                key, source = hit[0], "district_grid"
+        if key is None and self._by_state.get(st):
+            key, source = self._by_state[st][0], "state_first_district"
+        if key is None:
+            return None
+        p = dict(self._profiles[key])
+        p["priority_crops"] = list(p.get("priority_crops") or ())
+        p["_source"] = source
+        p["district"] = key
+        p["region"] = p.get("state", "India")
+        return p
+
+    def known_place(self, query: Optional[str], fuzzy: bool = False) -> Optional[Mapping[str, Any]]:
+        """KNOWN_INDIAN_PLACES entry for ``query`` (n-gram / prefix match if ``fuzzy``)."""
+        return self._place_key(query, fuzzy)
+
+    def _match_place(self, query: Optional[str], fuzzy: bool) -> Optional[Mapping[str, Any]]:
+        n = normalise_place(query)
+        if not n:
+            return None
+        entry = self._places.get(n)
+        if entry is not None or not fuzzy:
+            return entry
+        entry = _scan_ngrams(self._places, self._place_words, n.split())
+        if entry is not None:
+            return entry
+        name = _prefix_hit(self._sorted_places, n)
+        return self._places[name] if name is not None else None
+
+    def stats(self) -> Dict[str, Any]:
+        sizes = [len(c) for c in self._cells if c]
+        return {
+            "districts": len(self._profiles),
+            "aliases": self._n_aliases,
+            "states": len(self._by_state),
+            "known_places": len(self._places),
+            "grid_cells": len(self._cells),
+            "grid_cells_covered": len(sizes),
+            "grid_avg_candidates": round(sum(sizes) / len(sizes), 2) if sizes else 0,
+            "build_ms": round(self.build_ms, 1),
+        }
+
+
+_STORE_LOCK = threading.Lock()
+_store: Optional[AgroProfileStore] = None
+
+
+def _build_default() -> AgroProfileStore:
+    from .district_data import DISTRICT_COORDS, DISTRICT_PROFILES
+    from .location_context import KNOWN_INDIAN_PLACES
+    return AgroProfileStore(DISTRICT_PROFILES, DISTRICT_COORDS, KNOWN_INDIAN_PLACES)
+
+
+def get_agro_profile_store() -> AgroProfileStore:
+    """Shared store, built once per process (double-checked locking)."""
+    global _store
+    if _store is not None:
+        return _store
+    with _STORE_LOCK:
+        if _store is None:
+            _store = _build_default()
+            stats = _store.stats()
+            logger.info(
+                "Agro profile store built: %d districts, %d aliases, %d/%d grid cells in %.1f ms",
+                stats["districts"], stats["aliases"], stats["grid_cells_covered"],
+                stats["grid_cells"], stats["build_ms"],
+            )
+    return _store
@@ -0,0 +1,236 @@
+"""
+Small caching primitives shared by the upstream-facing services.
+
+SingleFlight — collapses concurrent calls for the same key inside one worker
+               process into a single execution; every caller gets the
+               leader's result (or exception).
+try_acquire_lease / release_lease
+             — best-effort cross-worker mutex on a Django cache alias
+               (``cache.add`` is atomic on Redis and LocMem).  Used to stop
+               every Gunicorn worker revalidating the same stale entry.
+LRUCache   — bounded, thread-safe in-process map with optional per-entry
+               TTL; the L1 in front of a shared alias in long-lived workers.
+TieredCache  — LRUCache in front of an optional shared Django cache alias
+               (Redis in production), with hit/miss/eviction counters.
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class _Call:
+    __slots__ = ("event", "result", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Per-key call coalescing (Go's ``singleflight`` for threads)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+
+    def do(self, key: str, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run ``fn`` once for all concurrent callers sharing ``key``."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.event.set()
+        return call.result
+
+    def in_flight(self, key: str) -> bool:
+        with self._lock:
+            return key in self._calls
+
+
+def try_acquire_lease(cache, key: str, ttl: int) -> bool:
+    """Atomically claim ``key`` for ``ttl`` seconds. Fails open on cache errors."""
+    if cache is None:
+        return True
+    try:
+        return bool(cache.add(f"lease:{key}", 1, timeout=ttl))
+    except Exception as exc:
+        logger.debug("lease acquire failed for %s: %s", key, exc)
+        return True
+
+
+def release_lease(cache, key: str) -> None:
+    if cache is None:
+        return
+    try:
+        cache.delete(f"lease:{key}")
+    except Exception:
+        pass
+
+
+class LRUCache:
+    """Bounded LRU map with optional TTL (seconds).  Safe to share between threads."""
+
+    def __init__(self, maxsize: int, ttl: Optional[float] = None):
+        self.maxsize = max(1, int(maxsize))
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()   # key → (expires_at | None, value)
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0, "expired": 0}
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.stats["misses"] += 1
+                return default
+            expires_at, value = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                self.stats["expired"] += 1
+                self.stats["misses"] += 1
+                return default
+            self._data.move_to_end(key)
+            self.stats["hits"] += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.stats["evictions"] += 1
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.pop(key, None)
+        return default if entry is None else entry[1]
+
+    def purge_expired(self) -> int:
+        """Drop every expired entry now (get() only drops the ones it meets)."""
+        now = time.monotonic()
+        with self._lock:
+            dead = [k for k, (exp, _) in self._data.items() if exp is not None and exp <= now]
+            for k in dead:
+                del self._data[k]
+            self.stats["expired"] += len(dead)
+        return len(dead)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+
+_MISSING = object()
+
+
+class TieredCache:
+    """
+    L1 LRUCache → shared Django cache alias.  A shared hit is promoted to L1;
+    set() writes both.  The alias is looked up lazily (settings may not be
+    ready at import) and every shared-tier error degrades to an L1-only
+    cache.  ``alias=None`` and no ``cache`` keeps it in-process only.
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        ttl: float,
+        alias: Optional[str] = None,
+        prefix: str = "",
+        cache=None,
+    ):
+        self.ttl = ttl
+        self.alias = alias
+        self.prefix = prefix
+        self._l1 = LRUCache(maxsize, ttl)
+        self._cache = cache
+        self._shared_stats = {"shared_hits": 0, "shared_misses": 0, "shared_errors": 0}
+
+    def _shared(self):
+        if self._cache is not None:
+            return self._cache
+        if self.alias is None:
+            return None
+        try:
+            from django.core.cache import caches
+            return caches[self.alias]
+        except Exception:
+            return None
+
+    def get(self, key: str, default: Any = None) -> Any:
+        value = self._l1.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        shared = self._shared()
+        if shared is None:
+            return default
+        try:
+            value = shared.get(self.prefix + key, _MISSING)
+        except Exception as exc:
+            self._shared_stats["shared_errors"] += 1
+            logger.debug("shared cache read failed for %s: %s", key, exc)
+            return default
+        if value is _MISSING:
+            self._shared_stats["shared_misses"] += 1
+            return default
+        self._shared_stats["shared_hits"] += 1
+        self._l1.set(key, value)
+        return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        ttl = self.ttl if ttl is None else ttl
+        self._l1.set(key, value, ttl)
+        shared = self._shared()
+        if shared is None:
+            return
+        try:
+            shared.set(self.prefix + key, value, timeout=int(ttl))
+        except Exception as exc:
+            self._shared_stats["shared_errors"] += 1
+            logger.debug("shared cache write failed for %s: %s", key, exc)
+
+    def stats(self) -> Dict[str, Any]:
+        """L1 hits/misses/evictions/expired + shared-tier hits/misses/errors."""
+        out: Dict[str, Any] = dict(self._l1.stats, **self._shared_stats)
+        out["size"] = len(self._l1)
+        out["maxsize"] = self._l1.maxsize
+        return out
+
+    def clear(self) -> None:
+        """Clear L1 only (the shared tier belongs to every worker)."""
+        self._l1.clear()
+
+    def __len__(self) -> int:
+        return len(self._l1)
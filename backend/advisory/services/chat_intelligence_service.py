@@ -44,6 +44,8 @@ from .language_service import (
     translate_farming_advice,
 )
 from .location_context import LocationContext
+from .query_classifier import IntentMatcher, ReplacementTable
+from .response_cache import response_cache
 from .unified_realtime_service import (
     MSP_2024_25,
     _is_valid_gemini_key,
@@ -63,12 +65,10 @@ try:
         field_sensor_service,
         CROP_SOIL_REQUIREMENTS as _CROP_SOIL_REQ,
     )
-    from .district_data import DISTRICT_PROFILES as _DISTRICT_PROFILES
 except ImportError:
     _ALL_CROP_DATA = {}
     field_sensor_service = None          # type: ignore[assignment]
     _CROP_SOIL_REQ = {}
-    _DISTRICT_PROFILES = {}
 
 logger = logging.getLogger(__name__)
 
@@ -100,41 +100,11 @@ def _safe_temp(temp_str: str, fallback: float = 25.0) -> float:
         return fallback
 
 _PHASE1_TIMEOUT_S:       int   = int(_os.environ.get("PHASE1_TIMEOUT_S", "45"))
-_PHASE1_CB_MAX_FAILS:    int   = 3   # open circuit after 3 consecutive failures
-_PHASE1_CB_RESET_S:      int   = 60  # retry after 60 s cooldown
 
-_CB_KEY_FAILS = "krishimitra:phase1:cb:fails"
-_CB_KEY_TS    = "krishimitra:phase1:cb:ts"
-
-def _cb_is_open() -> bool:
-    import time
-    from django.core.cache import caches
-    try:
-        cache = caches["default"]
-        fails = int(cache.get(_CB_KEY_FAILS) or 0)
-        if fails < _PHASE1_CB_MAX_FAILS:
-            return False
-        return (time.time() - float(cache.get(_CB_KEY_TS) or 0)) < _PHASE1_CB_RESET_S
-    except Exception:
-        return False
-
-def _cb_increment() -> None:
-    import time
-    from django.core.cache import caches
-    try:
-        c = caches["default"]
-        if not c.add(_CB_KEY_FAILS, 1, timeout=_PHASE1_CB_RESET_S * 2):
-            c.incr(_CB_KEY_FAILS)
-        c.set(_CB_KEY_TS, time.time(), timeout=_PHASE1_CB_RESET_S * 2)
-    except Exception:
-        pass
-
-def _cb_reset() -> None:
-    from django.core.cache import caches
-    try:
-        caches["default"].delete(_CB_KEY_FAILS)
-    except Exception:
-        pass
+# Shared breakers (services/circuit_breaker.py): error / slow-call rates over a
+# rolling window, half-open trials, background health probes of Phase 1 and
+# Ollama instead of a ping per request.
+from .circuit_breaker import gemini_breaker, ollama_breaker, phase1_breaker
 
 # ── Module-level Hindi→English term map (used by _qwen_rag_answer) ───────────
 # Built once at import time instead of on every request.
@@ -315,7 +285,9 @@ _INTENT_PATTERNS: List[Tuple[str, List[str]]] = [
     # ── FOLLOW-UP ────────────────────────────────────────────────
     (INTENT_FOLLOWUP, [
         r"\b(uska|uski|iske|isi|yahi|wahi|उसका|उसकी|इसका|इसकी|यही|वही)\b",
-        r"\b(aur|phir|फिर|और\s*क्या|next|then|also|more|aage)\b\s*(batao|bataiye|tell|kya|kab|kitna|batao)?",
+        # Connectors only lead a follow-up ("aur batao", "next kya karu");
+        # mid-sentence they are part of the question ("forecast for next week").
+        r"^\s*(aur|phir|फिर|और\s*क्या|next|then|also|more|aage)\b\s*(batao|bataiye|tell|kya|kab|kitna|batao)?",
         r"\b(iske\s*baad|इसके\s*बाद|उसके\s*बाद|uske\s*baad|और\s*बताइए|more\s*about)\b",
         r"^(okay|ok|theek\s*hai|accha|acha|hmm|haan|ha)\s*$",
     ]),
@@ -539,6 +511,34 @@ _INTENT_PATTERNS: List[Tuple[str, List[str]]] = [
 
 ]
 
+# Compiled once: one alternation per intent, same priority order.  Greetings
+# don't fire for long messages.
+_INTENT_MATCHER = IntentMatcher(_INTENT_PATTERNS, max_len={INTENT_GREETING: 50})
+
+# ── classify_query() pre-checks (composite patterns that beat the table) ──
+_PRE_RAIN_THEN_IRRIGATE = re.compile(
+    r"\b(barish|baarish|rain|varsha)\s*(ke\s*baad|after|ke\s*bad)\b.{0,40}\b(sinchai|pani|irrigat|water)\b",
+    re.IGNORECASE,
+)
+_PRE_IRRIGATE_AFTER_RAIN = re.compile(
+    r"\b(sinchai|pani|irrigat)\b.{0,30}\b(barish|rain)\s*(ke\s*baad|after)\b", re.IGNORECASE
+)
+_PRE_MICRO_IRRIGATION = re.compile(r"\b(drip|sprinkler|micro\s*irrigation|borewell)\b", re.IGNORECASE)
+_PRE_SUBSIDY = re.compile(r"\b(subsidy|scheme|yojana|milegi)\b", re.IGNORECASE)
+_PRE_SCHEME_APPLY = re.compile(r"\b(apply|avedan|register|pm[- ]?kusum|kusum|form)\b", re.IGNORECASE)
+_PRE_DAS_FERTILIZER = re.compile(
+    r"\b\d+\s*(din|days)\s*(baad|after)?\s*(khad|urea|dap|fertilizer|उर्वरक)", re.IGNORECASE
+)
+_PRE_TODAY_RATE = re.compile(r"\b(aaj|today|abhi)\s*ka\s*\w+\s*ka\s*(rate|bhav|daam|price)\b", re.IGNORECASE)
+
+# ── Named-location extraction (see _extract_query_location) ──
+_MULTIWORD_CITY_KEYS: Tuple[str, ...] = tuple(
+    sorted((k for k in _INDIAN_CITY_CATALOG if ' ' in k), key=len, reverse=True)
+)
+_MANDI_MARKET_RE = re.compile(r'\b(mandi\s*(mein|me|ka|ki|se|bhav|price|rate)|apmc\s*mein|bazar\s*mein)\b')
+_PUNCT_RE = re.compile(r'[^\w\s]')
+_CROP_TOKEN_SPLIT_RE = re.compile(r"[\s,?.!;|]+")
+
 
 class ChatIntelligenceService:
     """
@@ -917,6 +917,35 @@ Never claim you inspected a photo. Never make up mandi names or today's prices."
         except Exception as exc:
             logger.warning("KB Tier 0 error: %s", exc)
 
+        # ── Response cache: same question, same context bucket → reuse ───────
+        # Only the LLM tiers are cached; personalised turns always generate.
+        rc_bucket: Optional[str] = None
+        rc_hit: Optional[Dict[str, Any]] = None
+        rc_query = self._normalise_hinglish(query.lower())
+        if not response_text and not fast_mode:
+            if farmer_profile:
+                response_cache.bypass("farmer_profile")
+            elif history:
+                response_cache.bypass("history")
+            elif intent in (INTENT_GREETING, INTENT_FOLLOWUP):
+                response_cache.bypass("intent")
+            else:
+                rc_bucket = response_cache.bucket_for(
+                    intent=intent,
+                    crops=[c.get("id") or c.get("name", "") for c in crops_mentioned],
+                    lat=ctx.latitude, lon=ctx.longitude, region=ctx.state or ctx.display_name,
+                    lang=lang,
+                    context=self._response_cache_context(intent, wc, sc, market_str, season),
+                )
+                rc_hit = response_cache.get(rc_query, rc_bucket)
+                if rc_hit:
+                    response_text = rc_hit["response"]
+                    data_source = rc_hit["data_source"]
+                    logger.info(
+                        "Response cache %s hit (%.3f) for intent=%s",
+                        rc_hit["match"], rc_hit["similarity"], intent,
+                    )
+
         # Tier 1: krishimitra-llm — analyses ALL real-time data before responding
         if not response_text and not fast_mode:
             response_text = self._qwen_rag_answer(
@@ -938,6 +967,7 @@ Never claim you inspected a photo. Never make up mandi names or today's prices."
                 response_text = gemini_service.generate(
                     prompt=rendered, system_prompt="",
                     max_tokens=1600, user_query=query, temperature=0.3,
+                    fallback=False,
                 )
                 if response_text:
                     data_source = "Gemini AI + Official gov APIs"
@@ -946,6 +976,11 @@ Never claim you inspected a photo. Never make up mandi names or today's prices."
             except Exception as exc:
                 logger.warning("Gemini failed: %s — using rule-based", exc)
 
+        # Only real generations reach here: Phase 1 answers 503 instead of an
+        # offline notice, and Gemini returns "" instead of its rule-based text.
+        if response_text and rc_bucket and not rc_hit:
+            response_cache.put(rc_query, rc_bucket, response_text, data_source, intent)
+
         # Tier 3: Rule-based (instant, ICAR-grounded, always available)
         # Used when: fast_mode=True OR LLM offline OR Gemini unavailable
         if not response_text:
@@ -968,8 +1003,30 @@ Never claim you inspected a photo. Never make up mandi names or today's prices."
             "data_source":     data_source,
             "timestamp":       now.isoformat(),
             "location_context": ctx.to_dict() if hasattr(ctx, "to_dict") else None,
+            "response_cache":  rc_hit["match"] if rc_hit else None,
         }
 
+    @staticmethod
+    def _response_cache_context(
+        intent: str, wc: WeatherConstraints, sc: SensorContext, market_str: str, season: str,
+    ) -> Tuple[Any, ...]:
+        """
+        The part of the live context an LLM answer depends on, coarsened so
+        that small sensor/forecast jitter does not split the cache bucket.
+        A new alert, a flipped spray/irrigation gate or a moved price does.
+        """
+        parts: List[Any] = [
+            season, wc.alerts_text, wc.irrigation_blocked, wc.spray_blocked,
+            wc.frost_warning, wc.heavy_rain_48h, int(wc.rain_next_3d_mm // 5),
+        ]
+        if intent == INTENT_WEATHER:
+            parts += [wc.forecast_3day, None if wc.temperature is None else int(wc.temperature // 2)]
+        if intent in (INTENT_MARKET_PRICE, INTENT_STORAGE, INTENT_PROFIT_CALC):
+            parts.append(market_str)
+        if intent in (INTENT_IRRIGATION, INTENT_SOIL, INTENT_FERTILIZER):
+            parts += [sc.source, sc.moisture_status, sc.soil_health_grade]
+        return tuple(parts)
+
     # ── Tier 2: Qwen 2.5 7B + RAG (local Phase 1 server) ────────
 
     def _qwen_rag_answer(
@@ -995,13 +1052,13 @@ Never claim you inspected a photo. Never make up mandi names or today's prices."
           or unavailable. Uses the same grounded prompt with weather/sensor/
           market context built inline.
 
-        Both paths use the circuit breaker to avoid stalling on offline servers.
+        Each path has its own shared circuit breaker, so an offline server is
+        skipped at once instead of costing every request a timeout.
         """
         # ── Circuit breaker check ─────────────────────────────────────────────
-        if _cb_is_open():
-            logger.debug(
-                "Phase 1 circuit breaker OPEN — skipping",
-            )
+        use_phase1 = phase1_breaker().allow()
+        if not use_phase1 and not ollama_breaker().allow():
+            logger.debug("Phase 1 and Ollama circuit breakers OPEN — skipping")
             return None
 
         # ── Build shared context ──────────────────────────────────────────────
@@ -1050,18 +1107,20 @@ Never claim you inspected a photo. Never make up mandi names or today's prices."
             "stream":         False,
         }, ensure_ascii=False).encode("utf-8")
 
-        try:
-            req = urllib.request.Request(
-                PHASE1_URL,
-                data=payload,
-                headers={"Content-Type": "application/json"},
-                method="POST",
-            )
-            with urllib.request.urlopen(req, timeout=_PHASE1_TIMEOUT_S) as resp:
-                data = json.loads(resp.read().decode("utf-8"))
+        if use_phase1:
+            t0 = _time.monotonic()
+            try:
+                req = urllib.request.Request(
+                    PHASE1_URL,
+                    data=payload,
+                    headers={"Content-Type": "application/json"},
+                    method="POST",
+                )
+                with urllib.request.urlopen(req, timeout=_PHASE1_TIMEOUT_S) as resp:
+                    data = json.loads(resp.read().decode("utf-8"))
+                phase1_breaker().record_success(_time.monotonic() - t0)
                 text = (data.get("response") or "").strip()
                 if text:
-                    _cb_reset()
                     logger.info(
                         "krishimitra-llm via Phase1: '%s...' — %d RAG chunks",
                         query[:40], data.get("rag_chunks", 0),
@@ -1069,10 +1128,16 @@ Never claim you inspected a photo. Never make up mandi names or today's prices."
                     return text
                 logger.warning("Phase 1 returned empty for: %s", query[:40])
                 # Fall through to Path B
-        except urllib.error.URLError:
-            logger.debug("Phase 1 offline — trying direct Ollama path")
-        except Exception as exc:
-            logger.info("Phase 1 timeout/error (%s) — trying direct Ollama", type(exc).__name__)
+            except urllib.error.URLError:
+                phase1_breaker().record_failure(_time.monotonic() - t0)
+                logger.debug("Phase 1 offline — trying direct Ollama path")
+            except Exception as exc:
+                phase1_breaker().record_failure(_time.monotonic() - t0)
+                logger.info("Phase 1 timeout/error (%s) — trying direct Ollama", type(exc).__name__)
+
+        if use_phase1 and not ollama_breaker().allow():
+            logger.debug("Ollama circuit breaker OPEN — skipping direct path")
+            return None
 
         # ── Path B: Direct Ollama — Ultra-Rich Context (all real-time data) ─────
         OLLAMA_BASE  = _os.environ.get("OLLAMA_BASE_URL", "http://localhost:11434")
@@ -1183,23 +1248,26 @@ Never claim you inspected a photo. Never make up mandi names or today's prices."
                 prompt_parts.append("[FARMER PROFILE — PERSONALISE RESPONSE FOR THIS FARMER]\n"
                                     + "\n".join(fp_lines))
 
-        # 5. District agro-climatic profile (soil type, zone, avg rainfall)
+        # 5. District agro-climatic profile (soil type, rainfall, irrigation, zone)
         try:
-            if _DISTRICT_PROFILES and ctx.state:
-                state_lower = ctx.state.lower().replace(" ", "_")
-                district_profile = _DISTRICT_PROFILES.get(ctx.display_name.lower()) or \
-                                   _DISTRICT_PROFILES.get(state_lower)
-                if district_profile:
-                    d_lines = []
-                    if district_profile.get("soil_type"):
-                        d_lines.append(f"Dominant soil: {district_profile['soil_type']}")
-                    if district_profile.get("avg_annual_rainfall_mm"):
-                        d_lines.append(f"Avg rainfall: {district_profile['avg_annual_rainfall_mm']}mm/yr")
+            if ctx.state:
+                from .agro_profile_store import get_agro_profile_store
+                district_profile = get_agro_profile_store().resolve(
+                    ctx.district or ctx.city or ctx.display_name, ctx.state, ctx.latitude, ctx.longitude,
+                )
+                # State-level fallbacks would describe some other district — skip them.
+                if district_profile and district_profile["_source"] != "state_first_district":
+                    d_lines = [f"District: {district_profile['district'].title()}"]
+                    if district_profile.get("soil"):
+                        d_lines.append(f"Dominant soil: {district_profile['soil']}")
+                    if district_profile.get("rainfall"):
+                        d_lines.append(f"Rainfall: {district_profile['rainfall']}")
+                    if district_profile.get("irrigation"):
+                        d_lines.append(f"Irrigation coverage: {district_profile['irrigation']}")
                     if district_profile.get("agro_zone"):
                         d_lines.append(f"Agro zone: {district_profile['agro_zone']}")
-                    if d_lines:
-                        prompt_parts.append(f"[DISTRICT PROFILE — {ctx.display_name}]\n"
-                                            + "\n".join(d_lines))
+                    prompt_parts.append(f"[DISTRICT PROFILE — {ctx.display_name}]\n"
+                                        + "\n".join(d_lines))
         except Exception:
             pass
 
@@ -1273,6 +1341,7 @@ Never claim you inspected a photo. Never make up mandi names or today's prices."
             "stream": False,
         }, ensure_ascii=False).encode("utf-8")
 
+        t0 = _time.monotonic()
         try:
             ollama_req = urllib.request.Request(
                 OLLAMA_URL,
@@ -1283,21 +1352,21 @@ Never claim you inspected a photo. Never make up mandi names or today's prices."
             # Direct Ollama calls can take 20-40s on consumer hardware
             with urllib.request.urlopen(ollama_req, timeout=120) as resp:
                 data = json.loads(resp.read().decode("utf-8"))
-                text = (data.get("message", {}).get("content") or "").strip()
-                if text:
-                    _cb_reset()
-                    logger.info(
-                        "krishimitra-llm direct Ollama: '%s...' — %d chars",
-                        query[:40], len(text),
-                    )
-                    return text
-                return None
+            ollama_breaker().record_success(_time.monotonic() - t0)
+            text = (data.get("message", {}).get("content") or "").strip()
+            if text:
+                logger.info(
+                    "krishimitra-llm direct Ollama: '%s...' — %d chars",
+                    query[:40], len(text),
+                )
+                return text
+            return None
         except urllib.error.URLError:
-            _cb_increment()
+            ollama_breaker().record_failure(_time.monotonic() - t0)
             logger.debug("Direct Ollama also offline — falling back to rule-based")
             return None
         except Exception as exc:
-            _cb_increment()
+            ollama_breaker().record_failure(_time.monotonic() - t0)
             logger.warning("Direct Ollama error: %s", exc)
             return None
 
@@ -1319,22 +1388,15 @@ Never claim you inspected a photo. Never make up mandi names or today's prices."
         """
         q_lower = query.lower().strip()
         # Remove punctuation
-        q_clean = re.sub(r'[^\w\s]', ' ', q_lower)
+        q_clean = _PUNCT_RE.sub(' ', q_lower)
 
         # FIX: "mandi mein bhav" — "mandi" means market here, not Mandi city HP.
         # Guard: if query reads as market-price context, skip city extraction.
-        if re.search(
-            r'\b(mandi\s*(mein|me|ka|ki|se|bhav|price|rate)|apmc\s*mein|bazar\s*mein)\b',
-            q_lower,
-        ):
+        if _MANDI_MARKET_RE.search(q_lower):
             return None
 
         # ── Try multi-word city names first (longest match wins) ──────────────
-        for city_key in sorted(
-            (k for k in _INDIAN_CITY_CATALOG if ' ' in k),
-            key=len,
-            reverse=True,
-        ):
+        for city_key in _MULTIWORD_CITY_KEYS:
             if city_key in q_clean:
                 display, state, lat, lon = _INDIAN_CITY_CATALOG[city_key]
                 return LocationContext(
@@ -1543,6 +1605,26 @@ Never claim you inspected a photo. Never make up mandi names or today's prices."
 
     # ── Market price slot string ──────────────────────────────────
 
+    @staticmethod
+    def _nearest_mandis_line(ctx: LocationContext, crops: List[Dict[str, Any]]) -> str:
+        """Nearest-mandi context line from the shared spatial index ('' without GPS)."""
+        if ctx.latitude is None or ctx.longitude is None:
+            return ""
+        try:
+            from .mandi_index import get_mandi_index
+
+            commodity = crops[0]["name"] if crops else None
+            nearest = get_mandi_index().nearest(ctx.latitude, ctx.longitude, k=3, commodity=commodity)
+        except Exception as exc:
+            logger.debug("Nearest mandi lookup failed: %s", exc)
+            return ""
+        if not nearest:
+            return ""
+        label = f" for {commodity}" if commodity else ""
+        return f"[NEAREST MANDIS{label}] " + "; ".join(
+            f"{row['name']} ({row.get('district', '')}, {dist:.0f} km)" for dist, row in nearest
+        )
+
     def _build_market_price_str(
         self,
         prices: Dict[str, Any],
@@ -1575,9 +1657,11 @@ Never claim you inspected a photo. Never make up mandi names or today's prices."
             modal  = c.get("modal_price")
             msp    = c.get("msp")
             mandi  = c.get("mandi_name", "N/A")
+            # profit_vs_msp is None for crops without an MSP (vegetables, …)
+            pct    = c.get("profit_vs_msp")
             profit = (
-                f"+{c['profit_vs_msp']}% above MSP"
-                if c.get("profit_vs_msp", 0) > 0
+                "no MSP" if pct is None
+                else f"+{pct}% above MSP" if pct > 0
                 else "below MSP"
             )
             lines.append(f"{c.get('crop_name')} ₹{modal}/q (MSP ₹{msp}) @ {mandi} — {profit}")
@@ -1727,13 +1811,11 @@ Never claim you inspected a photo. Never make up mandi names or today's prices."
         "mazhai": "barish rain",           # rain (Tamil)
         "nilam": "mitti soil",             # soil (Tamil)
     }
+    _HINGLISH_NORMALISER = ReplacementTable(_HINGLISH_NORM)
 
     def _normalise_hinglish(self, text: str) -> str:
         """Replace common Hinglish variations with canonical forms so regexes match."""
-        t = text.lower()
-        for wrong, right in self._HINGLISH_NORM.items():
-            t = t.replace(wrong, right)
-        return t
+        return self._HINGLISH_NORMALISER(text)
 
     def classify_query(self, query: str) -> Tuple[str, List[Dict[str, Any]]]:
         """
@@ -1755,43 +1837,27 @@ Never claim you inspected a photo. Never make up mandi names or today's prices."
 
         # "barish ke baad [X me] sinchai" → IRRIGATION (not WEATHER)
         # Allow up to ~5 words between "barish ke baad" and "sinchai/pani"
-        if re.search(
-            r"\b(barish|baarish|rain|varsha)\s*(ke\s*baad|after|ke\s*bad)\b.{0,40}\b(sinchai|pani|irrigat|water)\b",
-            q, re.IGNORECASE
-        ) or re.search(
-            r"\b(sinchai|pani|irrigat)\b.{0,30}\b(barish|rain)\s*(ke\s*baad|after)\b",
-            q, re.IGNORECASE
-        ):
+        if _PRE_RAIN_THEN_IRRIGATE.search(q) or _PRE_IRRIGATE_AFTER_RAIN.search(q):
             return INTENT_IRRIGATION, crops_mentioned
 
         # "drip/sprinkler + subsidy/scheme" → IRRIGATION (not GOVT SCHEME)
         # But NOT if it's asking about applying for a specific named scheme like PM-KUSUM
-        if re.search(r"\b(drip|sprinkler|micro\s*irrigation|borewell)\b", q, re.IGNORECASE) and \
-           re.search(r"\b(subsidy|scheme|yojana|milegi)\b", q, re.IGNORECASE) and \
-           not re.search(r"\b(apply|avedan|register|pm[- ]?kusum|kusum|form)\b", q, re.IGNORECASE):
+        if _PRE_MICRO_IRRIGATION.search(q) and _PRE_SUBSIDY.search(q) and \
+           not _PRE_SCHEME_APPLY.search(q):
             return INTENT_IRRIGATION, crops_mentioned
 
         # "X din baad khad/urea/fertilizer" → FERTILIZER (not SOWING)
-        if re.search(r"\b\d+\s*(din|days)\s*(baad|after)?\s*(khad|urea|dap|fertilizer|उर्वरक)", q, re.IGNORECASE):
+        if _PRE_DAS_FERTILIZER.search(q):
             return INTENT_FERTILIZER, crops_mentioned
 
         # "aaj ka <crop> ka rate/bhav/daam" → MARKET_PRICE
-        if re.search(
-            r"\b(aaj|today|abhi)\s*ka\s*\w+\s*ka\s*(rate|bhav|daam|price)\b",
-            q, re.IGNORECASE
-        ):
+        if _PRE_TODAY_RATE.search(q):
             return INTENT_MARKET_PRICE, crops_mentioned
 
-        for intent, patterns in _INTENT_PATTERNS:
-            for pat in patterns:
-                try:
-                    if re.search(pat, q, re.IGNORECASE | re.UNICODE):
-                        # Don't fire GREETING for long messages
-                        if intent == INTENT_GREETING and len(q) > 50:
-                            continue
-                        return intent, crops_mentioned
-                except re.error:
-                    continue
+        # Step 3: compiled intent table (first match wins, see _INTENT_MATCHER)
+        intent = _INTENT_MATCHER.match(q)
+        if intent is not None:
+            return intent, crops_mentioned
 
         # Context-aware fallbacks ─────────────────────────────────
         if crops_mentioned:
@@ -1819,7 +1885,7 @@ Never claim you inspected a photo. Never make up mandi names or today's prices."
         """
         found: List[Dict[str, Any]] = []
         seen = set()
-        tokens = re.split(r"[\s,?.!;|]+", text.lower())
+        tokens = _CROP_TOKEN_SPLIT_RE.split(text.lower())
         for length in (3, 2, 1):
             for i in range(len(tokens) - length + 1):
                 phrase = " ".join(tokens[i:i + length])
@@ -2029,6 +2095,9 @@ Never claim you inspected a photo. Never make up mandi names or today's prices."
                 else:
                     lines.append("[MANDI PRICES] Live feed unavailable. Set DATA_GOV_IN_API_KEY for live data.")
                     lines.append("  Register free at data.gov.in/user/register")
+                nearest = self._nearest_mandis_line(ctx, crops)
+                if nearest:
+                    lines.append(nearest)
         except Exception as e:
             logger.warning("Market fetch failed in chat context: %s", e)
 
@@ -3586,6 +3655,19 @@ Never claim you inspected a photo. Never make up mandi names or today's prices."
 # Injected onto the class so it lives alongside answer() without touching
 # the existing 3 000-line method body.
 
+def _gemini_outage(exc: BaseException) -> bool:
+    """
+    True when a Gemini SDK error means Gemini itself is struggling: transport
+    errors (OSError covers requests / socket / timeout errors) or an API
+    error with HTTP status 429 or 5xx.  Import, configuration and 4xx errors
+    are ours and must not trip the shared breaker.
+    """
+    if isinstance(exc, OSError):
+        return True
+    code = getattr(exc, "code", None)            # google.api_core GoogleAPICallError
+    return isinstance(code, int) and (code == 429 or code >= 500)
+
+
 def _answer_stream(
     self,
     query: str,
@@ -3626,7 +3708,8 @@ def _answer_stream(
 
     # ── Try Gemini streaming first ────────────────────────────────
     has_gemini = _is_valid_gemini_key(gemini_service.api_key)
-    if has_gemini and not fast_mode:
+    if has_gemini and not fast_mode and gemini_breaker().allow():
+        t0 = None                                # set once the request is on the wire
         try:
             import google.generativeai as _genai
             _genai.configure(api_key=gemini_service.api_key)
@@ -3643,6 +3726,7 @@ def _answer_stream(
                 f"Respond concisely in the farmer's language. "
                 f"Use bullet points for action steps."
             )
+            t0 = _time.monotonic()
             response = model.generate_content(compact_prompt, stream=True)
             full_text = []
             for chunk in response:
@@ -3650,6 +3734,7 @@ def _answer_stream(
                 if token:
                     full_text.append(token)
                     yield token
+            gemini_breaker().record_success(_time.monotonic() - t0)
             yield {
                 "__done__": True,
                 "intent": intent,
@@ -3660,10 +3745,18 @@ def _answer_stream(
             }
             return
         except Exception as exc:
+            # Only transport / 429 / 5xx count against Gemini; a 4xx or blocked
+            # prompt means it answered, as in GeminiService._call_api.
+            if t0 is not None:
+                if _gemini_outage(exc):
+                    gemini_breaker().record_failure(_time.monotonic() - t0)
+                else:
+                    gemini_breaker().record_success(_time.monotonic() - t0)
             logger.warning("Gemini stream failed (%s) — falling back to answer()", exc)
 
     # ── Try Phase 1 Ollama streaming ──────────────────────────────
-    if not fast_mode:
+    if not fast_mode and phase1_breaker().allow():
+        t0 = _time.monotonic()
         try:
             PHASE1_STREAM_URL = "http://127.0.0.1:8001/chat/stream"
             payload = _json.dumps({
@@ -3677,6 +3770,8 @@ def _answer_stream(
                 headers={"Content-Type": "application/json"}, method="POST"
             )
             with _ureq.urlopen(req, timeout=30) as resp:
+                phase1_breaker().record_success(_time.monotonic() - t0)    # time to first byte
+                t0 = None
                 full_text = []
                 for raw in resp:
                     line = raw.decode("utf-8").strip()
@@ -3703,6 +3798,8 @@ def _answer_stream(
                     }
                     return
         except Exception as exc:
+            if t0 is not None:
+                phase1_breaker().record_failure(_time.monotonic() - t0)
             logger.debug("Phase1 stream unavailable (%s) — non-stream fallback", exc)
 
     # ── Non-stream fallback: call answer() and yield as one chunk ─
@@ -0,0 +1,554 @@
+"""
+KrishiMitra — shared circuit breakers for upstream calls
+========================================================
+One breaker per upstream (phase1, ollama, gemini, data_gov, open_meteo),
+with its state shared by every worker process instead of each Gunicorn
+worker, Celery child and the phase1 server finding out on its own — one
+timeout each — that an upstream is down.
+
+States:
+
+  closed     calls go through; outcomes are counted in a rolling window
+             (``window_s`` split into ``buckets`` buckets).  Once the window
+             holds ``min_calls`` calls and the failure rate reaches
+             ``failure_rate`` — or the share of calls slower than
+             ``slow_call_s`` reaches ``slow_call_rate`` — the breaker opens.
+  open       allow() is False for ``open_s`` seconds; callers skip the
+             upstream and take their fallback at once.
+  half_open  after ``open_s`` (or as soon as a health probe succeeds) up to
+             ``half_open_trials`` callers get a trial permit; the others are
+             still refused.  That many successful trials close the breaker,
+             a failed trial re-opens it.  A permit whose caller never
+             reports expires after ``trial_ttl_s``.
+
+Health probes: a breaker built with ``probe=`` (a cheap request such as
+Ollama's ``/api/tags``) is probed every ``probe_interval_s`` by one
+background thread per process; a lease makes one process in the group do it.
+A failed probe opens the breaker, a passing probe moves an open breaker to
+half_open.  This replaces the per-request availability pings.
+
+Shared state lives in the ``circuit_breaker`` Django cache alias (Redis in
+production).  Processes without Django settings (phase1) use REDIS_URL
+directly when redis-py is installed; otherwise, and behind DummyCache,
+state is per process.  Store errors fail open — a broken Redis never stops
+upstream calls.
+
+Metrics: breaker_stats() → /metrics (circuit_breakers) and phase1 /health.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+_CACHE_ALIAS = "circuit_breaker"
+_KEY_PREFIX  = "krishimitra:cb"
+_STATE_MEMO_S = float(os.getenv("CIRCUIT_STATE_MEMO_S", "1.0"))   # L1 for the shared state
+_PROBE_TICK_S = 1.0
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised by CircuitBreaker.call() when the breaker refuses the call."""
+
+
+# ── State stores ──────────────────────────────────────────────────────────────
+
+class _LocalStore:
+    """In-process store with TTLs — the fallback when nothing is shared."""
+
+    shared = False
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._data: Dict[str, tuple] = {}
+
+    def _live(self, key: str):
+        item = self._data.get(key)
+        if item is None:
+            return None
+        if item[1] < time.time():
+            del self._data[key]
+            return None
+        return item
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            item = self._live(key)
+            return item[0] if item else None
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        with self._lock:
+            out = {}
+            for k in keys:
+                item = self._live(k)
+                if item:
+                    out[k] = item[0]
+            return out
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        with self._lock:
+            self._data[key] = (value, time.time() + ttl)
+
+    def add(self, key: str, value: Any, ttl: float) -> bool:
+        with self._lock:
+            if self._live(key):
+                return False
+            self._data[key] = (value, time.time() + ttl)
+            return True
+
+    def incr(self, key: str, ttl: float) -> int:
+        with self._lock:
+            item = self._live(key)
+            value = (item[0] if item else 0) + 1
+            self._data[key] = (value, item[1] if item else time.time() + ttl)
+            return value
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+
+class _DjangoCacheStore:
+    """A Django cache alias (``cache.add`` / ``incr`` are atomic on Redis)."""
+
+    shared = True
+
+    def __init__(self, cache):
+        self._cache = cache
+
+    def get(self, key):
+        return self._cache.get(key)
+
+    def get_many(self, keys):
+        return self._cache.get_many(list(keys))
+
+    def set(self, key, value, ttl):
+        self._cache.set(key, value, timeout=max(1, int(ttl)))
+
+    def add(self, key, value, ttl):
+        return bool(self._cache.add(key, value, timeout=max(1, int(ttl))))
+
+    def incr(self, key, ttl):
+        if self._cache.add(key, 1, timeout=max(1, int(ttl))):
+            return 1
+        try:
+            return self._cache.incr(key)
+        except ValueError:                     # expired between add and incr
+            self._cache.set(key, 1, timeout=max(1, int(ttl)))
+            return 1
+
+    def delete(self, key):
+        self._cache.delete(key)
+
+
+class _RedisStore:
+    """redis-py directly, for processes without Django settings (phase1)."""
+
+    shared = True
+
+    def __init__(self, client):
+        self._r = client
+
+    def get(self, key):
+        raw = self._r.get(key)
+        return json.loads(raw) if raw is not None else None
+
+    def get_many(self, keys):
+        keys = list(keys)
+        return {k: json.loads(v) for k, v in zip(keys, self._r.mget(keys)) if v is not None}
+
+    def set(self, key, value, ttl):
+        self._r.set(key, json.dumps(value), ex=max(1, int(ttl)))
+
+    def add(self, key, value, ttl):
+        return bool(self._r.set(key, json.dumps(value), ex=max(1, int(ttl)), nx=True))
+
+    def incr(self, key, ttl):
+        pipe = self._r.pipeline()
+        pipe.set(key, 0, ex=max(1, int(ttl)), nx=True)     # INCR keeps the TTL set here
+        pipe.incr(key)
+        return int(pipe.execute()[1])
+
+    def delete(self, key):
+        self._r.delete(key)
+
+
+def _default_store():
+    try:
+        from django.conf import settings
+        if settings.configured:
+            from django.core.cache import caches
+            from django.core.cache.backends.dummy import DummyCache
+            cache = caches[_CACHE_ALIAS] if _CACHE_ALIAS in settings.CACHES else caches["default"]
+            if not isinstance(cache, DummyCache):
+                return _DjangoCacheStore(cache)
+            return _LocalStore()
+    except Exception as exc:
+        logger.debug("circuit_breaker: Django cache unavailable (%s)", exc)
+    url = os.getenv("REDIS_URL")
+    if url:
+        try:
+            import redis
+            return _RedisStore(redis.Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5))
+        except Exception as exc:
+            logger.warning("circuit_breaker: REDIS_URL set but unusable (%s) — per-process state", exc)
+    return _LocalStore()
+
+
+# ── Breaker ───────────────────────────────────────────────────────────────────
+
+class CircuitBreaker:
+    """Shared closed / open / half-open breaker for one upstream."""
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        window_s: float = 60.0,
+        buckets: int = 6,
+        min_calls: int = 5,
+        failure_rate: float = 0.5,
+        slow_call_s: Optional[float] = None,
+        slow_call_rate: float = 0.8,
+        open_s: float = 30.0,
+        half_open_trials: int = 1,
+        trial_ttl_s: float = 60.0,
+        probe: Optional[Callable[[], bool]] = None,
+        probe_interval_s: float = 15.0,
+        store=None,
+    ):
+        self.name = name
+        self.window_s = window_s
+        self.buckets = max(1, buckets)
+        self.bucket_s = window_s / self.buckets
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.slow_call_s = slow_call_s
+        self.slow_call_rate = slow_call_rate
+        self.open_s = open_s
+        self.half_open_trials = max(1, half_open_trials)
+        self.trial_ttl_s = trial_ttl_s
+        self.probe = probe
+        self.probe_interval_s = probe_interval_s
+        self._store = store
+        self._p = f"{_KEY_PREFIX}:{name}"
+        self._memo: Optional[tuple] = None          # (state dict, read at)
+        self._lock = threading.Lock()
+        self._local: Dict[str, int] = {
+            "allowed": 0, "rejected": 0, "successes": 0, "failures": 0, "slow_calls": 0,
+            "trips": 0, "trials": 0, "probes": 0, "probe_failures": 0, "store_errors": 0,
+        }
+        self._next_probe = 0.0
+        self._last_probe: Optional[Dict[str, Any]] = None
+
+    # ── store access (fail open) ───────────────────────────────
+
+    @property
+    def store(self):
+        if self._store is None:
+            self._store = _default_store()
+        return self._store
+
+    def _safe(self, fn, *args, default=None):
+        try:
+            return fn(*args)
+        except Exception as exc:
+            self._count("store_errors")
+            logger.debug("circuit_breaker %s: store error: %s", self.name, exc)
+            return default
+
+    def _count(self, key: str, n: int = 1) -> None:
+        with self._lock:
+            self._local[key] += n
+
+    def _read_state(self, fresh: bool = False) -> Dict[str, Any]:
+        now = time.time()
+        memo = self._memo
+        if not fresh and memo is not None and now - memo[1] < _STATE_MEMO_S:
+            return memo[0]
+        state = self._safe(self.store.get, f"{self._p}:state") or {"state": CLOSED}
+        self._memo = (state, now)
+        return state
+
+    def _write_state(self, state: Dict[str, Any]) -> None:
+        if state["state"] == CLOSED:
+            self._safe(self.store.delete, f"{self._p}:state")
+        else:
+            self._safe(self.store.set, f"{self._p}:state", state, self.open_s + self.window_s + self.trial_ttl_s)
+        self._memo = (state, time.time())
+
+    def state(self) -> str:
+        s = self._read_state()
+        if s["state"] == OPEN and time.time() >= s.get("until", 0):
+            return HALF_OPEN
+        return s["state"]
+
+    # ── admission ───────────────────────────────────────────────
+
+    def allow(self) -> bool:
+        """True when the caller may call the upstream now (then report via record_*)."""
+        _ensure_prober()
+        s = self._read_state()
+        if s["state"] == CLOSED:
+            self._count("allowed")
+            return True
+        if s["state"] == OPEN and time.time() < s.get("until", 0):
+            self._count("rejected")
+            return False
+        # half-open: hand out at most half_open_trials permits per opening
+        gen = s.get("gen", 0)
+        for i in range(self.half_open_trials):
+            if self._safe(self.store.add, f"{self._p}:trial:{gen}:{i}", 1, self.trial_ttl_s, default=True):
+                self._count("trials")
+                self._count("allowed")
+                return True
+        self._count("rejected")
+        return False
+
+    def record_success(self, elapsed_s: Optional[float] = None) -> None:
+        self._count("successes")
+        slow = self.slow_call_s is not None and elapsed_s is not None and elapsed_s >= self.slow_call_s
+        if slow:
+            self._count("slow_calls")
+        s = self._read_state()
+        if s["state"] != CLOSED:
+            s = self._read_state(fresh=True)
+        if s["state"] != CLOSED:
+            if s["state"] == OPEN and time.time() < s.get("until", 0):
+                return                                    # began before the trip — not a trial
+            if slow:
+                self._trip("slow trial call")
+                return
+            gen = s.get("gen", 0)
+            ok = self._safe(self.store.incr, f"{self._p}:trial_ok:{gen}", self.trial_ttl_s, default=1)
+            if ok >= self.half_open_trials:
+                self._close()
+            return
+        self._bump("calls")
+        if slow:
+            self._bump("slow")
+            self._evaluate()
+
+    def record_failure(self, elapsed_s: Optional[float] = None) -> None:
+        self._count("failures")
+        s = self._read_state()
+        if s["state"] != CLOSED:
+            s = self._read_state(fresh=True)
+        if s["state"] != CLOSED:
+            if s["state"] == HALF_OPEN or time.time() >= s.get("until", 0):
+                self._trip("failed trial call")
+            return
+        self._bump("calls")
+        self._bump("fail")
+        self._evaluate()
+
+    def call(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run ``fn`` under the breaker: exceptions count as failures and propagate."""
+        if not self.allow():
+            raise CircuitOpenError(f"{self.name} circuit is open")
+        t0 = time.monotonic()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception:
+            self.record_failure(time.monotonic() - t0)
+            raise
+        self.record_success(time.monotonic() - t0)
+        return result
+
+    # ── rolling window ─────────────────────────────────────────
+
+    def _bucket(self, now: Optional[float] = None) -> int:
+        return int((now or time.time()) // self.bucket_s)
+
+    def _bump(self, field: str) -> None:
+        self._safe(self.store.incr, f"{self._p}:w:{self._bucket()}:{field}", self.window_s + self.bucket_s)
+
+    def window(self) -> Dict[str, int]:
+        current = self._bucket()
+        keys = [f"{self._p}:w:{b}:{f}" for b in range(current - self.buckets + 1, current + 1)
+                for f in ("calls", "fail", "slow")]
+        got = self._safe(self.store.get_many, keys, default={}) or {}
+        totals = {"calls": 0, "fail": 0, "slow": 0}
+        for key, value in got.items():
+            totals[key.rsplit(":", 1)[1]] += int(value or 0)
+        return totals
+
+    def _evaluate(self) -> None:
+        w = self.window()
+        if w["calls"] < self.min_calls:
+            return
+        if w["fail"] / w["calls"] >= self.failure_rate:
+            self._trip(f"{w['fail']}/{w['calls']} calls failed")
+        elif self.slow_call_s is not None and w["slow"] / w["calls"] >= self.slow_call_rate:
+            self._trip(f"{w['slow']}/{w['calls']} calls slower than {self.slow_call_s}s")
+
+    # ── transitions ────────────────────────────────────────────
+
+    def _trip(self, reason: str) -> None:
+        prev = self._read_state(fresh=True)
+        gen = prev.get("gen", 0) + 1
+        self._write_state({"state": OPEN, "until": time.time() + self.open_s, "gen": gen,
+                           "since": time.time(), "reason": reason})
+        self._count("trips")
+        logger.warning("circuit_breaker %s OPEN for %.0fs: %s", self.name, self.open_s, reason)
+
+    def _half_open(self, reason: str) -> None:
+        s = self._read_state(fresh=True)
+        if s["state"] != OPEN:
+            return
+        self._write_state({**s, "state": HALF_OPEN, "reason": reason})
+        logger.info("circuit_breaker %s HALF-OPEN: %s", self.name, reason)
+
+    def _close(self) -> None:
+        self._write_state({"state": CLOSED})
+        current = self._bucket()
+        for b in range(current - self.buckets + 1, current + 1):     # start the window afresh
+            for f in ("calls", "fail", "slow"):
+                self._safe(self.store.delete, f"{self._p}:w:{b}:{f}")
+        logger.info("circuit_breaker %s CLOSED", self.name)
+
+    def reset(self) -> None:
+        """Force the breaker closed (operators / tests)."""
+        self._close()
+
+    # ── probes ─────────────────────────────────────────────────
+
+    def _probe_due(self, now: float) -> bool:
+        if self.probe is None or now < self._next_probe:
+            return False
+        self._next_probe = now + self.probe_interval_s
+        # One process per group probes each interval; failing open means every process probes.
+        return bool(self._safe(self.store.add, f"{self._p}:probe_lease", 1,
+                               max(1.0, self.probe_interval_s - _PROBE_TICK_S), default=True))
+
+    def run_probe(self) -> bool:
+        t0 = time.monotonic()
+        try:
+            ok = bool(self.probe())
+        except Exception as exc:
+            logger.debug("circuit_breaker %s probe error: %s", self.name, exc)
+            ok = False
+        self._count("probes")
+        self._last_probe = {"ok": ok, "at": time.time(), "ms": round((time.monotonic() - t0) * 1000, 1)}
+        if ok:
+            if self.state() != CLOSED:
+                self._half_open("health probe passed")
+        else:
+            self._count("probe_failures")
+            if self.state() != OPEN:
+                self._trip("health probe failed")
+        return ok
+
+    def stats(self) -> Dict[str, Any]:
+        s = self._read_state()
+        with self._lock:
+            out: Dict[str, Any] = dict(self._local)
+        out["state"] = self.state()
+        out["shared"] = getattr(self.store, "shared", False)
+        if s["state"] != CLOSED:
+            out["reason"] = s.get("reason")
+            out["opened_at"] = s.get("since")
+            out["retry_in_s"] = round(max(0.0, s.get("until", 0) - time.time()), 1)
+        out["window"] = self.window()
+        out["last_probe"] = self._last_probe
+        return out
+
+
+# ── Registry + prober thread ──────────────────────────────────────────────────
+
+_registry: Dict[str, CircuitBreaker] = {}
+_registry_lock = threading.Lock()
+_prober_pid: Optional[int] = None
+
+
+def get_breaker(name: str, **config) -> CircuitBreaker:
+    """The process's breaker for ``name``; ``config`` applies on first use only."""
+    breaker = _registry.get(name)
+    if breaker is None:
+        with _registry_lock:
+            breaker = _registry.get(name)
+            if breaker is None:
+                breaker = _registry[name] = CircuitBreaker(name, **config)
+        if breaker.probe is not None:
+            _ensure_prober()
+    return breaker
+
+
+def breaker_stats() -> Dict[str, Dict[str, Any]]:
+    return {name: b.stats() for name, b in list(_registry.items())}
+
+
+def _ensure_prober() -> None:
+    """Start this process's probe thread (again after a fork)."""
+    global _prober_pid
+    if _prober_pid == os.getpid() or not any(b.probe for b in list(_registry.values())):
+        return
+    with _registry_lock:
+        if _prober_pid == os.getpid():
+            return
+        _prober_pid = os.getpid()
+        threading.Thread(target=_probe_loop, name="km-cb-probe", daemon=True).start()
+
+
+def _probe_loop() -> None:
+    pid = os.getpid()
+    while _prober_pid == pid:
+        now = time.time()
+        for breaker in list(_registry.values()):
+            try:
+                if breaker._probe_due(now):
+                    breaker.run_probe()
+            except Exception as exc:                      # never let the prober die
+                logger.debug("circuit_breaker %s probe loop error: %s", breaker.name, exc)
+        time.sleep(_PROBE_TICK_S)
+
+
+# ── Upstream breakers ─────────────────────────────────────────────────────────
+
+def _http_ok(url: str, timeout: float = 3.0) -> bool:
+    import urllib.request
+    try:
+        with urllib.request.urlopen(urllib.request.Request(url), timeout=timeout) as resp:
+            return 200 <= resp.status < 300
+    except Exception:
+        return False
+
+
+def _phase1_health_url() -> str:
+    url = os.getenv("PHASE1_URL", "http://127.0.0.1:8001/chat")
+    return url.rsplit("/chat", 1)[0] + "/health"
+
+
+def ollama_breaker() -> CircuitBreaker:
+    base = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
+    return get_breaker(
+        "ollama", slow_call_s=90.0, open_s=30.0, trial_ttl_s=150.0,
+        probe=lambda: _http_ok(f"{base}/api/tags"),
+    )
+
+
+def phase1_breaker() -> CircuitBreaker:
+    return get_breaker(
+        "phase1", min_calls=3, slow_call_s=40.0, open_s=60.0, trial_ttl_s=60.0,
+        probe=lambda: _http_ok(_phase1_health_url(), timeout=5.0),
+    )
+
+
+def gemini_breaker() -> CircuitBreaker:
+    return get_breaker("gemini", slow_call_s=20.0, open_s=60.0, trial_ttl_s=45.0)
+
+
+def data_gov_breaker() -> CircuitBreaker:
+    return get_breaker("data_gov", min_calls=8, slow_call_s=10.0, open_s=60.0, trial_ttl_s=30.0)
+
+
+def open_meteo_breaker() -> CircuitBreaker:
+    return get_breaker("open_meteo", min_calls=8, slow_call_s=6.0, open_s=30.0, trial_ttl_s=20.0)
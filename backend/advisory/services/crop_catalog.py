@@ -75,8 +75,24 @@ _CROP_ROWS: List[Dict[str, Any]] = [
 ]
 
 
+_TOKEN_SPLIT_RE = re.compile(r"[\s,/\-]+")
+
+# normalize(): never fuzzy-match these
+_NORMALIZE_STOPWORDS = frozenset({
+    "में", "और", "लिए", "क्या", "बारे", "सब", "को", "से", "की", "के", "का",
+    "मेरी", "मेरे", "मेरा", "हमारी", "हमारे", "meri", "mera", "mere",
+    "he", "she", "it", "they", "the", "and", "for", "with", "this",
+    "that", "you", "your", "my", "our", "is", "are", "was", "has",
+    "ki", "ke", "ka", "se", "ko", "me", "kya", "kab", "kaise",
+})
+_SEARCH_STOPWORDS = frozenset({
+    "का", "की", "के", "में", "और", "लिए", "क्या", "बारे", "सब", "को", "से",
+    "he", "she", "it", "they", "the", "and", "for", "with", "this", "that", "you", "your",
+})
+
+
 def _tokenize(text: str) -> List[str]:
-    return [t for t in re.split(r"[\s,/\-]+", text.lower()) if len(t) >= 2]
+    return [t for t in _TOKEN_SPLIT_RE.split(text.lower()) if len(t) >= 2]
 
 
 class CropCatalog:
@@ -98,6 +114,34 @@ class CropCatalog:
             self._crops.append(entry)
             self._by_id[row["id"]] = entry
 
+        # Compiled lookups (built once; chat calls normalize() per n-gram):
+        #   _exact       id / name / hindi / alias → entry, first crop wins as
+        #                in the original scan order
+        #   _fragments   every ≥3-char substring of those strings — search()
+        #                can only score a crop when the query (or one of its
+        #                tokens) is one of these, so anything else skips the
+        #                ranked scan entirely
+        self._exact: Dict[str, Dict[str, Any]] = dict(self._by_id)
+        fragments = set()
+        for crop in self._crops:
+            strings = [crop["name"].lower(), crop["hindi"].lower(), *(a.lower() for a in crop["aliases"])]
+            for text in strings:
+                if text:
+                    self._exact.setdefault(text, crop)
+            for text in strings + [crop["id"]]:
+                for i in range(len(text)):
+                    for j in range(i + 3, len(text) + 1):
+                        fragments.add(text[i:j])
+        self._fragments = frozenset(fragments)
+
+    def _may_score(self, q_lower: str, min_hits: int = 1) -> bool:
+        """Cheap necessary condition for search() to score a crop ≥ 1 (or, with
+        min_hits=2, for the token-sum branch to reach normalize()'s 75 bar)."""
+        if q_lower in self._fragments:
+            return True
+        hits = sum(1 for tok in _tokenize(q_lower) if len(tok) >= 3 and tok in self._fragments)
+        return hits >= min_hits
+
     def get(self, crop_id: str) -> Optional[Dict[str, Any]]:
         return self._by_id.get((crop_id or "").lower().strip())
 
@@ -106,27 +150,16 @@ class CropCatalog:
         if not query or not str(query).strip():
             return None
         q = str(query).lower().strip()
-        if q in self._by_id:
-            return self._by_id[q]
-        for crop in self._crops:
-            if q == crop["name"].lower():
-                return crop
-            if q == crop["hindi"].lower():
-                return crop
-            if any(q == a.lower() for a in crop["aliases"]):
-                return crop
+        crop = self._exact.get(q)
+        if crop is not None:
+            return crop
         # Minimum length guard + common Hindi/English stopwords → no partial match
-        _STOPWORDS = {
-            "में", "और", "लिए", "क्या", "बारे", "सब", "को", "से", "की", "के", "का",
-            "मेरी", "मेरे", "मेरा", "हमारी", "हमारे", "meri", "mera", "mere",
-            "he", "she", "it", "they", "the", "and", "for", "with", "this",
-            "that", "you", "your", "my", "our", "is", "are", "was", "has",
-            "ki", "ke", "ka", "se", "ko", "me", "kya", "kab", "kaise",
-        }
-        if len(q) < 3 or q in _STOPWORDS:
+        if len(q) < 3 or q in _NORMALIZE_STOPWORDS:
             return None
-        # Only search if query is at least 4 chars and looks like a crop name
-        if len(q) >= 4:
+        # Only search if query is at least 4 chars and looks like a crop name.
+        # A ≥75 score needs the whole query inside a crop string, or two
+        # matching tokens (one token scores at most 25+20+18+3).
+        if len(q) >= 4 and self._may_score(q, min_hits=2):
             results = self.search(query, limit=1)
             if results and results[0].get("_score", 0) >= 75:
                 return results[0]
@@ -139,6 +172,8 @@ class CropCatalog:
             return self.popular(limit)
 
         q_lower = query.lower()
+        if not self._may_score(q_lower):
+            return []
         q_tokens = _tokenize(query)
         scored: List[tuple] = []
 
@@ -159,7 +194,7 @@ class CropCatalog:
                 score = 75.0 if len(q_lower) >= 3 else 0.0
             else:
                 for tok in q_tokens:
-                    if len(tok) < 3 or tok in {"का", "की", "के", "में", "और", "लिए", "क्या", "बारे", "सब", "को", "से", "he", "she", "it", "they", "the", "and", "for", "with", "this", "that", "you", "your"}:
+                    if len(tok) < 3 or tok in _SEARCH_STOPWORDS:
                         continue
                     if tok in name_l or tok in crop["id"]:
                         score += 25.0
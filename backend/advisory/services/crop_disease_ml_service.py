@@ -26,14 +26,20 @@ class CropDiseaseMLService:
                 b64 = image_data.split(",", 1)[1] if "," in image_data else image_data
                 raw = base64.b64decode(b64)
 
-            if raw:
-                blocked = self._validate_or_block(raw)
-                if blocked:
-                    return blocked
-
             from ..ml.inference import get_predictor
 
             predictor = get_predictor()
+            if raw and predictor.is_ready:
+                # The predictor checks its prediction cache on the raw bytes
+                # first, then decodes once for validation and preprocessing.
+                return predictor.predict(raw)
+
+            decoded = self._decode(raw) if raw else None
+            if decoded is not None:
+                blocked = self._validate_or_block(decoded)
+                if blocked:
+                    return blocked
+
             if not predictor.is_ready:
                 return {
                     "status": "model_unavailable",
@@ -47,8 +53,6 @@ class CropDiseaseMLService:
                     "top_predictions": [],
                 }
 
-            if image_bytes:
-                return predictor.predict(image_bytes, skip_validation=False)
             if image_path:
                 return predictor.predict(image_path, skip_validation=False)
             if image_data:
@@ -78,7 +82,12 @@ class CropDiseaseMLService:
             }
 
     def predict_from_upload_dict(self, images: Dict[str, str]) -> Dict[str, Any]:
-        """Run validation + inference on best available upload (close-up preferred)."""
+        """
+        Run validation + inference on every uploaded view (close-up first).
+        A single view takes the predict_image path; several are decoded and
+        preprocessed in parallel and share one batched forward pass
+        (CropDiseasePredictor.predict_views).
+        """
         priority = (
             "close_up",
             "leaf",
@@ -87,29 +96,63 @@ class CropDiseaseMLService:
             "imgLeaf",
             "imgWhole",
         )
-        for key in priority:
-            if images.get(key):
-                return self.predict_image(image_data=images[key])
-        for val in images.values():
-            if val:
-                return self.predict_image(image_data=val)
-        return {
-            "status": "error",
-            "message": "No image provided",
-            "crop_name": None,
-            "disease_name": None,
-            "confidence": 0.0,
-            "top_predictions": [],
-        }
+        ordered = [images[key] for key in priority if images.get(key)]
+        ordered += [val for key, val in images.items() if val and key not in priority]
+        if len(ordered) == 1:
+            return self.predict_image(image_data=ordered[0])
+        if not ordered:
+            return {
+                "status": "error",
+                "message": "No image provided",
+                "crop_name": None,
+                "disease_name": None,
+                "confidence": 0.0,
+                "top_predictions": [],
+            }
+        try:
+            from ..ml.inference import get_predictor
+
+            return get_predictor().predict_views(ordered)
+        except ImportError as exc:
+            logger.warning("TensorFlow not installed: %s", exc)
+            return {
+                "status": "tensorflow_missing",
+                "message": "Install ML deps: pip install -r requirements-ml.txt",
+                "crop_name": None,
+                "disease_name": None,
+                "confidence": 0.0,
+                "top_predictions": [],
+            }
+        except Exception as exc:
+            logger.error("ML prediction failed: %s", exc)
+            return {
+                "status": "error",
+                "message": str(exc),
+                "crop_name": None,
+                "disease_name": None,
+                "confidence": 0.0,
+                "top_predictions": [],
+            }
+
+    @staticmethod
+    def _decode(image_bytes: bytes):
+        """RGB array for an upload, or None (unreadable / Pillow missing)."""
+        try:
+            from ..ml.preprocess import decode_image
+
+            return decode_image(image_bytes)
+        except Exception as exc:
+            logger.debug("Upload not decoded up front: %s", exc)
+            return None
 
 
     @staticmethod
-    def _validate_or_block(image_bytes: bytes) -> Optional[Dict[str, Any]]:
+    def _validate_or_block(image) -> Optional[Dict[str, Any]]:
         try:
             from ..ml.image_validation import validate_plant_image
             from ..ml.config import NOT_PLANT_MESSAGE, UNKNOWN_DISPLAY
 
-            valid, reason, metrics = validate_plant_image(image_bytes)
+            valid, reason, metrics = validate_plant_image(image)
             if not valid and reason == "not_plant":
                 return {
                     "status": "not_plant",
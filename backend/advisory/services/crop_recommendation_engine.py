@@ -20,6 +20,7 @@ import re
 from datetime import datetime
 from typing import Any, Dict, List, Optional, Tuple
 
+from .agro_profile_store import get_agro_profile_store
 from .location_context import LocationContext
 from .unified_realtime_service import market_service, weather_service
 
@@ -89,13 +90,14 @@ class CropRecommendationEngine:
     Location-aware, multi-factor crop recommendation system.
 
     Priority order for location resolution:
-      1. Exact district match in DISTRICT_PROFILES
-      2. Fuzzy city/state match
+      1. Exact district / alias match (shared AgroProfileStore)
+      2. District named in the text, then nearest district to the GPS point
       3. State-level defaults
       4. Generic India defaults
     """
 
     def __init__(self):
+        self.profiles = get_agro_profile_store()
         # Defer import to avoid circular imports; reuse shared singleton if available
         try:
             from .ultra_dynamic_government_api import _gov_api_singleton
@@ -117,7 +119,7 @@ class CropRecommendationEngine:
         """Full recommendation pipeline with live weather and market data."""
 
         # 1. Resolve location profile
-        profile = self._resolve_location_profile(location, state)
+        profile = self._resolve_location_profile(location, state, latitude, longitude)
 
         # 2. Get live weather (Open-Meteo, no key needed)
         weather = weather_service.get_weather(location, latitude, longitude, lang=language)
@@ -132,7 +134,9 @@ class CropRecommendationEngine:
 
         # 4. Score all crops
         season_key = _current_season()
-        scored = self._score_all_crops(profile, season_key, current_weather, forecast, market_price_map)
+        scored = self._score_all_crops(
+            profile, season_key, current_weather, forecast, market_price_map, limit=12
+        )
 
         # 5. Localise and format
         recommendations = self._format_recommendations(scored[:12], language, market_price_map, profile)
@@ -182,42 +186,20 @@ class CropRecommendationEngine:
 
     # ── Location profile resolution ────────────────────────────────────
 
-    def _resolve_location_profile(self, location: str, state: Optional[str]) -> Dict[str, Any]:
+    def _resolve_location_profile(
+        self,
+        location: str,
+        state: Optional[str],
+        latitude: Optional[float] = None,
+        longitude: Optional[float] = None,
+    ) -> Dict[str, Any]:
         """Return the best agro-climatic profile for the location."""
-        try:
-            from .district_data import DISTRICT_PROFILES
-        except ImportError:
-            DISTRICT_PROFILES = {}
-
-        loc_lower = location.lower().strip()
-
-        # 1. Exact district match
-        if loc_lower in DISTRICT_PROFILES:
-            p = dict(DISTRICT_PROFILES[loc_lower])
-            p["_source"] = "district_exact"
-            p["region"] = p.get("state", "India")
-            return p
-
-        # 2. Partial district match (city name inside district key)
-        for district_key, profile in DISTRICT_PROFILES.items():
-            if district_key in loc_lower or loc_lower in district_key:
-                p = dict(profile)
-                p["_source"] = "district_fuzzy"
-                p["region"] = p.get("state", "India")
-                return p
-
-        # 3. State-level match
-        state_name = state or ""
-        state_lower = state_name.lower()
-        for district_key, profile in DISTRICT_PROFILES.items():
-            if profile.get("state", "").lower() == state_lower:
-                p = dict(profile)
-                p["_source"] = "state_first_district"
-                p["region"] = p.get("state", "India")
-                return p
-
-        # 4. Generic defaults by state name keywords
-        return self._state_keyword_profile(loc_lower, state_lower)
+        profile = self.profiles.resolve(location, state, latitude, longitude)
+        if profile is not None:
+            return profile
+
+        # Generic defaults by state name keywords
+        return self._state_keyword_profile(location.lower().strip(), (state or "").lower())
 
     def _state_keyword_profile(self, loc: str, state: str) -> Dict[str, Any]:
         """Fallback profile inferred from state/location keywords."""
@@ -316,37 +298,86 @@ class CropRecommendationEngine:
         current_weather: Dict,
         forecast: List[Dict],
         market_price_map: Dict[str, Dict],
+        limit: Optional[int] = None,
     ) -> List[Tuple[float, str, Dict[str, Any]]]:
-        """Score every crop in the database and return sorted list."""
-
-        try:
-            from .comprehensive_crop_database import ALL_CROP_DATA
-        except ImportError:
-            from .ultra_dynamic_government_api import _builtin_crop_database
-            ALL_CROP_DATA = _builtin_crop_database()
-
-        soil          = profile.get("soil", "Loamy")
-        rainfall_band = profile.get("rainfall", "Medium")
-        irrigation    = _irrigation_level(profile.get("irrigation", "Medium"))
-        priority_list = [c.lower() for c in profile.get("priority_crops", [])]
-        agro_zone     = profile.get("agro_zone", "")
-
-        # Derive weather risk from forecast
-        weather_risk = self._assess_weather_risk(forecast, current_weather)
-        curr_temp    = current_weather.get("temperature") or 28
+        """
+        Score every crop in the database and return sorted list.
+
+        Scores come from one vectorised pass (crop_scoring.score_regional);
+        _score_single_crop is only run for the crops returned, to produce
+        their reasons.  ``limit`` keeps just the top N.
+        """
+        from .crop_scoring import get_crop_matrix, ranked, score_regional
+
+        matrix = get_crop_matrix()
+        ctx = self._scoring_context(profile, season_key, current_weather, forecast, market_price_map)
+        scores = score_regional([ctx], matrix)[0]
+        order = ranked(scores)
+        if limit is not None:
+            order = order[:limit]
 
         results = []
-        for crop_key, crop in ALL_CROP_DATA.items():
-            score, reasons = self._score_single_crop(
-                crop_key, crop, season_key, soil, rainfall_band, irrigation,
-                priority_list, agro_zone, weather_risk, curr_temp, market_price_map
+        for i in order.tolist():
+            crop_key = matrix.keys[i]
+            crop = matrix.crop_data[crop_key]
+            _, reasons = self._score_single_crop(
+                crop_key, crop, season_key, ctx["soil"], ctx["rainfall_band"], ctx["irrigation"],
+                ctx["priority_list"], ctx["agro_zone"], ctx["_weather_risk"], ctx["curr_temp"],
+                market_price_map,
             )
-            if score > 0:
-                results.append((score, crop_key, crop, reasons))
-
-        results.sort(key=lambda x: x[0], reverse=True)
+            results.append((float(scores[i]), crop_key, crop, reasons))
         return results
 
+    def _scoring_context(
+        self,
+        profile: Dict[str, Any],
+        season_key: str,
+        current_weather: Dict,
+        forecast: List[Dict],
+        market_price_map: Dict[str, Dict],
+    ) -> Dict[str, Any]:
+        """Profile + live inputs → the per-location values the scorers read."""
+        weather_risk = self._assess_weather_risk(forecast, current_weather)
+        return {
+            "season_key":       season_key,
+            "soil":             profile.get("soil", "Loamy"),
+            "rainfall_band":    profile.get("rainfall", "Medium"),
+            "irrigation":       _irrigation_level(profile.get("irrigation", "Medium")),
+            "priority_list":    [c.lower() for c in profile.get("priority_crops", [])],
+            "agro_zone":        profile.get("agro_zone", ""),
+            "weather_risk":     weather_risk.get("risk", "None"),
+            "_weather_risk":    weather_risk,
+            "curr_temp":        current_weather.get("temperature") or 28,
+            "market_price_map": market_price_map,
+        }
+
+    def score_locations(
+        self,
+        locations: List[Tuple[str, Optional[str]]],
+        season_key: Optional[str] = None,
+        top_n: int = 5,
+        market_price_map: Optional[Dict[str, Dict]] = None,
+    ) -> Dict[str, List[Tuple[float, str]]]:
+        """
+        Batch ranking for district-level reports: (location, state) pairs →
+        top_n (score, crop_key) each, from profile data only (no live
+        weather calls).  All locations are scored in one matrix pass.
+        """
+        from .crop_scoring import get_crop_matrix, ranked, score_regional
+
+        season_key = season_key or _current_season()
+        matrix = get_crop_matrix()
+        contexts = [
+            self._scoring_context(self._resolve_location_profile(loc, state), season_key,
+                                  {}, [], market_price_map or {})
+            for loc, state in locations
+        ]
+        scores = score_regional(contexts, matrix)
+        return {
+            loc: [(float(row[i]), matrix.keys[i]) for i in ranked(row)[:top_n].tolist()]
+            for (loc, _), row in zip(locations, scores)
+        }
+
     def _score_single_crop(
         self, crop_key, crop, season_key, soil, rainfall_band,
         irrigation, priority_list, agro_zone, weather_risk, curr_temp,
@@ -0,0 +1,368 @@
+"""
+KrishiMitra — vectorised crop scoring
+=====================================
+Columnar (NumPy) form of the two crop scorers:
+
+  CropRecommendationEngine._score_single_crop  → score_regional()
+  FieldSensorService._score_with_sensors       → score_field()
+
+ALL_CROP_DATA and CROP_SOIL_REQUIREMENTS are compiled once into per-crop
+arrays (season code, soil/agro-zone match vectors, water class, temperature
+band, MSP, demand points, N/P/K/pH/moisture/EC/OC requirements).  Scoring a
+context is then a handful of array ops over all crops instead of ~150 Python
+calls that re-read dicts, and many contexts (districts, fields) can be scored
+in one call — rows of the returned matrix are contexts, columns are crops in
+``CropMatrix.keys`` order.
+
+The scalar functions stay as the reference implementation and as the source
+of the human-readable ``reasons``; scripts/bench_crop_scoring.py checks the
+two agree on every district profile.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_IRR_LEVELS = {"Low": 0, "Medium": 1, "High": 2}
+_DEMAND_POINTS = {"Very High": 10, "High": 8, "Medium": 5}
+
+
+class CropMatrix:
+    """Per-crop columns compiled from the crop database + soil requirements."""
+
+    def __init__(self, crop_data: Dict[str, Dict[str, Any]], soil_requirements: Dict[str, Dict[str, Any]],
+                 water_irrigation_min: Dict[str, str]):
+        self.crop_data = crop_data
+        self.keys: List[str] = list(crop_data)
+        self.index: Dict[str, int] = {k: i for i, k in enumerate(self.keys)}
+        n = len(self.keys)
+        crops = [crop_data[k] for k in self.keys]
+
+        seasons = [c.get("season", "kharif") for c in crops]
+        self._season_codes: Dict[str, int] = {s: i for i, s in enumerate(sorted(set(seasons)))}
+        self.season = np.array([self._season_codes[s] for s in seasons], dtype=np.int16)
+
+        water = [c.get("water_requirement", "Moderate") for c in crops]
+        self.water_low = np.array([w == "Low" for w in water])
+        self.water_high = np.array([w in ("High", "Very High") for w in water])
+        self.water_low_mod = np.array([w in ("Low", "Moderate") for w in water])
+        self.water_high_only = np.array([w == "High" for w in water])
+        self.irr_min = np.array(
+            [_IRR_LEVELS.get(water_irrigation_min.get(w, "Low"), 0) for w in water], dtype=np.int16
+        )
+
+        self.t_min = np.array([c.get("temperature_min", 10) for c in crops], dtype=np.float64)
+        self.t_max = np.array([c.get("temperature_max", 38) for c in crops], dtype=np.float64)
+        self.t_mid = (self.t_min + self.t_max) / 2
+        self.msp = np.array([c.get("msp_per_quintal", 0) for c in crops], dtype=np.float64)
+        self.demand_pts = np.array(
+            [_DEMAND_POINTS.get(c.get("market_demand", "Medium"), 2) for c in crops], dtype=np.float64
+        )
+
+        self._soil_prefs = [[s.lower() for s in c.get("soil_preference", [])] for c in crops]
+        self._agro_zones = [c.get("agro_zones", []) for c in crops]
+        self._soil_cache: Dict[str, np.ndarray] = {}
+        self._zone_cache: Dict[str, np.ndarray] = {}
+        self._rotation_cache: Dict[str, np.ndarray] = {}
+        self._cache_lock = threading.Lock()
+
+        # Soil requirements — NaN / False where the crop has no entry.
+        reqs = [soil_requirements.get(k, {}) for k in self.keys]
+
+        def _col(fn, present):
+            return np.array([fn(r) if present(r) else np.nan for r in reqs], dtype=np.float64)
+
+        self.has_ph = np.array([bool(r.get("pH")) for r in reqs])
+        self.ph_min = _col(lambda r: r["pH"][0], lambda r: bool(r.get("pH")))
+        self.ph_max = _col(lambda r: r["pH"][1], lambda r: bool(r.get("pH")))
+        self.ph_mid = (self.ph_min + self.ph_max) / 2
+        self.has_n = np.array([bool(r.get("N")) for r in reqs])
+        self.n_min = _col(lambda r: r["N"][0], lambda r: bool(r.get("N")))
+        self.has_p = np.array([bool(r.get("P")) for r in reqs])
+        self.p_min = _col(lambda r: r["P"][0], lambda r: bool(r.get("P")))
+        self.has_k = np.array([bool(r.get("K")) for r in reqs])
+        self.k_min = _col(lambda r: r["K"][0], lambda r: bool(r.get("K")))
+        self.has_moisture = np.array([r.get("moisture_min") is not None for r in reqs])
+        self.moisture_min = _col(lambda r: r["moisture_min"], lambda r: r.get("moisture_min") is not None)
+        self.has_ec = np.array([bool(r.get("EC_max")) for r in reqs])
+        self.ec_max = _col(lambda r: r["EC_max"], lambda r: bool(r.get("EC_max")))
+        self.has_oc = np.array([bool(r.get("OC_min")) for r in reqs])
+        self.oc_min = _col(lambda r: r["OC_min"], lambda r: bool(r.get("OC_min")))
+
+        logger.debug("CropMatrix compiled: %d crops, %d with soil requirements", n, int(self.has_n.sum()))
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    # ── Per-context vectors (memoised: few distinct soils / zones) ─────
+    def season_code(self, season_key: str) -> int:
+        return self._season_codes.get(season_key, -1)
+
+    def soil_points(self, soil: str) -> np.ndarray:
+        """20 ideal / 12 compatible / 4 otherwise — same rule as _score_single_crop."""
+        soil_lower = soil.lower()
+        vec = self._soil_cache.get(soil_lower)
+        if vec is None:
+            vec = np.array([
+                20.0 if (soil_lower in prefs or any(soil_lower in s for s in prefs))
+                else 12.0 if any(s in soil_lower for s in prefs)
+                else 4.0
+                for prefs in self._soil_prefs
+            ])
+            with self._cache_lock:
+                self._soil_cache[soil_lower] = vec
+        return vec
+
+    def zone_mask(self, agro_zone: str) -> np.ndarray:
+        vec = self._zone_cache.get(agro_zone)
+        if vec is None:
+            vec = np.array([agro_zone in zones for zones in self._agro_zones])
+            with self._cache_lock:
+                self._zone_cache[agro_zone] = vec
+        return vec
+
+    def key_mask(self, keys: Iterable[str]) -> np.ndarray:
+        mask = np.zeros(len(self.keys), dtype=bool)
+        for k in keys:
+            i = self.index.get(k)
+            if i is not None:
+                mask[i] = True
+        return mask
+
+    def rotation_points(self, prev_crop: str, rotation_fn: Callable[[str, str], float]) -> np.ndarray:
+        vec = self._rotation_cache.get(prev_crop)
+        if vec is None:
+            vec = np.array([rotation_fn(k, prev_crop) for k in self.keys], dtype=np.float64)
+            with self._cache_lock:
+                self._rotation_cache[prev_crop] = vec
+        return vec
+
+
+_MATRIX_LOCK = threading.Lock()
+_matrix: Optional[CropMatrix] = None
+
+
+def get_crop_matrix() -> CropMatrix:
+    """Compile the crop database once per process (double-checked locking)."""
+    global _matrix
+    if _matrix is not None:
+        return _matrix
+    with _MATRIX_LOCK:
+        if _matrix is None:
+            try:
+                from .comprehensive_crop_database import ALL_CROP_DATA
+            except ImportError:
+                from .ultra_dynamic_government_api import _builtin_crop_database
+                ALL_CROP_DATA = _builtin_crop_database()
+            from .crop_recommendation_engine import WATER_IRRIGATION_MIN
+            from .field_sensor_service import CROP_SOIL_REQUIREMENTS
+            _matrix = CropMatrix(ALL_CROP_DATA, CROP_SOIL_REQUIREMENTS, WATER_IRRIGATION_MIN)
+    return _matrix
+
+
+def round_scores(scores: np.ndarray) -> np.ndarray:
+    """Python round(x, 1) element-wise — np.round differs on some .x5 ties."""
+    return np.array([round(v, 1) for v in scores.ravel().tolist()]).reshape(scores.shape)
+
+
+def ranked(scores: np.ndarray, min_score: float = 0.0, strict: bool = True) -> np.ndarray:
+    """
+    Column indices with score above (``strict``) or at least ``min_score``,
+    best first; ties keep database order, like list.sort(reverse=True).
+    """
+    keep = scores > min_score if strict else scores >= min_score
+    idx = np.flatnonzero(keep)
+    return idx[np.argsort(-scores[idx], kind="stable")]
+
+
+# ── Regional scorer (CropRecommendationEngine) ─────────────────────────────
+
+def score_regional(contexts: Sequence[Dict[str, Any]], matrix: Optional[CropMatrix] = None) -> np.ndarray:
+    """
+    Vectorised _score_single_crop for each context.  A context carries the
+    values _score_all_crops derives from a profile: season_key, soil,
+    rainfall_band, irrigation (normalised), priority_list, agro_zone,
+    weather_risk (the risk label), curr_temp and market_price_map.
+
+    Returns float64 (len(contexts), n_crops), rounded to 0.1 like the scalar.
+    All contexts are scored together: per-context inputs become (L, 1)
+    columns or (L, C) masks and broadcast against the crop columns.
+    """
+    m = matrix or get_crop_matrix()
+    n_ctx, n_crops = len(contexts), len(m)
+    if not n_ctx:
+        return np.zeros((0, n_crops))
+
+    prio = np.zeros((n_ctx, n_crops), dtype=bool)
+    prio_top = np.zeros((n_ctx, n_crops), dtype=bool)
+    zone = np.zeros((n_ctx, n_crops), dtype=bool)
+    soil_pts = np.empty((n_ctx, n_crops))
+    bonus = np.zeros((n_ctx, n_crops))
+    season = np.empty((n_ctx, 1), dtype=np.int16)
+    is_zaid = np.empty((n_ctx, 1), dtype=bool)
+    effective = np.empty((n_ctx, 1), dtype=np.int16)
+    temp = np.empty((n_ctx, 1))
+    risk = np.empty((n_ctx, 1), dtype=object)
+
+    for row, ctx in enumerate(contexts):
+        priority_list = ctx.get("priority_list") or []
+        prio[row] = m.key_mask(priority_list)
+        prio_top[row] = m.key_mask(priority_list[:3])
+        agro_zone = ctx.get("agro_zone", "")
+        if agro_zone:
+            zone[row] = m.zone_mask(agro_zone)
+        soil_pts[row] = m.soil_points(ctx.get("soil", "Loamy"))
+        season[row] = m.season_code(ctx["season_key"])
+        is_zaid[row] = ctx["season_key"] == "zaid"
+        # Same scalar expression as the reference (rainfall maps to an int,
+        # which is never an _IRR_LEVELS key, so rain_val is always 1).
+        irr_val = _IRR_LEVELS.get(ctx.get("irrigation", "Medium"), 1)
+        rain_val = _IRR_LEVELS.get(
+            {"Very Low": 0, "Low": 0, "Medium": 1, "High": 2, "Very High": 2}.get(
+                ctx.get("rainfall_band", "Medium"), 1), 1
+        )
+        effective[row] = max(irr_val, rain_val)
+        temp[row] = ctx.get("curr_temp", 28)
+        risk[row] = ctx.get("weather_risk", "None")
+        for key, info in (ctx.get("market_price_map") or {}).items():
+            i = m.index.get(key)
+            if i is None:
+                continue
+            modal = info.get("modal_price", 0)
+            msp = m.crop_data[key].get("msp_per_quintal", 0)
+            if modal and msp and modal > msp:
+                bonus[row, i] = min(5, round((modal - msp) / msp * 10))
+
+    # 1. Season
+    is_year_round = m.season == m.season_code("year_round")
+    exact = m.season == season
+    overlap = is_zaid & (m.season == m.season_code("kharif"))
+    score = np.where(is_year_round, np.where(prio, 20.0, 12.0),
+                     np.where(exact, 25.0, np.where(overlap, 10.0, -10.0)))
+    killed = ~is_year_round & ~exact & ~overlap & ~prio
+
+    # 2. Soil
+    score = score + soil_pts
+
+    # 3. Water — a deficit that takes the running score negative ends scoring.
+    met = effective >= m.irr_min
+    score = score + np.where(met, np.where(m.water_low & (effective >= 2), 8.0, 15.0),
+                             -(m.irr_min - effective) * 20.0)
+    killed |= ~met & (score < 0)
+
+    # 4. Temperature
+    score = score + np.where(
+        (m.t_min <= temp) & (temp <= m.t_max), 10.0,
+        np.where(temp < m.t_min, np.maximum(0, 10 - (m.t_min - temp) * 2),
+                 np.maximum(0, 10 - (temp - m.t_max) * 2)),
+    )
+
+    # 5. Market demand + MSP + live mandi premium
+    score = score + m.demand_pts
+    score = score + np.where(m.msp > 0, 3.0, 0.0)
+    score = score + bonus
+
+    # 6. Regional priority
+    score = score + np.where(prio_top, 10.0, np.where(prio, 7.0, np.where(zone, 5.0, 0.0)))
+
+    # 7. Weather outlook
+    score = score + np.select(
+        [risk == "None", risk == "High Rainfall", risk == "Drought", risk == "Heatwave"],
+        [
+            np.full(n_crops, 10.0),
+            np.where(m.water_high_only, 8.0, np.where(m.water_low, -15.0, 0.0)),
+            np.where(m.water_low_mod, 7.0, np.where(m.water_high, -20.0, 0.0)),
+            np.where(m.t_max >= 38, 5.0, np.where(m.t_max < 28, -10.0, 0.0)),
+        ],
+        0.0,
+    )
+
+    return round_scores(np.where(killed, 0.0, np.maximum(0.0, score)))
+
+
+# ── Field-level scorer (FieldSensorService) ───────────────────────────────
+
+def _column(contexts: Sequence[Dict[str, Any]], key: str) -> np.ndarray:
+    """(L, 1) float column of soil[key]; NaN where the reading is missing."""
+    return np.array(
+        [[np.nan if ctx["soil"].get(key) is None else ctx["soil"][key]] for ctx in contexts],
+        dtype=np.float64,
+    )
+
+
+def score_field(
+    contexts: Sequence[Dict[str, Any]],
+    rotation_fn: Callable[[str, str], float],
+    matrix: Optional[CropMatrix] = None,
+) -> np.ndarray:
+    """
+    Vectorised _score_with_sensors for each context: ``soil`` (merged soil
+    dict), season_key, curr_temp, weather_risk.  ``rotation_fn`` is
+    FieldSensorService._rotation_bonus.
+
+    Returns float64 (len(contexts), n_crops).  Every term is a whole number
+    of points, so unlike the regional scorer no rounding is needed.
+    """
+    m = matrix or get_crop_matrix()
+    n_ctx, n_crops = len(contexts), len(m)
+    if not n_ctx:
+        return np.zeros((0, n_crops))
+
+    season = np.array([[m.season_code(ctx["season_key"])] for ctx in contexts], dtype=np.int16)
+    temp = np.array([[ctx["curr_temp"]] for ctx in contexts], dtype=np.float64)
+    risk = np.array([[ctx.get("weather_risk", "None")] for ctx in contexts], dtype=object)
+    rotation = np.zeros((n_ctx, n_crops))
+    for row, ctx in enumerate(contexts):
+        prev = ctx["soil"].get("previous_crop", "")
+        if prev:
+            rotation[row] = m.rotation_points(prev, rotation_fn)
+
+    is_year_round = m.season == m.season_code("year_round")
+    killed = ~is_year_round & (m.season != season)
+    score = np.where(is_year_round, 16.0, 20.0) + np.zeros((n_ctx, 1))
+
+    def term(value, has_req, scored, neutral):
+        """Scored where both the reading and the crop requirement exist."""
+        return np.where(~np.isnan(value) & has_req, scored, neutral)
+
+    ph = _column(contexts, "ph")
+    score = score + term(ph, m.has_ph, np.where((m.ph_min <= ph) & (ph <= m.ph_max), 15.0,
+                                                np.where(np.abs(ph - m.ph_mid) <= 0.5, 10.0, 3.0)), 8.0)
+    n = _column(contexts, "nitrogen_kg_ha")
+    score = score + term(n, m.has_n, np.where(n >= m.n_min, 15.0,
+                                              np.where(n >= m.n_min * 0.7, 10.0, 4.0)), 8.0)
+    p = _column(contexts, "phosphorus_kg_ha")
+    score = score + term(p, m.has_p, np.where(p >= m.p_min, 10.0, 5.0), 5.0)
+    k = _column(contexts, "potassium_kg_ha")
+    score = score + term(k, m.has_k, np.where(k >= m.k_min, 8.0, 4.0), 4.0)
+    moisture = _column(contexts, "moisture_pct")
+    score = score + term(moisture, m.has_moisture,
+                         np.where(moisture >= m.moisture_min, 10.0,
+                                  np.where(moisture >= m.moisture_min * 0.6, 6.0, 2.0)), 5.0)
+    ec = _column(contexts, "ec_ds_m")
+    score = score + term(ec, m.has_ec, np.where(ec <= m.ec_max, 5.0,
+                                                np.where(ec <= m.ec_max * 1.3, 2.0, -10.0)), 3.0)
+    oc = _column(contexts, "organic_carbon")
+    score = score + term(oc, m.has_oc, np.where(oc >= m.oc_min, 5.0, 2.0), 0.0)
+
+    score = score + np.where((m.t_min <= temp) & (temp <= m.t_max), 7.0,
+                             np.where(np.abs(temp - m.t_mid) <= 5, 4.0, 1.0))
+
+    score = score + np.select(
+        [risk == "None", risk == "High Rainfall", risk == "Drought"],
+        [
+            np.full(n_crops, 5.0),
+            np.where(m.water_high, 4.0, np.where(m.water_low, -8.0, 0.0)),
+            np.where(m.water_high, -10.0, np.where(m.water_low, 4.0, 0.0)),
+        ],
+        0.0,
+    )
+    score = score + rotation
+
+    return np.where(killed, 0.0, np.maximum(0.0, score))
@@ -22,6 +22,14 @@ Redis caching:
   - With REDIS_URL: 1-hour TTL, shared across all Gunicorn workers
   - Without REDIS_URL: in-process dict cache, per-worker (still 1-hour TTL)
   - Cache key: km:mandi:{commodity}:{state} (namespaced)
+  - Fallback results are cached too, briefly: Agmarknet-direct for 10 min,
+    seed prices for 2 min — an outage costs one upstream attempt per window,
+    not one per request
+  - Stampede protection: one fetch per key per expiry across all workers
+    (in-process single-flight + a market_cache lease; callers that lose
+    the lease serve the stale copy, or wait for the winner's result on a
+    cold key), and entries are refreshed in the background shortly
+    *before* they expire (probabilistic early refresh, XFetch)
 
 Coverage (data.gov.in):
   All commodities in Agmarknet + regional mandis across all 28 states
@@ -29,11 +37,16 @@ Coverage (data.gov.in):
 
 from __future__ import annotations
 
+import atexit
 import hashlib
 import json
 import logging
+import math
 import os
+import random
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from typing import Any, Dict, List, Optional, Tuple
 
@@ -41,15 +54,27 @@ import requests
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
+from .cache_utils import SingleFlight, release_lease, try_acquire_lease
+from .circuit_breaker import data_gov_breaker
+
 logger = logging.getLogger(__name__)
 
 # ── Configuration ─────────────────────────────────────────────────────────────
 _DATA_GOV_BASE    = "https://api.data.gov.in/resource"
 _RESOURCE_ID      = "9ef84268-d588-465a-a308-a864a43d0070"  # Agmarknet daily prices
 _CACHE_TTL_SECS   = 3600   # 1 hour — prices update once daily at ~9 AM IST
+_FALLBACK_TTL_SECS = int(os.getenv("MANDI_FALLBACK_TTL_S", "600"))   # Agmarknet-direct result
+_NEGATIVE_TTL_SECS = int(os.getenv("MANDI_NEGATIVE_TTL_S", "120"))   # seed prices (all live sources down)
+_STALE_GRACE_SECS = 3600   # expired entries stay readable this long (served while one caller refreshes)
+_FILL_LEASE_SECS  = 45     # > worst-case fetch (data.gov timeout + Agmarknet fallback)
+_FILL_WAIT_SECS   = 30.0   # cold key: how long a lease loser waits for the winner's result
+_XFETCH_BETA      = 1.0    # early-refresh eagerness (1.0 = XFetch default)
 _REQUEST_TIMEOUT  = (8, 20)  # (connect, read) seconds
 _MAX_RECORDS      = 100      # per API call
 
+_MANDI_REFRESH_POOL = ThreadPoolExecutor(max_workers=2, thread_name_prefix="km-mandi")
+atexit.register(_MANDI_REFRESH_POOL.shutdown, wait=False)
+
 # ── Placeholder fragments — never use these as real keys ─────────────────────
 _PLACEHOLDERS = frozenset({
     "your_", "placeholder", "change_me", "xxx", "example",
@@ -137,10 +162,26 @@ class DataGovMandiClient:
       data.gov.in OGD API → Agmarknet direct → seed prices (always returns data)
     """
 
-    def __init__(self):
+    def __init__(
+        self,
+        cache=None,
+        ttl: int = _CACHE_TTL_SECS,
+        fallback_ttl: int = _FALLBACK_TTL_SECS,
+        negative_ttl: int = _NEGATIVE_TTL_SECS,
+    ):
         self._session = self._build_session()
-        # In-process cache: {cache_key: (data, timestamp)}
-        self._mem_cache: Dict[str, Tuple[Any, float]] = {}
+        # In-process cache: {cache_key: envelope} — see _cache_set
+        self._mem_cache: Dict[str, Dict[str, Any]] = {}
+        self._mem_lock = threading.Lock()
+        self._cache = cache          # None → caches["market_cache"]
+        self._ttl = ttl
+        self._fallback_ttl = fallback_ttl
+        self._negative_ttl = negative_ttl
+        self._flight = SingleFlight()
+        self.stats = {
+            "hits": 0, "stale_hits": 0, "misses": 0, "early_refreshes": 0,
+            "upstream_fetches": 0, "negative_cached": 0, "lease_waits": 0, "wait_timeouts": 0,
+        }
 
     # ── Public API ─────────────────────────────────────────────────────────────
 
@@ -155,21 +196,112 @@ class DataGovMandiClient:
         Returns full response dict — always has data (fallback chain guarantees it).
         """
         cache_key = self._cache_key(commodity, state)
+        if force_refresh:
+            return self._flight.do(cache_key, self._fill, cache_key, commodity, state, None, True)
+
+        entry = self._read_entry(cache_key)
+        now = time.time()
+        if entry is not None:
+            expires = entry["ts"] + entry["ttl"]
+            if now < expires:
+                self.stats["hits"] += 1
+                # XFetch: refresh early with a probability that rises as expiry
+                # nears, scaled by how long the last fetch took — one caller
+                # refreshes in the background, nobody ever sees the miss.
+                # Negative (seed) entries just expire: one retry per window.
+                delta = max(entry.get("delta", 1.0), 0.05)
+                if not entry.get("negative") and now - delta * _XFETCH_BETA * math.log(random.random() or 1e-12) >= expires:
+                    shared = self._read_entry(cache_key, l1=False)
+                    if shared is not None and shared["ts"] > entry["ts"]:
+                        return shared["data"]      # another worker already refreshed it
+                    self._schedule_refresh(cache_key, commodity, state)
+                return entry["data"]
+
+        self.stats["misses"] += 1
+        return self._flight.do(cache_key, self._fill, cache_key, commodity, state, entry, False)
+
+    def _fill(
+        self,
+        cache_key: str,
+        commodity: Optional[str],
+        state: Optional[str],
+        stale: Optional[Dict[str, Any]],
+        force: bool,
+    ) -> Dict[str, Any]:
+        """
+        Refill an expired/missing key, once across all workers.
 
-        # 1. Check Redis cache
-        cached = self._redis_get(cache_key)
-        if not force_refresh and cached:
-            logger.debug("data_gov_mandi: Redis cache hit for %s", cache_key)
-            return cached
-
-        # 2. Check in-process cache
-        if not force_refresh and cache_key in self._mem_cache:
-            data, ts = self._mem_cache[cache_key]
-            if time.time() - ts < _CACHE_TTL_SECS:
-                logger.debug("data_gov_mandi: mem cache hit for %s", cache_key)
-                return data
+        The market_cache lease winner fetches; losers serve the stale copy
+        if there is one, otherwise poll for the winner's result (fail open
+        and fetch themselves after _FILL_WAIT_SECS).
+        """
+        cache = self._market_cache()
+        lease = f"mandi:fill:{cache_key}"
+        if try_acquire_lease(cache, lease, ttl=_FILL_LEASE_SECS):
+            try:
+                if not force:
+                    fresh = self._read_entry(cache_key, l1=False)
+                    if fresh is not None and time.time() < fresh["ts"] + fresh["ttl"]:
+                        return fresh["data"]     # another worker filled it while we queued
+                return self._fetch_and_store(cache_key, commodity, state)
+            finally:
+                release_lease(cache, lease)
+
+        if stale is not None:
+            self.stats["stale_hits"] += 1
+            return stale["data"]
+
+        self.stats["lease_waits"] += 1
+        deadline = time.monotonic() + _FILL_WAIT_SECS
+        while time.monotonic() < deadline:
+            time.sleep(0.05)
+            fresh = self._read_entry(cache_key, l1=False)
+            if fresh is not None and time.time() < fresh["ts"] + fresh["ttl"]:
+                return fresh["data"]
+        self.stats["wait_timeouts"] += 1
+        logger.warning("data_gov_mandi: gave up waiting for %s fill — fetching directly", cache_key)
+        return self._fetch_and_store(cache_key, commodity, state)
+
+    def _schedule_refresh(self, cache_key: str, commodity: Optional[str], state: Optional[str]) -> None:
+        if self._flight.in_flight(cache_key):
+            return
+        cache = self._market_cache()
+        lease = f"mandi:fill:{cache_key}"
+        if not try_acquire_lease(cache, lease, ttl=_FILL_LEASE_SECS):
+            return
+        self.stats["early_refreshes"] += 1
+
+        def _run():
+            try:
+                self._flight.do(cache_key, self._fetch_and_store, cache_key, commodity, state)
+            except Exception as exc:
+                logger.debug("data_gov_mandi: early refresh failed for %s: %s", cache_key, exc)
+            finally:
+                release_lease(cache, lease)
 
-        # 3. Try data.gov.in OGD API
+        try:
+            _MANDI_REFRESH_POOL.submit(_run)
+        except RuntimeError:
+            release_lease(cache, lease)   # pool shut down (interpreter exit)
+
+    def _fetch_and_store(self, cache_key: str, commodity: Optional[str], state: Optional[str]) -> Dict[str, Any]:
+        """Run the source chain and cache whatever it produced (TTL by source)."""
+        self.stats["upstream_fetches"] += 1
+        t0 = time.monotonic()
+        result, ttl, negative = self._fetch_sources(commodity, state)
+        if negative:
+            self.stats["negative_cached"] += 1
+        self._cache_set(cache_key, result, ttl=ttl, delta=time.monotonic() - t0, negative=negative)
+        return result
+
+    def _fetch_sources(
+        self, commodity: Optional[str], state: Optional[str],
+    ) -> Tuple[Dict[str, Any], int, bool]:
+        """
+        data.gov.in → Agmarknet direct → seed; returns (result, cache TTL,
+        negative) — negative when no live source answered (seed prices).
+        """
+        # 1. Try data.gov.in OGD API
         api_key = _get_api_key()
         if api_key:
             result = self._fetch_data_gov(api_key, commodity=commodity, state=state)
@@ -178,25 +310,26 @@ class DataGovMandiClient:
                     "data_gov_mandi: data.gov.in returned %d crops (commodity=%s state=%s)",
                     len(result["top_crops"]), commodity, state,
                 )
-                self._cache_set(cache_key, result)
-                return result
+                return result, self._ttl, False
             logger.warning("data_gov_mandi: data.gov.in returned no records — trying Agmarknet")
 
-        # 4. Try Agmarknet direct dashboard API (no key needed)
+        # 2. Try Agmarknet direct dashboard API (no key needed)
         agmarknet_result = self._fetch_agmarknet_direct(commodity=commodity)
         if agmarknet_result and agmarknet_result.get("top_crops"):
             logger.info(
                 "data_gov_mandi: Agmarknet direct returned %d crops",
                 len(agmarknet_result["top_crops"]),
             )
-            self._cache_set(cache_key, agmarknet_result)
-            return agmarknet_result
-
-        # 5. Seed fallback — always works
+            if not agmarknet_result.get("is_live"):
+                # Agmarknet client fell back to its own seed table — same as step 3
+                return agmarknet_result, self._negative_ttl, True
+            # Shorter TTL when data.gov.in is configured but failed: get back to it sooner
+            return agmarknet_result, (self._fallback_ttl if api_key else self._ttl), False
+
+        # 3. Seed fallback — always works.  Cached briefly so an outage costs
+        #    one upstream attempt per window instead of one per request.
         logger.info("data_gov_mandi: all live sources failed — serving seed prices")
-        seed = self._get_seed_result(commodity=commodity)
-        # Don't cache seeds — retry live sources next request
-        return seed
+        return self._get_seed_result(commodity=commodity), self._negative_ttl, True
 
     def get_prices_for_crops(self, crop_ids: List[str]) -> List[Dict[str, Any]]:
         """Return price rows filtered to specific crop IDs."""
@@ -225,8 +358,21 @@ class DataGovMandiClient:
 
         url = f"{_DATA_GOV_BASE}/{_RESOURCE_ID}"
 
+        breaker = data_gov_breaker()
+        if not breaker.allow():
+            logger.debug("data.gov.in: circuit open — skipping to Agmarknet direct")
+            return None
+        t0 = time.monotonic()
         try:
-            resp = self._session.get(url, params=params, timeout=_REQUEST_TIMEOUT)
+            try:
+                resp = self._session.get(url, params=params, timeout=_REQUEST_TIMEOUT)
+            except requests.exceptions.RequestException:
+                breaker.record_failure(time.monotonic() - t0)
+                raise
+            if resp.status_code == 429 or resp.status_code >= 500:
+                breaker.record_failure(time.monotonic() - t0)
+            else:
+                breaker.record_success(time.monotonic() - t0)
             resp.raise_for_status()
             raw = resp.json()
 
@@ -423,31 +569,72 @@ class DataGovMandiClient:
         parts = f"{commodity or 'all'}:{state or 'national'}"
         return f"km:mandi:{parts}"
 
-    @staticmethod
-    def _redis_get(key: str) -> Optional[Dict[str, Any]]:
+    def _market_cache(self):
+        if self._cache is not None:
+            return self._cache
         try:
             from django.core.cache import caches
-            cache = caches["market_cache"]
+            return caches["market_cache"]
+        except Exception:
+            return None
+
+    def _redis_get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Envelope for ``key`` from market_cache, or None."""
+        cache = self._market_cache()
+        if cache is None:
+            return None
+        try:
             val = cache.get(key)
             if val:
-                return json.loads(val) if isinstance(val, str) else val
+                val = json.loads(val) if isinstance(val, str) else val
+                if isinstance(val, dict) and "data" in val and "ts" in val:
+                    return val
+                # Pre-envelope entry: bare result written with a 1-hour timeout
+                return {"data": val, "ts": time.time(), "ttl": self._ttl, "delta": 1.0}
         except Exception:
             pass
         return None
 
-    @staticmethod
-    def _redis_set(key: str, data: Dict[str, Any]) -> None:
+    def _redis_set(self, key: str, envelope: Dict[str, Any]) -> None:
+        cache = self._market_cache()
+        if cache is None:
+            return
         try:
-            from django.core.cache import caches
-            cache = caches["market_cache"]
-            cache.set(key, json.dumps(data, default=str), timeout=_CACHE_TTL_SECS)
+            cache.set(key, json.dumps(envelope, default=str), timeout=envelope["ttl"] + _STALE_GRACE_SECS)
         except Exception:
             pass
 
-    def _cache_set(self, key: str, data: Dict[str, Any]) -> None:
+    def _read_entry(self, key: str, l1: bool = True) -> Optional[Dict[str, Any]]:
+        """
+        Newest envelope for ``key`` (in-process first unless ``l1=False``),
+        including expired-but-in-grace ones; callers check ``ts + ttl``.
+        """
+        if l1:
+            with self._mem_lock:
+                entry = self._mem_cache.get(key)
+            if entry is not None and time.time() < entry["ts"] + entry["ttl"]:
+                return entry
+        shared = self._redis_get(key)
+        if shared is not None:
+            with self._mem_lock:
+                self._mem_cache[key] = shared       # promote to L1
+            return shared
+        if l1:
+            with self._mem_lock:
+                entry = self._mem_cache.get(key)
+            if entry is not None and time.time() < entry["ts"] + entry["ttl"] + _STALE_GRACE_SECS:
+                return entry
+        return None
+
+    def _cache_set(
+        self, key: str, data: Dict[str, Any], ttl: int = _CACHE_TTL_SECS,
+        delta: float = 1.0, negative: bool = False,
+    ) -> None:
         """Write to both Redis (if available) and in-process dict."""
-        self._redis_set(key, data)
-        self._mem_cache[key] = (data, time.time())
+        envelope = {"data": data, "ts": time.time(), "ttl": ttl, "delta": round(delta, 3), "negative": negative}
+        self._redis_set(key, envelope)
+        with self._mem_lock:
+            self._mem_cache[key] = envelope
 
     # ── HTTP session ──────────────────────────────────────────────────────────
 
@@ -9,9 +9,11 @@ Each district profile:
   irrigation  – Low | Medium | High
   agro_zone   – zone key from comprehensive_crop_database.ZONES
   priority_crops – ordered list of highest-suitability crop keys
+
+DISTRICT_COORDS holds each district's headquarters (lat, lon).
 """
 
-from typing import Dict, Any
+from typing import Any, Dict, Tuple
 
 DISTRICT_PROFILES: Dict[str, Dict[str, Any]] = {
 
@@ -187,3 +189,162 @@ DISTRICT_PROFILES: Dict[str, Dict[str, Any]] = {
     "gangtok":     {"state": "Sikkim",    "soil": "Loamy",  "rainfall": "Very High","irrigation": "Low",   "agro_zone": "himalayan",   "priority_crops": ["cardamom","ginger","maize","potato","oranges"]},
     "itanagar":    {"state": "Arunachal Pradesh","soil":"Red","rainfall": "Very High","irrigation": "Low",  "agro_zone": "northeast",   "priority_crops": ["rice","ginger","cardamom","bamboo","pineapple"]},
 }
+
+# District headquarters (lat, lon) — nearest-district lookup for GPS-only
+# requests (services/agro_profile_store.py).  One entry per DISTRICT_PROFILES key.
+DISTRICT_COORDS: Dict[str, Tuple[float, float]] = {
+    "amritsar":            (31.6340, 74.8723),
+    "ludhiana":            (30.9010, 75.8573),
+    "jalandhar":           (31.3260, 75.5762),
+    "patiala":             (30.3398, 76.3869),
+    "firozpur":            (30.9250, 74.6130),
+    "bathinda":            (30.2110, 74.9455),
+
+    "karnal":              (29.6857, 76.9905),
+    "hisar":               (29.1492, 75.7217),
+    "rohtak":              (28.8955, 76.6066),
+    "gurgaon":             (28.4595, 77.0266),
+    "sirsa":               (29.5329, 75.0268),
+
+    "lucknow":             (26.8467, 80.9462),
+    "kanpur":              (26.4499, 80.3319),
+    "agra":                (27.1767, 78.0081),
+    "varanasi":            (25.3176, 82.9739),
+    "allahabad":           (25.4358, 81.8463),
+    "meerut":              (28.9845, 77.7064),
+    "moradabad":           (28.8386, 78.7733),
+    "bareilly":            (28.3670, 79.4304),
+    "gorakhpur":           (26.7606, 83.3732),
+
+    "jaipur":              (26.9124, 75.7873),
+    "jodhpur":             (26.2389, 73.0243),
+    "barmer":              (25.7500, 71.3920),
+    "bikaner":             (28.0229, 73.3119),
+    "kota":                (25.2138, 75.8648),
+    "ajmer":               (26.4499, 74.6399),
+    "udaipur":             (24.5854, 73.7125),
+
+    "bhopal":              (23.2599, 77.4126),
+    "indore":              (22.7196, 75.8577),
+    "jabalpur":            (23.1815, 79.9864),
+    "gwalior":             (26.2183, 78.1828),
+    "rewa":                (24.5362, 81.3037),
+    "sagar":               (23.8388, 78.7378),
+    "ujjain":              (23.1765, 75.7885),
+
+    "pune":                (18.5596, 73.8553),
+    "nashik":              (19.9975, 73.7898),
+    "nagpur":              (21.1458, 79.0882),
+    "aurangabad":          (19.8762, 75.3433),
+    "solapur":             (17.6599, 75.9064),
+    "kolhapur":            (16.7050, 74.2433),
+    "amravati":            (20.9374, 77.7796),
+    "latur":               (18.4088, 76.5604),
+    "nanded":              (19.1383, 77.3210),
+
+    "bangalore":           (12.9716, 77.5946),
+    "mysore":              (12.2958, 76.6394),
+    "hubli":               (15.3647, 75.1240),
+    "gulbarga":            (17.3297, 76.8343),
+    "shimoga":             (13.9299, 75.5681),
+    "bellary":             (15.1394, 76.9214),
+    "mangalore":           (12.9141, 74.8560),
+
+    "vijayawada":          (16.5062, 80.6480),
+    "guntur":              (16.3067, 80.4365),
+    "kurnool":             (15.8281, 78.0373),
+    "visakhapatnam":       (17.6868, 83.2185),
+    "nellore":             (14.4426, 79.9865),
+
+    "hyderabad":           (17.3850, 78.4867),
+    "warangal":            (17.9784, 79.5941),
+    "nizamabad":           (18.6725, 78.0941),
+    "karimnagar":          (18.4386, 79.1288),
+    "khammam":             (17.2473, 80.1514),
+
+    "chennai":             (13.0735, 80.1962),
+    "coimbatore":          (11.0168, 76.9558),
+    "madurai":             (9.9252, 78.1198),
+    "tirunelveli":         (8.7139, 77.7567),
+    "salem":               (11.6643, 78.1460),
+    "thanjavur":           (10.7870, 79.1378),
+    "erode":               (11.3410, 77.7172),
+
+    "thiruvananthapuram":  (8.5241, 76.9366),
+    "kochi":               (9.9312, 76.2673),
+    "kozhikode":           (11.2588, 75.7804),
+    "palakkad":            (10.7867, 76.6548),
+    "idukki":              (9.8500, 76.9720),
+    "thrissur":            (10.5276, 76.2144),
+
+    "ahmedabad":           (23.0225, 72.5714),
+    "surat":               (21.1702, 72.8311),
+    "rajkot":              (22.3039, 70.8022),
+    "vadodara":            (22.3072, 73.1812),
+    "anand":               (22.5645, 72.9289),
+    "junagadh":            (21.5222, 70.4579),
+    "mehsana":             (23.6002, 72.3689),
+
+    "kolkata":             (22.5726, 88.3639),
+    "murshidabad":         (24.1000, 88.2500),
+    "burdwan":             (23.2324, 87.8615),
+    "darjeeling":          (27.0360, 88.2627),
+
+    "patna":               (25.5941, 85.1376),
+    "muzaffarpur":         (26.1209, 85.3647),
+    "gaya":                (24.7955, 84.9994),
+    "bhagalpur":           (25.2425, 86.9842),
+    "purnea":              (25.7771, 87.4753),
+
+    "bhubaneswar":         (20.2961, 85.8245),
+    "cuttack":             (20.4625, 85.8829),
+    "koraput":             (18.8120, 82.7120),
+    "sambalpur":           (21.4669, 83.9756),
+    "balasore":            (21.4942, 86.9317),
+
+    "guwahati":            (26.1445, 91.7362),
+    "dibrugarh":           (27.4728, 94.9120),
+    "jorhat":              (26.7509, 94.2037),
+    "nagaon":              (26.3464, 92.6840),
+    "silchar":             (24.8333, 92.7789),
+
+    "shimla":              (31.1048, 77.1734),
+    "kullu":               (31.9578, 77.1095),
+    "mandi":               (31.7084, 76.9320),
+    "kangra":              (32.0998, 76.2691),
+    "solan":               (30.9045, 77.0967),
+
+    "dehradun":            (30.3165, 78.0322),
+    "haridwar":            (29.9457, 78.1642),
+    "nainital":            (29.2183, 79.5134),
+    "almora":              (29.5971, 79.6591),
+
+    "raipur":              (21.2514, 81.6296),
+    "bilaspur":            (22.0800, 82.1500),
+    "durg":                (21.1904, 81.2849),
+
+    "ranchi":              (23.3441, 85.3096),
+    "dhanbad":             (23.7957, 86.4304),
+    "jamshedpur":          (22.8046, 86.2029),
+
+    "panaji":              (15.4909, 73.8278),
+    "margao":              (15.2832, 73.9862),
+
+    "srinagar":            (34.0837, 74.7973),
+    "jammu":               (32.7266, 74.8570),
+    "anantnag":            (33.7311, 75.1487),
+
+    "shillong":            (25.5788, 91.8933),
+
+    "aizawl":              (23.7271, 92.7176),
+
+    "kohima":              (25.6747, 94.1103),
+
+    "imphal":              (24.8170, 93.9368),
+
+    "agartala":            (23.8315, 91.2868),
+
+    "gangtok":             (27.3389, 88.6065),
+
+    "itanagar":            (27.0844, 93.6053),
+}
@@ -4,6 +4,7 @@ Enhanced Market Prices Service
 Real Government API Integration for Mandi Prices
 """
 
+import numpy as np
 import requests
 import logging
 from datetime import datetime, timedelta
@@ -1540,13 +1541,19 @@ class EnhancedMarketPricesService:
         latitude: float = None,
         longitude: float = None,
         limit: int = 10,
+        commodity: str = None,
     ) -> List[Dict[str, Any]]:
-        """Get nearest mandis for dropdown based on location from nationwide database."""
+        """Get nearest mandis for dropdown based on location from nationwide database.
+
+        ``commodity`` keeps only mandis whose specialty covers it ("All Crops"
+        mandis always match).
+        """
         try:
             state = self._get_state_from_location(location)
             all_mandis = self._get_nationwide_mandi_database()
             return self._filter_mandis_by_location(
-                all_mandis, location, latitude, longitude, state, limit=limit
+                all_mandis, location, latitude, longitude, state, limit=limit,
+                commodity=commodity,
             )
         except Exception as e:
             logger.error(f"Error getting nearest mandis: {e}")
@@ -1588,7 +1595,13 @@ class EnhancedMarketPricesService:
         ]
 
     def _get_nationwide_mandi_database(self) -> List[Dict[str, Any]]:
-        """Comprehensive mandi database — 300+ real APMCs with GPS coordinates."""
+        """Comprehensive mandi database — rows of the shared spatial index (built once)."""
+        from .mandi_index import get_mandi_index
+        return get_mandi_index().rows
+
+    @staticmethod
+    def _nationwide_mandi_rows() -> List[Dict[str, Any]]:
+        """300+ real APMCs with GPS coordinates — source rows for mandi_index."""
         return [
             # ── DELHI NCR ────────────────────────────────────────────────────────
             {'name': 'Azadpur Mandi',         'state': 'Delhi',         'district': 'North Delhi',    'latitude': 28.7180, 'longitude': 77.1804, 'specialty': 'Fruits & Vegetables'},
@@ -1840,41 +1853,35 @@ class EnhancedMarketPricesService:
         longitude: float = None,
         state: str = None,
         limit: int = 10,
+        commodity: str = None,
     ) -> List[Dict[str, Any]]:
         """Filter mandis by location proximity and return nearest ones."""
         try:
-            import math
+            from .mandi_index import get_mandi_index, haversine_km_many
 
             if latitude is None or longitude is None:
                 latitude, longitude = 28.7041, 77.1025
+            cap = limit if limit and limit > 0 else None
 
-            mandis_with_distance = []
-            for mandi in all_mandis:
-                mandi_lat = mandi.get('latitude', latitude)
-                mandi_lon = mandi.get('longitude', longitude)
-
-                R = 6371
-                dlat = math.radians(mandi_lat - latitude)
-                dlon = math.radians(mandi_lon - longitude)
-                a = (
-                    math.sin(dlat / 2) ** 2
-                    + math.cos(math.radians(latitude))
-                    * math.cos(math.radians(mandi_lat))
-                    * math.sin(dlon / 2) ** 2
-                )
-                c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
-                distance = R * c
+            index = get_mandi_index()
+            if all_mandis is index.rows:
+                ranked = index.nearest(latitude, longitude, k=cap, commodity=commodity)
+            else:
+                # Arbitrary subset (e.g. one state) — one vectorised pass, no tree.
+                lats = np.array([m.get('latitude', latitude) for m in all_mandis], dtype=float)
+                lons = np.array([m.get('longitude', longitude) for m in all_mandis], dtype=float)
+                dist = haversine_km_many(latitude, longitude, lats, lons)
+                order = np.argsort(dist, kind="stable")[:cap]
+                ranked = [(float(dist[i]), all_mandis[i]) for i in order.tolist()]
 
+            nearest_mandis = []
+            for distance, mandi in ranked:
                 mandi_copy = mandi.copy()
                 mandi_copy['distance'] = f"{distance:.1f} km"
                 mandi_copy['distance_km'] = round(distance, 1)
                 mandi_copy.setdefault('source', 'reference database')
                 mandi_copy.setdefault('live', False)
-                mandis_with_distance.append(mandi_copy)
-
-            mandis_with_distance.sort(key=lambda x: x['distance_km'])
-            cap = limit if limit and limit > 0 else len(mandis_with_distance)
-            nearest_mandis = mandis_with_distance[:cap]
+                nearest_mandis.append(mandi_copy)
 
             if nearest_mandis:
                 nearest_mandis[0]['auto_selected'] = True
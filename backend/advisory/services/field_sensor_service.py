@@ -36,14 +36,22 @@ IoT Sensor Payload (sent by farmer's device or mobile app):
 
 from __future__ import annotations
 
+import atexit
 import logging
 import math
 import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from datetime import datetime, timedelta
 from typing import Any, Dict, List, Optional, Tuple
 
+import numpy as np
 import requests
 
+from .cache_utils import TieredCache
+from .circuit_breaker import open_meteo_breaker
+
 logger = logging.getLogger(__name__)
 
 # ── Nutrient thresholds (ICAR recommended ranges) ──────────────────────────
@@ -92,6 +100,33 @@ CROP_SOIL_REQUIREMENTS: Dict[str, Dict[str, Any]] = {
     "mushroom":  {"N": (0,0),     "P": (0,0),   "K": (0,0),    "pH": (6.5,7.5), "OC_min": 2.0, "moisture_min": 60, "EC_max": 1.5},
 }
 
+# ── Upstream fan-out ───────────────────────────────────────────────────────
+# One budget for every upstream fetch of a request (Open-Meteo, Soil Health
+# Card, NASA POWER).  Whatever has not answered by then is left out of the
+# merge instead of stretching the response.
+FIELD_FETCH_DEADLINE_S = float(os.environ.get("FIELD_FETCH_DEADLINE_S", "6"))
+# NASA POWER is started this far into the request when Open-Meteo or the Soil
+# Health Card is still pending, and at once when either of them fails.
+FIELD_NASA_HEDGE_S = float(os.environ.get("FIELD_NASA_HEDGE_S", "1.5"))
+_FIELD_POOL = ThreadPoolExecutor(
+    max_workers=int(os.environ.get("FIELD_FETCH_WORKERS", "16")), thread_name_prefix="km-field"
+)
+atexit.register(_FIELD_POOL.shutdown, wait=False)
+
+# ── Per-cell caches ────────────────────────────────────────────────────────
+# Bounded L1 per worker + caches["field_cache"] shared by every worker.
+FIELD_WEATHER_TTL_S = int(os.environ.get("FIELD_WEATHER_TTL_S", "1800"))
+# Soil Health Card / NASA POWER values for a cell change on a scale of years.
+FIELD_SOIL_TTL_S = int(os.environ.get("FIELD_SOIL_TTL_S", str(7 * 86400)))
+_WEATHER_L1_SIZE = int(os.environ.get("FIELD_WEATHER_CACHE_SIZE", "1024"))
+_SOIL_L1_SIZE = int(os.environ.get("FIELD_SOIL_CACHE_SIZE", "4096"))
+
+
+def field_grid_key(lat: float, lon: float) -> str:
+    """FieldSoilHistory cell (lat_grid/lon_grid rounded to 3 dp, ~100 m)."""
+    return f"{round(lat, 3):.3f}:{round(lon, 3):.3f}"
+
+
 def _band(value: float, bands: Dict[str, Tuple[float, float]]) -> str:
     for label, (lo, hi) in bands.items():
         if lo <= value < hi:
@@ -109,15 +144,26 @@ class FieldSensorService:
     SOIL_HEALTH_CARD_URL = "https://soilhealth.dac.gov.in/PublicReports/GpwiseSHCStatusData"
     NASA_POWER_URL = "https://power.larc.nasa.gov/api/temporal/monthly/point"
 
-    def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            "User-Agent": "KrishiMitra-AI/3.0 (field-precision)",
-            "Accept": "application/json",
-        })
-        # In-memory cache keyed by (lat_rounded, lon_rounded)
-        self._soil_history_cache: Dict[str, Dict] = {}
-        self._weather_cache: Dict[str, Dict] = {}
+    def __init__(self, shared_cache=None):
+        self._local = threading.local()
+        # Keyed by field_grid_key(); shared_cache=None → caches["field_cache"]
+        self._soil_history_cache = TieredCache(
+            _SOIL_L1_SIZE, FIELD_SOIL_TTL_S, alias="field_cache", prefix="field:soil:v1:", cache=shared_cache)
+        self._weather_cache = TieredCache(
+            _WEATHER_L1_SIZE, FIELD_WEATHER_TTL_S, alias="field_cache", prefix="field:wx:v1:", cache=shared_cache)
+        self.stats = {"requests": 0, "partial": 0, "nasa_hedges": 0, "timeouts": 0}
+
+    @property
+    def session(self) -> requests.Session:
+        """Per-thread Session — the upstream fetches run concurrently on pool threads."""
+        if not hasattr(self._local, "session"):
+            s = requests.Session()
+            s.headers.update({
+                "User-Agent": "KrishiMitra-AI/3.0 (field-precision)",
+                "Accept": "application/json",
+            })
+            self._local.session = s
+        return self._local.session
 
     # ── Main Entry Point ───────────────────────────────────────────────
 
@@ -133,8 +179,8 @@ class FieldSensorService:
     ) -> Dict[str, Any]:
         """
         Full field-level pipeline:
-          1. Fetch Open-Meteo soil layers (free, real-time, 1km grid)
-          2. Fetch Soil Health Card data from government
+          1-2. Fetch Open-Meteo soil layers + Soil Health Card concurrently,
+               NASA POWER hedged, all within FIELD_FETCH_DEADLINE_S
           3. Merge with IoT sensor data (highest priority)
           4. Fetch 16-day weather forecast
           5. Score all 80 crops
@@ -142,14 +188,12 @@ class FieldSensorService:
         """
         ts = datetime.now().isoformat()
 
-        # Step 1: Open-Meteo soil + weather (always available, no API key)
-        om_data = self._fetch_open_meteo_soil_weather(latitude, longitude)
-
-        # Step 2: Government Soil Health Card
-        govt_soil = self._fetch_soil_health_card(latitude, longitude, state)
+        # Steps 1-2: Open-Meteo soil + weather and Soil Health Card, in parallel
+        fetched = self.fetch_field_sources(latitude, longitude, state)
+        om_data, govt_soil, climate = fetched["open_meteo"], fetched["govt_soil"], fetched["climate"]
 
-        # Step 3: Merge all soil data
-        merged_soil = self._merge_soil_data(om_data, govt_soil, sensor_data)
+        # Step 3: Merge whatever answered
+        merged_soil = self._merge_soil_data(om_data, govt_soil, sensor_data, climate)
 
         # Step 4: 16-day weather forecast with agri analysis
         forecast = om_data.get("forecast", [])
@@ -157,7 +201,7 @@ class FieldSensorService:
 
         # Step 5: Score crops
         scored_crops = self._score_crops_field_level(
-            merged_soil, weather_analysis, latitude, longitude, state
+            merged_soil, weather_analysis, latitude, longitude, state, limit=10
         )
 
         # Step 6: Input gap recommendations
@@ -167,6 +211,10 @@ class FieldSensorService:
         from .language_service import normalise_language_code
         lang = normalise_language_code(language)
 
+        # District agro-climatic context (named district, else nearest to the field)
+        from .agro_profile_store import get_agro_profile_store
+        agro_profile = get_agro_profile_store().resolve(location_name, state, latitude, longitude)
+
         return {
             "status": "success",
             "field_id": field_id,
@@ -175,10 +223,12 @@ class FieldSensorService:
             "timestamp": ts,
             "analysis_level": "field",
             "grid_resolution": "1km (Open-Meteo) + 100m (sensor)",
-            "data_sources": self._list_data_sources(sensor_data, govt_soil, om_data),
+            "data_sources": self._list_data_sources(sensor_data, govt_soil, om_data, climate),
+            "upstreams": fetched["report"],
 
             # Core soil profile
             "soil_profile": merged_soil,
+            "agro_profile": agro_profile,
 
             # Weather
             "weather": {
@@ -203,9 +253,125 @@ class FieldSensorService:
             "summary": self._generate_summary(merged_soil, scored_crops[:3], weather_analysis, lang),
         }
 
+    def cache_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Hit/miss/eviction counters of the per-cell weather and soil caches."""
+        return {"weather": self._weather_cache.stats(), "soil_history": self._soil_history_cache.stats()}
+
     # ── Data Fetching ──────────────────────────────────────────────────
 
-    def _fetch_open_meteo_soil_weather(self, lat: float, lon: float) -> Dict[str, Any]:
+    def fetch_field_sources(
+        self,
+        lat: float,
+        lon: float,
+        state: Optional[str],
+        deadline_s: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """
+        Fan the upstream fetches out over the shared pool under one deadline.
+
+        Open-Meteo and the Soil Health Card start together.  NASA POWER (the
+        agro-climate stand-in for both) is hedged: started after
+        FIELD_NASA_HEDGE_S if either is still pending, or as soon as either
+        fails, instead of after the Soil Health Card has timed out.  Fetches
+        still running at the deadline are abandoned (a late Open-Meteo answer
+        still lands in the weather cache for the next request).
+
+        Returns {"open_meteo", "govt_soil", "climate", "report"}; report
+        records per-source status/latency and whether the merge is partial.
+        """
+        budget = FIELD_FETCH_DEADLINE_S if deadline_s is None else deadline_s
+        t0 = time.monotonic()
+        deadline = t0 + budget
+        hedge_at = t0 + min(FIELD_NASA_HEDGE_S, budget)
+        self.stats["requests"] += 1
+
+        futures = {
+            "open_meteo": _FIELD_POOL.submit(
+                self._fetch_open_meteo_soil_weather, lat, lon, min(10.0, budget)),
+            "soil_health_card": _FIELD_POOL.submit(
+                self._fetch_soil_health_card, lat, lon, state, min(8.0, budget), False),
+        }
+        started = {name: t0 for name in futures}
+        finished: Dict[str, float] = {}
+        results: Dict[str, Any] = {}
+        errors: Dict[str, str] = {}
+
+        def _live(name: str) -> Optional[bool]:
+            """True/False once ``name`` has answered, None while pending."""
+            if name not in finished:
+                return None
+            value = results.get(name)
+            return bool(value and value.get("is_live"))
+
+        pending = set(futures.values())
+        while pending:
+            now = time.monotonic()
+            if now >= deadline:
+                break
+            wake = deadline if "nasa_power" in futures else min(deadline, hedge_at)
+            done, pending = wait(pending, timeout=max(0.0, wake - now), return_when=FIRST_COMPLETED)
+            now = time.monotonic()
+            for name, fut in futures.items():
+                if fut in done and name not in finished:
+                    finished[name] = now
+                    try:
+                        results[name] = fut.result()
+                    except Exception as exc:
+                        errors[name] = str(exc)
+
+            om_live, shc_live = _live("open_meteo"), _live("soil_health_card")
+            if om_live and shc_live:
+                break                       # NASA POWER adds nothing now
+            if "nasa_power" not in futures and (
+                om_live is False or shc_live is False
+                or (now >= hedge_at and (om_live is None or shc_live is None))
+            ):
+                self.stats["nasa_hedges"] += 1
+                futures["nasa_power"] = _FIELD_POOL.submit(
+                    self._fetch_nasa_power_fallback, lat, lon, min(10.0, max(0.1, deadline - now)))
+                started["nasa_power"] = now
+                pending.add(futures["nasa_power"])
+            if om_live is not None and shc_live is not None and "nasa_power" in finished:
+                break
+
+        om_data = results.get("open_meteo") if _live("open_meteo") else None
+        shc = results.get("soil_health_card") if _live("soil_health_card") else None
+        nasa = results.get("nasa_power") if _live("nasa_power") else None
+
+        report: Dict[str, Any] = {"deadline_ms": round(budget * 1000),
+                                  "elapsed_ms": round((time.monotonic() - t0) * 1000, 1),
+                                  "sources": {}}
+        for name in ("open_meteo", "soil_health_card", "nasa_power"):
+            if name not in futures:
+                report["sources"][name] = {"status": "not_needed"}
+                continue
+            if name in errors:
+                status = "error"
+            elif name not in finished:
+                status = "timed_out"
+                self.stats["timeouts"] += 1
+            else:
+                status = "ok" if _live(name) else "unavailable"
+            entry = {"status": status}
+            if name in finished:
+                entry["ms"] = round((finished[name] - started[name]) * 1000, 1)
+            report["sources"][name] = entry
+        report["contributed"] = [name for name, value in
+                                 (("open_meteo", om_data), ("soil_health_card", shc), ("nasa_power", nasa))
+                                 if value]
+        report["partial"] = om_data is None or (shc is None and nasa is None)
+        if report["partial"]:
+            self.stats["partial"] += 1
+
+        return {
+            "open_meteo": om_data or self._open_meteo_fallback(lat, lon),
+            "govt_soil": shc or nasa or {"source": "No government soil data available", "is_live": False},
+            # NASA climate next to a live Soil Health Card (Open-Meteo missing)
+            "climate": nasa if shc else None,
+            "report": report,
+        }
+
+    def _fetch_open_meteo_soil_weather(self, lat: float, lon: float, timeout: float = 10) -> Dict[str, Any]:
         """
         Fetch from Open-Meteo:
           - current weather (temp, humidity, rain, UV, pressure)
@@ -214,9 +380,9 @@ class FieldSensorService:
           - 16-day daily forecast with agri variables
         Free, no API key, 1km resolution.
         """
-        cache_key = f"{round(lat,3)}:{round(lon,3)}"
+        cache_key = field_grid_key(lat, lon)
         cached = self._weather_cache.get(cache_key)
-        if cached and (datetime.now() - cached.get("_fetched_at", datetime.min)).seconds < 1800:
+        if cached is not None:
             return cached
 
         try:
@@ -250,7 +416,20 @@ class FieldSensorService:
                 "forecast_days": 16,
             }
 
-            resp = self.session.get(self.OPEN_METEO_SOIL_URL, params=params, timeout=10)
+            breaker = open_meteo_breaker()
+            if not breaker.allow():
+                logger.debug("Open-Meteo circuit open — soil/weather fallback")
+                return self._open_meteo_fallback(lat, lon)
+            t0 = time.monotonic()
+            try:
+                resp = self.session.get(self.OPEN_METEO_SOIL_URL, params=params, timeout=timeout)
+            except requests.RequestException:
+                breaker.record_failure(time.monotonic() - t0)
+                raise
+            if resp.status_code == 429 or resp.status_code >= 500:
+                breaker.record_failure(time.monotonic() - t0)
+            else:
+                breaker.record_success(time.monotonic() - t0)
             if resp.status_code != 200:
                 logger.warning("Open-Meteo returned %s", resp.status_code)
                 return self._open_meteo_fallback(lat, lon)
@@ -331,20 +510,33 @@ class FieldSensorService:
                 "soil_layers":   soil,
                 "forecast":      forecast,
                 "data_source":   "Open-Meteo (real-time, free, 1km grid)",
-                "_fetched_at":   datetime.now(),
+                "is_live":       True,
             }
-            self._weather_cache[cache_key] = result
+            self._weather_cache.set(cache_key, result)
             return result
 
         except Exception as e:
             logger.error("Open-Meteo soil fetch error: %s", e)
             return self._open_meteo_fallback(lat, lon)
 
-    def _fetch_soil_health_card(self, lat: float, lon: float, state: Optional[str]) -> Dict[str, Any]:
+    def _fetch_soil_health_card(
+        self,
+        lat: float,
+        lon: float,
+        state: Optional[str],
+        timeout: float = 8,
+        nasa_fallback: bool = True,
+    ) -> Optional[Dict[str, Any]]:
         """
         Fetch soil data from Soil Health Card portal (soilhealth.dac.gov.in).
-        Falls back to NASA POWER agro-climate data if unavailable.
+        Falls back to NASA POWER agro-climate data if unavailable, or returns
+        None with nasa_fallback=False (fetch_field_sources hedges NASA itself).
         """
+        cache_key = "shc:" + field_grid_key(lat, lon)
+        cached = self._soil_history_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
         try:
             # Soil Health Card GP-wise endpoint
             params = {
@@ -353,12 +545,12 @@ class FieldSensorService:
                 "format": "json",
             }
             resp = self.session.get(
-                self.SOIL_HEALTH_CARD_URL, params=params, timeout=8
+                self.SOIL_HEALTH_CARD_URL, params=params, timeout=timeout
             )
             if resp.status_code == 200:
                 data = resp.json()
                 if data and isinstance(data, dict) and data.get("N"):
-                    return {
+                    result = {
                         "source": "Soil Health Card (soilhealth.dac.gov.in)",
                         "nitrogen_kg_ha":  float(data.get("N", 0)),
                         "phosphorus_kg_ha": float(data.get("P", 0)),
@@ -371,14 +563,23 @@ class FieldSensorService:
                         "boron_ppm":       float(data.get("B", 0)),
                         "is_live":         True,
                     }
+                    self._soil_history_cache.set(cache_key, result)
+                    return result
         except Exception as e:
             logger.debug("Soil Health Card API unavailable: %s", e)
 
+        if not nasa_fallback:
+            return None
         # Fallback: Try NASA POWER for solar radiation (proxy for soil quality)
         return self._fetch_nasa_power_fallback(lat, lon)
 
-    def _fetch_nasa_power_fallback(self, lat: float, lon: float) -> Dict[str, Any]:
+    def _fetch_nasa_power_fallback(self, lat: float, lon: float, timeout: float = 10) -> Dict[str, Any]:
         """NASA POWER API — agro-climate variables (free, global coverage)."""
+        cache_key = "nasa:" + field_grid_key(lat, lon)
+        cached = self._soil_history_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
         try:
             params = {
                 "parameters": "PRECTOTCORR,T2M,RH2M,ALLSKY_SFC_SW_DWN,WS2M",
@@ -389,19 +590,21 @@ class FieldSensorService:
                 "end":       datetime.now().strftime("%Y%m01"),
                 "format":    "JSON",
             }
-            resp = self.session.get(self.NASA_POWER_URL, params=params, timeout=10)
+            resp = self.session.get(self.NASA_POWER_URL, params=params, timeout=timeout)
             if resp.status_code == 200:
                 data = resp.json()
                 props = data.get("properties", {}).get("parameter", {})
                 # Average annual rainfall
                 rain_vals = list(props.get("PRECTOTCORR", {}).values())
                 annual_rain = sum(rain_vals) / len(rain_vals) * 12 if rain_vals else 800
-                return {
+                result = {
                     "source": "NASA POWER (agro-climate estimate)",
                     "annual_rainfall_mm": round(annual_rain),
                     "is_live": True,
                     "note": "Nutrient data from NASA POWER agro-climate estimate",
                 }
+                self._soil_history_cache.set(cache_key, result)
+                return result
         except Exception as e:
             logger.debug("NASA POWER unavailable: %s", e)
 
@@ -412,14 +615,21 @@ class FieldSensorService:
     def _merge_soil_data(
         self,
         om_data: Dict,
-        govt_soil: Dict,
+        govt_soil: Optional[Dict],
         sensor_data: Optional[Dict],
+        climate: Optional[Dict] = None,
     ) -> Dict[str, Any]:
         """
         Merge soil data from all sources.
         Priority: IoT sensor > Govt Soil Health Card > Open-Meteo layers > defaults.
+        Any source may be missing (timed out / failed); only the ones that
+        answered are listed in data_sources.  NASA POWER — as govt_soil when
+        the Soil Health Card failed, or as climate next to it — contributes
+        annual rainfall.
         """
-        soil_layers = om_data.get("soil_layers", {})
+        om_data = om_data or {}
+        govt_soil = govt_soil or {}
+        soil_layers = om_data.get("soil_layers") or {}
 
         # Start with Open-Meteo real soil moisture
         om_moisture = soil_layers.get("moisture_surface_pct")
@@ -452,7 +662,7 @@ class FieldSensorService:
             "et0_mm_day":   soil_layers.get("evapotranspiration_mm"),
             "vpd_kpa":      soil_layers.get("vpd_kpa"),
 
-            "data_sources":  ["Open-Meteo (soil layers, real-time)"],
+            "data_sources":  ["Open-Meteo (soil layers, real-time)"] if soil_layers else [],
         }
 
         # Layer 2: Government Soil Health Card NPK
@@ -467,6 +677,13 @@ class FieldSensorService:
             merged["zinc_ppm"]        = govt_soil.get("zinc_ppm")
             merged["data_sources"].append("Soil Health Card (soilhealth.dac.gov.in)")
 
+        # Layer 2b: NASA POWER agro-climate (no nutrients)
+        nasa = climate if (climate or {}).get("is_live") else (
+            govt_soil if govt_soil.get("is_live") and govt_soil.get("annual_rainfall_mm") else None)
+        if nasa:
+            merged["annual_rainfall_mm"] = nasa.get("annual_rainfall_mm")
+            merged["data_sources"].append("NASA POWER (agro-climate estimate)")
+
         # Layer 3: IoT sensor data — overrides everything (highest accuracy)
         sensors = (sensor_data or {}).get("sensors", sensor_data or {})
         if sensors:
@@ -540,20 +757,17 @@ class FieldSensorService:
         lat: float,
         lon: float,
         state: Optional[str],
+        limit: Optional[int] = None,
     ) -> List[Dict[str, Any]]:
         """
         Score all 80 crops using field-level data.
-        Returns sorted list of crop recommendations.
+        Returns sorted list of crop recommendations; ``limit`` keeps the
+        top N.  Scores come from one vectorised pass over the compiled crop
+        matrix — _score_with_sensors only runs for returned crops, for
+        their reasons and NPK match.
         """
-        try:
-            from .comprehensive_crop_database import ALL_CROP_DATA
-        except ImportError:
-            ALL_CROP_DATA = {}
-
-        from .crop_recommendation_engine import (
-            _current_season, _season_label,
-            WATER_IRRIGATION_MIN,
-        )
+        from .crop_recommendation_engine import _current_season, _season_label
+        from .crop_scoring import get_crop_matrix, score_field
 
         season_key   = _current_season()
         curr_temp    = (weather.get("current_temp") or
@@ -561,16 +775,28 @@ class FieldSensorService:
         weather_risk = weather.get("risk", "None")
         rain_7d      = weather.get("rain_7d_mm", 0)
 
+        matrix = get_crop_matrix()
+        scores = score_field(
+            [{"soil": soil, "season_key": season_key, "curr_temp": curr_temp, "weather_risk": weather_risk}],
+            self._rotation_bonus, matrix,
+        )[0]
+        # Rank on the reported (int, capped) score; stable, like list.sort.
+        display = np.minimum(scores, 99).astype(int)
+        idx = np.flatnonzero(scores >= 5)
+        order = idx[np.argsort(-display[idx], kind="stable")]
+        if limit is not None:
+            order = order[:limit]
+
         results = []
-        for crop_key, crop in ALL_CROP_DATA.items():
-            score, reasons, npk_match = self._score_with_sensors(
+        for i in order.tolist():
+            crop_key = matrix.keys[i]
+            crop = matrix.crop_data[crop_key]
+            _, reasons, npk_match = self._score_with_sensors(
                 crop_key, crop, soil, season_key, curr_temp, weather_risk, rain_7d
             )
-            if score < 5:
-                continue
+            score = float(scores[i])
 
             # Build result
-            req = CROP_SOIL_REQUIREMENTS.get(crop_key, {})
             results.append({
                 "crop_name":      crop_key.title(),
                 "crop_name_hindi": crop.get("name_hindi", crop_key.title()),
@@ -599,7 +825,6 @@ class FieldSensorService:
                 },
             })
 
-        results.sort(key=lambda x: x["suitability_score"], reverse=True)
         return results
 
     def _score_with_sensors(
@@ -1009,10 +1234,14 @@ class FieldSensorService:
             hints.append(f"K deficient — add {round((req['K'][0]-k)/0.60,0)} kg MOP/ha")
         return hints
 
-    def _list_data_sources(self, sensor_data, govt_soil, om_data) -> List[str]:
-        sources = ["Open-Meteo (real-time soil moisture + weather, 1km grid)"]
-        if govt_soil.get("is_live"):
+    def _list_data_sources(self, sensor_data, govt_soil, om_data, climate=None) -> List[str]:
+        sources = []
+        if om_data.get("is_live"):
+            sources.append("Open-Meteo (real-time soil moisture + weather, 1km grid)")
+        if govt_soil.get("is_live") and govt_soil.get("nitrogen_kg_ha"):
             sources.append("Soil Health Card — soilhealth.dac.gov.in")
+        if (climate or {}).get("is_live") or (govt_soil.get("is_live") and govt_soil.get("annual_rainfall_mm")):
+            sources.append("NASA POWER — agro-climate estimate")
         if sensor_data:
             sources.append("IoT Field Sensor (field-level, real-time)")
         return sources
@@ -1102,6 +1331,7 @@ class FieldSensorService:
             "soil_layers": {},
             "forecast": [],
             "data_source": "Fallback (Open-Meteo unavailable)",
+            "is_live": False,
         }
 
 
@@ -0,0 +1,134 @@
+"""
+Tiered cache for reverse-geocoded GPS cells (LocationResolver._resolve_gps).
+
+  L1  LRUCache inside the worker — bounded (the old module-level dict grew
+      for as long as the Gunicorn worker lived)
+  L2  caches["geo_cache"] — Redis in production, shared by every worker
+      (L1 + L2 are a cache_utils.TieredCache)
+  L3  SQLite file (REVERSE_GEOCODE_DB) — survives restarts and deploys on
+      hosts where the shared tier is per-process LocMem; WAL mode so several
+      workers can write.  Set REVERSE_GEOCODE_DB="" to disable.
+
+Keys are ~110 m cells (3-decimal lat/lon, the old cache's grid); values are
+plain dicts (LocationContext.to_dict()), so every tier stores JSON-safe data.
+A hit in a lower tier is promoted to the tiers above it.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from .cache_utils import TieredCache
+
+logger = logging.getLogger(__name__)
+
+_L1_SIZE = int(os.environ.get("REVERSE_GEOCODE_L1_SIZE", "2048"))
+# Place names for a 110 m cell practically never change.
+_TTL_SECS = int(os.environ.get("REVERSE_GEOCODE_TTL_S", str(30 * 86400)))
+_DEFAULT_DB = Path(__file__).resolve().parents[2] / "reverse_geocode.sqlite3"
+REVERSE_GEOCODE_DB = os.environ.get("REVERSE_GEOCODE_DB", str(_DEFAULT_DB))
+
+
+def cell_key(lat: float, lon: float) -> str:
+    """~110 m cell for (lat, lon)."""
+    return f"{round(lat, 3):.3f}:{round(lon, 3):.3f}"
+
+
+class _SQLiteTier:
+    """One-table key/value file.  Connections are per thread and per process
+    (preload_app forks workers from the master — never share a handle)."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None or getattr(self._local, "pid", None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=2.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS reverse_geocode ("
+                " cell TEXT PRIMARY KEY, payload TEXT NOT NULL, updated REAL NOT NULL)"
+            )
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def get(self, key: str, max_age: float) -> Optional[Dict[str, Any]]:
+        row = self._conn().execute(
+            "SELECT payload, updated FROM reverse_geocode WHERE cell = ?", (key,)
+        ).fetchone()
+        if row is None or time.time() - row[1] > max_age:
+            return None
+        return json.loads(row[0])
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO reverse_geocode (cell, payload, updated) VALUES (?, ?, ?)",
+                (key, json.dumps(value, ensure_ascii=False), time.time()),
+            )
+
+    def __len__(self) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM reverse_geocode").fetchone()[0]
+
+
+class ReverseGeocodeCache:
+    """TieredCache (L1 LRU → caches["geo_cache"]) with the SQLite file under it."""
+
+    def __init__(
+        self,
+        l1_size: int = _L1_SIZE,
+        ttl: int = _TTL_SECS,
+        cache=None,
+        db_path: Optional[str] = REVERSE_GEOCODE_DB,
+    ):
+        self.ttl = ttl
+        self._tiers = TieredCache(l1_size, ttl, alias="geo_cache", prefix="revgeo:v1:", cache=cache)
+        self._disk = _SQLiteTier(db_path) if db_path else None
+        self._stats = {"disk_hits": 0, "cold_misses": 0, "writes": 0, "disk_errors": 0}   # cold: missed every tier
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        value = self._tiers.get(key)
+        if value is not None:
+            return value
+
+        if self._disk is not None:
+            try:
+                value = self._disk.get(key, self.ttl)
+            except Exception as exc:
+                self._stats["disk_errors"] += 1
+                logger.debug("reverse-geocode file read failed for %s: %s", key, exc)
+            if value is not None:
+                self._stats["disk_hits"] += 1
+                self._tiers.set(key, value)                   # promote to L1 + shared
+                return value
+
+        self._stats["cold_misses"] += 1
+        return None
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        self._stats["writes"] += 1
+        self._tiers.set(key, value)
+        if self._disk is not None:
+            try:
+                self._disk.set(key, value)
+            except Exception as exc:
+                self._stats["disk_errors"] += 1
+                logger.debug("reverse-geocode file write failed for %s: %s", key, exc)
+
+    def stats(self) -> Dict[str, Any]:
+        """TieredCache counters (L1 + shared) plus the file tier's."""
+        return dict(self._tiers.stats(), **self._stats)
+
+    def l1_size(self) -> int:
+        return len(self._tiers)
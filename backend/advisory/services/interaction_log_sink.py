@@ -0,0 +1,373 @@
+"""
+KrishiMitra — batched FarmerInteractionLog sink
+================================================
+Every chat turn writes one FarmerInteractionLog row (query, answer and the
+JSON sensor / weather / market snapshots).  Written one INSERT per turn —
+and, with a broker, one log_interaction Celery message per turn — this was
+the largest share of the database write load and of the broker traffic.
+
+The sink collects rows from every request thread and task in the process
+and writes them with one bulk_create per batch, when INTERACTION_LOG_BATCH_SIZE
+rows are waiting or every INTERACTION_LOG_FLUSH_MS, whichever comes first.
+
+Durability — a local spool (INTERACTION_LOG_SPOOL_DIR, default backend/var/
+interaction_spool; created 0700 and never under MEDIA_ROOT or any other
+web-served tree, since segments hold phone numbers, queries and answers):
+
+  - every row is appended to this process's current spool segment
+    (JSON lines) before add() returns; a flush rotates the segment and
+    deletes it once the batch has committed.  A killed or restarted worker
+    loses nothing that reached the page cache (no fsync per row).
+  - each process holds an flock on its own ``<token>.lock`` file.  On start
+    a sink claims the segments of every owner whose lock is free (the
+    process is gone): it renames them to its own token, then writes them
+    with its next batch.
+  - delivery is at-least-once: a crash between the commit and deleting the
+    segment replays that batch on the next start.
+  - created_at is the write time (auto_now_add), at most one flush
+    interval after the turn — more for rows replayed from a spool.
+
+When the database is down, failed batches stay queued (up to
+INTERACTION_LOG_MAX_PENDING rows in memory) and their segments stay on
+disk; beyond that the oldest batches are released from memory and left to
+the next start's recovery.  Without fcntl (Windows) segments are still
+written but another process's leftovers are not recovered.
+
+Metrics (monitoring /metrics → interaction_log_sink): rows logged and
+flushed, flush count and errors, batch size (mean / max) and flush latency
+percentiles over the last flushes, queued rows, recovered rows.
+"""
+
+from __future__ import annotations
+
+import atexit
+import glob
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:                                        # Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+INTERACTION_LOG_SINK        = os.getenv("INTERACTION_LOG_SINK", "1") not in ("0", "false", "False")
+INTERACTION_LOG_BATCH_SIZE  = int(os.getenv("INTERACTION_LOG_BATCH_SIZE", "200"))
+INTERACTION_LOG_FLUSH_MS    = int(os.getenv("INTERACTION_LOG_FLUSH_MS", "1000"))
+INTERACTION_LOG_MAX_PENDING = int(os.getenv("INTERACTION_LOG_MAX_PENDING", "50000"))
+INTERACTION_LOG_SPOOL_DIR   = os.getenv(
+    "INTERACTION_LOG_SPOOL_DIR", str(Path(__file__).resolve().parents[2] / "var" / "interaction_spool"),
+)
+_SAMPLES = 500     # recent flushes kept for batch-size / latency figures
+
+
+def interaction_row(
+    *,
+    session_id: str,
+    query: str,
+    response: str,
+    phone_number: str = "",
+    location_name: str = "",
+    state: str = "",
+    latitude=None,
+    longitude=None,
+    intent: str = "",
+    language: str = "hi",
+    crops_detected: Optional[list] = None,
+    ai_tier: str = "",
+    data_source: str = "",
+    season: str = "",
+    response_time_ms: Optional[int] = None,
+    **extra: Any,
+) -> Dict[str, Any]:
+    """FarmerInteractionLog field values with the model's blank defaults filled in."""
+    row = {
+        "session_id": session_id or "anon",
+        "phone_number": phone_number or "",
+        "location_name": location_name or "",
+        "state": state or "",
+        "latitude": latitude,
+        "longitude": longitude,
+        "query": query,
+        "response": response,
+        "intent": intent or "",
+        "language": language or "hi",
+        "crops_detected": crops_detected or [],
+        "ai_tier": ai_tier or "",
+        "data_source": data_source or "",
+        "season": season or "",
+        "response_time_ms": response_time_ms,
+    }
+    row.update(extra)                  # sensor_data / weather_data / market_prices …
+    return row
+
+
+def _pct(values: List[float], q: float) -> Optional[float]:
+    if not values:
+        return None
+    values = sorted(values)
+    return round(values[min(len(values) - 1, int(q * len(values)))], 1)
+
+
+class InteractionLogSink:
+    """Process-wide batching writer for FarmerInteractionLog with a durable spool."""
+
+    def __init__(
+        self,
+        spool_dir: Optional[str] = INTERACTION_LOG_SPOOL_DIR,
+        batch_size: int = INTERACTION_LOG_BATCH_SIZE,
+        flush_interval_ms: int = INTERACTION_LOG_FLUSH_MS,
+        max_pending: int = INTERACTION_LOG_MAX_PENDING,
+    ):
+        self.spool_dir = spool_dir
+        self.batch_size = batch_size
+        self.interval = flush_interval_ms / 1000.0
+        self.max_pending = max_pending
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._flush_times: Deque[float] = deque(maxlen=_SAMPLES)
+        self._batch_sizes: Deque[int] = deque(maxlen=_SAMPLES)
+        self._stats: Dict[str, int] = {
+            "rows_logged": 0, "rows_flushed": 0, "flushes": 0, "flush_errors": 0,
+            "rows_left_on_disk": 0, "rows_dropped": 0, "rows_recovered": 0, "segments_recovered": 0,
+            "spool_errors": 0,
+        }
+        self._reset()
+
+    def _reset(self) -> None:
+        """Per-process state; called again in a forked child."""
+        self._pid = os.getpid()
+        self._token = f"{self._pid}-{uuid.uuid4().hex[:8]}"
+        self._rows: List[Dict[str, Any]] = []
+        self._pending: List[Tuple[Optional[str], List[Dict[str, Any]]]] = []   # failed / recovered batches
+        self._segment = None
+        self._segment_path: Optional[str] = None
+        self._seq = 0
+        self._lock_fh = None
+        self._started = False
+        self._thread = None
+
+    # ── Spool ──────────────────────────────────────────────────
+
+    def _start(self) -> None:
+        """Open the spool and claim dead processes' segments (first add() in a process)."""
+        self._started = True
+        if not self.spool_dir:
+            return
+        try:
+            os.makedirs(self.spool_dir, mode=0o700, exist_ok=True)
+            os.chmod(self.spool_dir, 0o700)            # makedirs' mode is masked and skips existing dirs
+            self._lock_fh = open(os.path.join(self.spool_dir, f"{self._token}.lock"), "w")
+            if fcntl is not None:
+                fcntl.flock(self._lock_fh, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                self._recover()
+            self._open_segment()
+        except OSError as exc:
+            self._stats["spool_errors"] += 1
+            logger.warning("InteractionLogSink: spool %s unavailable, logging without it: %s",
+                           self.spool_dir, exc)
+            self._segment = None
+
+    def _open_segment(self) -> None:
+        self._seq += 1
+        self._segment_path = os.path.join(self.spool_dir, f"{self._token}-{self._seq:06d}.jsonl")
+        self._segment = open(self._segment_path, "a", encoding="utf-8")
+
+    def _rotate(self) -> Optional[str]:
+        """Close the current segment and start the next one; returns the closed path."""
+        if self._segment is None:
+            return None
+        path = self._segment_path
+        try:
+            self._segment.close()
+            self._open_segment()
+        except OSError as exc:
+            self._stats["spool_errors"] += 1
+            logger.warning("InteractionLogSink: spool rotation failed: %s", exc)
+            self._segment = None
+        return path
+
+    def _recover(self) -> None:
+        for lock_path in glob.glob(os.path.join(self.spool_dir, "*.lock")):
+            owner = os.path.basename(lock_path)[:-len(".lock")]
+            if owner == self._token:
+                continue
+            try:
+                fh = open(lock_path, "a")
+            except OSError:
+                continue
+            try:
+                try:
+                    fcntl.flock(fh, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except OSError:
+                    continue                                   # owner is alive
+                for seg in sorted(glob.glob(os.path.join(self.spool_dir, f"{owner}-*.jsonl"))):
+                    self._seq += 1
+                    mine = os.path.join(self.spool_dir, f"{self._token}-{self._seq:06d}.jsonl")
+                    os.rename(seg, mine)
+                    rows = _read_segment(mine)
+                    if rows:
+                        self._pending.append((mine, rows))
+                        self._stats["rows_recovered"] += len(rows)
+                        self._stats["segments_recovered"] += 1
+                    else:
+                        os.unlink(mine)
+                os.unlink(lock_path)
+            finally:
+                fh.close()
+        if self._stats["rows_recovered"]:
+            logger.info("InteractionLogSink: recovered %d interaction logs from %d spool segments",
+                        self._stats["rows_recovered"], self._stats["segments_recovered"])
+
+    # ── Write path ─────────────────────────────────────────────
+
+    def add(self, row: Dict[str, Any]) -> None:
+        """Queue one FarmerInteractionLog row (see interaction_row())."""
+        line = json.dumps(row, ensure_ascii=False, default=str) + "\n"
+        with self._cond:
+            if self._pid != os.getpid():
+                self._reset()
+            if not self._started:
+                self._start()
+            if self._segment is not None:
+                try:
+                    self._segment.write(line)
+                    self._segment.flush()
+                except OSError as exc:
+                    self._stats["spool_errors"] += 1
+                    logger.warning("InteractionLogSink: spool write failed: %s", exc)
+            self._rows.append(row)
+            self._stats["rows_logged"] += 1
+            if len(self._rows) >= self.batch_size:
+                self._cond.notify()
+        self._ensure_thread()
+
+    def _ensure_thread(self) -> None:
+        if self._thread is not None:
+            return
+        with self._cond:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="km-log-flush", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        from django.db import close_old_connections
+
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: len(self._rows) >= self.batch_size, timeout=self.interval)
+            try:
+                close_old_connections()
+                self.flush()
+            except Exception as exc:                          # never let the flusher die
+                logger.warning("InteractionLogSink flush loop error: %s", exc)
+
+    def flush(self) -> int:
+        """Write every queued row (including failed and recovered batches).  Returns rows written."""
+        with self._flush_lock:
+            with self._cond:
+                if self._pid != os.getpid():
+                    return 0
+                if self._rows:
+                    self._pending.append((self._rotate(), self._rows))
+                    self._rows = []
+                batches, self._pending = self._pending, []
+            if not batches:
+                return 0
+            from django.db import transaction
+            from ..models import FarmerInteractionLog
+
+            rows = [r for _, batch in batches for r in batch]
+            t0 = time.perf_counter()
+            try:
+                with transaction.atomic():
+                    FarmerInteractionLog.objects.bulk_create(
+                        [FarmerInteractionLog(**r) for r in rows], batch_size=self.batch_size,
+                    )
+            except Exception as exc:
+                logger.warning("InteractionLogSink: flush of %d rows failed: %s", len(rows), exc)
+                self._requeue(batches)
+                return 0
+            elapsed_ms = (time.perf_counter() - t0) * 1000
+            for path, _ in batches:
+                if path:
+                    try:
+                        os.unlink(path)
+                    except OSError:
+                        pass
+            with self._cond:
+                self._flush_times.append(elapsed_ms)
+                self._batch_sizes.append(len(rows))
+                self._stats["flushes"] += 1
+                self._stats["rows_flushed"] += len(rows)
+            return len(rows)
+
+    def _requeue(self, batches) -> None:
+        with self._cond:
+            self._stats["flush_errors"] += 1
+            self._pending = batches + self._pending
+            queued = sum(len(b) for _, b in self._pending)
+            while queued > self.max_pending and len(self._pending) > 1:
+                path, batch = self._pending.pop(0)
+                queued -= len(batch)
+                if path:                              # stays in the spool for the next start
+                    self._stats["rows_left_on_disk"] += len(batch)
+                    logger.error("InteractionLogSink: %d rows left in %s for recovery", len(batch), path)
+                else:
+                    self._stats["rows_dropped"] += len(batch)
+                    logger.error("InteractionLogSink: dropped %d unspooled rows", len(batch))
+
+    def close(self) -> None:
+        """Flush, then remove this process's empty segment and lock file (clean exit)."""
+        self.flush()
+        with self._cond:
+            if self._pid != os.getpid() or self._pending or self._rows or self._lock_fh is None:
+                return                                    # leave the spool to the next start's recovery
+            try:
+                if self._segment is not None:
+                    self._segment.close()
+                    os.unlink(self._segment_path)
+                    self._segment = None
+                os.unlink(self._lock_fh.name)
+                self._lock_fh.close()
+                self._lock_fh = None
+            except OSError:
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            s: Dict[str, Any] = dict(self._stats)
+            s["queued_rows"] = len(self._rows) + sum(len(b) for _, b in self._pending)
+            s["spool_enabled"] = self._segment is not None
+            times, sizes = list(self._flush_times), list(self._batch_sizes)
+        s["batch_size_mean"] = round(sum(sizes) / len(sizes), 1) if sizes else None
+        s["batch_size_max"] = max(sizes) if sizes else None
+        s["flush_ms_p50"] = _pct(times, 0.50)
+        s["flush_ms_p95"] = _pct(times, 0.95)
+        s["flush_ms_max"] = round(max(times), 1) if times else None
+        return s
+
+
+def _read_segment(path: str) -> List[Dict[str, Any]]:
+    rows = []
+    with open(path, encoding="utf-8") as fh:
+        for line in fh:
+            try:
+                rows.append(json.loads(line))
+            except ValueError:                        # torn last line of a killed writer
+                logger.warning("InteractionLogSink: skipped a partial line in %s", path)
+    return rows
+
+
+# Singleton
+interaction_log_sink = InteractionLogSink()
+atexit.register(interaction_log_sink.close)
@@ -6,7 +6,10 @@ Answers without touching ANY LLM (zero AI credits for common questions).
 
 Design:
   - Intent-keyed Q&A dictionary with crop-specific variants
-  - Keyword matcher picks the best answer in O(1)
+  - Every keyword list (sections, crop aliases, scheme names) is compiled at
+    import into one KeywordIndex; a query is scanned once for section, crop
+    and scheme, and the answer comes from tables pre-rendered per crop /
+    scheme (parity + timing: scripts/bench_knowledge_base.py)
   - Falls through to Qwen2.5:7b (local Ollama) for unknown queries
   - Only hits Gemini API if Qwen is also unavailable
 
@@ -45,6 +48,7 @@ _OLLAMA_MODEL   = os.getenv("OLLAMA_MODEL", "krishimitra-llm")
 _OLLAMA_TIMEOUT = (3, 45)  # (connect, read) seconds
 
 from .msp_data import MSP_2024_25
+from .query_classifier import KeywordIndex
 
 # ── Sowing calendar (month ranges for each crop) ──────────────────────────────
 SOWING_CALENDAR = {
@@ -269,12 +273,13 @@ class KnowledgeBase:
         Returns dict with keys: answer, source, confidence, crop_detected.
         """
         q_lower = query.lower()
+        match = _scan(q_lower)
 
         # Detect crop from query
-        detected_crop = crop or self._detect_crop(q_lower)
+        detected_crop = crop or match.crop
 
         # Try KB lookup
-        kb_result = self._kb_lookup(q_lower, detected_crop, language, weather_context)
+        kb_result = self._kb_lookup(q_lower, detected_crop, language, weather_context, match)
         if kb_result:
             return {
                 "answer":         kb_result,
@@ -330,33 +335,19 @@ class KnowledgeBase:
         crop: Optional[str],
         lang: str,
         weather: Optional[Dict],
+        match: Optional["_KBMatch"] = None,
     ) -> Optional[str]:
         """Route query to the right KB section. Returns formatted answer or None."""
+        m = match if match is not None else _scan(q)
 
         # MSP query
-        if any(kw in q for kw in _MSP_KW):
-            if crop and crop in MSP_2024_25:
-                msp = MSP_2024_25[crop]
-                crop_hi = _CROP_ALIASES_REVERSE.get(crop, crop)
-                return (
-                    f"💰 **{crop_hi} MSP 2024-25:** ₹{msp:,}/क्विंटल\n\n"
-                    f"📌 यह केंद्र सरकार द्वारा घोषित न्यूनतम समर्थन मूल्य है।\n"
-                    f"📞 नजदीकी मंडी/APMC से बाजार भाव जानें।\n"
-                    f"💡 e-NAM (enam.gov.in) पर ऑनलाइन भाव देखें।"
-                )
-            # List all MSPs
-            lines = [f"💰 **MSP 2024-25 (₹/क्विंटल):**\n"]
-            for c, m in MSP_2024_25.items():
-                hi = _CROP_ALIASES_REVERSE.get(c, c)
-                lines.append(f"• {hi}: ₹{m:,}")
-            lines.append("\n📞 KVK हेल्पलाइन: 1800-180-1551")
-            return "\n".join(lines)
+        if m.sections & _MSP:
+            return _MSP_ANSWERS.get(crop) or _MSP_ALL_ANSWER
 
         # Sowing time query
-        if any(kw in q for kw in _SOWING_KW):
+        if m.sections & _SOWING:
             if crop and crop in SOWING_CALENDAR:
                 s = SOWING_CALENDAR[crop]
-                crop_hi = _CROP_ALIASES_REVERSE.get(crop, crop)
                 temp_note = ""
                 if weather:
                     if isinstance(weather, dict):
@@ -369,83 +360,29 @@ class KnowledgeBase:
                             temp_note = f"\n\n⚠️ अभी तापमान {temp}°C है — रबी बुवाई के लिए तापमान 20°C से नीचे आने का इंतजार करें।"
                         elif temp < 15 and "खरीफ" in s["season"]:
                             temp_note = f"\n\n⚠️ अभी तापमान {temp}°C है — खरीफ फसल के लिए बहुत ठंडा। जून तक प्रतीक्षा करें।"
-                return (
-                    f"🌱 **{crop_hi} की बुवाई:**\n\n"
-                    f"🗓️ **बुवाई का समय:** {s['sow']}\n"
-                    f"✂️ **कटाई:** {s['harvest']}\n"
-                    f"🌿 **मौसम:** {s['season']}"
-                    f"{temp_note}\n\n"
-                    f"📞 स्थानीय KVK से किस्म की सलाह लें: 1800-180-1551"
-                )
+                head, tail = _SOWING_ANSWERS[crop]
+                return head + temp_note + tail
             # Generic sowing season answer
-            return (
-                "🌱 **बुवाई की जानकारी:**\n\n"
-                "• **रबी फसलें** (अक्टूबर–दिसंबर): गेहूं, सरसों, चना, जौ, मटर\n"
-                "• **खरीफ फसलें** (जून–जुलाई): धान, मक्का, बाजरा, सोयाबीन, कपास\n"
-                "• **जायद** (फरवरी–मार्च): मूँग, तरबूज, खरबूजा, खीरा\n\n"
-                "💡 फसल का नाम बताएं — सटीक तारीख बताऊँगा।"
-            )
+            return _SOWING_GENERIC_ANSWER
 
         # Fertilizer query
-        if any(kw in q for kw in _FERTILIZER_KW):
-            if crop and crop in FERTILIZER_GUIDE:
-                f = FERTILIZER_GUIDE[crop]
-                crop_hi = _CROP_ALIASES_REVERSE.get(crop, crop)
-                return (
-                    f"🌿 **{crop_hi} उर्वरक सिफारिश (ICAR):**\n\n"
-                    f"• **नाइट्रोजन (N):** {f['n']} kg/ha\n"
-                    f"• **फास्फोरस (P):** {f['p']} kg/ha\n"
-                    f"• **पोटाश (K):** {f['k']} kg/ha\n\n"
-                    f"📋 **उपयोग विधि:** {f['notes']}\n\n"
-                    f"💡 मिट्टी परीक्षण के बाद मात्रा में बदलाव करें।\n"
-                    f"📞 मृदा स्वास्थ्य कार्ड: नजदीकी कृषि विभाग"
-                )
+        if m.sections & _FERTILIZER and crop in _FERTILIZER_ANSWERS:
+            return _FERTILIZER_ANSWERS[crop]
 
         # Irrigation query
-        if any(kw in q for kw in _IRRIGATION_KW):
-            if crop and crop in IRRIGATION_GUIDE:
-                irr = IRRIGATION_GUIDE[crop]
-                crop_hi = _CROP_ALIASES_REVERSE.get(crop, crop)
-                stages = "\n".join(f"  • {s}" for s in irr["critical_stages"])
-                return (
-                    f"💧 **{crop_hi} सिंचाई गाइड:**\n\n"
-                    f"🔑 **महत्वपूर्ण अवस्थाएं:**\n{stages}\n\n"
-                    f"📊 **कुल सिंचाई:** {irr['total']}\n"
-                    f"🛠️ **विधि:** {irr['method']}\n\n"
-                    f"💡 ड्रिप/स्प्रिंकलर पर 45-55% सरकारी सब्सिडी उपलब्ध।"
-                )
+        if m.sections & _IRRIGATION and crop in _IRRIGATION_ANSWERS:
+            return _IRRIGATION_ANSWERS[crop]
 
         # Pest/disease query
-        if any(kw in q for kw in _PEST_KW):
-            if crop and crop in PEST_GUIDE:
-                pests = PEST_GUIDE[crop]
-                crop_hi = _CROP_ALIASES_REVERSE.get(crop, crop)
-                lines = [f"🐛 **{crop_hi} के प्रमुख कीट/रोग और उपचार:**\n"]
-                for pest, solution in pests.items():
-                    lines.append(f"• **{pest.replace('_',' ').title()}:** {solution}")
-                lines.append("\n⚠️ दवाई का उपयोग अनुशंसित मात्रा में करें।")
-                lines.append("📞 KVK हेल्पलाइन: 1800-180-1551")
-                return "\n".join(lines)
+        if m.sections & _PEST and crop in _PEST_ANSWERS:
+            return _PEST_ANSWERS[crop]
 
         # Government scheme query
-        if any(kw in q for kw in _SCHEME_KW):
-            # Try to match specific scheme
-            for scheme_id, info in SCHEME_KB.items():
-                if any(kw in q for kw in scheme_id.replace("_", " ").split() + [scheme_id]):
-                    return (
-                        f"🏛️ **{info['full_name']}**\n\n"
-                        f"💰 **लाभ:** {info.get('benefit','')}\n"
-                        + (f"✅ **पात्रता:** {info.get('eligibility','')}\n" if info.get('eligibility') else "")
-                        + (f"📋 **आवेदन:** {info.get('apply','')}\n" if info.get('apply') else "")
-                        + (f"📞 **हेल्पलाइन:** {info.get('helpline','')}\n" if info.get('helpline') else "")
-                        + (f"⏰ **समयसीमा:** {info.get('deadline','')}\n" if info.get('deadline') else "")
-                    )
-            # List all schemes
-            lines = ["🏛️ **किसानों के लिए प्रमुख सरकारी योजनाएं:**\n"]
-            for sid, info in SCHEME_KB.items():
-                lines.append(f"• **{info['full_name']}** — {info.get('benefit','').split('|')[0].strip()}")
-            lines.append("\n💡 किसी योजना के बारे में और जानकारी के लिए नाम बताएं।")
-            return "\n".join(lines)
+        if m.sections & _SCHEME:
+            # Specific scheme if one is named, else the list of all schemes
+            if m.scheme is not None:
+                return _SCHEME_ANSWERS[m.scheme]
+            return _SCHEME_ALL_ANSWER
 
         return None  # No KB match — escalate
 
@@ -453,10 +390,7 @@ class KnowledgeBase:
 
     @staticmethod
     def _detect_crop(q: str) -> Optional[str]:
-        for alias, crop_id in _CROP_ALIASES.items():
-            if alias.lower() in q:
-                return crop_id
-        return None
+        return _scan(q).crop
 
     # ── Qwen / Ollama ─────────────────────────────────────────────────────────
 
@@ -553,5 +487,173 @@ class KnowledgeBase:
 # Reverse map for Hindi display
 _CROP_ALIASES_REVERSE = {v: k for k, v in _CROP_ALIASES.items() if "\u0900" <= k[0] <= "\u097f"}
 
+
+# ── Compiled lookup (built once at import) ────────────────────────────────────
+# Section bits, in _kb_lookup's routing order.
+_MSP, _SOWING, _FERTILIZER, _IRRIGATION, _PEST, _SCHEME = (1 << i for i in range(6))
+_SECTION_KEYWORDS = (
+    (_MSP, _MSP_KW), (_SOWING, _SOWING_KW), (_FERTILIZER, _FERTILIZER_KW),
+    (_IRRIGATION, _IRRIGATION_KW), (_PEST, _PEST_KW), (_SCHEME, _SCHEME_KW),
+)
+
+
+class _KBMatch:
+    """What one scan of a lower-cased query found."""
+
+    __slots__ = ("sections", "crop", "scheme")
+
+    def __init__(self, sections: int, crop: Optional[str], scheme: Optional[str]):
+        self.sections = sections    # OR of the section bits whose keywords occur
+        self.crop = crop            # first _CROP_ALIASES entry (dict order) that occurs
+        self.scheme = scheme        # first SCHEME_KB entry (dict order) named in the query
+
+
+def _build_keyword_table() -> Dict[str, Tuple[int, int, int]]:
+    """keyword → (section bits, crop alias rank, scheme rank); ranks are -1 when n/a."""
+    table: Dict[str, List[int]] = {}
+
+    def entry(kw: str) -> List[int]:
+        return table.setdefault(kw, [0, -1, -1])
+
+    for bit, kws in _SECTION_KEYWORDS:
+        for kw in kws:
+            entry(kw)[0] |= bit
+    for rank, alias in enumerate(_CROP_ALIASES):
+        e = entry(alias.lower())
+        if e[1] < 0:
+            e[1] = rank
+    for rank, scheme_id in enumerate(SCHEME_KB):
+        for kw in scheme_id.replace("_", " ").split() + [scheme_id]:
+            e = entry(kw)
+            if e[2] < 0:
+                e[2] = rank
+    return {kw: tuple(v) for kw, v in table.items()}
+
+
+_KEYWORD_TABLE = _build_keyword_table()
+_KB_INDEX = KeywordIndex(_KEYWORD_TABLE)
+_NO_RANK = len(_CROP_ALIASES) + len(SCHEME_KB)
+
+
+def _fold(keyword: str) -> Tuple[int, int, int]:
+    """Table entry of ``keyword`` merged with every keyword it contains."""
+    bits, crop_rank, scheme_rank = 0, _NO_RANK, _NO_RANK
+    for kw in _KB_INDEX.contained(keyword):
+        b, c, s = _KEYWORD_TABLE[kw]
+        bits |= b
+        if c >= 0:
+            crop_rank = min(crop_rank, c)
+        if s >= 0:
+            scheme_rank = min(scheme_rank, s)
+    return bits, crop_rank, scheme_rank
+
+
+_HITS = {kw: _fold(kw) for kw in _KB_INDEX}
+_CROP_BY_RANK = dict(enumerate(_CROP_ALIASES.values()))
+_SCHEME_BY_RANK = dict(enumerate(SCHEME_KB))
+
+
+def _scan(q: str) -> _KBMatch:
+    """Sections, crop and scheme of ``q`` (already lower-cased) in one pass."""
+    sections, crop_rank, scheme_rank = 0, _NO_RANK, _NO_RANK
+    for kw in _KB_INDEX.hits(q):
+        bits, c, s = _HITS[kw]
+        sections |= bits
+        if c < crop_rank:
+            crop_rank = c
+        if s < scheme_rank:
+            scheme_rank = s
+    return _KBMatch(sections, _CROP_BY_RANK.get(crop_rank), _SCHEME_BY_RANK.get(scheme_rank))
+
+
+def _crop_hi(crop: str) -> str:
+    return _CROP_ALIASES_REVERSE.get(crop, crop)
+
+
+# Pre-rendered answers — everything except the sowing temperature note is static.
+_MSP_ANSWERS = {
+    crop: (
+        f"💰 **{_crop_hi(crop)} MSP 2024-25:** ₹{msp:,}/क्विंटल\n\n"
+        f"📌 यह केंद्र सरकार द्वारा घोषित न्यूनतम समर्थन मूल्य है।\n"
+        f"📞 नजदीकी मंडी/APMC से बाजार भाव जानें।\n"
+        f"💡 e-NAM (enam.gov.in) पर ऑनलाइन भाव देखें।"
+    )
+    for crop, msp in MSP_2024_25.items()
+}
+_MSP_ALL_ANSWER = "\n".join(
+    ["💰 **MSP 2024-25 (₹/क्विंटल):**\n"]
+    + [f"• {_crop_hi(c)}: ₹{m:,}" for c, m in MSP_2024_25.items()]
+    + ["\n📞 KVK हेल्पलाइन: 1800-180-1551"]
+)
+
+_SOWING_ANSWERS = {
+    crop: (
+        f"🌱 **{_crop_hi(crop)} की बुवाई:**\n\n"
+        f"🗓️ **बुवाई का समय:** {s['sow']}\n"
+        f"✂️ **कटाई:** {s['harvest']}\n"
+        f"🌿 **मौसम:** {s['season']}",
+        "\n\n📞 स्थानीय KVK से किस्म की सलाह लें: 1800-180-1551",
+    )
+    for crop, s in SOWING_CALENDAR.items()
+}
+_SOWING_GENERIC_ANSWER = (
+    "🌱 **बुवाई की जानकारी:**\n\n"
+    "• **रबी फसलें** (अक्टूबर–दिसंबर): गेहूं, सरसों, चना, जौ, मटर\n"
+    "• **खरीफ फसलें** (जून–जुलाई): धान, मक्का, बाजरा, सोयाबीन, कपास\n"
+    "• **जायद** (फरवरी–मार्च): मूँग, तरबूज, खरबूजा, खीरा\n\n"
+    "💡 फसल का नाम बताएं — सटीक तारीख बताऊँगा।"
+)
+
+_FERTILIZER_ANSWERS = {
+    crop: (
+        f"🌿 **{_crop_hi(crop)} उर्वरक सिफारिश (ICAR):**\n\n"
+        f"• **नाइट्रोजन (N):** {f['n']} kg/ha\n"
+        f"• **फास्फोरस (P):** {f['p']} kg/ha\n"
+        f"• **पोटाश (K):** {f['k']} kg/ha\n\n"
+        f"📋 **उपयोग विधि:** {f['notes']}\n\n"
+        f"💡 मिट्टी परीक्षण के बाद मात्रा में बदलाव करें।\n"
+        f"📞 मृदा स्वास्थ्य कार्ड: नजदीकी कृषि विभाग"
+    )
+    for crop, f in FERTILIZER_GUIDE.items()
+}
+
+_IRRIGATION_ANSWERS = {
+    crop: (
+        f"💧 **{_crop_hi(crop)} सिंचाई गाइड:**\n\n"
+        f"🔑 **महत्वपूर्ण अवस्थाएं:**\n" + "\n".join(f"  • {s}" for s in irr["critical_stages"]) + "\n\n"
+        f"📊 **कुल सिंचाई:** {irr['total']}\n"
+        f"🛠️ **विधि:** {irr['method']}\n\n"
+        f"💡 ड्रिप/स्प्रिंकलर पर 45-55% सरकारी सब्सिडी उपलब्ध।"
+    )
+    for crop, irr in IRRIGATION_GUIDE.items()
+}
+
+_PEST_ANSWERS = {
+    crop: "\n".join(
+        [f"🐛 **{_crop_hi(crop)} के प्रमुख कीट/रोग और उपचार:**\n"]
+        + [f"• **{pest.replace('_',' ').title()}:** {solution}" for pest, solution in pests.items()]
+        + ["\n⚠️ दवाई का उपयोग अनुशंसित मात्रा में करें।", "📞 KVK हेल्पलाइन: 1800-180-1551"]
+    )
+    for crop, pests in PEST_GUIDE.items()
+}
+
+_SCHEME_ANSWERS = {
+    scheme_id: (
+        f"🏛️ **{info['full_name']}**\n\n"
+        f"💰 **लाभ:** {info.get('benefit','')}\n"
+        + (f"✅ **पात्रता:** {info.get('eligibility','')}\n" if info.get('eligibility') else "")
+        + (f"📋 **आवेदन:** {info.get('apply','')}\n" if info.get('apply') else "")
+        + (f"📞 **हेल्पलाइन:** {info.get('helpline','')}\n" if info.get('helpline') else "")
+        + (f"⏰ **समयसीमा:** {info.get('deadline','')}\n" if info.get('deadline') else "")
+    )
+    for scheme_id, info in SCHEME_KB.items()
+}
+_SCHEME_ALL_ANSWER = "\n".join(
+    ["🏛️ **किसानों के लिए प्रमुख सरकारी योजनाएं:**\n"]
+    + [f"• **{info['full_name']}** — {info.get('benefit','').split('|')[0].strip()}"
+       for info in SCHEME_KB.values()]
+    + ["\n💡 किसी योजना के बारे में और जानकारी के लिए नाम बताएं।"]
+)
+
 # Module-level singleton
 knowledge_base = KnowledgeBase()
@@ -14,11 +14,14 @@ All realtime services (weather, mandi, crop, pest, chatbot) should use
 
 from __future__ import annotations
 
+import atexit
 import logging
 import math
+import os
 import threading
 import time
-from dataclasses import asdict, dataclass, field
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import asdict, dataclass, field, fields, replace
 from datetime import datetime
 from functools import lru_cache
 from typing import Any, Dict, List, Optional, Tuple
@@ -26,15 +29,33 @@ from typing import Any, Dict, List, Optional, Tuple
 import requests
 
 from ..rate_limiters import nominatim_limiter, rate_limit
+from .cache_utils import SingleFlight
+from .geocode_cache import ReverseGeocodeCache, cell_key
 
 # Global lock — ensures only one Nominatim reverse call runs at a time,
 # eliminating "Rate limit exceeded" errors when multiple services fire
 # simultaneously on page load (weather + market + crop + field advisory).
 _nominatim_lock = threading.Lock()
 
-# In-process cache: (lat_rounded, lon_rounded) -> LocationContext
-# Prevents duplicate Nominatim calls for the same GPS coordinates.
-_reverse_cache: Dict[tuple, Any] = {}
+# Reverse-geocode results per ~110 m cell: bounded in-process LRU → shared
+# geo_cache alias → SQLite file that survives restarts (services/geocode_cache.py).
+_reverse_cache = ReverseGeocodeCache()
+
+# On a miss BigDataCloud and Nominatim are raced; the first valid answer is
+# returned (after a short grace so the other can still be merged in) and a
+# late finisher only upgrades the cached entry.
+_REVERSE_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix="km-revgeo")
+atexit.register(_REVERSE_POOL.shutdown, wait=False)
+_REVERSE_RACE_TIMEOUT_S = 20.0
+_REVERSE_MERGE_GRACE_S = float(os.environ.get("REVERSE_GEOCODE_MERGE_GRACE_S", "0.15"))
+
+# Offline reverse geocoder (services/offline_geocoder.py).  A fix coarser than
+# _OFFLINE_MIN_ACCURACY_M cannot name anything finer than a town anyway, so a
+# catalog town within _OFFLINE_CONFIDENT_KM answers without a network call;
+# within _OFFLINE_FALLBACK_KM it is the answer when both providers fail.
+_OFFLINE_MIN_ACCURACY_M = float(os.environ.get("OFFLINE_GEOCODE_MIN_ACCURACY_M", "1000"))
+_OFFLINE_CONFIDENT_KM = 10.0
+_OFFLINE_FALLBACK_KM = 60.0
 
 logger = logging.getLogger(__name__)
 
@@ -148,12 +169,24 @@ class LocationContext:
 class LocationResolver:
     """Resolve GPS, text, or IP into a single LocationContext."""
 
-    def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            "User-Agent": "KrishiMitra-AI/3.0 (agricultural-advisory; contact@krishimitra.in)",
-            "Accept": "application/json",
-        })
+    def __init__(self, geo_cache: Optional[ReverseGeocodeCache] = None):
+        self._local = threading.local()
+        self._geo_cache = geo_cache or _reverse_cache
+        self._flight = SingleFlight()
+        self.stats = {"cache_hits": 0, "offline_answers": 0, "offline_fallbacks": 0,
+                      "provider_races": 0, "race_failures": 0, "merged": 0, "late_upgrades": 0}
+
+    @property
+    def session(self) -> requests.Session:
+        """Per-thread Session — the reverse providers run concurrently on pool threads."""
+        if not hasattr(self._local, "session"):
+            s = requests.Session()
+            s.headers.update({
+                "User-Agent": "KrishiMitra-AI/3.0 (agricultural-advisory; contact@krishimitra.in)",
+                "Accept": "application/json",
+            })
+            self._local.session = s
+        return self._local.session
 
     def resolve(
         self,
@@ -242,15 +275,28 @@ class LocationResolver:
     def _resolve_gps(
         self, lat: float, lon: float, accuracy_meters: Optional[float]
     ) -> Optional[LocationContext]:
-        # Merge BigDataCloud + Nominatim for village/society/locality (Swiggy-style labels)
-        bdc = self._reverse_bigdatacloud(lat, lon, accuracy_meters)
-        nom = self._reverse_nominatim(lat, lon, accuracy_meters)
-        if bdc and nom:
-            return self._merge_reverse_results(bdc, nom, accuracy_meters)
-        if bdc:
-            return bdc
-        if nom:
-            return nom
+        key = cell_key(lat, lon)
+        cached = self._geo_cache.get(key)
+        if cached is not None:
+            self.stats["cache_hits"] += 1
+            return _context_from_cache(cached, lat, lon, accuracy_meters)
+
+        from .offline_geocoder import get_offline_geocoder
+        place = get_offline_geocoder().nearest(lat, lon)
+        if (place and accuracy_meters is not None and accuracy_meters >= _OFFLINE_MIN_ACCURACY_M
+                and place["distance_km"] <= _OFFLINE_CONFIDENT_KM):
+            self.stats["offline_answers"] += 1
+            return self._offline_context(lat, lon, accuracy_meters, place)
+
+        # Concurrent requests for one cell (weather + market + crop on page load) share one race.
+        ctx = self._flight.do(key, self._race_reverse_providers, lat, lon, accuracy_meters, key)
+        if ctx:
+            return replace(ctx, latitude=lat, longitude=lon, accuracy_meters=accuracy_meters,
+                           accuracy_label=_accuracy_label(accuracy_meters))
+
+        if place and place["distance_km"] <= _OFFLINE_FALLBACK_KM:
+            self.stats["offline_fallbacks"] += 1
+            return self._offline_context(lat, lon, accuracy_meters, place)
 
         return LocationContext(
             latitude=lat,
@@ -264,6 +310,98 @@ class LocationResolver:
             location_type="coordinates",
         )
 
+    def _race_reverse_providers(
+        self, lat: float, lon: float, accuracy_meters: Optional[float], key: str
+    ) -> Optional[LocationContext]:
+        """Run both reverse providers at once; cache and return the first valid answer."""
+        self.stats["provider_races"] += 1
+        futures = {
+            _REVERSE_POOL.submit(self._reverse_bigdatacloud, lat, lon, accuracy_meters): "bdc",
+            _REVERSE_POOL.submit(self._reverse_nominatim, lat, lon, accuracy_meters): "nom",
+        }
+        results: Dict[str, LocationContext] = {}
+        pending = set(futures)
+        deadline = time.monotonic() + _REVERSE_RACE_TIMEOUT_S
+        while pending and not results:
+            done, pending = wait(pending, timeout=max(0.0, deadline - time.monotonic()),
+                                 return_when=FIRST_COMPLETED)
+            if not done:
+                break
+            for fut in done:
+                ctx = _provider_result(fut)
+                if ctx:
+                    results[futures[fut]] = ctx
+        if not results:
+            self.stats["race_failures"] += 1
+            return None
+
+        if pending and _REVERSE_MERGE_GRACE_S > 0:
+            done, pending = wait(pending, timeout=_REVERSE_MERGE_GRACE_S)
+            for fut in done:
+                ctx = _provider_result(fut)
+                if ctx:
+                    results[futures[fut]] = ctx
+
+        ctx = self._combine_reverse_results(results, accuracy_meters)
+        self._geo_cache.set(key, ctx.to_dict())
+        for fut in pending:
+            fut.add_done_callback(
+                lambda f, first=dict(results): self._late_reverse_result(
+                    f, futures[f], first, accuracy_meters, key)
+            )
+        return ctx
+
+    def _combine_reverse_results(
+        self, results: Dict[str, LocationContext], accuracy_meters: Optional[float]
+    ) -> LocationContext:
+        # Merge BigDataCloud + Nominatim for village/society/locality (Swiggy-style labels)
+        if "bdc" in results and "nom" in results:
+            self.stats["merged"] += 1
+            return self._merge_reverse_results(results["bdc"], results["nom"], accuracy_meters)
+        return results.get("bdc") or results["nom"]
+
+    def _late_reverse_result(
+        self, fut: Future, provider: str, first: Dict[str, LocationContext],
+        accuracy_meters: Optional[float], key: str,
+    ) -> None:
+        """The race loser finished: upgrade the cached cell to the merged answer."""
+        ctx = _provider_result(fut)
+        if not ctx or provider in first:
+            return
+        both = dict(first, **{provider: ctx})
+        self.stats["late_upgrades"] += 1
+        self._geo_cache.set(key, self._combine_reverse_results(both, accuracy_meters).to_dict())
+
+    @staticmethod
+    def _offline_context(
+        lat: float, lon: float, accuracy_meters: Optional[float], place: Dict[str, Any]
+    ) -> LocationContext:
+        """LocationContext for the nearest catalog town (no network)."""
+        from .agro_profile_store import get_agro_profile_store
+
+        profile = get_agro_profile_store().resolve(place["name"], place["state"], lat, lon)
+        district = ""
+        if profile and profile["_source"] != "state_first_district":
+            district = profile["district"].title()
+        km = place["distance_km"]
+        return LocationContext(
+            latitude=lat,
+            longitude=lon,
+            display_name=place["name"],
+            city=place["name"],
+            district=district,
+            state=place["state"],
+            region=_region_from_state(place["state"]),
+            country="India",
+            location_type="city",
+            accuracy_meters=accuracy_meters,
+            accuracy_label=_accuracy_label(accuracy_meters),
+            source="offline_city_catalog",
+            confidence=round(max(0.55, 0.8 - 0.005 * km), 2),
+            is_gps=True,
+            full_address=f"{place['name']}, {place['state']}, India",
+        )
+
     @staticmethod
     def _merge_reverse_results(
         bdc: LocationContext,
@@ -387,25 +525,14 @@ class LocationResolver:
     def _reverse_nominatim(
         self, lat: float, lon: float, accuracy_meters: Optional[float]
     ) -> Optional["LocationContext"]:
-        """Thread-safe, cached Nominatim reverse geocode.
+        """Thread-safe Nominatim reverse geocode.
 
         Uses a global lock so concurrent requests from multiple services
         (weather, market, crop, field-advisory) on page load never fire
         Nominatim simultaneously — which caused 'Rate limit exceeded' HTTP 500.
-        Results are cached in-process by rounded coordinates.
+        Results are cached per cell by _resolve_gps (services/geocode_cache.py).
         """
-        # Round to ~100 m grid for cache key
-        cache_key = (round(lat, 3), round(lon, 3))
-        cached = _reverse_cache.get(cache_key)
-        if cached is not None:
-            return cached
-
         with _nominatim_lock:
-            # Double-check inside lock (another thread may have filled it)
-            cached = _reverse_cache.get(cache_key)
-            if cached is not None:
-                return cached
-
             # Honour Nominatim 1 req/sec policy
             if not nominatim_limiter.is_allowed("_reverse_nominatim"):
                 wait = nominatim_limiter.wait_time("_reverse_nominatim")
@@ -435,7 +562,7 @@ class LocationResolver:
                 parsed = _parse_osm_address(address, data.get("display_name", ""))
                 display = _pick_display_name(**parsed)
 
-                result = LocationContext(
+                return LocationContext(
                     latitude=lat,
                     longitude=lon,
                     display_name=display,
@@ -458,9 +585,6 @@ class LocationResolver:
                     is_gps=True,
                     full_address=data.get("display_name", display),
                 )
-                # Cache for the lifetime of this worker process
-                _reverse_cache[cache_key] = result
-                return result
 
             except requests.RequestException as exc:
                 logger.debug("Nominatim reverse failed: %s", exc)
@@ -468,14 +592,9 @@ class LocationResolver:
 
     def _resolve_known_place(self, query: str, fuzzy: bool = False) -> Optional[LocationContext]:
         """Resolve major Indian cities without external geocoding."""
-        key = query.strip().lower()
-        entry = KNOWN_INDIAN_PLACES.get(key)
-        if not entry and fuzzy:
-            for name, data in KNOWN_INDIAN_PLACES.items():
-                if name in key or key in name:
-                    entry = data
-                    key = name
-                    break
+        from .agro_profile_store import get_agro_profile_store
+
+        entry = get_agro_profile_store().known_place(query, fuzzy=fuzzy)
         if not entry:
             return None
         city = entry["city"]
@@ -705,6 +824,28 @@ def _accuracy_label(accuracy_meters: Optional[float]) -> str:
     return "low"
 
 
+_CONTEXT_FIELDS = frozenset(f.name for f in fields(LocationContext))
+
+
+def _context_from_cache(
+    payload: Dict[str, Any], lat: float, lon: float, accuracy_meters: Optional[float]
+) -> LocationContext:
+    """Cached cell → LocationContext for this request's exact fix."""
+    ctx = LocationContext(**{k: v for k, v in payload.items() if k in _CONTEXT_FIELDS})
+    return replace(
+        ctx, latitude=lat, longitude=lon, accuracy_meters=accuracy_meters,
+        accuracy_label=_accuracy_label(accuracy_meters), timestamp=datetime.now().isoformat(),
+    )
+
+
+def _provider_result(fut: Future) -> Optional[LocationContext]:
+    try:
+        return fut.result()
+    except Exception as exc:
+        logger.debug("Reverse geocode provider failed: %s", exc)
+        return None
+
+
 def _region_from_state(state: str) -> str:
     s = (state or "").lower()
     if any(k in s for k in ("delhi", "punjab", "haryana", "rajasthan", "himachal", "uttarakhand", "jammu", "kashmir", "ladakh")):
@@ -0,0 +1,253 @@
+"""
+KrishiMitra — process-wide spatial index over the reference mandi database
+==========================================================================
+One index per process, built on first use from EnhancedMarketPricesService's
+nationwide APMC list.  That list ships with the code, so a deploy (a new
+process) is its only refresh.  It answers:
+
+  nearest(lat, lon, k, commodity=, state=)      — k closest mandis
+  within(lat, lon, radius_km, commodity=, ...)  — everything inside a radius
+  distances(lat, lon, names)                    — km to named mandis (live
+                                                  data.gov rows carry names,
+                                                  not coordinates)
+
+Large row sets are backed by a scikit-learn BallTree on (lat, lon) radians
+with the haversine metric.  Below _TREE_MIN_ROWS — which covers the current
+reference list of a couple of hundred APMCs — a single vectorised NumPy
+haversine + argsort beats the tree's per-query overhead, so that is used
+instead (and is also the fallback without scikit-learn).  Commodity / state
+filters get their own cached sub-index, so a filtered k-NN never scans rows
+that cannot match.
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+try:
+    from sklearn.neighbors import BallTree
+    HAS_SKLEARN = True
+except ImportError:
+    BallTree = None
+    HAS_SKLEARN = False
+
+EARTH_RADIUS_KM = 6371.0
+# Measured: ~33 µs brute force vs ~100 µs BallTree k=10 at 194 rows.
+_TREE_MIN_ROWS = 2000
+
+# Specialty strings in the reference DB name categories ("Grains & Pulses"),
+# so a commodity also matches the categories it belongs to.
+_COMMODITY_CATEGORIES: Dict[str, Tuple[str, ...]] = {
+    "grains":     ("wheat", "rice", "paddy", "maize", "bajra", "jowar", "barley", "ragi", "millet"),
+    "pulses":     ("gram", "chana", "tur", "arhar", "moong", "urad", "masoor", "lentil", "peas", "rajma"),
+    "vegetables": ("potato", "onion", "tomato", "brinjal", "cabbage", "cauliflower", "okra", "peas",
+                   "chilli", "garlic", "ginger", "capsicum"),
+    "fruits":     ("mango", "banana", "apple", "grapes", "orange", "pomegranate", "papaya", "guava",
+                   "litchi", "pineapple"),
+    "oilseeds":   ("mustard", "groundnut", "soybean", "sunflower", "sesame", "castor"),
+    "spices":     ("turmeric", "chilli", "cumin", "coriander", "cardamom", "pepper", "ginger", "garlic"),
+}
+_ALL_CROPS_MARKERS = ("all crops", "all commodities")
+_TOKEN_RE = re.compile(r"[a-z]+")
+
+
+def haversine_km_many(lat: float, lon: float, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    """Great-circle km from one point to arrays of points (degrees in)."""
+    p1 = np.radians(lat)
+    p2 = np.radians(lats)
+    dlat = p2 - p1
+    dlon = np.radians(lons) - np.radians(lon)
+    a = np.sin(dlat / 2) ** 2 + np.cos(p1) * np.cos(p2) * np.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def _norm_name(name: Any) -> str:
+    return str(name or "").strip().lower()
+
+
+class _SubIndex:
+    """Row subset + its tree (or None → brute force)."""
+
+    __slots__ = ("idx", "rad", "tree")
+
+    def __init__(self, idx: np.ndarray, rad: np.ndarray):
+        self.idx = idx
+        self.rad = rad[idx]
+        self.tree = (
+            BallTree(self.rad, metric="haversine")
+            if HAS_SKLEARN and len(idx) >= _TREE_MIN_ROWS else None
+        )
+
+    def query(self, lat: float, lon: float, k: Optional[int], radius_km: Optional[float]):
+        """(row indices, distances km) sorted nearest-first."""
+        n = len(self.idx)
+        if not n:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        point = np.radians([[lat, lon]])
+        if self.tree is not None:
+            if radius_km is not None:
+                ind, dist = self.tree.query_radius(
+                    point, r=radius_km / EARTH_RADIUS_KM, return_distance=True, sort_results=True
+                )
+                ind, dist = ind[0], dist[0]
+                if k is not None:
+                    ind, dist = ind[:k], dist[:k]
+            else:
+                dist, ind = self.tree.query(point, k=min(k or n, n))
+                ind, dist = ind[0], dist[0]
+            return self.idx[ind], dist * EARTH_RADIUS_KM
+
+        dist = haversine_km_many(lat, lon, np.degrees(self.rad[:, 0]), np.degrees(self.rad[:, 1]))
+        order = np.argsort(dist, kind="stable")
+        if radius_km is not None:
+            order = order[dist[order] <= radius_km]
+        if k is not None:
+            order = order[:k]
+        return self.idx[order], dist[order]
+
+
+class MandiIndex:
+    """Immutable spatial index over mandi rows with latitude/longitude."""
+
+    _MAX_SUBINDEXES = 128
+
+    def __init__(self, rows: Sequence[Dict[str, Any]]):
+        self.rows: List[Dict[str, Any]] = [
+            r for r in rows if r.get("latitude") is not None and r.get("longitude") is not None
+        ]
+        self.built_at = time.time()
+        lat = np.array([float(r["latitude"]) for r in self.rows], dtype=np.float64)
+        lon = np.array([float(r["longitude"]) for r in self.rows], dtype=np.float64)
+        self._rad = np.radians(np.column_stack([lat, lon])) if self.rows else np.empty((0, 2))
+        self._by_name: Dict[str, int] = {}
+        for i, r in enumerate(self.rows):
+            self._by_name.setdefault(_norm_name(r.get("name")), i)
+        self._states = [_norm_name(r.get("state")) for r in self.rows]
+        self._terms = [self._row_terms(r) for r in self.rows]
+        self._all = _SubIndex(np.arange(len(self.rows)), self._rad)
+        self._subs: Dict[Tuple[str, str], _SubIndex] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    @staticmethod
+    def _row_terms(row: Dict[str, Any]) -> Optional[frozenset]:
+        """Commodities a mandi trades; None = all crops."""
+        specialty = _norm_name(row.get("specialty"))
+        if not specialty or any(m in specialty for m in _ALL_CROPS_MARKERS):
+            return None
+        terms = set(_TOKEN_RE.findall(specialty))
+        for category, members in _COMMODITY_CATEGORIES.items():
+            if category in terms or category.rstrip("s") in terms:
+                terms.update(members)
+        return frozenset(terms)
+
+    def _matches(self, i: int, commodity: str, state: str) -> bool:
+        if state:
+            row_state = self._states[i]
+            if not (state in row_state or (row_state and row_state in state)):
+                return False
+        if commodity:
+            terms = self._terms[i]
+            if terms is not None and commodity not in terms and commodity.rstrip("s") not in terms:
+                return False
+        return True
+
+    def _sub(self, commodity: Optional[str], state: Optional[str]) -> _SubIndex:
+        commodity, state = _norm_name(commodity), _norm_name(state)
+        if not commodity and not state:
+            return self._all
+        key = (commodity, state)
+        sub = self._subs.get(key)
+        if sub is None:
+            idx = np.array([i for i in range(len(self.rows)) if self._matches(i, commodity, state)],
+                           dtype=np.int64)
+            sub = _SubIndex(idx, self._rad)
+            with self._lock:
+                if len(self._subs) >= self._MAX_SUBINDEXES:
+                    self._subs.clear()
+                self._subs[key] = sub
+        return sub
+
+    # ── Queries ────────────────────────────────────────────────────────
+    def nearest(
+        self,
+        lat: float,
+        lon: float,
+        k: Optional[int] = 10,
+        commodity: Optional[str] = None,
+        state: Optional[str] = None,
+    ) -> List[Tuple[float, Dict[str, Any]]]:
+        """(distance_km, row) for the k nearest mandis; k=None → all, sorted."""
+        ind, dist = self._sub(commodity, state).query(lat, lon, k, None)
+        return [(float(d), self.rows[i]) for i, d in zip(ind.tolist(), dist.tolist())]
+
+    def within(
+        self,
+        lat: float,
+        lon: float,
+        radius_km: float,
+        commodity: Optional[str] = None,
+        state: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> List[Tuple[float, Dict[str, Any]]]:
+        """(distance_km, row) for mandis within radius_km, nearest first."""
+        ind, dist = self._sub(commodity, state).query(lat, lon, limit, radius_km)
+        return [(float(d), self.rows[i]) for i, d in zip(ind.tolist(), dist.tolist())]
+
+    def lookup(self, name: str) -> Optional[Dict[str, Any]]:
+        i = self._by_name.get(_norm_name(name))
+        return self.rows[i] if i is not None else None
+
+    def distances(self, lat: float, lon: float, names: Iterable[str]) -> List[Optional[float]]:
+        """km from (lat, lon) to each named mandi (None when not in the index)."""
+        idx = [self._by_name.get(_norm_name(n), -1) for n in names]
+        known = [i for i in idx if i >= 0]
+        if not known:
+            return [None] * len(idx)
+        rad = self._rad[known]
+        km = haversine_km_many(lat, lon, np.degrees(rad[:, 0]), np.degrees(rad[:, 1])).tolist()
+        it = iter(km)
+        return [next(it) if i >= 0 else None for i in idx]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "mandis":      len(self.rows),
+            "backend":     "balltree" if self._all.tree is not None else "numpy",
+            "subindexes":  len(self._subs),
+            "built_at":    self.built_at,
+        }
+
+
+_INDEX_LOCK = threading.Lock()
+_index: Optional[MandiIndex] = None
+
+
+def _reference_rows() -> List[Dict[str, Any]]:
+    from .enhanced_market_prices import EnhancedMarketPricesService
+    return EnhancedMarketPricesService._nationwide_mandi_rows()
+
+
+def get_mandi_index() -> MandiIndex:
+    """Shared index, built once per process (double-checked locking)."""
+    global _index
+    if _index is not None:
+        return _index
+    with _INDEX_LOCK:
+        if _index is None:
+            t0 = time.perf_counter()
+            _index = MandiIndex(_reference_rows())
+            logger.info(
+                "Mandi index built: %d mandis (%s) in %.1f ms",
+                len(_index), _index.stats()["backend"], (time.perf_counter() - t0) * 1000,
+            )
+    return _index
@@ -0,0 +1,111 @@
+"""
+Offline reverse geocoder — the nearest known town for a GPS point, no network.
+
+Points come from city_catalog._INDIAN_CITY_CATALOG (≈250 cities and towns)
+plus the district headquarters in district_data.DISTRICT_COORDS that the
+catalog does not already cover.  One vectorised haversine over a few hundred
+points is ~20 µs, against 100 ms–1 s for BigDataCloud/Nominatim.
+
+The geocoder only reports the nearest place and its distance; LocationResolver
+decides whether that is confident enough to answer with (coarse fixes close
+to a known town) or only good as a fallback when both providers fail.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_EARTH_KM = 6371.0
+# A district HQ this close to a catalog city is the same place.
+_SAME_PLACE_KM = 3.0
+
+
+def _haversine_km(lat, lon, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    plat, plon = np.radians(lat), np.radians(lon)
+    h = (np.sin((lats - plat) / 2) ** 2
+         + np.cos(plat) * np.cos(lats) * np.sin((lons - plon) / 2) ** 2)
+    return 2 * _EARTH_KM * np.arcsin(np.sqrt(np.minimum(h, 1.0)))
+
+
+class OfflineReverseGeocoder:
+    """Nearest catalog town / district HQ for a point."""
+
+    def __init__(
+        self,
+        catalog: Mapping[str, Tuple[str, str, float, float]],
+        district_coords: Mapping[str, Tuple[float, float]],
+        district_profiles: Mapping[str, Mapping[str, Any]],
+    ):
+        names: List[str] = []
+        states: List[str] = []
+        kinds: List[str] = []
+        coords: List[Tuple[float, float]] = []
+        seen = set()
+        for display, state, lat, lon in catalog.values():
+            key = (display, round(lat, 3), round(lon, 3))
+            if key in seen:
+                continue
+            seen.add(key)
+            names.append(display)
+            states.append(state)
+            kinds.append("city")
+            coords.append((lat, lon))
+
+        lats = np.radians([c[0] for c in coords])
+        lons = np.radians([c[1] for c in coords])
+        for district, (lat, lon) in district_coords.items():
+            if coords and _haversine_km(lat, lon, lats, lons).min() <= _SAME_PLACE_KM:
+                continue
+            names.append(district.title())
+            states.append(district_profiles.get(district, {}).get("state", ""))
+            kinds.append("district_hq")
+            coords.append((lat, lon))
+
+        self._names = tuple(names)
+        self._states = tuple(states)
+        self._kinds = tuple(kinds)
+        self._coords = tuple(coords)
+        self._lats = np.radians([c[0] for c in coords])
+        self._lons = np.radians([c[1] for c in coords])
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def nearest(self, lat: float, lon: float) -> Optional[Dict[str, Any]]:
+        """{"name", "state", "kind", "latitude", "longitude", "distance_km"} or None."""
+        if not self._names:
+            return None
+        d = _haversine_km(lat, lon, self._lats, self._lons)
+        i = int(np.argmin(d))
+        return {
+            "name": self._names[i],
+            "state": self._states[i],
+            "kind": self._kinds[i],
+            "latitude": self._coords[i][0],
+            "longitude": self._coords[i][1],
+            "distance_km": float(d[i]),
+        }
+
+
+_GEOCODER_LOCK = threading.Lock()
+_geocoder: Optional[OfflineReverseGeocoder] = None
+
+
+def get_offline_geocoder() -> OfflineReverseGeocoder:
+    """Shared geocoder, built once per process (double-checked locking)."""
+    global _geocoder
+    if _geocoder is not None:
+        return _geocoder
+    with _GEOCODER_LOCK:
+        if _geocoder is None:
+            from .city_catalog import _INDIAN_CITY_CATALOG
+            from .district_data import DISTRICT_COORDS, DISTRICT_PROFILES
+            _geocoder = OfflineReverseGeocoder(_INDIAN_CITY_CATALOG, DISTRICT_COORDS, DISTRICT_PROFILES)
+            logger.info("Offline reverse geocoder: %d places", len(_geocoder))
+    return _geocoder
@@ -0,0 +1,186 @@
+"""
+KrishiMitra — compiled matchers for chat query classification
+==============================================================
+Built once at import and shared by ChatIntelligenceService.classify_query():
+
+  ReplacementTable   Hinglish / regional spelling normaliser.  One regex
+                     compiled from a character trie of every variant, so a
+                     query is rewritten in a single left-to-right pass
+                     instead of one str.replace() per table entry.
+  IntentMatcher      The ordered (intent, [regex, ...]) table folded into one
+                     precompiled alternation per intent.  Intents are still
+                     tried in priority order (first hit wins), but each costs
+                     one search() instead of a cache lookup + search() per
+                     raw pattern string.
+  KeywordIndex       Every keyword of a fixed set that occurs in a text — the
+                     answer to ``kw in text`` for all of them — from one regex
+                     pass (used by KnowledgeBase's tier-0 lookup).
+
+All three preserve the semantics of the loops they replace; the parity/throughput
+harnesses are scripts/bench_intent_classifier.py and
+scripts/bench_knowledge_base.py.
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+from typing import Dict, FrozenSet, Iterable, List, Optional, Sequence, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def _trie_regex(words: Sequence[str]) -> str:
+    """Regex source matching any of ``words``, longest alternative first."""
+    trie: Dict[str, dict] = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def emit(node: Dict[str, dict]) -> str:
+        terminal = "" in node
+        branches = [re.escape(ch) + emit(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if terminal:
+            # Greedy optional: try the longer word first, fall back to this one.
+            return "(?:" + body + ")?" if len(branches) > 1 or len(body) > 1 else body + "?"
+        return body
+
+    return emit(trie)
+
+
+class ReplacementTable:
+    """
+    Single-pass equivalent of ``for k, v in mapping.items(): t = t.replace(k, v)``.
+
+    The sequential loop lets a later entry rewrite the output of an earlier
+    one ("havaman" → "mausam weather", then "mausam" → "mausam weather").
+    That chaining is resolved here at build time by pushing every value
+    through the entries that follow it, so one pass yields the same text.
+    """
+
+    def __init__(self, mapping: Dict[str, str]):
+        items = list(mapping.items())
+        resolved: Dict[str, str] = {}
+        for i, (key, value) in enumerate(items):
+            for later_key, later_value in items[i + 1:]:
+                value = value.replace(later_key, later_value)
+            resolved[key] = value
+        self._map = resolved
+        self._re = re.compile(_trie_regex(list(resolved))) if resolved else None
+
+    def __call__(self, text: str) -> str:
+        t = text.lower()
+        if self._re is None:
+            return t
+        return self._re.sub(lambda m: self._map[m.group(0)], t)
+
+
+class IntentMatcher:
+    """
+    Ordered intent table → one compiled alternation per intent.
+
+    ``re.search(p1|p2|...)`` succeeds exactly when some ``re.search(pi)``
+    does, so first-intent-wins ordering is unchanged.  Patterns that fail to
+    compile are dropped (the old loop skipped them on ``re.error`` every call).
+    ``max_len`` caps the query length an intent may fire on (greetings must
+    not swallow long messages).
+    """
+
+    def __init__(
+        self,
+        patterns: Sequence[Tuple[str, Sequence[str]]],
+        flags: int = re.IGNORECASE | re.UNICODE,
+        max_len: Optional[Dict[str, int]] = None,
+    ):
+        max_len = max_len or {}
+        self._table: List[Tuple[str, "re.Pattern[str]", Optional[int]]] = []
+        for intent, pats in patterns:
+            valid = []
+            for pat in pats:
+                try:
+                    re.compile(pat, flags)
+                except re.error as exc:
+                    logger.warning("Dropping invalid %s intent pattern %r: %s", intent, pat, exc)
+                    continue
+                valid.append("(?:" + pat + ")")
+            if valid:
+                self._table.append((intent, re.compile("|".join(valid), flags), max_len.get(intent)))
+
+    def match(self, text: str) -> Optional[str]:
+        """First intent (in table order) with a pattern found in ``text``."""
+        n = len(text)
+        for intent, rx, limit in self._table:
+            if limit is not None and n > limit:
+                continue
+            if rx.search(text):
+                return intent
+        return None
+
+
+class KeywordIndex:
+    """
+    Substring keyword automaton: ``find(text)`` is ``{kw for kw in keywords if kw in text}``.
+
+    One left-to-right search over the keyword trie (which lets ``re`` skip
+    non-candidate characters in C) reports the longest keyword at the
+    leftmost position that has one.  Every keyword starting inside that match
+    either ends inside it — and is among the keywords it contains,
+    precomputed at build time — or runs past its end, which can only happen
+    from offsets fixed by the keyword itself; the search resumes at the first
+    such offset (or at the end of the match).  Single-character keywords
+    would match almost everywhere and are tested with ``in`` instead.
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        words = sorted({k for k in keywords if k})
+        self._contains: Dict[str, FrozenSet[str]] = {
+            k: frozenset(w for w in words if w in k) for k in words
+        }
+        self._chars = [w for w in words if len(w) == 1]
+        longer = [w for w in words if len(w) > 1]
+        # A keyword can run past the end of ``k`` from offset t iff k[t:] is a proper prefix of one.
+        proper_prefixes = {w[:j] for w in longer for j in range(1, len(w))}
+        self._resume: Dict[str, int] = {
+            k: next((t for t in range(1, len(k)) if k[t:] in proper_prefixes), len(k)) for k in longer
+        }
+        self._search = re.compile(_trie_regex(longer)).search if longer else None
+
+    def __len__(self) -> int:
+        return len(self._contains)
+
+    def __iter__(self):
+        return iter(self._contains)
+
+    def hits(self, text: str) -> List[str]:
+        """
+        Keywords found by the single pass; the union of their ``contained()``
+        sets is ``find(text)``.  A keyword may repeat.
+        """
+        found = [c for c in self._chars if c in text]
+        search, resume = self._search, self._resume
+        if search is None:
+            return found
+        pos = 0
+        while True:
+            m = search(text, pos)
+            if m is None:
+                return found
+            kw = m.group()
+            found.append(kw)
+            pos = m.start() + resume[kw]
+
+    def contained(self, keyword: str) -> FrozenSet[str]:
+        """Every indexed keyword occurring inside ``keyword`` (itself included)."""
+        return self._contains[keyword]
+
+    def find(self, text: str) -> Set[str]:
+        found: Set[str] = set()
+        contains = self._contains
+        for kw in self.hits(text):
+            found |= contains[kw]
+        return found
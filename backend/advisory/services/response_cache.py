@@ -0,0 +1,358 @@
+"""
+KrishiMitra — response cache for the LLM answer tiers
+=====================================================
+Sits in front of Tier 1 (krishimitra-llm via Phase 1) and Tier 2 (Gemini) in
+ChatIntelligenceService.answer().  "wheat sowing time" asked by a thousand
+farmers in one district in one week should cost one generation, not a
+thousand multi-second ones.
+
+An answer is filed under a *context bucket*:
+
+    intent · crop ids · location cell (0.25°) · language · freshness window
+    · digest of the live context the prompt was grounded on
+    · generation counters (global and per cell, bumped by invalidate())
+
+and, inside the bucket, under its normalised query text.  Lookups try
+
+  1. exact     — same normalised query in the same bucket (one cache GET)
+  2. semantic  — cosine similarity of hashed character-trigram query vectors
+                 against the bucket's recent queries, ≥ RESPONSE_CACHE_SIM
+                 (default 0.90) — and only when the two queries carry the
+                 same content words once stopwords are dropped (crop,
+                 input, pest, symptom, colour, number, negation), compared
+                 after folding Hinglish spelling drift ("gehun" = "gehu",
+                 "paani" = "pani").  A trigram vector barely moves when
+                 "urea" becomes "potash" or "yellow" becomes "brown", so the
+                 similarity alone would serve a wrong answer
+
+Context changes invalidate implicitly: a new weather alert, a moved price
+or a new freshness window produces a new bucket, and the old one ages out
+on its TTL.  invalidate() drops everything (or one cell) explicitly.
+
+Storage is the ``response_cache`` cache alias (Redis in production, shared by
+every worker), falling back to ``default``.  Personalised turns — with a
+farmer profile or conversation history — are never cached.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import re
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "1") not in ("0", "false", "False")
+RESPONSE_CACHE_SIM     = float(os.getenv("RESPONSE_CACHE_SIM", "0.90"))
+_CELL_DEG              = float(os.getenv("RESPONSE_CACHE_CELL_DEG", "0.25"))   # ~28 km
+_BUCKET_MAX            = 48      # recent queries kept per bucket for the semantic pass
+_VEC_DIM               = 512
+_KEY_PREFIX            = "krishimitra:rc:v1"
+
+# Freshness window per intent: answers grounded on fast-moving data expire
+# sooner.  Everything else (agronomy, schemes, …) is good for a day.
+_FRESHNESS_S: Dict[str, int] = {
+    "weather":      3 * 3600,
+    "irrigation":   6 * 3600,
+    "market_price": 6 * 3600,
+    "storage":      12 * 3600,
+    "profit_calc":  12 * 3600,
+}
+_DEFAULT_FRESHNESS_S = 24 * 3600
+
+_PUNCT_RE  = re.compile(r"[^\w\sऀ-ॿ]")
+_SPACE_RE  = re.compile(r"\s+")
+_NUMBER_RE = re.compile(r"\d+(?:\.\d+)?")
+# Negation words (English / Hinglish / Hindi).  A trigram vector barely
+# moves when one is added, but the answer flips.
+_NEGATIONS = frozenset({
+    "not", "no", "dont", "never", "na", "nahi", "nahin", "nhi", "mat", "bina", "मत", "नहीं", "नही", "ना", "बिना",
+})
+
+
+# Function words that do not change what is being asked.  Question words
+# other than "what"/"kya" (kab, kitna, kaise, when, how, …) stay content:
+# "when to sow" and "how to sow" have different answers.
+_STOPWORDS = frozenset({
+    "a", "an", "the", "is", "are", "am", "was", "be", "do", "does", "i", "me", "my", "we", "our", "you",
+    "it", "this", "that", "of", "in", "on", "at", "to", "for", "with", "and", "or", "what", "please", "plz",
+    "ka", "ki", "ke", "ko", "se", "mein", "mai", "main", "par", "pe", "hai", "hain", "ho", "tha", "thi",
+    "kya", "aur", "ya", "mera", "meri", "mere", "hum", "hamara", "hamari", "ji", "bhai", "sir",
+    "का", "की", "के", "को", "से", "में", "पर", "है", "हैं", "हो", "क्या", "और", "या", "मेरा", "मेरी", "मेरे", "जी",
+})
+# Romanised-Hindi spelling drift, folded before comparing content words.
+_FOLDS = (("w", "v"), ("z", "j"), ("ph", "f"), ("sh", "s"), ("ee", "i"), ("oo", "u"))
+_REPEAT_RE = re.compile(r"(.)\1+")
+_ASPIRATE_RE = re.compile(r"(?<=[bcdgjkpt])h|(?<=[aeiou])h(?=[aeiou])")
+
+
+def _fold(token: str) -> str:
+    if not (token.isascii() and token.isalpha()):
+        return token                              # numbers and Devanagari as written
+    for src, dst in _FOLDS:
+        token = token.replace(src, dst)
+    token = _ASPIRATE_RE.sub("", _REPEAT_RE.sub(r"\1", token))
+    if len(token) > 3:
+        if token.endswith("ein"):
+            token = token[:-2]                    # karein → kare, kismein → kisme
+        elif token.endswith("n") and token[-2] in "aeiou":
+            token = token[:-1]                    # gehun → gehu, sarson → sarso
+    return token
+
+
+def content_words(q_norm: str) -> frozenset:
+    """Folded non-stopword tokens of a normalised query — what it is asking about."""
+    return frozenset(_fold(tok) for tok in q_norm.split() if tok not in _STOPWORDS)
+
+
+def negations(q_norm: str) -> List[str]:
+    """Negation tokens of a normalised query, in order ("don't" normalises to "don t")."""
+    tokens = q_norm.split()
+    found = []
+    for i, tok in enumerate(tokens):
+        if tok in _NEGATIONS:
+            found.append(tok)
+        elif tok == "t" and i and tokens[i - 1].endswith("n"):
+            found.append("n't")
+    return found
+
+
+def normalise_query(text: str) -> str:
+    """Lower-case, drop punctuation, collapse whitespace."""
+    return _SPACE_RE.sub(" ", _PUNCT_RE.sub(" ", (text or "").lower())).strip()
+
+
+def query_vector(text: str, dim: int = _VEC_DIM) -> np.ndarray:
+    """
+    L2-normalised hashed character-trigram vector of a normalised query.
+    Robust to word order, Hinglish spelling drift and small typos; cheap
+    enough (~20 µs) to run on every chat turn without a model call.
+    """
+    vec = np.zeros(dim, dtype=np.float32)
+    for word in text.split():
+        padded = f" {word} "
+        for i in range(len(padded) - 2):
+            h = int.from_bytes(hashlib.blake2b(padded[i:i + 3].encode("utf-8"), digest_size=4).digest(), "little")
+            vec[h % dim] += 1.0
+    norm = float(np.linalg.norm(vec))
+    return vec / norm if norm else vec
+
+
+def location_cell(lat: Optional[float], lon: Optional[float], region: str = "") -> str:
+    if lat is not None and lon is not None:
+        g = _CELL_DEG
+        return f"{round(lat / g) * g:.2f},{round(lon / g) * g:.2f}"
+    return (region or "unknown").strip().lower() or "unknown"
+
+
+def _digest(parts: Iterable[Any]) -> str:
+    return hashlib.sha1(repr(tuple(parts)).encode("utf-8")).hexdigest()[:16]
+
+
+def _response_cache_backend():
+    try:
+        from django.core.cache import caches
+        try:
+            return caches["response_cache"]
+        except Exception:
+            return caches["default"]
+    except Exception:
+        return None
+
+
+class ResponseCache:
+    """Exact + near-duplicate answer cache over a Django cache backend."""
+
+    def __init__(self, cache=None, threshold: float = RESPONSE_CACHE_SIM, enabled: bool = RESPONSE_CACHE_ENABLED):
+        self._cache = cache
+        self.threshold = threshold
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Any] = {
+            "lookups": 0, "exact_hits": 0, "semantic_hits": 0, "misses": 0,
+            "stores": 0, "errors": 0, "invalidations": 0, "bypassed": {},
+        }
+        self._sim_sum = 0.0
+
+    @property
+    def cache(self):
+        return self._cache if self._cache is not None else _response_cache_backend()
+
+    def _count(self, key: str, n: int = 1) -> None:
+        with self._lock:
+            self._stats[key] += n
+
+    def bypass(self, reason: str) -> None:
+        """Record a turn that was not eligible for caching."""
+        with self._lock:
+            self._stats["bypassed"][reason] = self._stats["bypassed"].get(reason, 0) + 1
+
+    # ── Keys ──────────────────────────────────────────────────────────
+    @staticmethod
+    def freshness_s(intent: str) -> int:
+        return _FRESHNESS_S.get(intent, _DEFAULT_FRESHNESS_S)
+
+    def _generations(self, cell: str) -> Tuple[int, int]:
+        keys = [f"{_KEY_PREFIX}:gen", f"{_KEY_PREFIX}:gen:{cell}"]
+        got = self.cache.get_many(keys) or {}
+        return int(got.get(keys[0]) or 0), int(got.get(keys[1]) or 0)
+
+    def bucket_for(
+        self,
+        *,
+        intent: str,
+        crops: Sequence[str],
+        lat: Optional[float],
+        lon: Optional[float],
+        region: str,
+        lang: str,
+        context: Sequence[Any] = (),
+        now: Optional[float] = None,
+    ) -> Optional[str]:
+        """Context bucket id for this turn, or None when the cache is off/unreachable."""
+        if not self.enabled or self.cache is None:
+            return None
+        cell = location_cell(lat, lon, region)
+        window = self.freshness_s(intent)
+        epoch = int((now if now is not None else time.time()) // window)
+        try:
+            gen_all, gen_cell = self._generations(cell)
+        except Exception as exc:
+            self._count("errors")
+            logger.debug("Response cache unavailable: %s", exc)
+            return None
+        return _digest((intent, tuple(sorted(crops)), cell, lang, window, epoch,
+                        _digest(context), gen_all, gen_cell))
+
+    @staticmethod
+    def _entry_key(bucket: str, q_norm: str) -> str:
+        return f"{_KEY_PREFIX}:e:{bucket}:{hashlib.sha1(q_norm.encode('utf-8')).hexdigest()}"
+
+    @staticmethod
+    def _index_key(bucket: str) -> str:
+        return f"{_KEY_PREFIX}:i:{bucket}"
+
+    # ── Lookup / store ────────────────────────────────────────────────
+    def get(self, query: str, bucket: Optional[str]) -> Optional[Dict[str, Any]]:
+        """
+        Cached {"response", "data_source", "match", "similarity"} for this
+        query in this bucket, or None.
+        """
+        if bucket is None:
+            return None
+        q_norm = normalise_query(query)
+        if not q_norm:
+            return None
+        self._count("lookups")
+        cache = self.cache
+        try:
+            entry = cache.get(self._entry_key(bucket, q_norm))
+            if entry is not None:
+                self._count("exact_hits")
+                return dict(entry, match="exact", similarity=1.0)
+
+            index = cache.get(self._index_key(bucket)) or []
+            best = self._nearest(q_norm, index)
+            if best is not None:
+                sim, cand_norm = best
+                entry = cache.get(self._entry_key(bucket, cand_norm))
+                if entry is not None:
+                    with self._lock:
+                        self._stats["semantic_hits"] += 1
+                        self._sim_sum += sim
+                    logger.debug("Response cache semantic hit %.3f: %r ≈ %r", sim, q_norm, cand_norm)
+                    return dict(entry, match="semantic", similarity=round(sim, 3))
+        except Exception as exc:
+            self._count("errors")
+            logger.debug("Response cache lookup failed: %s", exc)
+        self._count("misses")
+        return None
+
+    def _nearest(self, q_norm: str, index: List[Tuple[str, bytes]]) -> Optional[Tuple[float, str]]:
+        if not index:
+            return None
+        matrix = np.frombuffer(b"".join(vec for _, vec in index), dtype=np.float32).reshape(len(index), -1)
+        if matrix.shape[1] != _VEC_DIM:
+            return None
+        sims = matrix @ query_vector(q_norm)
+        numbers = _NUMBER_RE.findall(q_norm)
+        negated = negations(q_norm)
+        words = content_words(q_norm)
+        for i in np.argsort(-sims, kind="stable"):
+            sim = float(sims[i])
+            if sim < self.threshold:
+                return None
+            cand = index[i][0]
+            if (_NUMBER_RE.findall(cand) == numbers and negations(cand) == negated
+                    and content_words(cand) == words):
+                return sim, cand
+        return None
+
+    def put(self, query: str, bucket: Optional[str], response: str, data_source: str, intent: str) -> None:
+        if bucket is None or not response:
+            return
+        q_norm = normalise_query(query)
+        if not q_norm:
+            return
+        ttl = self.freshness_s(intent)
+        cache = self.cache
+        try:
+            cache.set(
+                self._entry_key(bucket, q_norm),
+                {"response": response, "data_source": data_source, "query": q_norm, "stored_at": time.time()},
+                ttl,
+            )
+            # Read-modify-write of the bucket index: a lost update under a race
+            # only costs a future semantic hit, never a wrong answer.
+            index = [(q, v) for q, v in (cache.get(self._index_key(bucket)) or []) if q != q_norm]
+            index.append((q_norm, query_vector(q_norm).tobytes()))
+            cache.set(self._index_key(bucket), index[-_BUCKET_MAX:], ttl)
+            self._count("stores")
+        except Exception as exc:
+            self._count("errors")
+            logger.debug("Response cache store failed: %s", exc)
+
+    # ── Invalidation ──────────────────────────────────────────────────
+    def invalidate(self, lat: Optional[float] = None, lon: Optional[float] = None, region: str = "") -> None:
+        """
+        Orphan cached answers — all of them, or only one location cell's.
+        Bumps a generation counter that is part of every bucket id; the old
+        entries simply expire on their TTL.
+        """
+        cache = self.cache
+        if cache is None:
+            return
+        if lat is None and lon is None and not region:
+            key = f"{_KEY_PREFIX}:gen"
+        else:
+            key = f"{_KEY_PREFIX}:gen:{location_cell(lat, lon, region)}"
+        try:
+            try:
+                cache.incr(key)
+            except ValueError:
+                cache.set(key, 1, None)
+            self._count("invalidations")
+        except Exception as exc:
+            self._count("errors")
+            logger.warning("Response cache invalidation failed: %s", exc)
+
+    # ── Metrics ───────────────────────────────────────────────────────
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            s = dict(self._stats, bypassed=dict(self._stats["bypassed"]))
+            sim_sum = self._sim_sum
+        hits = s["exact_hits"] + s["semantic_hits"]
+        s["hit_rate"] = round(hits / s["lookups"], 3) if s["lookups"] else None
+        s["avg_semantic_similarity"] = round(sim_sum / s["semantic_hits"], 3) if s["semantic_hits"] else None
+        s["enabled"] = self.enabled
+        s["threshold"] = self.threshold
+        return s
+
+
+response_cache = ResponseCache()
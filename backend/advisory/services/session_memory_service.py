@@ -15,11 +15,37 @@ Architecture:
   - ChatSession stores the farmer's profile and last-seen context (JSON).
   - ChatHistory stores the last N turns for the active session.
   - Both are read/written by the chatbot viewset, not the service.
+
+Write-behind (SESSION_WRITE_BEHIND, on by default):
+  save_turn() used to cost five or more statements per chat message (two
+  INSERTs, the ChatSession upsert, the keep-ids SELECT and the DELETE), all
+  contending on hot sessions.  Turns are now buffered in the process and a
+  background thread flushes every SESSION_FLUSH_INTERVAL_MS (or at
+  SESSION_FLUSH_MAX_ROWS rows): one bulk_create for every buffered row of
+  every session, one ChatSession upsert (INSERT … ON CONFLICT) for all
+  touched sessions, and the trim only for sessions this process has
+  written TRIM_SLACK rows to since it last trimmed them.  The counts are
+  per process, so a session written by W worker processes holds at most
+  MAX_HISTORY_TURNS + W × (TRIM_SLACK − 1) rows after a flush (one
+  worker: under MAX_HISTORY_TURNS + TRIM_SLACK).  At most
+  SESSION_TRIM_TRACK sessions are counted; the least recently written ones
+  beyond that are trimmed with the next flush and forgotten, so short
+  sessions do not pile up in a long-lived worker.  Past
+  SESSION_BUFFER_MAX_ROWS buffered rows the caller flushes inline.
+  load_history() merges the session's unflushed rows, so a worker always
+  reads its own writes; other workers see them within one flush interval.
+  Rows carry the turn time from save_turn() as created_at, not the flush
+  time, so a requeued batch never sorts after newer turns.
 """
 
 from __future__ import annotations
 
+import atexit
+import itertools
 import logging
+import os
+import threading
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from typing import Any, Dict, List, Optional
 
@@ -30,10 +56,191 @@ MAX_HISTORY_TURNS = 20
 # Maximum turns to return to the chatbot on each request (keeps prompts small)
 HISTORY_WINDOW    = 10
 
+SESSION_WRITE_BEHIND      = os.getenv("SESSION_WRITE_BEHIND", "1") not in ("0", "false", "False")
+SESSION_FLUSH_INTERVAL_MS = int(os.getenv("SESSION_FLUSH_INTERVAL_MS", "250"))
+SESSION_FLUSH_MAX_ROWS    = int(os.getenv("SESSION_FLUSH_MAX_ROWS", "500"))
+SESSION_BUFFER_MAX_ROWS   = int(os.getenv("SESSION_BUFFER_MAX_ROWS", "20000"))
+SESSION_TRIM_TRACK        = int(os.getenv("SESSION_TRIM_TRACK", "10000"))
+TRIM_SLACK                = 20       # rows a session may grow past MAX_HISTORY_TURNS before a trim
+
+_SESSION_FIELDS = ["user_id", "preferred_language", "latitude", "longitude", "is_active", "last_activity"]
+
+
+class _HistoryBuffer:
+    """Process-wide write-behind queue of ChatHistory rows + ChatSession upserts."""
+
+    def __init__(self, interval_ms: int, max_rows: int):
+        self.interval = interval_ms / 1000.0
+        self.max_rows = max_rows
+        self._cond = threading.Condition()
+        self._rows: List[Dict[str, Any]] = []             # in arrival order
+        self._by_session: Dict[str, List[Dict[str, Any]]] = {}
+        self._sessions: Dict[str, Dict[str, Any]] = {}    # session_id → latest upsert defaults
+        # session_id → rows written since this process last trimmed it, least recently written first
+        self._since_trim: "OrderedDict[str, int]" = OrderedDict()
+        self._generation = 0                              # bumped after every committed flush
+        self._flush_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stats: Dict[str, int] = {
+            "turns": 0, "rows_flushed": 0, "flushes": 0, "sessions_upserted": 0,
+            "trims": 0, "rows_trimmed": 0, "flush_errors": 0, "rows_dropped": 0, "max_buffered": 0,
+            "inline_flushes": 0,
+        }
+
+    def add(self, session_id: str, rows: List[Dict[str, Any]], session: Dict[str, Any]) -> None:
+        with self._cond:
+            self._rows.extend(rows)
+            self._by_session.setdefault(session_id, []).extend(rows)
+            self._sessions[session_id] = session
+            self._stats["turns"] += 1
+            self._stats["max_buffered"] = max(self._stats["max_buffered"], len(self._rows))
+            buffered = len(self._rows)
+            if buffered >= self.max_rows:
+                self._cond.notify()
+        self._ensure_thread()
+        if buffered >= SESSION_BUFFER_MAX_ROWS:
+            # Backpressure: the flusher is not keeping up — write on this thread.
+            with self._cond:
+                self._stats["inline_flushes"] += 1
+            self.flush()
+
+    def pending(self, session_id: str) -> List[Dict[str, Any]]:
+        with self._cond:
+            return list(self._by_session.get(session_id, ()))
+
+    @property
+    def generation(self) -> int:
+        with self._cond:
+            return self._generation
+
+    def _ensure_thread(self) -> None:
+        if self._thread is not None:
+            return
+        with self._cond:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="km-chat-flush", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        from django.db import close_old_connections
+
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: len(self._rows) >= self.max_rows, timeout=self.interval)
+            try:
+                close_old_connections()               # honour CONN_MAX_AGE on this thread's connection
+                self.flush()
+            except Exception as exc:                      # never let the flusher die
+                logger.warning("SessionMemory flush loop error: %s", exc)
+
+    def flush(self) -> int:
+        """Write everything buffered so far.  Returns the number of rows written."""
+        with self._flush_lock:
+            with self._cond:
+                rows, sessions = self._rows, self._sessions
+                if not rows and not sessions:
+                    return 0
+                self._rows, self._sessions = [], {}
+            try:
+                trimmed = self._write(rows, sessions)
+            except Exception as exc:
+                logger.warning("SessionMemory flush of %d rows failed: %s", len(rows), exc)
+                self._requeue(rows, sessions)
+                return 0
+            with self._cond:
+                written = {id(r) for r in rows}
+                for sid in {r["session_id"] for r in rows}:
+                    left = [r for r in self._by_session.get(sid, ()) if id(r) not in written]
+                    if left:
+                        self._by_session[sid] = left
+                    else:
+                        self._by_session.pop(sid, None)
+                self._generation += 1
+                self._stats["flushes"] += 1
+                self._stats["rows_flushed"] += len(rows)
+                self._stats["sessions_upserted"] += len(sessions)
+                self._stats["trims"] += len(trimmed)
+            return len(rows)
+
+    def _requeue(self, rows, sessions) -> None:
+        with self._cond:
+            self._stats["flush_errors"] += 1
+            self._rows = rows + self._rows
+            for sid, defaults in sessions.items():
+                self._sessions.setdefault(sid, defaults)
+            overflow = len(self._rows) - 2 * SESSION_BUFFER_MAX_ROWS
+            if overflow > 0:                              # DB down for a while: drop the oldest
+                dropped, self._rows = self._rows[:overflow], self._rows[overflow:]
+                gone = {id(r) for r in dropped}
+                for sid in {r["session_id"] for r in dropped}:
+                    self._by_session[sid] = [r for r in self._by_session.get(sid, ()) if id(r) not in gone]
+                self._stats["rows_dropped"] += overflow
+                logger.error("SessionMemory buffer full — dropped %d oldest chat rows", overflow)
+
+    def _write(self, rows: List[Dict[str, Any]], sessions: Dict[str, Dict[str, Any]]) -> List[str]:
+        from django.db import connection, transaction
+        from ..models import ChatHistory, ChatSession
+
+        with self._cond:
+            since_trim = self._since_trim
+            for r in rows:
+                sid = r["session_id"]
+                since_trim[sid] = since_trim.get(sid, 0) + 1
+                since_trim.move_to_end(sid)
+            due = [sid for sid, n in since_trim.items() if n >= TRIM_SLACK]
+            # Beyond SESSION_TRIM_TRACK: trim the least recently written sessions now and stop counting them.
+            overflow = len(since_trim) - SESSION_TRIM_TRACK
+            if overflow > 0:
+                due += [sid for sid, n in itertools.islice(since_trim.items(), overflow) if n < TRIM_SLACK]
+        with transaction.atomic():
+            ChatHistory.objects.bulk_create([ChatHistory(**r) for r in rows])
+            if connection.features.supports_update_conflicts_with_target:
+                ChatSession.objects.bulk_create(
+                    [ChatSession(session_id=sid, **d) for sid, d in sessions.items()],
+                    update_conflicts=True, unique_fields=["session_id"], update_fields=_SESSION_FIELDS,
+                )
+            else:
+                for sid, d in sessions.items():
+                    ChatSession.objects.update_or_create(session_id=sid, defaults=d)
+            removed = 0
+            for sid in due:
+                # Same keep-ids trim as the synchronous path, once per TRIM_SLACK rows.
+                keep_ids = list(
+                    ChatHistory.objects
+                    .filter(session_id=sid)
+                    .order_by("-created_at", "-id")
+                    .values_list("id", flat=True)[:MAX_HISTORY_TURNS]
+                )
+                if keep_ids:
+                    removed += ChatHistory.objects.filter(session_id=sid).exclude(id__in=keep_ids).delete()[0]
+        with self._cond:
+            for sid in due:
+                self._since_trim.pop(sid, None)
+            self._stats["rows_trimmed"] += removed
+        return due
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            s: Dict[str, Any] = dict(self._stats)
+            s["buffered_rows"] = len(self._rows)
+            s["buffered_sessions"] = len(self._sessions)
+            s["trim_tracked_sessions"] = len(self._since_trim)
+        s["rows_per_flush"] = round(s["rows_flushed"] / s["flushes"], 1) if s["flushes"] else None
+        return s
+
 
 class SessionMemoryService:
     """Read and write farmer conversation memory to the Django ORM."""
 
+    def __init__(
+        self,
+        write_behind: bool = SESSION_WRITE_BEHIND,
+        flush_interval_ms: int = SESSION_FLUSH_INTERVAL_MS,
+        flush_max_rows: int = SESSION_FLUSH_MAX_ROWS,
+    ):
+        self.write_behind = write_behind
+        self._buffer = _HistoryBuffer(flush_interval_ms, flush_max_rows) if write_behind else None
+
     # ── Load ──────────────────────────────────────────────────────────────────
 
     def load_history(
@@ -48,20 +255,29 @@ class SessionMemoryService:
         """
         try:
             from ..models import ChatHistory
-            rows = (
-                ChatHistory.objects
-                .filter(session_id=session_id)
-                .order_by("-created_at")[:limit]
-            )
+            buffer = self._buffer
+            for _ in range(3):
+                # A flush committing between the two reads would show its rows
+                # twice (DB + buffer snapshot) — retry on a new generation.
+                generation = buffer.generation if buffer else 0
+                pending = buffer.pending(session_id)[-limit:] if buffer else []
+                rows = list(
+                    ChatHistory.objects
+                    .filter(session_id=session_id)
+                    .order_by("-created_at", "-id")
+                    .values("message_type", "message_content", "response_type")[:limit - len(pending)]
+                ) if limit > len(pending) else []
+                if buffer is None or buffer.generation == generation:
+                    break
             turns = []
-            for row in reversed(list(rows)):  # oldest first
+            for row in [*reversed(rows), *pending]:  # oldest first
                 entry: Dict[str, Any] = {
-                    "role":    "user" if row.message_type == "user" else "assistant",
-                    "content": row.message_content,
+                    "role":    "user" if row["message_type"] == "user" else "assistant",
+                    "content": row["message_content"],
                 }
                 # Re-attach intent metadata stored in response_type field
-                if row.message_type == "assistant" and row.response_type:
-                    entry["intent"] = row.response_type
+                if row["message_type"] == "assistant" and row["response_type"]:
+                    entry["intent"] = row["response_type"]
                 turns.append(entry)
             return turns
         except Exception as exc:
@@ -99,13 +315,13 @@ class SessionMemoryService:
     ) -> None:
         """
         Persist one full Q→A turn (2 ChatHistory rows) and update
-        ChatSession stats + last-seen context.
+        ChatSession stats + last-seen context.  With write-behind on, the
+        turn is buffered and flushed in a batch (see module docstring).
         Fails silently — never blocks the API response.
         """
         try:
-            from ..models import ChatHistory, ChatSession
-            from django.db import transaction
-
+            from django.utils import timezone
+            now = timezone.now()
             common_fields = dict(
                 session_id=session_id,
                 detected_language=language,
@@ -115,7 +331,29 @@ class SessionMemoryService:
                 has_location=bool(latitude and longitude),
                 latitude=latitude,
                 longitude=longitude,
+                created_at=now,          # the turn time, kept through a delayed or retried flush
             )
+            if self._buffer is not None:
+                self._buffer.add(
+                    session_id,
+                    [
+                        dict(user_id=user_id, message_type="user", message_content=user_query, **common_fields),
+                        dict(user_id=user_id, message_type="assistant", message_content=ai_response,
+                             **common_fields),
+                    ],
+                    {
+                        "user_id":            user_id,
+                        "preferred_language": language,
+                        "latitude":           latitude,
+                        "longitude":          longitude,
+                        "is_active":          True,
+                        "last_activity":      now,
+                    },
+                )
+                return
+
+            from ..models import ChatHistory, ChatSession
+            from django.db import transaction
 
             # All four DB ops in one atomic block so concurrent requests
             # can't race on insertion + deletion.
@@ -149,7 +387,7 @@ class SessionMemoryService:
                 keep_ids = list(
                     ChatHistory.objects
                     .filter(session_id=session_id)
-                    .order_by("-created_at")
+                    .order_by("-created_at", "-id")
                     .values_list("id", flat=True)[:MAX_HISTORY_TURNS]
                 )
                 if keep_ids:
@@ -196,6 +434,18 @@ class SessionMemoryService:
         except Exception as exc:
             logger.warning("SessionMemory.update_session_context failed: %s", exc)
 
+    # ── Write-behind control ──────────────────────────────────────────────────
+
+    def flush(self) -> int:
+        """Write buffered turns now (shutdown, tests, benchmarks).  Returns rows written."""
+        return self._buffer.flush() if self._buffer is not None else 0
+
+    def stats(self) -> Dict[str, Any]:
+        if self._buffer is None:
+            return {"write_behind": False}
+        return dict(self._buffer.stats(), write_behind=True)
+
 
 # Module-level singleton
 session_memory = SessionMemoryService()
+atexit.register(session_memory.flush)
@@ -0,0 +1,489 @@
+"""
+KrishiMitra — content-addressed audio store for text-to-speech
+==============================================================
+/api/tts/ used to call gTTS for every request.  The same greetings, helpline
+lines and advisory sentences were synthesised again and again, per language,
+each costing one or more round-trips to Google's TTS endpoint (seconds, and
+outbound quota).
+
+Text is normalised (Unicode NFC, markdown emphasis / emoji dropped,
+whitespace collapsed) and split into sentence chunks of at most
+TTS_CHUNK_CHARS characters.  Each chunk is one MP3 segment, filed under
+
+    sha256(voice · language · normalised chunk)
+
+so a sentence shared by two answers is synthesised once.  MP3 segments
+concatenate into a playable stream (gTTS joins its own 100-char requests
+the same way).  Lookups try
+
+  1. local disk   — TTS_AUDIO_DIR, size-bounded (TTS_DISK_MAX_MB); least
+                    recently used files are evicted, a hit refreshes mtime.
+                    Outside MEDIA_ROOT and owner-only (0700): the frequency
+                    counters hold what farmers asked to hear
+  2. shared cache — the ``tts_cache`` alias (Redis in production), falling
+                    back to ``default``; a hit is copied to disk
+  3. synthesise   — concurrent misses for one chunk in this worker collapse
+                    into a single call (SingleFlight)
+
+render() serves a fully stored text in one body; otherwise the first chunk
+is synthesised up front (errors still become a proper HTTP error) and the
+rest stream as they are synthesised, TTS_PREFETCH chunks ahead.
+
+Requested chunks are counted per language (flushed to the shared cache and
+to disk); ``manage.py presynthesize_tts`` synthesises the most frequent ones
+plus SEED_PHRASES ahead of traffic.
+"""
+
+from __future__ import annotations
+
+import atexit
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from .cache_utils import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+TTS_CACHE_ENABLED = os.getenv("TTS_CACHE_ENABLED", "1") not in ("0", "false", "False")
+TTS_AUDIO_DIR     = os.getenv(
+    "TTS_AUDIO_DIR", str(Path(__file__).resolve().parents[2] / "var" / "tts_cache"),
+)
+TTS_DISK_MAX_MB   = float(os.getenv("TTS_DISK_MAX_MB", "256"))
+TTS_CACHE_TTL_S   = int(os.getenv("TTS_CACHE_TTL_S", str(30 * 86400)))
+TTS_CHUNK_CHARS   = int(os.getenv("TTS_CHUNK_CHARS", "200"))
+TTS_PREFETCH      = int(os.getenv("TTS_PREFETCH", "2"))      # chunks synthesised ahead of the stream
+TTS_MAX_CHARS     = int(os.getenv("TTS_MAX_CHARS", "2000"))  # characters of text per request
+DEFAULT_VOICE     = "gtts:com"                               # engine:accent (gTTS tld)
+_KEY_PREFIX       = "krishimitra:tts:v1"
+_FREQ_FLUSH_EVERY = 50       # recorded chunks between counter flushes
+_FREQ_KEEP        = 500      # phrases kept per language in the flushed counters
+
+_TTS_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="km-tts")
+atexit.register(_TTS_POOL.shutdown, wait=False)
+
+_LANGUAGES = {
+    "hi": "hi", "en": "en", "mr": "mr", "ta": "ta", "te": "te",
+    "gu": "gu", "pa": "pa", "bn": "bn", "kn": "kn", "ml": "ml",
+    "or": "or", "as": "as",
+}
+
+# Fixed lines every caller hears; synthesised by presynthesize_tts on deploy.
+SEED_PHRASES: Dict[str, List[str]] = {
+    "hi": [
+        "नमस्ते किसान भाई!",
+        "Kisan Helpline: 1800-180-1551",
+        "माफ़ करें, AI सेवा अभी व्यस्त है।",
+        "माफ़ करें, कृपया फिर से पूछें।",
+        "मेरी बात सुनी नहीं गई। कृपया अपना सवाल टाइप करें।",
+        "कृषिमित्रा से बात करने के लिए धन्यवाद।",
+    ],
+    "en": [
+        "Hello farmer!",
+        "Kisan Helpline: 1800-180-1551",
+        "Sorry, the AI service is busy right now.",
+        "Thank you for using KrishiMitra.",
+    ],
+}
+
+_MARKUP_RE   = re.compile(r"[*_#`~>|]+")
+_SPACE_RE    = re.compile(r"\s+")
+# Sentence ends: Latin terminators, danda / double danda, line breaks.
+_SENTENCE_RE = re.compile(r"(?<=[.!?।॥])\s+|\n+")
+
+
+def normalise_text(text: str) -> str:
+    """NFC, no markdown emphasis or emoji (never spoken), collapsed whitespace."""
+    text = unicodedata.normalize("NFC", text or "")
+    text = "".join(ch for ch in text if unicodedata.category(ch) not in ("So", "Cs", "Co"))
+    lines = (_SPACE_RE.sub(" ", _MARKUP_RE.sub(" ", line)).strip() for line in text.splitlines())
+    return "\n".join(line for line in lines if line)
+
+
+def split_chunks(text: str, max_chars: int = TTS_CHUNK_CHARS) -> List[str]:
+    """Normalised sentence chunks of at most ``max_chars`` (long sentences split at commas, then spaces)."""
+    chunks: List[str] = []
+    for sentence in _SENTENCE_RE.split(normalise_text(text)):
+        sentence = sentence.strip()
+        while len(sentence) > max_chars:
+            cut = max(sentence.rfind(", ", 0, max_chars), sentence.rfind(" ", 0, max_chars))
+            cut = cut if cut > 0 else max_chars
+            chunks.append(sentence[:cut + 1].strip())
+            sentence = sentence[cut + 1:].strip()
+        if sentence:
+            chunks.append(sentence)
+    return chunks
+
+
+def audio_key(text: str, language: str, voice: str = DEFAULT_VOICE) -> str:
+    """Content address of one normalised chunk."""
+    return hashlib.sha256(f"{voice}\0{language}\0{text}".encode("utf-8")).hexdigest()
+
+
+def gtts_synthesize(text: str, language: str, voice: str = DEFAULT_VOICE) -> bytes:
+    """One MP3 segment from gTTS.  Raises ImportError when gTTS is not installed."""
+    import io
+
+    from gtts import gTTS
+
+    tld = voice.split(":", 1)[1] if voice.startswith("gtts:") else "com"
+    buf = io.BytesIO()
+    gTTS(text=text, lang=language, tld=tld, slow=False).write_to_fp(buf)
+    return buf.getvalue()
+
+
+def _tts_cache_backend():
+    try:
+        from django.core.cache import caches
+        try:
+            return caches["tts_cache"]
+        except Exception:
+            return caches["default"]
+    except Exception:
+        return None
+
+
+class _DiskStore:
+    """Audio files sharded by key prefix; LRU by mtime, bounded in total bytes."""
+
+    def __init__(self, directory: Optional[str], max_bytes: int):
+        self.directory = Path(directory) if directory and max_bytes > 0 else None
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._bytes: Optional[int] = None      # estimate; rescanned before evicting
+        self.evictions = 0
+        self._private = False
+
+    def _ensure_dir(self, path: Path) -> None:
+        """Create ``path`` (the store root or a shard) owner-only."""
+        if not self._private:
+            os.makedirs(self.directory, mode=0o700, exist_ok=True)
+            os.chmod(self.directory, 0o700)    # makedirs' mode is masked and skips existing dirs
+            self._private = True
+        path.mkdir(mode=0o700, exist_ok=True)
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.mp3"
+
+    def get(self, key: str) -> Optional[bytes]:
+        if self.directory is None:
+            return None
+        path = self._path(key)
+        try:
+            data = path.read_bytes()
+            os.utime(path)
+            return data
+        except OSError:                          # missing, or evicted by another worker
+            return None
+
+    def put(self, key: str, data: bytes) -> None:
+        if self.directory is None or len(data) > self.max_bytes:
+            return
+        path = self._path(key)
+        try:
+            self._ensure_dir(path.parent)
+            tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp.write_bytes(data)
+            os.replace(tmp, path)
+        except OSError as exc:
+            logger.debug("TTS disk store failed: %s", exc)
+            return
+        with self._lock:
+            if self._bytes is None:
+                self._bytes = self._scan()[1]
+            else:
+                self._bytes += len(data)
+            if self._bytes > self.max_bytes:
+                self._evict()
+
+    def _scan(self) -> Tuple[List[Tuple[float, int, Path]], int]:
+        files = []
+        for path in self.directory.glob("*/*.mp3"):
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            files.append((st.st_mtime, st.st_size, path))
+        return files, sum(size for _, size, _ in files)
+
+    def _evict(self) -> None:
+        """Oldest first down to 90 % of the bound (the scan covers every worker's writes)."""
+        files, total = self._scan()
+        target = self.max_bytes * 0.9
+        for _, size, path in sorted(files):
+            if total <= target:
+                break
+            try:
+                path.unlink()
+                total -= size
+                self.evictions += 1
+            except OSError:
+                pass
+        self._bytes = total
+
+    def usage(self) -> Dict[str, Any]:
+        if self.directory is None:
+            return {"enabled": False}
+        with self._lock:
+            if self._bytes is None:
+                self._bytes = self._scan()[1]
+            return {"enabled": True, "bytes": self._bytes, "max_bytes": self.max_bytes,
+                    "evictions": self.evictions}
+
+    def load_json(self, name: str) -> Dict[str, Any]:
+        if self.directory is None:
+            return {}
+        try:
+            return json.loads((self.directory / name).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+
+    def save_json(self, name: str, payload: Dict[str, Any]) -> None:
+        if self.directory is None:
+            return
+        try:
+            self._ensure_dir(self.directory)
+            tmp = self.directory / f".{name}.{os.getpid()}.tmp"
+            tmp.write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
+            os.replace(tmp, self.directory / name)
+        except OSError as exc:
+            logger.debug("TTS counter flush failed: %s", exc)
+
+
+class TTSAudioStore:
+    """Disk + shared-cache audio store in front of a synthesiser (see module docstring)."""
+
+    def __init__(
+        self,
+        synthesizer: Callable[[str, str, str], bytes] = gtts_synthesize,
+        cache=None,
+        disk_dir: Optional[str] = TTS_AUDIO_DIR,
+        disk_max_bytes: int = int(TTS_DISK_MAX_MB * 1024 * 1024),
+        ttl: int = TTS_CACHE_TTL_S,
+        enabled: bool = TTS_CACHE_ENABLED,
+    ):
+        self.synthesizer = synthesizer
+        self.ttl = ttl
+        self.enabled = enabled
+        self._cache = cache
+        self._disk = _DiskStore(disk_dir if enabled else None, disk_max_bytes)
+        self._flight = SingleFlight()
+        self._lock = threading.Lock()
+        self._freq: Dict[str, Counter] = {}
+        self._unflushed = 0
+        self._synth_ms: List[float] = []
+        self._stats: Dict[str, int] = {
+            "chunks": 0, "disk_hits": 0, "shared_hits": 0, "synthesized": 0, "synth_errors": 0,
+            "coalesced": 0, "full_hits": 0, "streamed": 0, "errors": 0,
+        }
+
+    @property
+    def cache(self):
+        if not self.enabled:
+            return None
+        return self._cache if self._cache is not None else _tts_cache_backend()
+
+    def _count(self, key: str, n: int = 1) -> None:
+        with self._lock:
+            self._stats[key] += n
+
+    # ── Lookup / store ────────────────────────────────────────────────
+    def lookup(self, text: str, language: str, voice: str = DEFAULT_VOICE) -> Optional[bytes]:
+        """Stored audio for one normalised chunk, without synthesising."""
+        if not self.enabled:
+            return None
+        key = audio_key(text, language, voice)
+        data = self._disk.get(key)
+        if data is not None:
+            self._count("disk_hits")
+            return data
+        cache = self.cache
+        if cache is None:
+            return None
+        try:
+            data = cache.get(f"{_KEY_PREFIX}:{key}")
+        except Exception as exc:
+            self._count("errors")
+            logger.debug("TTS cache lookup failed: %s", exc)
+            return None
+        if data is not None:
+            self._count("shared_hits")
+            self._disk.put(key, data)
+        return data
+
+    def _store(self, key: str, data: bytes) -> None:
+        self._disk.put(key, data)
+        cache = self.cache
+        if cache is not None:
+            try:
+                cache.set(f"{_KEY_PREFIX}:{key}", data, self.ttl)
+            except Exception as exc:
+                self._count("errors")
+                logger.debug("TTS cache store failed: %s", exc)
+
+    def _synthesize(self, key: str, text: str, language: str, voice: str) -> bytes:
+        data = self.lookup(text, language, voice)         # another caller may have just stored it
+        if data is not None:
+            return data
+        t0 = time.perf_counter()
+        try:
+            data = self.synthesizer(text, language, voice)
+        except Exception:
+            self._count("synth_errors")
+            raise
+        with self._lock:
+            self._stats["synthesized"] += 1
+            self._synth_ms.append((time.perf_counter() - t0) * 1000)
+            del self._synth_ms[:-1000]
+        if self.enabled:
+            self._store(key, data)
+        return data
+
+    def audio(self, text: str, language: str, voice: str = DEFAULT_VOICE) -> bytes:
+        """Audio for one normalised chunk: stored copy or a (coalesced) synthesis."""
+        self._count("chunks")
+        data = self.lookup(text, language, voice)
+        if data is not None:
+            return data
+        key = audio_key(text, language, voice)
+        if self._flight.in_flight(key):
+            self._count("coalesced")
+        return self._flight.do(key, self._synthesize, key, text, language, voice)
+
+    # ── Rendering ─────────────────────────────────────────────────────
+    def render(self, text: str, language: str, voice: str = DEFAULT_VOICE) -> Tuple[bool, Iterable[bytes]]:
+        """
+        (True, [mp3]) when every chunk of ``text`` is stored; otherwise
+        (False, iterator) whose first chunk is already synthesised — so a
+        synthesiser failure raises here, before a streaming response starts.
+        ValueError when nothing speakable is left after normalisation.
+        """
+        language = _LANGUAGES.get(language, "hi")
+        chunks = split_chunks(text[:TTS_MAX_CHARS])
+        if not chunks:
+            raise ValueError("nothing to speak")
+        self.record(language, chunks)
+        stored = [self.lookup(chunk, language, voice) for chunk in chunks]
+        if all(data is not None for data in stored):
+            self._count("chunks", len(chunks))
+            self._count("full_hits")
+            return True, [b"".join(stored)]
+        self._count("streamed")
+        if stored[0] is not None:
+            self._count("chunks")
+            first = stored[0]
+        else:
+            first = self.audio(chunks[0], language, voice)
+        return False, self._stream(first, chunks[1:], stored[1:], language, voice)
+
+    def _stream(
+        self, first: bytes, chunks: Sequence[str], stored: Sequence[Optional[bytes]], language: str, voice: str,
+    ) -> Iterator[bytes]:
+        yield first
+        futures: Dict[int, Any] = {}
+
+        def ahead(i: int) -> None:
+            if i < len(chunks) and i not in futures and stored[i] is None:
+                futures[i] = _TTS_POOL.submit(self.audio, chunks[i], language, voice)
+
+        for i in range(len(chunks)):
+            for j in range(i, i + 1 + TTS_PREFETCH):
+                ahead(j)
+            if stored[i] is not None:
+                self._count("chunks")
+                yield stored[i]
+                continue
+            try:
+                yield futures.pop(i).result()
+            except Exception as exc:
+                # Headers are sent: end the stream short rather than mid-frame.
+                logger.error("TTS chunk %d/%d failed: %s", i + 2, len(chunks) + 1, exc)
+                for f in futures.values():
+                    f.cancel()
+                return
+
+    # ── Frequency counters / pre-synthesis ────────────────────────────
+    def record(self, language: str, chunks: Sequence[str]) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._freq.setdefault(language, Counter()).update(chunks)
+            self._unflushed += len(chunks)
+            flush = self._unflushed >= _FREQ_FLUSH_EVERY
+        if flush:
+            self.flush_counters()
+
+    def _flushed_counts(self, language: str) -> Counter:
+        """Flushed totals: the larger of the disk and shared-cache copies per phrase."""
+        counts = Counter(self._disk.load_json(f"freq-{language}.json"))
+        cache = self.cache
+        if cache is not None:
+            try:
+                for phrase, n in (cache.get(f"{_KEY_PREFIX}:freq:{language}") or {}).items():
+                    counts[phrase] = max(counts[phrase], n)
+            except Exception:
+                pass
+        return counts
+
+    def flush_counters(self) -> None:
+        """Add this worker's counts to the flushed totals (a lost race only drops counts)."""
+        with self._lock:
+            local, self._freq, self._unflushed = self._freq, {}, 0
+        cache = self.cache
+        for language, counts in local.items():
+            merged = self._flushed_counts(language)
+            merged.update(counts)
+            top = dict(merged.most_common(_FREQ_KEEP))
+            self._disk.save_json(f"freq-{language}.json", top)
+            if cache is not None:
+                try:
+                    cache.set(f"{_KEY_PREFIX}:freq:{language}", top, self.ttl)
+                except Exception:
+                    pass
+
+    def frequent_phrases(self, language: str, n: int = 100) -> List[str]:
+        self.flush_counters()
+        return [phrase for phrase, _ in self._flushed_counts(language).most_common(n)]
+
+    def presynthesize(self, languages: Iterable[str], top: int = 100, voice: str = DEFAULT_VOICE) -> Dict[str, Dict]:
+        """Store SEED_PHRASES and the ``top`` most requested chunks per language."""
+        report: Dict[str, Dict] = {}
+        for language in languages:
+            language = _LANGUAGES.get(language, language)
+            phrases = [c for p in SEED_PHRASES.get(language, []) for c in split_chunks(p)]
+            phrases += self.frequent_phrases(language, top)
+            done = {"stored": 0, "synthesized": 0, "failed": 0}
+            for phrase in dict.fromkeys(phrases):
+                before = self._stats["synthesized"]
+                try:
+                    self.audio(phrase, language, voice)
+                    done["synthesized" if self._stats["synthesized"] > before else "stored"] += 1
+                except Exception as exc:
+                    done["failed"] += 1
+                    logger.warning("Pre-synthesis failed (%s): %s", language, exc)
+            report[language] = done
+        return report
+
+    # ── Metrics ───────────────────────────────────────────────────────
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            s: Dict[str, Any] = dict(self._stats)
+            synth = sorted(self._synth_ms)
+        hits = s["disk_hits"] + s["shared_hits"]
+        s["hit_rate"] = round(hits / s["chunks"], 3) if s["chunks"] else None
+        s["synth_p50_ms"] = round(synth[len(synth) // 2], 1) if synth else None
+        s["disk"] = self._disk.usage()
+        s["enabled"] = self.enabled
+        return s
+
+
+tts_audio_store = TTSAudioStore()
@@ -882,27 +882,24 @@ class UltraDynamicGovernmentAPI:
         # 1. Agro-Climatic Zone Intelligence
 
         # 1. Advanced Granular Location Detection (District-Wise)
-        try:
-            from .district_data import DISTRICT_PROFILES
-        except ImportError:
-            DISTRICT_PROFILES = {}
+        from .agro_profile_store import get_agro_profile_store
 
         location_lower = location.lower()
-        district_key = None
         env_profile = None
 
-        # A. Try Exact District Match
-        for district, profile in DISTRICT_PROFILES.items():
-            if district in location_lower:
-                district_key = district
-                env_profile = profile.copy()
-                env_profile['region'] = profile['state'] # Maintain compatibility
-                
-                # Derive region_key from state for compatibility
-                state_key = profile['state'].lower().replace(' ', '_')
-                region_key = state_key if state_key != 'madhya_pradesh' else 'mp' # Handle MP exception
-                if state_key == 'uttar_pradesh': region_key = 'up'
-                break
+        # A. Try District Match (name, alias or district named in the text)
+        store = get_agro_profile_store()
+        district_key = store.match_text(location_lower)
+        if district_key:
+            profile = store.profile(district_key)
+            env_profile = dict(profile)
+            env_profile['priority_crops'] = list(profile.get('priority_crops', ()))
+            env_profile['region'] = profile['state'] # Maintain compatibility
+
+            # Derive region_key from state for compatibility
+            state_key = profile['state'].lower().replace(' ', '_')
+            region_key = state_key if state_key != 'madhya_pradesh' else 'mp' # Handle MP exception
+            if state_key == 'uttar_pradesh': region_key = 'up'
         
         # B. Fallback to State/Regional Sensing if District not found
         if not env_profile:
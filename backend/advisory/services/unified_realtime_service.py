@@ -15,11 +15,16 @@ import os
 import json
 import logging
 import threading
+import time
+import atexit
 import requests
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone, timedelta
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Dict, Iterator, List, Any, Optional, Tuple
 
-from .location_context import _haversine_km
+from .cache_utils import SingleFlight, release_lease, try_acquire_lease
+from .circuit_breaker import data_gov_breaker, gemini_breaker, open_meteo_breaker
 from .language_service import (
     get_language_info,
     normalise_language_code,
@@ -49,7 +54,26 @@ DATA_GOV_DEMO_KEY = "579b464db66ec23bdd000001cdd3946e44ce4aad7209ff7b23ac571b"
 # This prevents stale coordinates surviving a process restart when a village
 # is renamed or a farmer enters a slightly different spelling.
 _GEOCODE_CACHE_TTL = 60 * 60 * 24 * 7   # 7 days — location→coords is stable
+
+# ─── Forecast cache ──────────────────────────────────────────────────────────
+# Raw Open-Meteo sections are cached per grid cell (language-agnostic) and
+# rendered per request, so every language and every farmer in a ~5 km cell
+# shares one upstream call.  Two TTL tiers: "current" conditions go stale
+# quickly, the 7-day daily block barely moves within a few hours.
+# Past its TTL an entry is still served for _WEATHER_STALE_GRACE seconds while
+# a single background refresh runs (stale-while-revalidate).
+_WEATHER_GRID_DEG    = float(os.getenv("WEATHER_GRID_DEG", "0.05"))          # ~5.5 km
+_WEATHER_CURRENT_TTL = int(os.getenv("WEATHER_CURRENT_TTL_S", "600"))        # 10 min
+_WEATHER_DAILY_TTL   = int(os.getenv("WEATHER_DAILY_TTL_S", str(3 * 3600)))  # 3 h
+_WEATHER_STALE_GRACE = int(os.getenv("WEATHER_STALE_GRACE_S", str(6 * 3600)))
+_WEATHER_L1_MAX      = 2048
+_WEATHER_SECTION_TTL = {"current": _WEATHER_CURRENT_TTL, "daily": _WEATHER_DAILY_TTL}
 DATA_GOV_TIMEOUT  = (5, 25)  # connect, read seconds
+# Paginated data.gov.in walks (mandi listing): once page 1 reports the total,
+# the remaining pages are fetched in parallel, bounded across all requests.
+_DATA_GOV_PAGE_SIZE        = 100
+_DATA_GOV_PAGE_CONCURRENCY = int(os.getenv("DATA_GOV_PAGE_CONCURRENCY", "6"))
+_DATA_GOV_PAGE_ATTEMPTS    = 3
 OPENWEATHER_KEY   = os.getenv("OPENWEATHER_API_KEY", "")
 GEMINI_MODEL      = os.getenv("GEMINI_MODEL", "gemini-1.5-pro")
 GEMINI_FLASH      = os.getenv("GEMINI_FLASH_MODEL", "gemini-1.5-flash")
@@ -191,6 +215,23 @@ def get_msp(crop_id: str, fallback: int = 0) -> int:
 # ─────────────────────────────────────────────────────────────────────────────
 #  WEATHER SERVICE
 # ─────────────────────────────────────────────────────────────────────────────
+# Background revalidation of stale forecast cells — shared, bounded pool.
+_WEATHER_REFRESH_POOL = ThreadPoolExecutor(max_workers=2, thread_name_prefix="km-weather")
+atexit.register(_WEATHER_REFRESH_POOL.shutdown, wait=False)
+
+# data.gov.in page fetches for paginated walks — bounds parallel calls per worker.
+_DATA_GOV_PAGE_POOL = ThreadPoolExecutor(
+    max_workers=_DATA_GOV_PAGE_CONCURRENCY, thread_name_prefix="km-datagov"
+)
+atexit.register(_DATA_GOV_PAGE_POOL.shutdown, wait=False)
+
+
+def _weather_grid_cell(lat: float, lon: float) -> Tuple[float, float]:
+    """Snap coordinates to the forecast grid so nearby farms share a cache entry."""
+    g = _WEATHER_GRID_DEG
+    return round(round(lat / g) * g, 4), round(round(lon / g) * g, 4)
+
+
 class WeatherService:
     """Real-time weather from Open-Meteo (FREE, no key) + OpenWeatherMap fallback"""
 
@@ -198,6 +239,18 @@ class WeatherService:
     OWM_URL = "https://api.openweathermap.org/data/2.5/forecast"
     GEOCODING_URL = "https://nominatim.openstreetmap.org/search"
 
+    OPEN_METEO_CURRENT_VARS = [
+        "temperature_2m", "relative_humidity_2m", "apparent_temperature",
+        "precipitation", "weather_code", "wind_speed_10m",
+        "wind_direction_10m", "uv_index", "surface_pressure",
+    ]
+    OPEN_METEO_DAILY_VARS = [
+        "temperature_2m_max", "temperature_2m_min",
+        "precipitation_sum", "weather_code",
+        "uv_index_max", "wind_speed_10m_max",
+        "precipitation_probability_max",
+    ]
+
     def __init__(self):
         self.session = requests.Session()
         self.session.headers.update({
@@ -205,18 +258,29 @@ class WeatherService:
             "Accept": "application/json"
         })
         self._coord_cache: Dict[str, Tuple[float, float]] = {}
+        # L1 forecast cache: key → {"data": section, "ts": epoch}.  L2 is weather_cache.
+        self._forecast_l1: OrderedDict = OrderedDict()
+        self._forecast_lock = threading.Lock()
+        self._flight = SingleFlight()
+        self.stats = {"hits": 0, "stale_hits": 0, "misses": 0, "upstream_calls": 0}
 
     def get_weather(self, location: str, lat: float = None, lon: float = None,
-                    lang: str = "hi") -> Dict[str, Any]:
-        """Get complete weather data with 7-day forecast in the requested language."""
+                    lang: str = "hi", force_refresh: bool = False) -> Dict[str, Any]:
+        """Get complete weather data with 7-day forecast in the requested language.
+
+        Open-Meteo sections are served from the grid-cell forecast cache;
+        ``force_refresh=True`` bypasses it (pull-to-refresh).
+        """
         try:
             if lat is None or lon is None:
                 lat, lon = self._geocode(location)
 
             # Try Open-Meteo first (FREE, highly reliable)
-            data = self._fetch_open_meteo(lat, lon, location, lang=lang)
-            if data:
-                return data
+            sections = self._get_forecast_sections(lat, lon, force_refresh=force_refresh)
+            if sections:
+                data = self._render_open_meteo(sections, lat, lon, location, lang=lang)
+                if data:
+                    return data
 
             # Fallback: OpenWeatherMap
             if OPENWEATHER_KEY:
@@ -230,6 +294,150 @@ class WeatherService:
             logger.error(f"Weather error for {location}: {e}")
             return self._static_fallback(location, lang=lang)
 
+    def invalidate(self, lat: float, lon: float) -> None:
+        """Drop both forecast tiers for the grid cell containing (lat, lon)."""
+        cell = _weather_grid_cell(lat, lon)
+        cache = self._weather_l2()
+        with self._forecast_lock:
+            for section in _WEATHER_SECTION_TTL:
+                self._forecast_l1.pop(self._forecast_key(section, cell), None)
+        if cache is not None:
+            try:
+                cache.delete_many([self._forecast_key(s, cell) for s in _WEATHER_SECTION_TTL])
+            except Exception:
+                pass
+
+    # ── Forecast cache ────────────────────────────────────────────────────────
+
+    @staticmethod
+    def _forecast_key(section: str, cell: Tuple[float, float]) -> str:
+        return f"weather:v1:{section}:{cell[0]:.4f}:{cell[1]:.4f}"
+
+    @staticmethod
+    def _weather_l2():
+        try:
+            from django.core.cache import caches
+            return caches["weather_cache"]
+        except Exception:
+            return None
+
+    def _read_section(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._forecast_lock:
+            entry = self._forecast_l1.get(key)
+            if entry is not None:
+                self._forecast_l1.move_to_end(key)
+                return entry
+        cache = self._weather_l2()
+        if cache is None:
+            return None
+        try:
+            entry = cache.get(key)
+        except Exception:
+            return None
+        if entry is not None:
+            self._store_l1(key, entry)
+        return entry
+
+    def _store_l1(self, key: str, entry: Dict[str, Any]) -> None:
+        with self._forecast_lock:
+            self._forecast_l1[key] = entry
+            self._forecast_l1.move_to_end(key)
+            while len(self._forecast_l1) > _WEATHER_L1_MAX:
+                self._forecast_l1.popitem(last=False)
+
+    def _write_section(self, key: str, section: str, data: Dict[str, Any], ts: float) -> None:
+        entry = {"data": data, "ts": ts}
+        self._store_l1(key, entry)
+        cache = self._weather_l2()
+        if cache is not None:
+            try:
+                cache.set(key, entry, timeout=_WEATHER_SECTION_TTL[section] + _WEATHER_STALE_GRACE)
+            except Exception:
+                pass   # L2 write failure is non-fatal — L1 still works
+
+    def _get_forecast_sections(self, lat: float, lon: float,
+                               force_refresh: bool = False) -> Optional[Dict[str, Any]]:
+        """Return ``{"current": {...}, "daily": {...}, "fetched_at": epoch}`` for the cell.
+
+        Fresh sections come from cache; missing/expired ones are fetched once per
+        cell (single-flight); stale-but-in-grace ones are served immediately and
+        refreshed in the background.
+        """
+        cell = _weather_grid_cell(lat, lon)
+        now = time.time()
+        found: Dict[str, Dict[str, Any]] = {}
+        missing: List[str] = []
+        stale: List[str] = []
+        for section, ttl in _WEATHER_SECTION_TTL.items():
+            entry = None if force_refresh else self._read_section(self._forecast_key(section, cell))
+            age = now - entry["ts"] if entry else None
+            if entry is None or age > ttl + _WEATHER_STALE_GRACE:
+                missing.append(section)
+                continue
+            found[section] = entry
+            if age > ttl:
+                stale.append(section)
+
+        if missing:
+            self.stats["misses"] += 1
+            fetched = self._flight.do(
+                f"{cell}:{','.join(missing)}", self._refresh_sections, cell, tuple(missing)
+            )
+            if not fetched:
+                return None
+            found.update(fetched)
+        elif stale:
+            self.stats["stale_hits"] += 1
+            self._schedule_revalidation(cell, tuple(stale))
+        else:
+            self.stats["hits"] += 1
+
+        return {
+            "current": found["current"]["data"],
+            "daily": found["daily"]["data"],
+            "fetched_at": min(e["ts"] for e in found.values()),
+        }
+
+    def _schedule_revalidation(self, cell: Tuple[float, float], sections: Tuple[str, ...]) -> None:
+        flight_key = f"{cell}:{','.join(sections)}"
+        if self._flight.in_flight(flight_key):
+            return
+        # One worker revalidates per cell; others keep serving the stale copy.
+        cache = self._weather_l2()
+        lease_key = f"weather:revalidate:{cell[0]:.4f}:{cell[1]:.4f}"
+        if not try_acquire_lease(cache, lease_key, ttl=30):
+            return
+
+        def _run():
+            try:
+                self._flight.do(flight_key, self._refresh_sections, cell, sections)
+            except Exception as exc:
+                logger.debug("Weather revalidation failed for %s: %s", cell, exc)
+            finally:
+                release_lease(cache, lease_key)
+
+        try:
+            _WEATHER_REFRESH_POOL.submit(_run)
+        except RuntimeError:
+            release_lease(cache, lease_key)   # pool shut down (interpreter exit)
+
+    def _refresh_sections(self, cell: Tuple[float, float],
+                          sections: Tuple[str, ...]) -> Optional[Dict[str, Dict[str, Any]]]:
+        """Fetch ``sections`` for ``cell`` from Open-Meteo and write them through."""
+        self.stats["upstream_calls"] += 1
+        raw = self._fetch_open_meteo_raw(cell[0], cell[1], sections)
+        if not raw:
+            return None
+        ts = time.time()
+        out = {}
+        for section in sections:
+            data = raw.get(section)
+            if not data:
+                return None
+            self._write_section(self._forecast_key(section, cell), section, data, ts)
+            out[section] = {"data": data, "ts": ts}
+        return out
+
     def _geocode(self, location: str) -> Tuple[float, float]:
         """Convert location name to coordinates.
 
@@ -304,35 +512,55 @@ class WeatherService:
         except Exception:
             pass   # L2 write failure is non-fatal — L1 still works
 
-    def _fetch_open_meteo(self, lat: float, lon: float, location: str,
-                          lang: str = "hi") -> Optional[Dict]:
-        """Open-Meteo full forecast — humidity, rainfall, UV, 7-day (NO API KEY NEEDED)"""
+    def _fetch_open_meteo_raw(self, lat: float, lon: float,
+                              sections: Tuple[str, ...] = ("current", "daily")) -> Optional[Dict]:
+        """Open-Meteo current/daily blocks — humidity, rainfall, UV, 7-day (NO API KEY NEEDED)"""
         try:
             params = {
                 "latitude": lat,
                 "longitude": lon,
-                # Current variables
-                "current": [
-                    "temperature_2m", "relative_humidity_2m", "apparent_temperature",
-                    "precipitation", "weather_code", "wind_speed_10m",
-                    "wind_direction_10m", "uv_index", "surface_pressure"
-                ],
-                # Daily forecast variables
-                "daily": [
-                    "temperature_2m_max", "temperature_2m_min",
-                    "precipitation_sum", "weather_code",
-                    "uv_index_max", "wind_speed_10m_max",
-                    "precipitation_probability_max"
-                ],
                 "timezone": "Asia/Kolkata",
-                "forecast_days": 7
             }
-
-            resp = self.session.get(self.OPEN_METEO_URL, params=params, timeout=8)
+            if "current" in sections:
+                params["current"] = self.OPEN_METEO_CURRENT_VARS
+            if "daily" in sections:
+                params["daily"] = self.OPEN_METEO_DAILY_VARS
+                params["forecast_days"] = 7
+
+            breaker = open_meteo_breaker()
+            if not breaker.allow():
+                logger.debug("Open-Meteo circuit open — skipping")
+                return None
+            t0 = time.monotonic()
+            try:
+                resp = self.session.get(self.OPEN_METEO_URL, params=params, timeout=8)
+            except requests.RequestException:
+                breaker.record_failure(time.monotonic() - t0)
+                raise
+            if resp.status_code == 429 or resp.status_code >= 500:
+                breaker.record_failure(time.monotonic() - t0)
+            else:
+                breaker.record_success(time.monotonic() - t0)
             if resp.status_code != 200:
                 return None
+            return resp.json()
+        except Exception as e:
+            logger.error(f"Open-Meteo error: {e}")
+            return None
 
-            raw = resp.json()
+    def _fetch_open_meteo(self, lat: float, lon: float, location: str,
+                          lang: str = "hi") -> Optional[Dict]:
+        """Uncached Open-Meteo fetch + render (kept for direct callers)."""
+        raw = self._fetch_open_meteo_raw(lat, lon)
+        if not raw or not raw.get("current") or not raw.get("daily"):
+            return None
+        raw["fetched_at"] = time.time()
+        return self._render_open_meteo(raw, lat, lon, location, lang=lang)
+
+    def _render_open_meteo(self, raw: Dict[str, Any], lat: float, lon: float,
+                           location: str, lang: str = "hi") -> Optional[Dict]:
+        """Build the localised weather response from raw Open-Meteo sections."""
+        try:
             curr = raw.get("current", {})
             daily = raw.get("daily", {})
 
@@ -380,6 +608,7 @@ class WeatherService:
                 lang,
             )
 
+            fetched_at = raw.get("fetched_at") or time.time()
             return {
                 "status": "success",
                 "is_live": True,
@@ -387,7 +616,8 @@ class WeatherService:
                 "latitude": lat,
                 "longitude": lon,
                 "data_source": "Open-Meteo (Real-time, Free)",
-                "timestamp": datetime.now(tz=timezone.utc).isoformat(),
+                "timestamp": datetime.fromtimestamp(fetched_at, tz=timezone.utc).isoformat(),
+                "cache_age_seconds": max(0, int(time.time() - fetched_at)),
                 "language": lang,
                 "current": current_data,
                 "current_weather": current_data,       # alias for frontend compatibility
@@ -397,7 +627,7 @@ class WeatherService:
                 "farming_alerts": _generate_farming_alerts(forecast, lang=lang),
             }
         except Exception as e:
-            logger.error(f"Open-Meteo error: {e}")
+            logger.error(f"Open-Meteo render error: {e}")
             return None
 
     def _fetch_owm(self, lat: float, lon: float, location: str,
@@ -623,6 +853,9 @@ class MarketPricesService:
         # corruption when the module-level ThreadPoolExecutor calls get_prices()
         # concurrently from multiple threads sharing the same Session object.
         self._local = threading.local()
+        # Shared store for assembled data.gov.in mandi rows per (resource, state);
+        # None → caches["market_cache"].
+        self._rows_cache = None
 
     @property
     def session(self) -> requests.Session:
@@ -955,6 +1188,7 @@ class MarketPricesService:
         state: str = None,
         radius_km: float = 150,     # NEW: only return mandis within this radius when GPS available
         max_results: int = 50,       # NEW: cap the list for frontend usability
+        commodity: str = None,       # reference mandis: only those whose specialty covers it
     ) -> Dict[str, Any]:
         """
         Nearby mandi list, sorted by distance from user's GPS.
@@ -965,7 +1199,9 @@ class MarketPricesService:
 
         Falls back to state-wide list when no GPS is available.
         """
-        cache_key = f"mandis:{round(lat or 0, 3)}:{round(lon or 0, 3)}:{location}:{state}:{radius_km}"
+        cache_key = (
+            f"mandis:{round(lat or 0, 3)}:{round(lon or 0, 3)}:{location}:{state}:{radius_km}:{commodity or ''}"
+        )
         if cache_key in self._cache:
             age = (datetime.now(tz=timezone.utc) - self._cache_ts[cache_key]).total_seconds()
             # Mandi list is stable — 60-min TTL is sufficient and avoids hammering
@@ -997,38 +1233,27 @@ class MarketPricesService:
                 tries = state_candidates if not using_demo else state_candidates[:1]
 
                 for state_name in tries:
-                    records = self._data_gov_fetch_paginated(
-                        url,
-                        {
-                            "api-key": api_key,
-                            "format": "json",
-                            "filters[state]": state_name,
-                        },
-                        resource_key,
-                        api_key,
-                    )
-                    for rec in records:
-                        market = str(
-                            self._record_field(rec, "market", "Market", default="")
-                        ).strip()
-                        if not market or len(market) < 2:
-                            continue
-                        self._upsert_mandi(
-                            mandis_map,
-                            {
-                                "name": market,
-                                "district": self._record_field(
-                                    rec, "district", "District", default=""
-                                ),
-                                "state": self._record_field(
-                                    rec, "state", "State", default=state_name
-                                ),
-                                "source": f"data.gov.in ({resource_key})",
-                                "live": True,
-                                "commodity_count": 1,
-                            },
-                            live=True,
-                        )
+                    # Rows stream in page by page (parallel fetch, page order);
+                    # distances for new mandis are filled while later pages load.
+                    for rows in self._data_gov_mandi_rows(url, resource_key, api_key, state_name):
+                        added = []
+                        for name, district, row_state, count in rows:
+                            is_new = name.lower() not in mandis_map
+                            self._upsert_mandi(
+                                mandis_map,
+                                {
+                                    "name": name,
+                                    "district": district,
+                                    "state": row_state or state_name,
+                                    "source": f"data.gov.in ({resource_key})",
+                                    "live": True,
+                                    "commodity_count": count,
+                                },
+                                live=True,
+                            )
+                            if is_new:
+                                added.append(mandis_map[name.lower()])
+                        self._enrich_mandi_distances(added, lat, lon)
 
         live_count = sum(1 for m in mandis_map.values() if m.get("live"))
 
@@ -1036,7 +1261,7 @@ class MarketPricesService:
         ref_before = len(mandis_map)
         # Always merge reference DB so users see full state/nearby coverage, not a sparse live-only list
         self._merge_reference_mandis(
-            mandis_map, location, resolved_state, lat, lon, fill_gaps=True
+            mandis_map, location, resolved_state, lat, lon, fill_gaps=True, commodity=commodity
         )
         ref_count = len(mandis_map) - ref_before
 
@@ -1207,6 +1432,7 @@ class MarketPricesService:
         lat: float,
         lon: float,
         fill_gaps: bool,
+        commodity: str = None,
     ) -> None:
         if not fill_gaps and len(mandis_map) >= 200:
             return
@@ -1220,12 +1446,12 @@ class MarketPricesService:
                 # GPS available: get nearest mandis by distance (coordinates populated)
                 # This is key — get_nearest_mandis returns mandis WITH distance_km set,
                 # so the proximity filter in list_mandis can correctly exclude far ones.
-                refs = ref_svc.get_nearest_mandis(location, lat, lon, limit=60)
+                refs = ref_svc.get_nearest_mandis(location, lat, lon, limit=60, commodity=commodity)
             elif state:
                 # No GPS — fall back to state-wide list (no distance data)
                 refs = ref_svc.get_mandis_in_state(state, lat, lon, limit=100)
             else:
-                refs = ref_svc.get_nearest_mandis(location, lat, lon, limit=60)
+                refs = ref_svc.get_nearest_mandis(location, lat, lon, limit=60, commodity=commodity)
 
             for m in refs:
                 self._upsert_mandi(
@@ -1245,45 +1471,37 @@ class MarketPricesService:
         except Exception as exc:
             logger.warning("Reference mandi merge failed: %s", exc)
 
-    _mandi_coord_cache: Optional[Dict[str, Tuple[float, float]]] = None
-
-    @classmethod
-    def _mandi_coordinate_lookup(cls) -> Dict[str, Tuple[float, float]]:
-        if cls._mandi_coord_cache is not None:
-            return cls._mandi_coord_cache
-        lookup: Dict[str, Tuple[float, float]] = {}
-        try:
-            from .enhanced_market_prices import EnhancedMarketPricesService
-
-            for m in EnhancedMarketPricesService()._get_nationwide_mandi_database():
-                name = str(m.get("name", "")).strip().lower()
-                mlat = m.get("latitude")
-                mlon = m.get("longitude")
-                if name and mlat is not None and mlon is not None:
-                    lookup[name] = (float(mlat), float(mlon))
-        except Exception as exc:
-            logger.debug("Mandi coordinate lookup build failed: %s", exc)
-        cls._mandi_coord_cache = lookup
-        return lookup
-
     def _enrich_and_sort_mandis(
         self,
         mandis: List[Dict[str, Any]],
         lat: float = None,
         lon: float = None,
     ) -> List[Dict[str, Any]]:
-        if lat is not None and lon is not None:
-            coord_lookup = self._mandi_coordinate_lookup()
-            for m in mandis:
-                if m.get("distance_km") is not None:
-                    continue
-                key = str(m.get("name", "")).strip().lower()
-                coords = coord_lookup.get(key)
-                if coords:
-                    dist = _haversine_km(lat, lon, coords[0], coords[1])
+        self._enrich_mandi_distances(mandis, lat, lon)
+        return self._sort_mandis_for_user(mandis, lat, lon)
+
+    @staticmethod
+    def _enrich_mandi_distances(
+        mandis: List[Dict[str, Any]],
+        lat: float = None,
+        lon: float = None,
+    ) -> None:
+        """Fill distance_km for mandis that lack it (in place)."""
+        if lat is None or lon is None:
+            return
+        missing = [m for m in mandis if m.get("distance_km") is None]
+        if not missing:
+            return
+        try:
+            from .mandi_index import get_mandi_index
+
+            dists = get_mandi_index().distances(lat, lon, (m.get("name", "") for m in missing))
+            for m, dist in zip(missing, dists):
+                if dist is not None:
                     m["distance_km"] = round(dist, 1)
                     m["distance"] = f"{dist:.1f} km"
-        return self._sort_mandis_for_user(mandis, lat, lon)
+        except Exception as exc:
+            logger.debug("Mandi distance enrichment failed: %s", exc)
 
     @staticmethod
     def _sort_mandis_for_user(
@@ -1312,28 +1530,212 @@ class MarketPricesService:
         max_records: int = 2500,
     ) -> List[dict]:
         """Fetch all pages from data.gov.in (no key: refuse rather than use shared demo)."""
+        all_records: List[dict] = []
+        for page in self._data_gov_iter_pages(url, base_params, resource_key, api_key, max_records):
+            all_records.extend(page)
+        return all_records
+
+    def _data_gov_iter_pages(
+        self,
+        url: str,
+        base_params: Dict[str, Any],
+        resource_key: str,
+        api_key: str,
+        max_records: int = 2500,
+        lost: Optional[List[int]] = None,
+    ) -> Iterator[List[dict]]:
+        """
+        Yield data.gov.in result pages in order as they arrive.
+
+        Page 1 is fetched alone; when it reports ``total``, the remaining
+        pages go out in parallel on _DATA_GOV_PAGE_POOL and each is yielded
+        as soon as it and every page before it are in.  Without a total the
+        walk stays sequential.  A page that still fails after its retries is
+        skipped (logged, and its 1-based number appended to ``lost``) rather
+        than truncating the walk.
+        """
         if not api_key:
             logger.warning("DATA_GOV_IN_API_KEY not configured — skipping paginated fetch")
-            return []
-        page_size = 100
+            return
+        page_size = _DATA_GOV_PAGE_SIZE
         max_pages = 25
-        all_records: List[dict] = []
-        offset = 0
 
-        for _ in range(max_pages):
+        def _params(offset: int) -> Dict[str, Any]:
             params = dict(base_params)
             params["limit"] = page_size
             params["offset"] = offset
-            records = self._data_gov_request(url, params, resource_key, api_key)
-            if not records:
-                break
-            all_records.extend(records)
-            if len(records) < page_size:
-                break
-            offset += page_size
-            if len(all_records) >= max_records:
-                break
-        return all_records
+            return params
+
+        first, total = self._data_gov_page(url, _params(0), resource_key, api_key)
+        if first is None and lost is not None:
+            lost.append(1)
+        if not first:
+            return
+        yield first
+        if len(first) < page_size:
+            return
+
+        if total is None:
+            fetched, offset = len(first), page_size
+            for _ in range(max_pages - 1):
+                if fetched >= max_records:
+                    break
+                records, _ = self._data_gov_page(url, _params(offset), resource_key, api_key)
+                if records is None and lost is not None:
+                    lost.append(offset // page_size + 1)
+                if not records:
+                    break
+                yield records
+                fetched += len(records)
+                if len(records) < page_size:
+                    break
+                offset += page_size
+            return
+
+        n_pages = min(max_pages, -(-min(total, max_records) // page_size))
+        futures = [
+            _DATA_GOV_PAGE_POOL.submit(
+                self._data_gov_page, url, _params(i * page_size), resource_key, api_key
+            )
+            for i in range(1, n_pages)
+        ]
+        try:
+            for i, fut in enumerate(futures, start=1):
+                records, _ = fut.result()
+                if records is None:
+                    logger.warning("data.gov.in %s: page %d/%d missing after retries", resource_key, i + 1, n_pages)
+                    if lost is not None:
+                        lost.append(i + 1)
+                    continue
+                if records:
+                    yield records
+        finally:
+            for fut in futures:
+                fut.cancel()
+
+    def _data_gov_page(
+        self,
+        url: str,
+        params: Dict[str, Any],
+        resource_key: str,
+        api_key: str,
+    ) -> Tuple[Optional[list], Optional[int]]:
+        """
+        One data.gov.in page → (records, total).  Timeouts, connection errors,
+        429 and 5xx are retried with backoff; records is None when the page
+        could not be fetched, [] when it is past the end.
+        """
+        breaker = data_gov_breaker()
+        for attempt in range(_DATA_GOV_PAGE_ATTEMPTS):
+            if attempt:
+                time.sleep(0.25 * (2 ** (attempt - 1)))
+            if not breaker.allow():
+                logger.debug("data.gov.in circuit open — skipping %s page", resource_key)
+                return None, None
+            t0 = time.monotonic()
+            try:
+                resp = self.session.get(url, params=params, timeout=DATA_GOV_TIMEOUT)
+            except requests.RequestException as exc:
+                breaker.record_failure(time.monotonic() - t0)
+                logger.warning(
+                    "data.gov.in %s page offset=%s error (attempt %s): %s",
+                    resource_key, params.get("offset"), attempt + 1, exc,
+                )
+                continue
+            if resp.status_code == 429 or resp.status_code >= 500:
+                breaker.record_failure(time.monotonic() - t0)
+            else:
+                breaker.record_success(time.monotonic() - t0)
+            if resp.status_code == 403:
+                logger.warning(
+                    "data.gov.in 403 for %s — check your DATA_GOV_IN_API_KEY. "
+                    "Register at https://data.gov.in/user/register",
+                    resource_key,
+                )
+                return None, None
+            if resp.status_code == 429 or resp.status_code >= 500:
+                logger.warning(
+                    "data.gov.in %s HTTP %s (attempt %s)", resource_key, resp.status_code, attempt + 1
+                )
+                continue
+            if resp.status_code != 200:
+                logger.warning("data.gov.in %s HTTP %s", resource_key, resp.status_code)
+                return None, None
+            try:
+                raw = resp.json()
+            except ValueError as exc:
+                logger.warning("data.gov.in %s bad JSON: %s", resource_key, exc)
+                continue
+            try:
+                total = int(raw.get("total"))
+            except (TypeError, ValueError):
+                total = None
+            return raw.get("records") or [], total
+        return None, None
+
+    # ── Assembled mandi rows per (resource, state) ─────────────────────────
+    def _market_cache(self):
+        if self._rows_cache is not None:
+            return self._rows_cache
+        try:
+            from django.core.cache import caches
+            return caches["market_cache"]
+        except Exception:
+            return None
+
+    def _data_gov_mandi_rows(
+        self,
+        url: str,
+        resource_key: str,
+        api_key: str,
+        state_name: str,
+    ) -> Iterator[List[Tuple[str, str, str, int]]]:
+        """
+        (market, district, state, record count) rows for one state, per page.
+
+        The assembled set is cached in market_cache for CACHE_TTL, so the
+        next listing for any location in the state skips the page walk.
+        A walk that lost pages is not cached.
+        """
+        cache = self._market_cache()
+        key = f"km:mandis:rows:{resource_key}:{state_name.lower().replace(' ', '_')}"
+        if cache is not None:
+            try:
+                cached = cache.get(key)
+            except Exception:
+                cached = None
+            if cached is not None:
+                yield [tuple(r) for r in cached]
+                return
+
+        assembled: Dict[str, List[Any]] = {}
+        lost: List[int] = []
+        for records in self._data_gov_iter_pages(
+            url, {"api-key": api_key, "format": "json", "filters[state]": state_name},
+            resource_key, api_key, lost=lost,
+        ):
+            page_rows: Dict[str, List[Any]] = {}
+            for rec in records:
+                market = str(self._record_field(rec, "market", "Market", default="")).strip()
+                if not market or len(market) < 2:
+                    continue
+                district = self._record_field(rec, "district", "District", default="")
+                row_state = self._record_field(rec, "state", "State", default=state_name)
+                for rows in (page_rows, assembled):
+                    row = rows.get(market.lower())
+                    if row is None:
+                        rows[market.lower()] = [market, district, row_state, 1]
+                    else:
+                        row[3] += 1
+                        if district and not row[1]:
+                            row[1] = district
+            yield [tuple(r) for r in page_rows.values()]
+
+        if not lost and cache is not None:
+            try:
+                cache.set(key, list(assembled.values()), timeout=self.CACHE_TTL)
+            except Exception:
+                pass
 
     def _apply_mandi_filter(self, data: Dict[str, Any], mandi: str) -> Dict[str, Any]:
         m = mandi.lower().strip()
@@ -1557,9 +1959,22 @@ class MarketPricesService:
         api_key: str,
     ) -> Optional[list]:
         last_error = None
+        breaker = data_gov_breaker()
         for attempt in range(2):
+            if not breaker.allow():
+                logger.debug("data.gov.in circuit open — skipping %s", resource_key)
+                return None
+            t0 = time.monotonic()
             try:
-                resp = self.session.get(url, params=params, timeout=DATA_GOV_TIMEOUT)
+                try:
+                    resp = self.session.get(url, params=params, timeout=DATA_GOV_TIMEOUT)
+                except requests.RequestException:
+                    breaker.record_failure(time.monotonic() - t0)
+                    raise
+                if resp.status_code == 429 or resp.status_code >= 500:
+                    breaker.record_failure(time.monotonic() - t0)
+                else:
+                    breaker.record_success(time.monotonic() - t0)
                 if resp.status_code == 403:
                     logger.warning(
                         "data.gov.in 403 for %s — check your DATA_GOV_IN_API_KEY. "
@@ -1842,12 +2257,20 @@ class GeminiService:
         max_tokens: int = 1024,
         user_query: str = None,
         temperature: float = 0.7,
+        fallback: bool = True,
     ) -> str:
-        """Generate response with pro → flash fallback"""
+        """
+        Generate response with pro → flash fallback.  When neither answers,
+        the rule-based text — or "" with ``fallback=False``, for callers
+        that must tell a generation from a fallback (the response cache).
+        """
         if not _is_valid_gemini_key(self.api_key):
-            return self._rule_based_response(user_query or prompt)
+            return self._rule_based_response(user_query or prompt) if fallback else ""
 
         for model in [GEMINI_MODEL, GEMINI_FLASH]:
+            if not gemini_breaker().allow():
+                logger.debug("Gemini circuit open — rule-based answer")
+                break
             try:
                 response = self._call_api(
                     model, prompt, system_prompt, max_tokens, temperature
@@ -1857,7 +2280,7 @@ class GeminiService:
             except Exception as e:
                 logger.warning(f"Gemini {model} failed: {e}")
 
-        return self._rule_based_response(user_query or prompt)
+        return self._rule_based_response(user_query or prompt) if fallback else ""
 
     def _call_api(
         self,
@@ -1902,7 +2325,18 @@ class GeminiService:
                 "parts": [{"text": system_prompt}]
             }
 
-        resp = self.session.post(url, json=payload, timeout=30)
+        breaker = gemini_breaker()
+        t0 = time.monotonic()
+        try:
+            resp = self.session.post(url, json=payload, timeout=30)
+        except requests.RequestException:
+            breaker.record_failure(time.monotonic() - t0)
+            raise
+        # 429 / 5xx mean Gemini is struggling; 4xx and blocked prompts do not.
+        if resp.status_code == 429 or resp.status_code >= 500:
+            breaker.record_failure(time.monotonic() - t0)
+        else:
+            breaker.record_success(time.monotonic() - t0)
         if resp.status_code == 200:
             data = resp.json()
 
@@ -0,0 +1,364 @@
+"""
+KrishiMitra — WhatsApp inbox: acknowledge the webhook, answer in the background
+==============================================================================
+Meta expects the webhook to answer within a few seconds and redelivers when
+it does not.  Answering a farmer can take longer than that: a voice note
+goes through Whisper, the chat pipeline may generate with an LLM, and the
+reply is another Graph API call.  The webhook therefore only validates and
+enqueues; the inbox does the rest.
+
+  idempotency   every message id is claimed once (an in-process LRU for
+                this worker + ``cache.add`` on the shared cache for all of
+                them), so Meta's redeliveries and duplicate batches are
+                dropped instead of answered twice
+  ordering      one farmer's messages are handled one at a time, in arrival
+                order; different farmers are handled in parallel
+  backpressure  at most WHATSAPP_QUEUE_MAX_PENDING messages wait in this
+                worker.  Beyond that submit() answers "busy", the message's
+                claim is released and the webhook returns 503 so Meta
+                redelivers it later
+  metrics       depth, in-flight, waiting senders, queue wait and handling
+                time percentiles, duplicate / busy / failed counters
+
+Backends:
+
+  celery       when a broker is configured (CELERY_BROKER_URL / REDIS_URL,
+               like chatbot._dispatch_writes): tasks.process_whatsapp_message
+               on the Celery workers.  Celery does not deliver in order, so
+               submit() numbers each farmer's messages (a counter on the
+               shared cache) and a task only answers once the previous
+               number is done (answer_in_order); a sender lease keeps it to
+               one message per farmer at a time
+  in_process   otherwise (or when the broker is unreachable): a small
+               thread pool with per-sender FIFO queues in this process
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from .cache_utils import LRUCache, release_lease, try_acquire_lease
+
+logger = logging.getLogger(__name__)
+
+WHATSAPP_QUEUE_BACKEND     = os.getenv("WHATSAPP_QUEUE_BACKEND", "auto").lower()   # auto | celery | in_process
+WHATSAPP_QUEUE_WORKERS     = int(os.getenv("WHATSAPP_QUEUE_WORKERS", "8"))
+WHATSAPP_QUEUE_MAX_PENDING = int(os.getenv("WHATSAPP_QUEUE_MAX_PENDING", "500"))
+# Meta retries undelivered webhooks for days; remember message ids as long.
+WHATSAPP_DEDUPE_TTL_S      = int(os.getenv("WHATSAPP_DEDUPE_TTL_S", str(3 * 86400)))
+SENDER_LEASE_S             = 120     # Celery: longest one message may hold its farmer's lease
+# Celery: sequence counters outlive the turn markers they are compared with
+# by this much, so a counter that expired and restarted at 1 never meets a
+# stale marker with the same number.
+_SEQ_SLACK_S               = 86400
+_KEY_PREFIX                = "krishimitra:wa"
+_SAMPLES                   = 2000    # recent timings kept for percentiles
+
+
+def _use_celery() -> bool:
+    if WHATSAPP_QUEUE_BACKEND == "celery":
+        return True
+    if WHATSAPP_QUEUE_BACKEND == "in_process":
+        return False
+    return bool(os.getenv("CELERY_BROKER_URL") or os.getenv("REDIS_URL"))
+
+
+def _shared_cache():
+    try:
+        from django.core.cache import caches
+        return caches["default"]
+    except Exception:
+        return None
+
+
+def sender_lease_key(sender: str) -> str:
+    return f"{_KEY_PREFIX}:sender:{sender}"
+
+
+def _seq_key(sender: str) -> str:
+    return f"{_KEY_PREFIX}:seq:{sender}"
+
+
+def _done_key(sender: str) -> str:
+    return f"{_KEY_PREFIX}:done:{sender}"
+
+
+def next_sender_seq(cache, sender: str, ttl: int = WHATSAPP_DEDUPE_TTL_S) -> Optional[int]:
+    """
+    Number this farmer's next message (1, 2, ...) on the shared cache.  None
+    when the cache cannot count (DummyCache, outage) — the task then answers
+    under the sender lease alone, as before sequencing.
+    """
+    if cache is None:
+        return None
+    key = _seq_key(sender)
+    try:
+        cache.add(key, 0, timeout=ttl + _SEQ_SLACK_S)
+        seq = cache.incr(key)
+        cache.touch(key, ttl + _SEQ_SLACK_S)
+        if seq == 1:                                  # new counter: nothing answered yet
+            cache.set(_done_key(sender), 0, timeout=ttl)
+        return seq
+    except Exception as exc:
+        logger.debug("WhatsApp sequence unavailable for %s: %s", sender, exc)
+        return None
+
+
+def _is_turn(cache, sender: str, seq: int) -> bool:
+    """Every earlier message of this farmer is answered (or its marker is gone)."""
+    try:
+        done = cache.get(_done_key(sender))
+    except Exception:
+        return True
+    return done is None or done >= seq - 1
+
+
+def _mark_done(cache, sender: str, seq: int, ttl: int) -> None:
+    try:
+        done = cache.get(_done_key(sender)) or 0
+        cache.set(_done_key(sender), max(done, seq), timeout=ttl)
+    except Exception as exc:
+        logger.debug("WhatsApp sequence marker not written for %s: %s", sender, exc)
+
+
+def answer_in_order(
+    cache,
+    message: Dict[str, Any],
+    seq: Optional[int],
+    handler: Callable[[Dict[str, Any]], Any],
+    last_try: bool = False,
+    ttl: int = WHATSAPP_DEDUPE_TTL_S,
+) -> bool:
+    """
+    One delivery of a Celery task.  Returns False when the message has to
+    wait — an earlier message of the farmer is still unanswered or their
+    lease is held — and the task should come back later; True once it is
+    answered (handler errors propagate after the turn is passed on).
+
+    On the last try a message whose predecessor never finished (task lost,
+    dropped after its own retries) is answered out of order rather than
+    not at all.
+    """
+    sender = message.get("from", "")
+    if seq is not None and not _is_turn(cache, sender, seq):
+        if not last_try:
+            return False
+        logger.warning("WhatsApp %s: earlier message of the sender never finished, answering out of order",
+                       message.get("id"))
+    key = sender_lease_key(sender)
+    if not try_acquire_lease(cache, key, SENDER_LEASE_S):
+        if not last_try:
+            return False
+        logger.error("WhatsApp %s: sender busy too long, dropping", message.get("id"))
+        return True
+    try:
+        handler(message)
+    finally:
+        if seq is not None:
+            _mark_done(cache, sender, seq, ttl)
+        release_lease(cache, key)
+    return True
+
+
+def _pct(values: List[float], q: float) -> Optional[float]:
+    if not values:
+        return None
+    values = sorted(values)
+    return round(values[min(len(values) - 1, int(q * len(values)))], 1)
+
+
+class WhatsAppInbox:
+    """Idempotent, per-sender ordered background queue for inbound WhatsApp messages."""
+
+    def __init__(
+        self,
+        handler: Optional[Callable[[Dict[str, Any]], Any]] = None,
+        workers: int = WHATSAPP_QUEUE_WORKERS,
+        max_pending: int = WHATSAPP_QUEUE_MAX_PENDING,
+        cache=None,
+        use_celery: Optional[bool] = None,
+        dedupe_ttl: int = WHATSAPP_DEDUPE_TTL_S,
+        dispatch: Optional[Callable[[Dict[str, Any], Optional[int]], Any]] = None,
+    ):
+        self.handler = handler
+        self.workers = max(1, workers)
+        self.max_pending = max_pending
+        self.dedupe_ttl = dedupe_ttl
+        self._cache = cache
+        self._use_celery = use_celery
+        self._dispatch = dispatch                     # (message, seq) → Celery; default the real task
+        self._seen = LRUCache(maxsize=50_000, ttl=dedupe_ttl)
+        self._cond = threading.Condition()
+        self._pending: Dict[str, Deque[Dict[str, Any]]] = {}   # sender → FIFO
+        self._ready: Deque[str] = deque()                      # senders with work, none in flight
+        self._active: set = set()
+        self._depth = 0
+        self._threads: List[threading.Thread] = []
+        self._waits: Deque[float] = deque(maxlen=_SAMPLES)
+        self._handling: Deque[float] = deque(maxlen=_SAMPLES)
+        self._stats: Dict[str, int] = {
+            "submitted": 0, "queued": 0, "duplicates": 0, "busy": 0, "invalid": 0,
+            "processed": 0, "failed": 0, "celery": 0, "celery_fallbacks": 0, "max_depth": 0,
+        }
+
+    @property
+    def cache(self):
+        return self._cache if self._cache is not None else _shared_cache()
+
+    @property
+    def mode(self) -> str:
+        use = self._use_celery if self._use_celery is not None else _use_celery()
+        return "celery" if use else "in_process"
+
+    def _count(self, key: str, n: int = 1) -> None:
+        with self._cond:
+            self._stats[key] += n
+
+    # ── Idempotency ───────────────────────────────────────────────────
+    def _claim(self, message_id: str) -> bool:
+        """First sighting of this message id (this worker and, via the shared cache, all of them)."""
+        if self._seen.get(message_id) is not None:
+            return False
+        self._seen.set(message_id, True)
+        cache = self.cache
+        if cache is None:
+            return True
+        try:
+            return bool(cache.add(f"{_KEY_PREFIX}:msg:{message_id}", 1, timeout=self.dedupe_ttl))
+        except Exception as exc:                      # fail open: answer twice rather than never
+            logger.debug("WhatsApp dedupe cache unavailable: %s", exc)
+            return True
+
+    def _unclaim(self, message_id: str) -> None:
+        self._seen.pop(message_id)
+        cache = self.cache
+        if cache is not None:
+            try:
+                cache.delete(f"{_KEY_PREFIX}:msg:{message_id}")
+            except Exception:
+                pass
+
+    # ── Submission ────────────────────────────────────────────────────
+    def submit(self, message: Dict[str, Any]) -> str:
+        """
+        Queue one inbound message ({"id", "from", "type", ...} as Meta sends
+        it).  Returns "queued", "duplicate", "busy" (retry later) or
+        "invalid".  Never blocks on the handler.
+        """
+        self._count("submitted")
+        message_id, sender = message.get("id"), message.get("from")
+        if not message_id or not sender:
+            self._count("invalid")
+            return "invalid"
+        if not self._claim(message_id):
+            self._count("duplicates")
+            return "duplicate"
+
+        if self.mode == "celery":
+            try:
+                dispatch = self._dispatch
+                if dispatch is None:
+                    from ..tasks import process_whatsapp_message
+                    dispatch = process_whatsapp_message.delay
+                dispatch(message, next_sender_seq(self.cache, sender, self.dedupe_ttl))
+                self._count("celery")
+                return "queued"
+            except Exception as exc:
+                logger.warning("Celery unavailable for WhatsApp (%s) — queueing in process", exc)
+                self._count("celery_fallbacks")
+
+        enqueued_at = time.perf_counter()
+        with self._cond:
+            if self._depth >= self.max_pending:
+                self._stats["busy"] += 1
+                busy = True
+            else:
+                busy = False
+                queue = self._pending.setdefault(sender, deque())
+                queue.append({"message": message, "enqueued_at": enqueued_at})
+                if len(queue) == 1 and sender not in self._active:
+                    self._ready.append(sender)
+                self._depth += 1
+                self._stats["queued"] += 1
+                self._stats["max_depth"] = max(self._stats["max_depth"], self._depth)
+                self._cond.notify()
+        if busy:
+            self._unclaim(message_id)                 # let the redelivery in
+            return "busy"
+        self._ensure_workers()
+        return "queued"
+
+    # ── Workers ───────────────────────────────────────────────────────
+    def _ensure_workers(self) -> None:
+        if len(self._threads) >= self.workers:
+            return
+        with self._cond:
+            while len(self._threads) < self.workers:
+                t = threading.Thread(target=self._work, name=f"km-wa-{len(self._threads)}", daemon=True)
+                self._threads.append(t)
+                t.start()
+
+    def _work(self) -> None:
+        while True:
+            with self._cond:
+                while not self._ready:
+                    self._cond.wait()
+                sender = self._ready.popleft()
+                item = self._pending[sender].popleft()
+                self._active.add(sender)
+            started = time.perf_counter()
+            ok = True
+            try:
+                self.handler(item["message"])
+            except Exception as exc:
+                ok = False
+                logger.error("WhatsApp message %s failed: %s", item["message"].get("id"), exc)
+            done = time.perf_counter()
+            with self._cond:
+                self._active.discard(sender)
+                if self._pending[sender]:
+                    self._ready.append(sender)
+                    self._cond.notify()
+                else:
+                    del self._pending[sender]
+                self._depth -= 1
+                self._stats["processed" if ok else "failed"] += 1
+                self._waits.append((started - item["enqueued_at"]) * 1000)
+                self._handling.append((done - started) * 1000)
+                self._cond.notify_all()
+
+    def drain(self, timeout: float = 30.0) -> bool:
+        """Wait until nothing is queued or in flight (benchmarks, shutdown)."""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while self._depth:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    # ── Metrics ───────────────────────────────────────────────────────
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            s: Dict[str, Any] = dict(self._stats)
+            waits, handling = list(self._waits), list(self._handling)
+            s.update(
+                depth=self._depth,
+                in_flight=len(self._active),
+                senders_waiting=len(self._pending) - len(self._active),
+                max_pending=self.max_pending,
+                workers=len(self._threads),
+            )
+        s["mode"] = self.mode
+        s["queue_wait_p50_ms"] = _pct(waits, 0.50)
+        s["queue_wait_p95_ms"] = _pct(waits, 0.95)
+        s["handling_p50_ms"] = _pct(handling, 0.50)
+        s["handling_p95_ms"] = _pct(handling, 0.95)
+        return s
+
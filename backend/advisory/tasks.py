@@ -11,10 +11,26 @@ chatbot.py calls the underlying functions directly — no Celery required.
 
 import logging
 from celery import shared_task
+from celery.signals import worker_process_shutdown
 
 logger = logging.getLogger(__name__)
 
 
+@worker_process_shutdown.connect
+def _flush_session_memory(**_kwargs):
+    """persist_turn and log_interaction buffer rows; write them before the child exits."""
+    try:
+        from .services.session_memory_service import session_memory
+        session_memory.flush()
+    except Exception as exc:
+        logger.warning("session_memory flush on worker shutdown failed: %s", exc)
+    try:
+        from .services.interaction_log_sink import interaction_log_sink
+        interaction_log_sink.close()
+    except Exception as exc:
+        logger.warning("interaction_log_sink flush on worker shutdown failed: %s", exc)
+
+
 # ── Existing placeholder ──────────────────────────────────────
 @shared_task(name="backend.advisory.tasks.refresh_location_cache")
 def refresh_location_cache():
@@ -111,27 +127,37 @@ def log_interaction(
     Async version of FarmerInteractionLog.objects.create().
 
     All Q&A interactions are still logged — just 50–100 ms later when
-    running asynchronously.  Retries up to 2 times on DB errors.
+    running asynchronously.  With INTERACTION_LOG_SINK on (the default) the
+    row joins this worker's batch (one bulk_create per batch, spooled to
+    disk until committed) instead of its own INSERT; the sink retries
+    failed batches itself.  Otherwise retries up to 2 times on DB errors.
     """
+    from .services.interaction_log_sink import (
+        INTERACTION_LOG_SINK, interaction_log_sink, interaction_row,
+    )
+    row = interaction_row(
+        session_id=session_id,
+        phone_number=phone_number,
+        location_name=location_name,
+        state=state,
+        latitude=latitude,
+        longitude=longitude,
+        query=query,
+        response=response,
+        intent=intent,
+        language=language,
+        crops_detected=crops_detected,
+        ai_tier=ai_tier,
+        data_source=data_source,
+        season=season,
+        response_time_ms=response_time_ms,
+    )
+    if INTERACTION_LOG_SINK:
+        interaction_log_sink.add(row)
+        return
     try:
         from .models import FarmerInteractionLog
-        FarmerInteractionLog.objects.create(
-            session_id=session_id,
-            phone_number=phone_number or "",
-            location_name=location_name or "",
-            state=state or "",
-            latitude=latitude,
-            longitude=longitude,
-            query=query,
-            response=response,
-            intent=intent or "",
-            language=language or "hi",
-            crops_detected=crops_detected or [],
-            ai_tier=ai_tier or "",
-            data_source=data_source or "",
-            season=season or "",
-            response_time_ms=response_time_ms,
-        )
+        FarmerInteractionLog.objects.create(**row)
     except Exception as exc:
         logger.warning(
             "log_interaction task failed (session=%s, attempt=%d): %s",
@@ -145,3 +171,40 @@ def log_interaction(
             )
             import sentry_sdk
             sentry_sdk.capture_exception(exc)
+
+
+# ── Task 3: answer one inbound WhatsApp message ───────────────
+@shared_task(
+    name="backend.advisory.tasks.process_whatsapp_message",
+    bind=True,
+    max_retries=120,
+    ignore_result=True,
+)
+def process_whatsapp_message(self, message: dict, seq: int = None):
+    """
+    Celery side of services/whatsapp_inbox.py: transcribe, run the chat
+    pipeline and send the reply for one message the webhook already
+    acknowledged.
+
+    ``seq`` numbers the farmer's messages in arrival order; the task
+    re-queues itself (1 s countdown) until every earlier one is answered
+    and the farmer's lease is free, so a farmer's waiting messages cannot
+    overtake each other on retry.  Tasks queued without ``seq`` only take
+    the lease.
+    Handler errors are not retried — the farmer would get a late duplicate
+    answer.
+    """
+    from django.core.cache import caches
+    from .api.viewsets.misc import process_whatsapp_message as handle
+    from .services.whatsapp_inbox import answer_in_order
+
+    try:
+        answered = answer_in_order(caches["default"], message, seq, handle,
+                                   last_try=self.request.retries >= self.max_retries)
+    except Exception as exc:
+        logger.error("process_whatsapp_message failed (%s): %s", message.get("id"), exc)
+        import sentry_sdk
+        sentry_sdk.capture_exception(exc)
+        return
+    if not answered:
+        raise self.retry(countdown=1)
@@ -364,6 +364,24 @@ if DEBUG:
         'rate_limit': {
             'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
         },
+        'response_cache': {
+            'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
+        },
+        'geo_cache': {
+            'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
+        },
+        'field_cache': {
+            'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
+        },
+        'prediction_cache': {
+            'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
+        },
+        'tts_cache': {
+            'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
+        },
+        'circuit_breaker': {
+            'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
+        },
     }
 elif _REDIS_URL:
     # Production with Redis — rate counters shared across all Gunicorn workers
@@ -384,6 +402,18 @@ elif _REDIS_URL:
         'schema_cache': _redis_cache(86400,    10),
         # rate_limit must be Redis in production — LocMem bypasses limits across workers
         'rate_limit':   _redis_cache(86400,  5000),
+        # LLM answers shared across workers (services/response_cache.py)
+        'response_cache': _redis_cache(86400, 20000),
+        # Reverse-geocoded GPS cells (services/geocode_cache.py) — places don't move
+        'geo_cache':    _redis_cache(30 * 86400, 50000),
+        # Field advisory weather / soil per ~100 m cell (services/field_sensor_service.py)
+        'field_cache':  _redis_cache(7 * 86400, 50000),
+        # Crop disease results by upload / perceptual hash (ml/prediction_cache.py)
+        'prediction_cache': _redis_cache(3 * 86400, 20000),
+        # Synthesised speech per sentence (services/tts_audio_cache.py)
+        'tts_cache':    _redis_cache(30 * 86400, 20000),
+        # Upstream breaker state shared by every worker (services/circuit_breaker.py)
+        'circuit_breaker': _redis_cache(3600, 2000),
     }
 else:
     # Staging / preview without Redis — warn loudly and use LocMem
@@ -407,6 +437,12 @@ else:
         'market_cache':  _locmem_cache('market',  86400,   1000),
         'schema_cache':  _locmem_cache('schema',  86400,     10),
         'rate_limit':    _locmem_cache('ratelimit', 86400, 5000),
+        'response_cache': _locmem_cache('response', 86400, 5000),
+        'geo_cache':     _locmem_cache('geo', 30 * 86400, 5000),
+        'field_cache':   _locmem_cache('field', 7 * 86400, 5000),
+        'prediction_cache': _locmem_cache('prediction', 3 * 86400, 2000),
+        'tts_cache':     _locmem_cache('tts', 30 * 86400, 500),
+        'circuit_breaker': _locmem_cache('circuit_breaker', 3600, 2000),
     }
 
 CORS_ALLOW_ALL_ORIGINS = DEBUG  # Allow all in dev only
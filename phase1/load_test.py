@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+KrishiMitra Phase 1 — concurrency load test
+===========================================
+Starts a fake Ollama that takes --delay seconds per generation, fires
+--n concurrent POST /chat requests at the FastAPI app (in-process, via
+httpx ASGITransport) and probes GET /health while they run.
+
+With a blocking request path the chats serialize (wall ≈ n × delay) and
+/health waits behind them; with the async path wall ≈ ceil(n / slots) ×
+delay and /health answers immediately.
+
+Usage:
+    python3 load_test.py                 # 8 chats, 1 s each, 8 model slots
+    python3 load_test.py --n 16 --delay 0.5 --slots 4
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import math
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+
+def _fake_ollama(delay: float) -> ThreadingHTTPServer:
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def _json(self, body: dict):
+            raw = json.dumps(body).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(raw)))
+            self.end_headers()
+            self.wfile.write(raw)
+
+        def do_GET(self):
+            self._json({"models": [{"name": "krishimitra-llm:latest", "size": 4_000_000_000}]})
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            time.sleep(delay)
+            self._json({"message": {"content": "Irrigate wheat at crown root initiation."}})
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+async def _run(n: int, delay: float) -> dict:
+    import httpx
+    import main
+
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://phase1") as client:
+        async def one_chat(i):
+            t0 = time.perf_counter()
+            r = await client.post("/chat", json={"query": f"wheat irrigation {i}", "language": "en"})
+            return r.status_code, time.perf_counter() - t0
+
+        async def health_probe():
+            await asyncio.sleep(delay / 4)      # let the chats start first
+            t0 = time.perf_counter()
+            r = await client.get("/health")
+            return r.status_code, time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        results = await asyncio.gather(health_probe(), *(one_chat(i) for i in range(n)))
+        wall = time.perf_counter() - t0
+        await main.close_ollama_client()
+
+    health, chats = results[0], results[1:]
+    return {
+        "chats":            n,
+        "ok":               sum(1 for code, _ in chats if code == 200),
+        "wall_s":           round(wall, 2),
+        "serialized_s":     round(n * delay, 2),
+        "health_ms":        round(health[1] * 1000, 1),
+        "max_chat_s":       round(max(t for _, t in chats), 2),
+    }
+
+
+def main_cli():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--n", type=int, default=8)
+    ap.add_argument("--delay", type=float, default=1.0)
+    ap.add_argument("--slots", type=int, default=None, help="OLLAMA_MAX_CONCURRENCY (default: n)")
+    args = ap.parse_args()
+
+    server = _fake_ollama(args.delay)
+    slots = args.slots or args.n
+    os.environ["OLLAMA_BASE_URL"] = f"http://127.0.0.1:{server.server_address[1]}"
+    os.environ["OLLAMA_MAX_CONCURRENCY"] = str(slots)
+    os.environ.setdefault("OLLAMA_MAX_QUEUE", str(args.n))
+    sys.path.insert(0, str(Path(__file__).parent))
+
+    res = asyncio.run(_run(args.n, args.delay))
+    expected = math.ceil(args.n / slots) * args.delay
+    print(json.dumps(res, indent=2))
+    print(
+        f"\n{res['ok']}/{res['chats']} chats in {res['wall_s']}s "
+        f"(serialized would be {res['serialized_s']}s, bound ≈ {expected:.1f}s); "
+        f"/health answered in {res['health_ms']} ms during load"
+    )
+    server.shutdown()
+    if res["ok"] != args.n or res["wall_s"] > expected + args.delay:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -14,11 +14,22 @@ Endpoints:
     GET  /health        — system health check
     GET  /rag/status    — knowledge base status
     GET  /rag/search    — test a RAG search query
+
+Concurrency: the chat endpoints never block the event loop.  Ollama is
+called through the pooled async client (services/ollama_service.achat /
+astream_chat, bounded per model); ChromaDB/BM25 retrieval and the Django
+weather service run on _IO_POOL, concurrently with each other.  When a
+model's queue is full, Ollama is down or it generated nothing, /chat
+answers 503 so callers fall back (and never cache an offline notice as
+an answer).
 """
 
+import asyncio
 import json
 import logging
+import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 from typing import List, Optional
@@ -43,12 +54,28 @@ except ImportError:
 
 from rag.retriever import retrieve, retrieve_with_sources, is_available
 from services.ollama_service import (
+    OllamaBusyError,
+    OllamaUnavailableError,
+    aclose as close_ollama_client,
+    achat,
+    astream_chat,
     build_farming_prompt,
-    chat,
-    stream_chat,
     get_model_info,
+    queue_stats,
     AGRI_SYSTEM_PROMPT,
 )
+from advisory.services.circuit_breaker import breaker_stats, ollama_breaker
+
+# Blocking work (ChromaDB, BM25, Django weather) — bounded, off the event loop.
+_IO_POOL = ThreadPoolExecutor(
+    max_workers=int(os.getenv("PHASE1_IO_WORKERS", "8")),
+    thread_name_prefix="phase1-io",
+)
+
+
+async def _offload(fn, *args, **kwargs):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_IO_POOL, lambda: fn(*args, **kwargs))
 
 # ── FastAPI app ───────────────────────────────────────────────────────────────
 app = FastAPI(
@@ -150,6 +177,14 @@ def _get_weather_summary(location: str, lat: float, lon: float, lang: str) -> st
         return ""
 
 
+async def _weather_for(req: "ChatRequest") -> str:
+    if not (req.latitude and req.longitude and req.location):
+        return ""
+    return await _offload(
+        _get_weather_summary, req.location, req.latitude, req.longitude, req.language
+    )
+
+
 # ── Chat endpoint ─────────────────────────────────────────────────────────────
 @app.post("/chat", response_model=ChatResponse)
 async def chat_endpoint(req: ChatRequest):
@@ -160,19 +195,15 @@ async def chat_endpoint(req: ChatRequest):
     if req.stream:
         raise HTTPException(400, "Use POST /chat/stream for streaming responses")
 
-    # 1. RAG retrieval — fetch 20 candidates, reranker returns top 5
-    #    (RAG-1: parallel vector+keyword; RAG-2: compressed context; RAG-3: cached)
-    rag_results = retrieve_with_sources(req.query, k=5)
+    # 1+2. RAG retrieval (vector+keyword → top 5) and optional weather,
+    #      concurrently on the I/O pool
+    rag_results, weather_summary = await asyncio.gather(
+        _offload(retrieve_with_sources, req.query, k=5),
+        _weather_for(req),
+    )
     rag_texts   = [r["text"]        for r in rag_results]
     rag_sources = list({r["source_file"] for r in rag_results})
 
-    # 2. Optional weather (non-blocking)
-    weather_summary = ""
-    if req.latitude and req.longitude and req.location:
-        weather_summary = _get_weather_summary(
-            req.location, req.latitude, req.longitude, req.language
-        )
-
     # 3. Build prompt
     farmer_profile = {
         "location": req.location,
@@ -190,16 +221,19 @@ async def chat_endpoint(req: ChatRequest):
     )
 
     # 4. Generate response via Qwen
-    # Bug 6 fix: if Qwen returns empty string (e.g. Ollama overloaded),
-    # return a safe fallback message instead of letting Pydantic validation
-    # reject the empty string and emit a 422 to the Django caller.
-    _OFFLINE_MSG = (
-        "माफ़ करें, AI सेवा अभी व्यस्त है। "
-        "Kisan Helpline: 1800-180-1551 (Free, 24x7)\n\n"
-        "Sorry, AI service is temporarily busy. "
-        "Please call Kisan Helpline: 1800-180-1551 (Free, 24x7)"
-    )
-    response_text = chat(prompt) or _OFFLINE_MSG
+    # No generation (Ollama offline, failed or returned nothing) is a 503,
+    # not a 200 carrying a helpline notice: the Django caller falls back to
+    # its next tier and must not cache the notice as this question's answer.
+    try:
+        response_text = await achat(prompt)
+    except OllamaBusyError as exc:
+        logger.warning("Model queue full — rejecting chat: %s", exc)
+        raise HTTPException(503, "AI model busy — retry shortly", headers={"Retry-After": "5"})
+    except OllamaUnavailableError as exc:
+        logger.warning("Model unavailable — rejecting chat: %s", exc)
+        raise HTTPException(503, "AI model unavailable", headers={"Retry-After": "30"})
+    if not response_text:
+        raise HTTPException(503, "AI model returned no answer", headers={"Retry-After": "5"})
 
     return ChatResponse(
         response=response_text,
@@ -218,15 +252,11 @@ async def chat_stream_endpoint(req: ChatRequest):
     Streaming chat — tokens arrive in real-time.
     Response is newline-delimited JSON: {"token": "..."} or {"done": true}.
     """
-    # 1. RAG — Top-20 → rerank → Top-5 (RAG-1/2/3 pipeline)
-    rag_texts = retrieve(req.query, k=5)
-
-    # 2. Weather
-    weather_summary = ""
-    if req.latitude and req.longitude and req.location:
-        weather_summary = _get_weather_summary(
-            req.location, req.latitude, req.longitude, req.language
-        )
+    # 1+2. RAG (Top-20 → fuse → Top-5) and weather, concurrently
+    rag_texts, weather_summary = await asyncio.gather(
+        _offload(retrieve, req.query, k=5),
+        _weather_for(req),
+    )
 
     # 3. Build prompt
     prompt = build_farming_prompt(
@@ -243,8 +273,8 @@ async def chat_stream_endpoint(req: ChatRequest):
         conversation_history=req.history,
     )
 
-    def _token_generator():
-        for token in stream_chat(prompt):
+    async def _token_generator():
+        async for token in astream_chat(prompt):
             yield json.dumps({"token": token}, ensure_ascii=False) + "\n"
         yield json.dumps({"done": True, "rag_chunks": len(rag_texts)}) + "\n"
 
@@ -265,6 +295,8 @@ def health():
         "ollama":   model_info["available"],
         "model":    model_info.get("model"),
         "rag":      rag_ok,
+        "model_queues": queue_stats(),
+        "circuit_breakers": breaker_stats(),
         "timestamp": datetime.now().isoformat(),
         "notes": (
             []
@@ -316,6 +348,7 @@ def rag_search(
 # ── Startup info ──────────────────────────────────────────────────────────────
 @app.on_event("startup")
 async def on_startup():
+    ollama_breaker()            # registers the breaker; starts its background /api/tags probe
     model_info = get_model_info()
     rag_ok     = is_available()
     logger.info("═" * 50)
@@ -324,3 +357,9 @@ async def on_startup():
     logger.info("RAG:    %s", "✅ vector store ready" if rag_ok else "⚠  run: python3 rag/ingest.py")
     logger.info("Docs:   http://localhost:8001/docs")
     logger.info("═" * 50)
+
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    await close_ollama_client()
+    _IO_POOL.shutdown(wait=False)
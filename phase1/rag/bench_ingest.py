@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+KrishiMitra RAG — incremental ingest check + embedding throughput
+=================================================================
+Runs against a scratch copy of knowledge_base/ with the deterministic
+StubEmbedder (rag/embedder.py) — no Ollama needed:
+
+  1. cold ingest    every chunk is new; embedding throughput for the old
+                    path (one text per request, sequential) vs batched +
+                    concurrent; the stub charges --latency-ms per request
+                    plus --per-text-ms per text
+  2. re-run         nothing changed → nothing embedded or written
+  3. edit + delete  one file edited, one removed → only that file's chunks
+                    are upserted, the removed file's ids deleted, and only
+                    text never seen before reaches the embedder
+  4. cache          vectors read back from the on-disk cache equal fresh ones
+
+With chromadb installed, --chroma also runs ingest.main(--stub) twice into
+a scratch vector store and checks the second run embeds nothing.
+
+Usage:
+    python3 rag/bench_ingest.py
+    python3 rag/bench_ingest.py --latency-ms 40 --workers 8 --json ingest.json
+"""
+
+import argparse
+import json
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from rag import ingest  # noqa: E402
+from rag.embedder import EmbeddingCache, StubEmbedder, embed_texts  # noqa: E402
+
+
+def _check(ok: bool, label: str, failures: list) -> None:
+    print(f"  {'✅' if ok else '❌'} {label}")
+    if not ok:
+        failures.append(label)
+
+
+def _apply(existing: dict, plan: dict) -> dict:
+    """The id → content_hash map a collection holds after sync_collection(plan)."""
+    out = {k: v for k, v in existing.items() if k not in set(plan["delete"])}
+    for c in plan["add"] + plan["update"]:
+        out[c["id"]] = c["content_hash"]
+    return out
+
+
+def run(args) -> dict:
+    failures: list = []
+    results: dict = {}
+    scratch = Path(tempfile.mkdtemp(prefix="kb_ingest_"))
+    try:
+        kb = scratch / "knowledge_base"
+        shutil.copytree(ingest.KB_DIR, kb)
+        chunks = ingest.load_chunks(kb)
+        texts = [c["text"] for c in chunks]
+
+        # ── 1. cold ingest: throughput ─────────────────────────────────────
+        print(f"\n1. Cold ingest — {len(chunks)} chunks, stub cost {args.latency_ms} ms/request "
+              f"+ {args.per_text_ms} ms/text")
+        plan = ingest.plan_sync({}, chunks)
+        _check(len(plan["add"]) == len(chunks) and not plan["delete"], "every chunk planned as new", failures)
+
+        seq = StubEmbedder(latency_ms=args.latency_ms, per_text_ms=args.per_text_ms)
+        sequential = embed_texts(texts, seq, None, batch_size=1, workers=1)
+        cache = EmbeddingCache(scratch / "embed_cache.sqlite3")
+        par = StubEmbedder(latency_ms=args.latency_ms, per_text_ms=args.per_text_ms)
+        batched = embed_texts(texts, par, cache, batch_size=args.batch_size, workers=args.workers)
+        for label, r, emb in (("sequential, 1/request", sequential, seq),
+                              (f"batched x{args.batch_size}, {args.workers} workers", batched, par)):
+            rate = r["embedded"] / r["seconds"]
+            results[label] = {"seconds": round(r["seconds"], 3), "chunks_per_s": round(rate, 1),
+                              "requests": emb.calls}
+            print(f"     {label:32s} {r['seconds']:7.2f}s  {rate:8.1f} chunks/s  {emb.calls:4d} requests")
+        _check(sequential["vectors"] == batched["vectors"], "batched vectors identical to sequential", failures)
+        existing = _apply({}, plan)
+
+        # ── 2. re-run, nothing changed ─────────────────────────────────────
+        print("\n2. Re-run with no changes")
+        plan = ingest.plan_sync(existing, ingest.load_chunks(kb))
+        _check(not (plan["add"] or plan["update"] or plan["delete"]),
+               f"0 changes ({len(plan['unchanged'])} unchanged)", failures)
+
+        # ── 3. edit one file, delete another ──────────────────────────────
+        files = sorted(kb.rglob("*.txt"))
+        edited, removed = files[0], files[-1]
+        text = edited.read_text(encoding="utf-8")
+        mid = len(text) // 2
+        edited.write_text(
+            text[:mid] + "\n\nFIELD NOTE\nLocal trials report better stand establishment with "
+            "line sowing and seed treatment before the first irrigation.\n\n" + text[mid:],
+            encoding="utf-8",
+        )
+        removed.unlink()
+        print(f"\n3. Edited {edited.relative_to(kb)}, removed {removed.relative_to(kb)}")
+        new_chunks = ingest.load_chunks(kb)
+        plan = ingest.plan_sync(existing, new_chunks)
+        touched = {c["id"].split("#")[0] for c in plan["add"] + plan["update"]}
+        removed_prefix = removed.relative_to(kb).as_posix() + "#"
+        _check(touched == {edited.relative_to(kb).as_posix()},
+               f"only the edited file upserted ({len(plan['add'])} add, {len(plan['update'])} update)", failures)
+        _check(bool(plan["delete"]) and all(cid.startswith(removed_prefix) or cid.startswith(
+            edited.relative_to(kb).as_posix() + "#") for cid in plan["delete"]),
+            f"deletes limited to removed/shrunk files ({len(plan['delete'])} ids)", failures)
+        inc = StubEmbedder(latency_ms=args.latency_ms, per_text_ms=args.per_text_ms)
+        todo = [c["text"] for c in plan["add"] + plan["update"]]
+        r = embed_texts(todo, inc, cache, batch_size=args.batch_size, workers=args.workers)
+        unseen = len({t for t in todo} - set(texts))
+        _check(r["embedded"] == unseen,
+               f"embedded only never-seen text ({r['embedded']} of {len(todo)} upserts, "
+               f"{r['cache_hits']} cache hits)", failures)
+        results["incremental"] = {"upserts": len(todo), "embedded": r["embedded"], "cache_hits": r["cache_hits"],
+                                  "deleted": len(plan["delete"]), "seconds": round(r["seconds"], 3)}
+
+        # ── 4. cache round-trip ────────────────────────────────────────────
+        print("\n4. Embedding cache")
+        again = embed_texts(texts[:50], StubEmbedder(), cache)
+        fresh = StubEmbedder().embed(texts[:50])
+        _check(again["embedded"] == 0 and all(
+            max(abs(a - b) for a, b in zip(x, y)) < 1e-6 for x, y in zip(again["vectors"], fresh)),
+            "cached vectors equal fresh ones", failures)
+        cache.close()
+
+        if args.chroma:
+            print("\n5. End-to-end ingest.main(--stub) x2")
+            try:
+                import chromadb  # noqa: F401
+            except ImportError:
+                print("  ⚠  chromadb not installed — skipped")
+            else:
+                argv = ["--stub", "--chroma-dir", str(scratch / "chroma"), "--kb-dir", str(kb)]
+                ingest.main(argv)
+                col = ingest.open_collection(scratch / "chroma", StubEmbedder().model)
+                cache = EmbeddingCache()
+                stats = ingest.sync_collection(col, ingest.load_chunks(kb), StubEmbedder(), cache)
+                cache.close()
+                _check(stats["embedded"] == 0 and stats["added"] == 0 and stats["deleted"] == 0,
+                       "second run is a no-op", failures)
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    base = results["sequential, 1/request"]["chunks_per_s"]
+    fast = results[f"batched x{args.batch_size}, {args.workers} workers"]["chunks_per_s"]
+    print(f"\nEmbedding throughput ×{fast / base:.1f}; "
+          f"{'all checks passed' if not failures else f'{len(failures)} check(s) FAILED'}")
+    results["failures"] = failures
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="simulated embedding request latency")
+    parser.add_argument("--per-text-ms", type=float, default=5.0, help="simulated marginal cost per text")
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--chroma", action="store_true", help="also run ingest.main end-to-end (needs chromadb)")
+    parser.add_argument("--json", default=None, help="write results to this file")
+    args = parser.parse_args()
+
+    t0 = time.time()
+    results = run(args)
+    print(f"({time.time() - t0:.1f}s total)")
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump(results, fh, indent=2)
+    sys.exit(1 if results["failures"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+KrishiMitra RAG — retrieval recall@k / latency benchmark
+========================================================
+Replays a labelled query set against the knowledge base and reports, per
+mode, recall@k (a hit = any expected source file in the top k) and
+p50/p95 latency with caches cleared between queries.
+
+Modes:
+    bm25    — keyword index only (no Ollama needed)
+    vector  — ChromaDB only (needs Ollama + chroma_db/)
+    hybrid  — retrieve_with_sources(): BM25 ∥ embed → RRF fusion
+
+Usage:
+    python3 rag/ingest.py --bm25-only        # if bm25_index/ is missing
+    python3 rag/bench_retrieval.py
+    python3 rag/bench_retrieval.py --k 3 --embed-delay 5 --json bench.json
+
+--embed-delay adds N seconds to every embedding call, to show the hybrid
+path staying inside RAG_EMBED_BUDGET_S when Ollama is slow.
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from rag import retriever  # noqa: E402
+
+# (query, acceptable source files)
+LABELLED_QUERIES = [
+    ("wheat sowing time and seed rate", {"wheat_icar.txt", "wheat_varieties_zone_wise.txt"}),
+    ("HD-3086 wheat variety yield", {"wheat_icar.txt", "wheat_varieties_zone_wise.txt"}),
+    ("yellow rust in wheat control propiconazole", {"wheat_diseases_rust_smut.txt"}),
+    ("karnal bunt loose smut wheat", {"wheat_diseases_rust_smut.txt"}),
+    ("rice blast disease tricyclazole", {"rice_diseases_blast_blt_sheath.txt"}),
+    ("bacterial leaf blight paddy", {"rice_diseases_blast_blt_sheath.txt"}),
+    ("direct seeded rice transplanting", {"rice_varieties_zone_wise.txt", "rice_icar.txt"}),
+    ("Swarna Sub1 flood tolerant rice", {"rice_icar.txt", "rice_varieties_zone_wise.txt"}),
+    ("mustard aphid control Dimethoate", {"mustard_icar.txt"}),
+    ("Pusa Bold mustard variety", {"mustard_icar.txt"}),
+    ("Bt cotton pink bollworm", {"cotton_icar.txt"}),
+    ("maize hybrid DKC-9144", {"maize_icar.txt"}),
+    ("fall armyworm in maize spodoptera", {"fall_armyworm_detailed.txt", "maize_icar.txt"}),
+    ("soybean JS-335 yellow mosaic", {"soybean_icar.txt"}),
+    ("chickpea wilt gram pod borer", {"pulses_gram_arhar.txt"}),
+    ("arhar pigeonpea sowing", {"pulses_gram_arhar.txt"}),
+    ("tomato late blight potato", {"tomato_potato_onion.txt"}),
+    ("onion storage purple blotch", {"tomato_potato_onion.txt", "post_harvest_storage_cold_chain.txt"}),
+    ("brinjal shoot and fruit borer okra", {"vegetables_extended.txt"}),
+    ("turmeric ginger rhizome rot", {"spices_turmeric_ginger_garlic.txt"}),
+    ("sugarcane CoC-671 ratoon", {"sugarcane_icar.txt"}),
+    ("groundnut bajra jowar millets", {"groundnut_millets.txt"}),
+    ("mango alphonso flowering banana", {"horticulture_fruits.txt"}),
+    ("barley lentil sunflower", {"barley_lentil_sunflower.txt"}),
+    ("polyhouse capsicum cucumber protected cultivation", {"polyhouse_greenhouse_farming.txt"}),
+    ("dairy cow poultry goat farming", {"animal_husbandry_integration.txt"}),
+    ("intercropping crop rotation system", {"crop_rotation_intercropping.txt"}),
+    ("drought flood climate adaptation", {"climate_smart_agriculture.txt"}),
+    ("root knot nematode management", {"nematode_management.txt"}),
+    ("pesticide safety protective equipment resistance", {"pesticide_safety_resistance.txt"}),
+    ("stored grain weevil rat control", {"stored_grain_pest_management.txt"}),
+    ("integrated pest management pheromone traps economic threshold", {"ipm_guide.txt"}),
+    ("leaf yellowing symptoms diagnosis", {"crop_disease_diagnosis.txt"}),
+    ("PMFBY crop insurance claim process", {"crop_insurance_pmfby_detail.txt", "government_schemes_complete.txt"}),
+    ("PM-Kisan installment eligibility", {"government_schemes_complete.txt"}),
+    ("Kisan credit card loan NABARD", {"kcc_loan_nabard_schemes.txt"}),
+    ("MSP 2024-25 wheat paddy price", {"msp_market_prices_2024.txt"}),
+    ("FPO eNAM export value addition", {"fpo_mandi_export_guide.txt"}),
+    ("cold storage post harvest", {"post_harvest_storage_cold_chain.txt"}),
+    ("kisan suvidha app digital tools", {"digital_tools_apps_farmers.txt"}),
+    ("drip irrigation subsidy installation", {"drip_sprinkler_installation.txt"}),
+    ("split dose urea fertilizer schedule", {"fertilizer_application_schedule.txt"}),
+    ("nano urea liquid fertilizer", {"nano_fertilizers_new_technology.txt"}),
+    ("vermicompost biofertilizer organic", {"organic_farming_guide.txt"}),
+    ("soil health card pH interpretation", {"soil_testing_interpretation.txt", "soil_health_fertilizer_guide.txt"}),
+    ("zinc micronutrient deficiency", {"soil_health_fertilizer_guide.txt", "soil_testing_interpretation.txt"}),
+    ("PM-KUSUM solar pump irrigation", {"irrigation_water_management.txt", "government_schemes_complete.txt"}),
+    ("crop calendar kharif rabi weather advisory", {"crop_weather_calendar.txt"}),
+    ("सरसों माहू नियंत्रण", {"mustard_icar.txt"}),
+    ("गेहूँ की बुवाई", {"wheat_icar.txt", "wheat_varieties_zone_wise.txt"}),
+]
+
+
+def _pct(values, q):
+    if not values:
+        return None
+    values = sorted(values)
+    return round(values[min(len(values) - 1, int(q * len(values)))], 2)
+
+
+def _run_mode(mode: str, k: int) -> dict:
+    hits, latencies = 0, []
+    for query, expected in LABELLED_QUERIES:
+        retriever._result_cache.clear()
+        retriever._embed.cache_clear()
+        aug = retriever._augment(query)
+        t0 = time.perf_counter()
+        if mode == "bm25":
+            results = retriever._keyword_search(aug, k, None)
+        elif mode == "vector":
+            col = retriever._get_collection()
+            results = retriever._vector_search(retriever._embed(aug), k, None) if col else []
+        else:
+            results = retriever.retrieve_with_sources(query, k=k)
+        latencies.append((time.perf_counter() - t0) * 1000)
+        if any(r["source_file"] in expected for r in results[:k]):
+            hits += 1
+    return {
+        "mode":       mode,
+        "queries":    len(LABELLED_QUERIES),
+        f"recall@{k}": round(hits / len(LABELLED_QUERIES), 3),
+        "p50_ms":     _pct(latencies, 0.50),
+        "p95_ms":     _pct(latencies, 0.95),
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--k", type=int, default=5)
+    ap.add_argument("--embed-delay", type=float, default=0.0,
+                    help="seconds added to each embedding call")
+    ap.add_argument("--json", help="write results to this file")
+    args = ap.parse_args()
+
+    if args.embed_delay:
+        real_embed = retriever._embed
+
+        def _slow_embed(text):
+            time.sleep(args.embed_delay)
+            return real_embed(text)
+        _slow_embed.cache_clear = real_embed.cache_clear
+        retriever._embed = _slow_embed
+
+    modes = []
+    if retriever._get_bm25() is not None:
+        modes.append("bm25")
+    else:
+        print("⚠  bm25_index/ missing — run: python3 rag/ingest.py --bm25-only")
+    if retriever._get_collection() is not None:
+        modes.append("vector")
+    if modes:
+        modes.append("hybrid")
+
+    rows = []
+    for mode in modes:
+        try:
+            rows.append(_run_mode(mode, args.k))
+        except Exception as exc:
+            print(f"⚠  {mode}: {exc}")
+
+    print(f"\n{'mode':8s} {'recall@' + str(args.k):>10s} {'p50 ms':>9s} {'p95 ms':>9s}")
+    for r in rows:
+        print(f"{r['mode']:8s} {r[f'recall@{args.k}']:>10.3f} {r['p50_ms']:>9} {r['p95_ms']:>9}")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps({
+            "k": args.k,
+            "embed_delay_s": args.embed_delay,
+            "results": rows,
+        }, indent=2))
+        print(f"\n📄  Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+"""
+KrishiMitra RAG — persistent BM25 inverted index
+================================================
+Lexical half of the hybrid retriever.  Built by rag/ingest.py over exactly
+the chunks it writes to ChromaDB (same ids), stored as flat NumPy arrays and
+memory-mapped by the retriever at startup — no Ollama call is needed to
+answer from it.
+
+On-disk layout (BM25_DIR):
+    meta.json    — version, N, avgdl, k1, b, categories
+    terms.json   — vocabulary; term id = list position
+    offsets.npy  — int64[V+1], postings slice per term
+    postings.npy — int32 doc ids, grouped by term
+    tfs.npy      — float32 term frequency per posting
+    doc_len.npy  — float32 tokens per doc
+    doc_cat.npy  — int16 category id per doc
+    docs.jsonl   — {"id", "text", "source_file", "category"} per doc
+
+Writes go to a temp directory that is renamed into place, so a reader never
+sees a half-built index.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import math
+import os
+import re
+import shutil
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+BM25_DIR = Path(__file__).parent.parent / "bm25_index"
+_FORMAT_VERSION = 1
+
+K1 = 1.5
+B  = 0.75
+
+# Devanagari vowel signs are not \w — include the whole block so Hindi words
+# stay whole.
+_TOKEN_RE = re.compile(r"[\w\u0900-\u097F]+")
+_STOPWORDS = frozenset({
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "how",
+    "in", "is", "it", "of", "on", "or", "that", "the", "to", "was", "what",
+    "when", "which", "with", "do", "does", "can", "my", "i",
+    "ka", "ki", "ke", "ko", "me", "mein", "hai", "kya", "kab", "kaise",
+    "karein", "kare", "se", "aur",
+})
+
+
+def tokenize(text: str) -> List[str]:
+    return [
+        t for t in _TOKEN_RE.findall(text.lower())
+        if len(t) > 1 and t not in _STOPWORDS
+    ]
+
+
+def build_index(chunks: Iterable[dict], out_dir: Path = BM25_DIR) -> Dict[str, float]:
+    """
+    Build and persist the index.  Each chunk needs ``id``, ``text``,
+    ``source_file`` and ``category``.  Returns build stats.
+    """
+    t0 = time.monotonic()
+    docs = list(chunks)
+    categories = sorted({d["category"] for d in docs})
+    cat_ids = {c: i for i, c in enumerate(categories)}
+
+    postings: Dict[str, List[tuple]] = {}
+    doc_len = np.zeros(len(docs), dtype=np.float32)
+    for doc_id, d in enumerate(docs):
+        counts = Counter(tokenize(d["text"]))
+        doc_len[doc_id] = sum(counts.values())
+        for term, tf in counts.items():
+            postings.setdefault(term, []).append((doc_id, tf))
+
+    terms = sorted(postings)
+    offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+    for i, term in enumerate(terms):
+        offsets[i + 1] = offsets[i] + len(postings[term])
+    post_docs = np.empty(int(offsets[-1]), dtype=np.int32)
+    post_tfs  = np.empty(int(offsets[-1]), dtype=np.float32)
+    for i, term in enumerate(terms):
+        lo, hi = offsets[i], offsets[i + 1]
+        plist = postings[term]
+        post_docs[lo:hi] = [p[0] for p in plist]
+        post_tfs[lo:hi]  = [p[1] for p in plist]
+
+    meta = {
+        "version":    _FORMAT_VERSION,
+        "n_docs":     len(docs),
+        "avgdl":      float(doc_len.mean()) if len(docs) else 0.0,
+        "k1":         K1,
+        "b":          B,
+        "categories": categories,
+        "built_at":   time.time(),
+    }
+
+    out_dir = Path(out_dir)
+    out_dir.parent.mkdir(parents=True, exist_ok=True)
+    tmp = Path(tempfile.mkdtemp(prefix=".bm25-", dir=out_dir.parent))
+    try:
+        np.save(tmp / "offsets.npy", offsets)
+        np.save(tmp / "postings.npy", post_docs)
+        np.save(tmp / "tfs.npy", post_tfs)
+        np.save(tmp / "doc_len.npy", doc_len)
+        np.save(tmp / "doc_cat.npy",
+                np.array([cat_ids[d["category"]] for d in docs], dtype=np.int16))
+        (tmp / "terms.json").write_text(json.dumps(terms, ensure_ascii=False), encoding="utf-8")
+        with open(tmp / "docs.jsonl", "w", encoding="utf-8") as fh:
+            for d in docs:
+                fh.write(json.dumps({
+                    "id":          d["id"],
+                    "text":        d["text"],
+                    "source_file": d["source_file"],
+                    "category":    d["category"],
+                }, ensure_ascii=False) + "\n")
+        # meta.json last — its presence marks a complete index
+        (tmp / "meta.json").write_text(json.dumps(meta), encoding="utf-8")
+
+        old = out_dir.with_name(out_dir.name + ".old")
+        if out_dir.exists():
+            shutil.rmtree(old, ignore_errors=True)
+            os.replace(out_dir, old)
+        os.replace(tmp, out_dir)
+        shutil.rmtree(old, ignore_errors=True)
+    except Exception:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+
+    return {
+        "docs":     len(docs),
+        "terms":    len(terms),
+        "postings": int(offsets[-1]),
+        "build_ms": round((time.monotonic() - t0) * 1000, 1),
+    }
+
+
+class BM25Index:
+    """Read-only, memory-mapped view of an index written by build_index()."""
+
+    def __init__(self, index_dir: Path = BM25_DIR):
+        index_dir = Path(index_dir)
+        meta = json.loads((index_dir / "meta.json").read_text(encoding="utf-8"))
+        if meta.get("version") != _FORMAT_VERSION:
+            raise ValueError(f"Unsupported BM25 index version {meta.get('version')}")
+        self.n_docs: int  = meta["n_docs"]
+        self.avgdl: float = meta["avgdl"] or 1.0
+        self.k1: float    = meta["k1"]
+        self.b: float     = meta["b"]
+        self.categories: List[str] = meta["categories"]
+
+        self._offsets  = np.load(index_dir / "offsets.npy", mmap_mode="r")
+        self._postings = np.load(index_dir / "postings.npy", mmap_mode="r")
+        self._tfs      = np.load(index_dir / "tfs.npy", mmap_mode="r")
+        self._doc_len  = np.load(index_dir / "doc_len.npy", mmap_mode="r")
+        self._doc_cat  = np.load(index_dir / "doc_cat.npy", mmap_mode="r")
+        terms = json.loads((index_dir / "terms.json").read_text(encoding="utf-8"))
+        self._term_ids: Dict[str, int] = {t: i for i, t in enumerate(terms)}
+        with open(index_dir / "docs.jsonl", encoding="utf-8") as fh:
+            self._docs: List[dict] = [json.loads(line) for line in fh]
+        # Per-doc length normalisation is query-independent — compute once.
+        self._norm = self.k1 * (1 - self.b + self.b * np.asarray(self._doc_len) / self.avgdl)
+
+    def __len__(self) -> int:
+        return self.n_docs
+
+    def search(self, query: str, n: int, category: Optional[str] = None) -> List[dict]:
+        """Top-n chunks by BM25 score; ``score`` is normalised to [0, 1]."""
+        if not self.n_docs:
+            return []
+        scores = np.zeros(self.n_docs, dtype=np.float32)
+        matched = False
+        for term in set(tokenize(query)):
+            tid = self._term_ids.get(term)
+            if tid is None:
+                continue
+            lo, hi = self._offsets[tid], self._offsets[tid + 1]
+            df = hi - lo
+            idf = math.log(1 + (self.n_docs - df + 0.5) / (df + 0.5))
+            docs = self._postings[lo:hi]
+            tf = self._tfs[lo:hi]
+            scores[docs] += idf * tf * (self.k1 + 1) / (tf + self._norm[docs])
+            matched = True
+        if not matched:
+            return []
+
+        if category:
+            if category not in self.categories:
+                return []
+            scores[np.asarray(self._doc_cat) != self.categories.index(category)] = 0.0
+
+        n = min(n, int(np.count_nonzero(scores)))
+        if n <= 0:
+            return []
+        top = np.argpartition(-scores, n - 1)[:n]
+        top = top[np.argsort(-scores[top])]
+        best = float(scores[top[0]]) or 1.0
+        results = []
+        for i in top:
+            d = self._docs[int(i)]
+            results.append({
+                "id":          d["id"],
+                "text":        d["text"],
+                "source_file": d["source_file"],
+                "category":    d["category"],
+                "score":       round(float(scores[i]) / best, 3),
+            })
+        return results
+
+
+def load_index(index_dir: Path = BM25_DIR) -> Optional[BM25Index]:
+    """Load the index if it exists; None (logged) otherwise."""
+    if not (Path(index_dir) / "meta.json").exists():
+        return None
+    try:
+        idx = BM25Index(index_dir)
+        logger.info("BM25 index ready — %d chunks, %d terms", idx.n_docs, len(idx._term_ids))
+        return idx
+    except Exception as exc:
+        logger.error("BM25 index load failed: %s", exc)
+        return None
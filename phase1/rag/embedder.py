@@ -0,0 +1,221 @@
+"""
+KrishiMitra RAG — ingest-side embedding: cache, batching, concurrency
+=====================================================================
+Used by rag/ingest.py.
+
+  EmbeddingCache   persistent SQLite store of vectors keyed by
+                   (embedding model, sha256 of the chunk text), so a chunk
+                   that has been embedded once — by any previous ingest run,
+                   at any chunk position — is never sent to Ollama again
+  OllamaEmbedder   batched /api/embed calls (one request per batch); falls
+                   back to one /api/embeddings call per text on Ollama
+                   builds without the batch endpoint
+  StubEmbedder     deterministic local embedder (hashed bag of tokens) for
+                   tests and benchmarks — no Ollama needed
+  embed_texts()    cache lookup → concurrent batched embedding of the misses
+                   with bounded parallelism → cache write-back
+
+The cache is only touched from the calling thread; worker threads only talk
+to the embedder.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+EMBED_CACHE_PATH = Path(__file__).parent.parent / "embed_cache.sqlite3"
+
+DEFAULT_BATCH_SIZE = 16
+DEFAULT_WORKERS    = 4
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """(model, text hash) → float32 vector, persisted in SQLite."""
+
+    def __init__(self, path: Path = EMBED_CACHE_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(self.path))
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " model TEXT NOT NULL, text_hash TEXT NOT NULL, dim INTEGER NOT NULL, vec BLOB NOT NULL,"
+            " PRIMARY KEY (model, text_hash))"
+        )
+        self._db.commit()
+
+    def get_many(self, model: str, hashes: Iterable[str]) -> Dict[str, List[float]]:
+        hashes = list(dict.fromkeys(hashes))
+        found: Dict[str, List[float]] = {}
+        for start in range(0, len(hashes), 500):            # SQLite variable limit
+            part = hashes[start:start + 500]
+            rows = self._db.execute(
+                f"SELECT text_hash, vec FROM embeddings WHERE model = ? AND text_hash IN "
+                f"({','.join('?' * len(part))})",
+                [model, *part],
+            )
+            for h, blob in rows:
+                found[h] = np.frombuffer(blob, dtype=np.float32).tolist()
+        return found
+
+    def put_many(self, model: str, items: Dict[str, Sequence[float]]) -> None:
+        self._db.executemany(
+            "INSERT OR REPLACE INTO embeddings (model, text_hash, dim, vec) VALUES (?, ?, ?, ?)",
+            [
+                (model, h, len(vec), np.asarray(vec, dtype=np.float32).tobytes())
+                for h, vec in items.items()
+            ],
+        )
+        self._db.commit()
+
+    def count(self, model: Optional[str] = None) -> int:
+        if model is None:
+            return self._db.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        return self._db.execute("SELECT COUNT(*) FROM embeddings WHERE model = ?", (model,)).fetchone()[0]
+
+    def close(self) -> None:
+        self._db.close()
+
+
+class OllamaEmbedder:
+    """Batched Ollama embeddings; ``embed(texts)`` is safe to call from threads."""
+
+    def __init__(self, model: str, url: str, timeout: float = 60.0):
+        self.model = model
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+        self._batch_endpoint = True
+
+    def _post(self, path: str, body: dict) -> dict:
+        req = urllib.request.Request(
+            f"{self.url}{path}",
+            data=json.dumps(body).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        with urllib.request.urlopen(req, timeout=self.timeout) as resp:
+            return json.loads(resp.read())
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        if self._batch_endpoint:
+            try:
+                return self._post("/api/embed", {"model": self.model, "input": texts})["embeddings"]
+            except urllib.error.HTTPError as exc:
+                if exc.code != 404:
+                    raise
+                self._batch_endpoint = False       # older Ollama: per-text endpoint only
+        return [self._post("/api/embeddings", {"model": self.model, "prompt": t})["embedding"] for t in texts]
+
+
+class StubEmbedder:
+    """
+    Deterministic embedder for tests: each token is hashed to a signed
+    dimension, the bag is L2-normalised.  Same text → same vector on every
+    machine; texts sharing words have positive cosine similarity.
+    ``latency_ms`` + ``per_text_ms`` × batch size simulates the request cost
+    of a real embedding server.
+    """
+
+    _TOKEN_RE = re.compile(r"[\w\u0900-\u097F]+")
+
+    def __init__(
+        self, dim: int = 768, latency_ms: float = 0.0, per_text_ms: float = 0.0, model: str = "stub-hash-768"
+    ):
+        self.dim = dim
+        self.latency_s = latency_ms / 1000.0
+        self.per_text_s = per_text_ms / 1000.0
+        self.model = model
+        self.calls = 0
+        self.texts = 0
+        self._lock = threading.Lock()
+
+    def _vector(self, text: str) -> List[float]:
+        vec = np.zeros(self.dim, dtype=np.float32)
+        for tok in self._TOKEN_RE.findall(text.lower()):
+            digest = hashlib.blake2b(tok.encode("utf-8"), digest_size=8).digest()
+            h = int.from_bytes(digest, "little")
+            vec[h % self.dim] += 1.0 if (h >> 63) else -1.0
+        norm = float(np.linalg.norm(vec))
+        return (vec / norm if norm else vec).tolist()
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        if self.latency_s or self.per_text_s:
+            time.sleep(self.latency_s + self.per_text_s * len(texts))
+        with self._lock:
+            self.calls += 1
+            self.texts += len(texts)
+        return [self._vector(t) for t in texts]
+
+
+def embed_texts(
+    texts: Sequence[str],
+    embedder,
+    cache: Optional[EmbeddingCache] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    workers: int = DEFAULT_WORKERS,
+    on_batch: Optional[Callable[[int, int], None]] = None,
+) -> Dict[str, object]:
+    """
+    Vectors for ``texts`` (same order; None where embedding failed).
+
+    Returns {"vectors", "cache_hits", "embedded", "failed", "seconds"}.
+    Distinct texts are embedded once; at most ``workers`` batches are in
+    flight.  ``on_batch(done, total)`` is called as misses complete.
+    """
+    t0 = time.perf_counter()
+    hashes = [text_hash(t) for t in texts]
+    cached = cache.get_many(embedder.model, hashes) if cache is not None else {}
+
+    pending: Dict[str, str] = {}
+    for h, t in zip(hashes, texts):
+        if h not in cached:
+            pending.setdefault(h, t)
+    miss_hashes = list(pending)
+    batches = [miss_hashes[i:i + batch_size] for i in range(0, len(miss_hashes), batch_size)]
+
+    fresh: Dict[str, List[float]] = {}
+    failed = 0
+    done = 0
+    if batches:
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(batches))),
+                                thread_name_prefix="kb_embed") as pool:
+            futures = {pool.submit(embedder.embed, [pending[h] for h in b]): b for b in batches}
+            for fut in as_completed(futures):
+                batch = futures[fut]
+                try:
+                    vectors = fut.result()
+                except Exception as exc:
+                    failed += len(batch)
+                    print(f"  ❌  Embed batch of {len(batch)} failed: {exc}")
+                    continue
+                got = dict(zip(batch, vectors))
+                fresh.update(got)
+                if cache is not None:
+                    cache.put_many(embedder.model, got)
+                done += len(batch)
+                if on_batch is not None:
+                    on_batch(done, len(miss_hashes))
+
+    vectors = [cached.get(h) or fresh.get(h) for h in hashes]
+    return {
+        "vectors":    vectors,
+        "cache_hits": sum(1 for h in hashes if h in cached),
+        "embedded":   len(fresh),
+        "failed":     failed,
+        "seconds":    time.perf_counter() - t0,
+    }
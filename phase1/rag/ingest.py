@@ -10,19 +10,50 @@ Run once after knowledge base generation:
     source ../phase1_env/bin/activate
     python3 rag/ingest.py
 
-Re-run whenever new documents are added.
+Re-run whenever documents are added or edited — ingest is incremental.
+Chunk ids are "<path under knowledge_base/>#<n>" and each vector carries the sha256 of
+its chunk text, so a run only upserts chunks whose text changed, adds new
+ones and deletes ids that no longer exist.  Vectors are also kept in a
+persistent cache keyed by (model, text hash) (rag/embedder.py), so text that
+was ever embedded — even at another position — is not sent to Ollama again.
+Misses are embedded in batches with bounded parallelism.
+
+Every run also rebuilds the BM25 keyword index (rag/bm25_index.py) over the
+same chunk ids; to rebuild only that index without Ollama/ChromaDB:
+    python3 rag/ingest.py --bm25-only
+
+Other options:
+    --rebuild          drop and recreate the collection (cache still used)
+    --workers N        concurrent embedding requests (default 4)
+    --batch-size N     texts per embedding request (default 16)
+    --no-cache         ignore the on-disk embedding cache
+    --stub             deterministic local embedder, no Ollama (tests /
+                       benchmarks; writes to chroma_db_stub/ by default)
+    --chroma-dir DIR   vector store location
 """
 
+import argparse
 import json
 import re
 import sys
 import time
 import urllib.request
 from pathlib import Path
+from typing import Optional
 
 ROOT       = Path(__file__).parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from rag.bm25_index import BM25_DIR, build_index  # noqa: E402
+from rag.embedder import (  # noqa: E402
+    DEFAULT_BATCH_SIZE, DEFAULT_WORKERS, EmbeddingCache, OllamaEmbedder, StubEmbedder,
+    embed_texts, text_hash,
+)
+
 KB_DIR     = ROOT / "knowledge_base"
 CHROMA_DIR = ROOT / "chroma_db"
+STUB_CHROMA_DIR = ROOT / "chroma_db_stub"
 COLLECTION = "krishimitra_kb"
 EMBED_MODEL = "nomic-embed-text"
 OLLAMA_URL  = "http://localhost:11434"
@@ -31,25 +62,14 @@ OLLAMA_URL  = "http://localhost:11434"
 CHUNK_SIZE    = 800   # characters (~600 words)
 CHUNK_OVERLAP = 120
 
+# ChromaDB write / read page sizes
+UPSERT_BATCH = 64
+GET_PAGE     = 5000
+
 
 def embed(texts: list[str]) -> list[list[float]]:
     """Call Ollama nomic-embed-text to get embeddings for a batch of texts."""
-    vectors = []
-    for text in texts:
-        payload = json.dumps({
-            "model": EMBED_MODEL,
-            "prompt": text,
-        }).encode("utf-8")
-        req = urllib.request.Request(
-            f"{OLLAMA_URL}/api/embeddings",
-            data=payload,
-            headers={"Content-Type": "application/json"},
-            method="POST",
-        )
-        with urllib.request.urlopen(req, timeout=30) as resp:
-            data = json.loads(resp.read())
-            vectors.append(data["embedding"])
-    return vectors
+    return OllamaEmbedder(EMBED_MODEL, OLLAMA_URL).embed(texts)
 
 
 def chunk_text(text: str, source_file: str, category: str) -> list[dict]:
@@ -109,35 +129,18 @@ def chunk_text(text: str, source_file: str, category: str) -> list[dict]:
     ]
 
 
-def main():
-    print("\n" + "═" * 55)
-    print("  KrishiMitra RAG — Knowledge Base Ingestion v2")
-    print("═" * 55 + "\n")
+def _assign_ids(chunks: list[dict], rel_path: str) -> list[dict]:
+    """"<path under knowledge_base>#<n>" ids + text hash — stable while a file is unchanged."""
+    for n, c in enumerate(chunks):
+        c["id"] = f"{rel_path}#{n}"
+        c["content_hash"] = text_hash(c["text"])
+    return chunks
 
-    # ── Check dependencies ────────────────────────────────────────────────────
-    try:
-        import chromadb
-    except ImportError:
-        print("❌  chromadb not installed. Run: pip install chromadb")
-        sys.exit(1)
-
-    # ── Check Ollama ──────────────────────────────────────────────────────────
-    try:
-        req = urllib.request.Request(f"{OLLAMA_URL}/api/tags")
-        with urllib.request.urlopen(req, timeout=5) as resp:
-            models = [m["name"] for m in json.loads(resp.read()).get("models", [])]
-        if not any(EMBED_MODEL in m for m in models):
-            print(f"❌  {EMBED_MODEL} not found. Run: ollama pull {EMBED_MODEL}")
-            sys.exit(1)
-        print(f"✅  Ollama ready — {EMBED_MODEL} available")
-    except Exception as e:
-        print(f"❌  Ollama not running: {e}")
-        print("   Start it with: ollama serve")
-        sys.exit(1)
 
-    # ── Load and chunk documents ──────────────────────────────────────────────
-    txt_files = sorted(KB_DIR.rglob("*.txt"))
-    pdf_files = sorted(KB_DIR.rglob("*.pdf"))
+def load_chunks(kb_dir: Path = KB_DIR) -> list[dict]:
+    """Chunk every knowledge-base file (ids: see _assign_ids)."""
+    txt_files = sorted(kb_dir.rglob("*.txt"))
+    pdf_files = sorted(kb_dir.rglob("*.pdf"))
     print(f"📚  Found {len(txt_files)} text files + {len(pdf_files)} PDF files")
 
     all_chunks: list[dict] = []
@@ -147,7 +150,7 @@ def main():
             text     = path.read_text(encoding="utf-8")
             category = path.parent.name
             chunks   = chunk_text(text, path.name, category)
-            all_chunks.extend(chunks)
+            all_chunks.extend(_assign_ids(chunks, path.relative_to(kb_dir).as_posix()))
         except Exception as e:
             print(f"  ⚠  Failed to load {path.name}: {e}")
 
@@ -158,7 +161,7 @@ def main():
             text   = "\n\n".join(p.extract_text() or "" for p in reader.pages)
             category = path.parent.name
             chunks   = chunk_text(text, path.name, category)
-            all_chunks.extend(chunks)
+            all_chunks.extend(_assign_ids(chunks, path.relative_to(kb_dir).as_posix()))
             print(f"  📄  PDF {path.name}: {len(reader.pages)} pages → {len(chunks)} chunks")
         except ImportError:
             print("  ⚠  pypdf not installed — skipping PDFs")
@@ -167,69 +170,228 @@ def main():
             print(f"  ⚠  PDF failed {path.name}: {e}")
 
     print(f"✂   Total chunks: {len(all_chunks)}")
+    return all_chunks
 
-    if not all_chunks:
-        print("❌  No chunks created. Check knowledge_base/ directory.")
-        sys.exit(1)
 
-    # ── Create ChromaDB collection (cosine similarity) ────────────────────────
+def write_bm25(all_chunks: list[dict]) -> None:
+    stats = build_index(all_chunks)
+    print(
+        f"🔤  BM25 index: {stats['docs']} chunks, {stats['terms']} terms, "
+        f"{stats['postings']} postings in {stats['build_ms']}ms → {BM25_DIR}"
+    )
+
+
+def existing_hashes(collection) -> dict[str, Optional[str]]:
+    """id → content_hash for every vector already in the collection."""
+    out: dict[str, Optional[str]] = {}
+    offset = 0
+    while True:
+        page = collection.get(include=["metadatas"], limit=GET_PAGE, offset=offset)
+        ids = page["ids"]
+        for cid, meta in zip(ids, page["metadatas"] or [{}] * len(ids)):
+            out[cid] = (meta or {}).get("content_hash")
+        if len(ids) < GET_PAGE:
+            return out
+        offset += GET_PAGE
+
+
+def plan_sync(existing: dict[str, Optional[str]], chunks: list[dict]) -> dict[str, list]:
+    """Split chunks into add / update / unchanged and list ids to delete."""
+    plan: dict[str, list] = {"add": [], "update": [], "unchanged": [], "delete": []}
+    current = set()
+    for c in chunks:
+        current.add(c["id"])
+        if c["id"] not in existing:
+            plan["add"].append(c)
+        elif existing[c["id"]] != c["content_hash"]:
+            plan["update"].append(c)
+        else:
+            plan["unchanged"].append(c)
+    plan["delete"] = [cid for cid in existing if cid not in current]
+    return plan
+
+
+def sync_collection(
+    collection,
+    chunks: list[dict],
+    embedder,
+    cache: Optional[EmbeddingCache],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    workers: int = DEFAULT_WORKERS,
+) -> dict:
+    """
+    Bring ``collection`` in line with ``chunks``: embed (cache first) and
+    upsert new/changed chunks, delete vanished ids.  Chunks whose embedding
+    fails are left out and retried by the next run.
+    """
+    t0 = time.time()
+    plan = plan_sync(existing_hashes(collection), chunks)
+    todo = plan["add"] + plan["update"]
+    print(
+        f"🧮  {len(plan['add'])} new, {len(plan['update'])} changed, "
+        f"{len(plan['unchanged'])} unchanged, {len(plan['delete'])} to delete"
+    )
+
+    def progress(done: int, total: int) -> None:
+        elapsed = time.time() - t0
+        eta = (elapsed / done) * (total - done) if done else 0
+        print(f"  [{done:4d}/{total}]  {round(elapsed, 1)}s elapsed, ~{round(eta)}s remaining")
+
+    res = embed_texts(
+        [c["text"] for c in todo], embedder, cache,
+        batch_size=batch_size, workers=workers, on_batch=progress,
+    )
+    ready = [(c, v) for c, v in zip(todo, res["vectors"]) if v is not None]
+    for start in range(0, len(ready), UPSERT_BATCH):
+        batch = ready[start:start + UPSERT_BATCH]
+        collection.upsert(
+            ids=[c["id"] for c, _ in batch],
+            embeddings=[v for _, v in batch],
+            documents=[c["text"] for c, _ in batch],
+            metadatas=[
+                {"source_file": c["source_file"], "category": c["category"], "content_hash": c["content_hash"]}
+                for c, _ in batch
+            ],
+        )
+    for start in range(0, len(plan["delete"]), UPSERT_BATCH):
+        collection.delete(ids=plan["delete"][start:start + UPSERT_BATCH])
+
+    seconds = time.time() - t0
+    return {
+        "added":      len(plan["add"]),
+        "updated":    len(plan["update"]),
+        "unchanged":  len(plan["unchanged"]),
+        "deleted":    len(plan["delete"]),
+        "cache_hits": res["cache_hits"],
+        "embedded":   res["embedded"],
+        "failed":     res["failed"],
+        "embed_s":    round(res["seconds"], 2),
+        "seconds":    round(seconds, 2),
+        "embed_per_s": round(res["embedded"] / res["seconds"], 1) if res["embedded"] else None,
+    }
+
+
+def open_collection(chroma_dir: Path, model: str, rebuild: bool = False):
+    """Get (or create) the cosine collection; rebuilt when the embed model changed."""
     import chromadb as cdb
-    CHROMA_DIR.mkdir(parents=True, exist_ok=True)
-    client = cdb.PersistentClient(path=str(CHROMA_DIR))
+    chroma_dir.mkdir(parents=True, exist_ok=True)
+    client = cdb.PersistentClient(path=str(chroma_dir))
 
-    # Delete old collection if exists
-    try:
-        client.delete_collection(COLLECTION)
-        print(f"🗑   Old collection '{COLLECTION}' deleted")
-    except Exception:
-        pass
+    if not rebuild:
+        try:
+            built_with = (client.get_collection(COLLECTION).metadata or {}).get("embed_model")
+            if built_with and built_with != model:
+                print(f"♻️   Collection was built with {built_with}, not {model} — rebuilding")
+                rebuild = True
+        except Exception:
+            pass            # no collection yet
+    if rebuild:
+        try:
+            client.delete_collection(COLLECTION)
+            print(f"🗑   Old collection '{COLLECTION}' deleted")
+        except Exception:
+            pass
 
-    collection = client.create_collection(
+    collection = client.get_or_create_collection(
         name=COLLECTION,
-        metadata={"hnsw:space": "cosine"},
+        metadata={"hnsw:space": "cosine", "embed_model": model},
     )
-    print(f"✅  Created collection '{COLLECTION}' with cosine similarity")
+    print(f"✅  Collection '{COLLECTION}' (cosine) — {collection.count()} vectors")
+    return collection
+
 
-    # ── Embed and store in batches ────────────────────────────────────────────
-    print(f"\n🔢  Embedding {len(all_chunks)} chunks with {EMBED_MODEL}...")
-    BATCH = 16
-    t0    = time.time()
-    total = len(all_chunks)
+def _parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Build / update the KrishiMitra RAG vector store.")
+    parser.add_argument("--bm25-only", action="store_true", help="only rebuild the BM25 keyword index")
+    parser.add_argument("--rebuild", action="store_true", help="drop and recreate the collection")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--no-cache", action="store_true", help="ignore the on-disk embedding cache")
+    parser.add_argument("--stub", action="store_true", help="deterministic local embedder (no Ollama)")
+    parser.add_argument("--chroma-dir", type=Path, default=None)
+    parser.add_argument("--kb-dir", type=Path, default=KB_DIR)
+    return parser.parse_args(argv)
 
-    for start in range(0, total, BATCH):
-        batch  = all_chunks[start:start + BATCH]
-        texts  = [c["text"] for c in batch]
 
+def main(argv=None):
+    args = _parse_args(argv)
+    print("\n" + "═" * 55)
+    print("  KrishiMitra RAG — Knowledge Base Ingestion v3")
+    print("═" * 55 + "\n")
+
+    if args.bm25_only:
+        all_chunks = load_chunks(args.kb_dir)
+        if not all_chunks:
+            print("❌  No chunks created. Check knowledge_base/ directory.")
+            sys.exit(1)
+        write_bm25(all_chunks)
+        return
+
+    # ── Check dependencies ────────────────────────────────────────────────────
+    try:
+        import chromadb  # noqa: F401
+    except ImportError:
+        print("❌  chromadb not installed. Run: pip install chromadb")
+        sys.exit(1)
+
+    if args.stub:
+        embedder = StubEmbedder()
+        chroma_dir = args.chroma_dir or STUB_CHROMA_DIR
+        print(f"🧪  Stub embedder ({embedder.model}) → {chroma_dir}")
+    else:
+        embedder = OllamaEmbedder(EMBED_MODEL, OLLAMA_URL)
+        chroma_dir = args.chroma_dir or CHROMA_DIR
+        # ── Check Ollama ──────────────────────────────────────────────────────
         try:
-            vectors = embed(texts)
+            req = urllib.request.Request(f"{OLLAMA_URL}/api/tags")
+            with urllib.request.urlopen(req, timeout=5) as resp:
+                models = [m["name"] for m in json.loads(resp.read()).get("models", [])]
+            if not any(EMBED_MODEL in m for m in models):
+                print(f"❌  {EMBED_MODEL} not found. Run: ollama pull {EMBED_MODEL}")
+                sys.exit(1)
+            print(f"✅  Ollama ready — {EMBED_MODEL} available")
         except Exception as e:
-            print(f"  ❌  Embed batch {start}-{start+len(batch)} failed: {e}")
-            continue
+            print(f"❌  Ollama not running: {e}")
+            print("   Start it with: ollama serve")
+            sys.exit(1)
 
-        ids       = [f"chunk_{start + i}" for i in range(len(batch))]
-        metadatas = [{"source_file": c["source_file"], "category": c["category"]} for c in batch]
+    # ── Load and chunk documents ──────────────────────────────────────────────
+    all_chunks = load_chunks(args.kb_dir)
 
-        collection.add(
-            ids=ids,
-            embeddings=vectors,
-            documents=texts,
-            metadatas=metadatas,
-        )
+    if not all_chunks:
+        print("❌  No chunks created. Check knowledge_base/ directory.")
+        sys.exit(1)
 
-        done    = min(start + BATCH, total)
-        elapsed = time.time() - t0
-        eta     = (elapsed / done) * (total - done) if done > 0 else 0
-        print(f"  [{done:3d}/{total}]  {round(elapsed, 1)}s elapsed, ~{round(eta)}s remaining")
+    # ── Keyword index (no embedding needed — built first) ────────────────────
+    # Stub runs leave the live index alone.
+    if not args.stub:
+        write_bm25(all_chunks)
+
+    # ── Incremental sync into ChromaDB ────────────────────────────────────────
+    collection = open_collection(chroma_dir, embedder.model, rebuild=args.rebuild)
+    cache = None if args.no_cache else EmbeddingCache()
+    try:
+        stats = sync_collection(
+            collection, all_chunks, embedder, cache,
+            batch_size=args.batch_size, workers=args.workers,
+        )
+    finally:
+        if cache is not None:
+            cache.close()
 
     # ── Verify ────────────────────────────────────────────────────────────────
     final_count = collection.count()
-    total_time  = round(time.time() - t0, 1)
-    print(f"\n✅  Done — {final_count} vectors stored in {total_time}s")
-    print(f"📦  Chroma DB: {CHROMA_DIR}")
+    rate = f", {stats['embed_per_s']} chunks/s embedded" if stats["embed_per_s"] else ""
+    print(
+        f"\n✅  Done — {final_count} vectors stored in {stats['seconds']}s "
+        f"({stats['embedded']} embedded, {stats['cache_hits']} from cache, "
+        f"{stats['failed']} failed{rate})"
+    )
+    print(f"📦  Chroma DB: {chroma_dir}")
 
     # ── Quick test ────────────────────────────────────────────────────────────
     print("\n🔍  Testing: 'mustard aphid control Dimethoate'")
-    test_vec = embed(["mustard aphid control Dimethoate"])[0]
+    test_vec = embedder.embed(["mustard aphid control Dimethoate"])[0]
     results  = collection.query(
         query_embeddings=[test_vec],
         n_results=3,
@@ -244,7 +406,7 @@ def main():
         print(f"  [{score}] {meta['source_file']}  /  {doc[:80]}...")
 
     print("\n🔍  Testing Hindi: 'सरसों माहू नियंत्रण mustard aphid'")
-    test_vec2 = embed(["सरसों माहू नियंत्रण mustard aphid"])[0]
+    test_vec2 = embedder.embed(["सरसों माहू नियंत्रण mustard aphid"])[0]
     results2  = collection.query(
         query_embeddings=[test_vec2],
         n_results=3,
@@ -1,23 +1,24 @@
 """
-KrishiMitra RAG Retriever v4
+KrishiMitra RAG Retriever v5
 ============================
-Production-optimized retriever implementing all 5 RAG latency fixes:
+Production-optimized hybrid retriever:
 
-  1. Parallel retrieval — keyword BM25 + vector search run concurrently
-  2. Top-20 → rerank → Top-5 — smaller LLM context, better precision
+  1. Parallel retrieval — BM25 keyword search and the query embedding run
+     concurrently; vector search follows the embedding
+  2. Reciprocal-rank fusion of the two candidate lists → Top-k
   3. Embedding LRU cache — same query embedding never computed twice
   4. Retrieval result cache — identical (query, k, category) skip ChromaDB
-  5. Context compression — dedup + 200-char hard cap per chunk on the way out
+  5. Context compression — dedup + hard char cap per chunk on the way out
 
 Profile before you optimize — this module logs stage timings at DEBUG level:
-  EMBED_MS, VECTOR_MS, KEYWORD_MS, RERANK_MS, TOTAL_MS
-
-Key changes vs v3:
-  - retrieve() now retrieves 20, reranks, returns top k (default 5)
-  - retrieve_with_sources() same reranking pipeline with scores
-  - _embed() is @lru_cache(maxsize=512) keyed on the augmented query string
-  - Keyword search uses simple TF-IDF-like term overlap (no extra dep)
-  - Parallel futures: embed + keyword_scan run concurrently, vector waits for embed
+  EMBED_MS, VECTOR_MS, KEYWORD_MS, FUSE_MS, TOTAL_MS
+
+Key changes vs v4:
+  - Keyword search is a persistent, memory-mapped BM25 index built by
+    rag/ingest.py over the same chunk ids as ChromaDB (rag/bm25_index.py)
+  - When keyword hits exist, the embedding only gets _EMBED_BUDGET_S; if
+    Ollama is slow or down the lexical results answer on their own
+  - Works with only one of the two indexes present
 """
 
 from __future__ import annotations
@@ -25,13 +26,16 @@ from __future__ import annotations
 import hashlib
 import json
 import logging
+import os
 import re
 import time
 import urllib.request
 from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeout
 from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional
+
+from .bm25_index import BM25Index, load_index
 
 logger = logging.getLogger(__name__)
 
@@ -46,12 +50,21 @@ _RETRIEVAL_CANDIDATES = 20
 _DEFAULT_K = 5
 # Hard character cap per chunk in context (prevents token bloat)
 _MAX_CHUNK_CHARS = 600
+# Reciprocal-rank fusion constant (Cormack et al. use 60)
+_RRF_K = 60
+# Embedding wait when BM25 already has hits / when it is the only source
+_EMBED_BUDGET_S  = float(os.getenv("RAG_EMBED_BUDGET_S", "3"))
+_EMBED_TIMEOUT_S = 15
 
 _client     = None
 _collection = None
+_collection_failed_at = float("-inf")
+_COLLECTION_RETRY_S   = 60
+_bm25: Optional[BM25Index] = None
+_bm25_loaded = False
 
-# Thread pool for parallel retrieval stages
-_RETRIEVAL_POOL = ThreadPoolExecutor(max_workers=3, thread_name_prefix="rag-retrieval")
+# Thread pool for parallel retrieval stages (embed + keyword per request)
+_RETRIEVAL_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="rag-retrieval")
 
 # ── Retrieval result cache (query hash → results) ─────────────────────────────
 # LRU of 256 unique (augmented_query, k, category) combos.
@@ -138,71 +151,76 @@ def _embed(text: str) -> tuple:
 
 
 def _get_collection():
-    global _client, _collection
-    if _collection is None:
+    global _client, _collection, _collection_failed_at
+    if _collection is None and time.monotonic() - _collection_failed_at >= _COLLECTION_RETRY_S:
         try:
             import chromadb
             _client = chromadb.PersistentClient(path=str(CHROMA_DIR))
             _collection = _client.get_collection(name=COLLECTION)
             logger.info("ChromaDB ready — %d vectors in '%s'", _collection.count(), COLLECTION)
         except Exception as exc:
+            # Don't retry (and re-log) on every query — BM25 keeps serving.
+            _collection_failed_at = time.monotonic()
             logger.error("ChromaDB load failed: %s", exc)
     return _collection
 
 
-# ── Keyword overlap scorer (BM25-lite, no extra deps) ─────────────────────────
-def _keyword_score(query_terms: set, doc: str) -> float:
-    """
-    Simple term-overlap ratio: |query ∩ doc_terms| / |query|
-    Fast enough to score 20 candidates in <1 ms.
-    """
-    if not query_terms:
-        return 0.0
-    doc_lower  = doc.lower()
-    hits = sum(1 for t in query_terms if t in doc_lower)
-    return hits / len(query_terms)
+def _get_bm25() -> Optional[BM25Index]:
+    global _bm25, _bm25_loaded
+    if not _bm25_loaded:
+        _bm25 = load_index()
+        _bm25_loaded = True
+    return _bm25
 
 
-def _rerank(
-    candidates: List[dict],
-    query: str,
+def _keyword_search(query: str, n: int, category: Optional[str]) -> List[dict]:
+    """BM25 search over the memory-mapped keyword index."""
+    idx = _get_bm25()
+    if idx is None:
+        return []
+    t0 = time.monotonic()
+    hits = idx.search(query, n, category)
+    logger.debug("KEYWORD_MS=%.1f n=%d", (time.monotonic() - t0) * 1000, len(hits))
+    return hits
+
+
+def _fuse(
+    vector: List[dict],
+    lexical: List[dict],
     final_k: int,
 ) -> List[dict]:
     """
-    RAG-1/RAG-2: Rerank Top-20 candidates to Top-k using a combined score:
-      combined = 0.7 * vector_similarity + 0.3 * keyword_overlap
+    Reciprocal-rank fusion: score(d) = Σ 1 / (_RRF_K + rank_list(d)).
 
-    This is the key insight from the RAG optimization article:
-    "The best RAG engineers optimize context."
-    Sending 5 highly relevant chunks beats sending 20 mediocre ones.
-
-    Also deduplicates near-identical chunks (first 80 chars as fingerprint).
+    Rank-based, so cosine similarities and BM25 scores need no calibration
+    against each other.  Chunks are matched by id; near-identical chunks
+    (same first 80 chars) are deduplicated.  The returned ``score`` is
+    normalised so a chunk ranked first by both lists scores 1.0.
     """
-    query_terms = set(re.findall(r"\w+", query.lower()))
+    fused: Dict[str, float] = {}
+    by_id: Dict[str, dict] = {}
+    for hits in (vector, lexical):
+        for rank, c in enumerate(hits, start=1):
+            cid = c.get("id") or c["text"][:80]
+            fused[cid] = fused.get(cid, 0.0) + 1.0 / (_RRF_K + rank)
+            by_id.setdefault(cid, c)
+
+    max_score = 2.0 / (_RRF_K + 1)
     seen: set = set()
-    scored: List[Tuple[float, dict]] = []
-
-    for c in candidates:
-        # Dedup — skip chunks that start the same way (RAG-2)
+    results = []
+    for cid in sorted(fused, key=fused.get, reverse=True):
+        c = by_id[cid]
         fp = c["text"][:80]
         if fp in seen:
             continue
         seen.add(fp)
-
-        vec_sim  = c.get("score", 0.0)
-        kw_score = _keyword_score(query_terms, c["text"])
-        combined = 0.7 * vec_sim + 0.3 * kw_score
-        scored.append((combined, c))
-
-    scored.sort(key=lambda x: x[0], reverse=True)
-    results = []
-    for score, c in scored[:final_k]:
         c = dict(c)
-        c["score"] = round(score, 3)
+        c["score"] = round(fused[cid] / max_score, 3)
         # RAG-2: hard-cap chunk to _MAX_CHUNK_CHARS to prevent token bloat
         c["text"] = c["text"][:_MAX_CHUNK_CHARS]
         results.append(c)
-
+        if len(results) >= final_k:
+            break
     return results
 
 
@@ -224,18 +242,20 @@ def _vector_search(
     if category:
         kwargs["where"] = {"category": category}
     res = col.query(**kwargs)
+    ids   = res["ids"][0]
     docs  = res["documents"][0]
     metas = res["metadatas"][0]
     dists = res["distances"][0]
     logger.debug("VECTOR_MS=%.0f n=%d", (time.monotonic() - t0) * 1000, len(docs))
     return [
         {
+            "id":          cid,
             "text":        doc,
             "source_file": meta.get("source_file", "unknown"),
             "category":    meta.get("category", "general"),
             "score":       round(1 - dist, 3),
         }
-        for doc, meta, dist in zip(docs, metas, dists)
+        for cid, doc, meta, dist in zip(ids, docs, metas, dists)
     ]
 
 
@@ -247,7 +267,7 @@ def retrieve(
     """
     Return top-k relevant text chunks (text only, no metadata).
 
-    RAG-1: fetches _RETRIEVAL_CANDIDATES (20) then reranks to k.
+    RAG-1: fetches _RETRIEVAL_CANDIDATES (20) per index then fuses to k.
     RAG-3: result is cached by (augmented_query, k, category).
     """
     results = retrieve_with_sources(query, k=k, category=category)
@@ -260,18 +280,22 @@ def retrieve_with_sources(
     category: Optional[str] = None,
 ) -> List[dict]:
     """
-    Return top-k chunks with source metadata and combined rerank score.
+    Return top-k chunks with source metadata and fused score.
 
     Pipeline (all timings logged at DEBUG):
       1. Augment query with Hindi→English expansions
-      2. Embed (LRU cached)                          [EMBED_MS]
+      2. In parallel: BM25 search [KEYWORD_MS] and embed (LRU cached) [EMBED_MS]
       3. Vector search for _RETRIEVAL_CANDIDATES     [VECTOR_MS]
-      4. Rerank Top-20 → Top-k (keyword + vector)    [RERANK_MS]
+      4. Reciprocal-rank fusion → Top-k              [FUSE_MS]
       5. Return compressed chunks                    [TOTAL_MS]
+
+    If the embedding misses its budget or fails, the BM25 hits are returned
+    alone (and not cached, so the next call can use the now-cached vector).
     """
     t_total = time.monotonic()
-    col = _get_collection()
-    if col is None:
+    col  = _get_collection()
+    bm25 = _get_bm25()
+    if col is None and bm25 is None:
         return []
 
     aug = _augment(query)
@@ -283,40 +307,55 @@ def retrieve_with_sources(
         return _result_cache[ck]
 
     try:
-        # ── RAG-1: parallel embedding + (optionally) keyword pre-scan ────
-        # Embedding must finish before vector search, but the augmentation
-        # and cache check happen in the calling thread.  We run the embed
-        # on the pool so it doesn't block other operations in the caller.
-        embed_future = _RETRIEVAL_POOL.submit(_embed, aug)
-        vec = embed_future.result(timeout=15)   # raises on timeout
-
-        # ── RAG-1: vector search ──────────────────────────────────────────
-        n_candidates = min(_RETRIEVAL_CANDIDATES, col.count())
-        t_vec = time.monotonic()
-        candidates = _vector_search(vec, n_candidates, category)
-        logger.debug("VECTOR_MS=%.0f", (time.monotonic() - t_vec) * 1000)
-
-        # ── RAG-1+2: rerank + compress ────────────────────────────────────
-        t_rerank = time.monotonic()
-        results = _rerank(candidates, aug, k)
-        logger.debug("RERANK_MS=%.0f", (time.monotonic() - t_rerank) * 1000)
+        # ── RAG-1: keyword search and embedding run concurrently ──────────
+        kw_future = (
+            _RETRIEVAL_POOL.submit(_keyword_search, aug, _RETRIEVAL_CANDIDATES, category)
+            if bm25 is not None else None
+        )
+        embed_future = _RETRIEVAL_POOL.submit(_embed, aug) if col is not None else None
+
+        lexical: List[dict] = kw_future.result(timeout=5) if kw_future else []
+
+        vector: List[dict] = []
+        complete = True
+        if embed_future is not None:
+            budget = _EMBED_BUDGET_S if lexical else _EMBED_TIMEOUT_S
+            try:
+                vec = embed_future.result(timeout=budget)
+                n_candidates = min(_RETRIEVAL_CANDIDATES, col.count())
+                vector = _vector_search(vec, n_candidates, category)
+            except FuturesTimeout:
+                complete = False
+                logger.warning(
+                    "Embedding exceeded %.1fs budget — %s",
+                    budget, "serving BM25 hits only" if lexical else "no results",
+                )
+            except Exception as exc:
+                complete = False
+                logger.warning("Vector search failed (%s) — serving BM25 hits only", exc)
+
+        # ── RAG-1+2: fuse + compress ──────────────────────────────────────
+        t_fuse = time.monotonic()
+        results = _fuse(vector, lexical, k)
+        logger.debug("FUSE_MS=%.1f", (time.monotonic() - t_fuse) * 1000)
 
         # ── RAG-3: store in result cache ──────────────────────────────────
-        if len(_result_cache) >= _RESULT_CACHE_MAX:
-            # Evict oldest entry (dict insertion order in Python 3.7+)
-            oldest = next(iter(_result_cache))
-            del _result_cache[oldest]
-        _result_cache[ck] = results
+        if complete and results:
+            if len(_result_cache) >= _RESULT_CACHE_MAX:
+                # Evict oldest entry (dict insertion order in Python 3.7+)
+                oldest = next(iter(_result_cache))
+                del _result_cache[oldest]
+            _result_cache[ck] = results
 
         logger.debug(
-            "TOTAL_MS=%.0f query='%s' candidates=%d→k=%d",
+            "TOTAL_MS=%.0f query='%s' vector=%d keyword=%d→k=%d",
             (time.monotonic() - t_total) * 1000,
-            query[:40], len(candidates), len(results),
+            query[:40], len(vector), len(lexical), len(results),
         )
         return results
 
     except FuturesTimeout:
-        logger.error("Embedding timed out for query: %s", query[:40])
+        logger.error("Keyword search timed out for query: %s", query[:40])
         return []
     except Exception as exc:
         logger.error("Retrieval failed: %s", exc)
@@ -325,11 +364,16 @@ def retrieve_with_sources(
 
 def is_available() -> bool:
     col = _get_collection()
-    return col is not None and col.count() > 0
+    if col is not None and col.count() > 0:
+        return True
+    bm25 = _get_bm25()
+    return bm25 is not None and len(bm25) > 0
 
 
 def clear_cache() -> None:
-    """Clear both the result cache and the embedding LRU cache."""
+    """Clear the result cache and embedding LRU; re-open the BM25 index lazily."""
+    global _bm25, _bm25_loaded
     _result_cache.clear()
     _embed.cache_clear()
+    _bm25, _bm25_loaded = None, False
     logger.info("RAG caches cleared")
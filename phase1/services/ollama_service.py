@@ -12,22 +12,69 @@ Why this matters (from the RAG optimization post):
   "Sending 15 000 tokens to an LLM is often more expensive than retrieving
    the right 1 500."  More tokens = more time spent reading = higher latency.
 
-All other behaviour (Ollama URL, model name, system prompt, streaming) is
-unchanged from v1.
+Async path (used by the FastAPI endpoints):
+  - achat() / astream_chat() talk to Ollama through one pooled
+    httpx.AsyncClient, so a long generation never blocks the event loop.
+  - Each model gets a bounded slot pool (OLLAMA_MAX_CONCURRENCY) with a
+    bounded wait queue (OLLAMA_MAX_QUEUE); beyond that OllamaBusyError is
+    raised instead of piling up requests Ollama would serialize anyway.
+  - achat() raises OllamaUnavailableError instead of returning the
+    offline / error text, so /chat can answer 503 rather than a 200 whose
+    body the caller would take (and cache) as a generated answer.
+  - Without httpx installed the blocking client runs in a worker thread.
+
+Availability: calls go through the shared "ollama" circuit breaker
+(backend/advisory/services/circuit_breaker.py) — a background probe of
+/api/tags plus error / slow-call rates — instead of pinging /api/tags before
+every chat.  While the breaker is open the offline message is returned at once.
+
+OLLAMA_BASE_URL / OLLAMA_MODEL env vars match the Django direct-Ollama tier.
 """
 
 from __future__ import annotations
 
+import asyncio
 import json
 import logging
+import os
+import sys
+import time
 import urllib.request
 import urllib.error
-from typing import Iterator, List, Optional
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import AsyncIterator, Dict, Iterator, List, Optional
+
+try:
+    import httpx
+except ImportError:          # optional — sync client in a thread instead
+    httpx = None
+
+# The breaker module lives in the Django tree (no Django needed to import it).
+_BACKEND_PATH = str(Path(__file__).resolve().parents[2] / "backend")
+if _BACKEND_PATH not in sys.path:
+    sys.path.append(_BACKEND_PATH)
+from advisory.services.circuit_breaker import ollama_breaker  # noqa: E402
 
 logger = logging.getLogger(__name__)
 
-OLLAMA_BASE   = "http://localhost:11434"
-DEFAULT_MODEL = "krishimitra-llm"
+OLLAMA_BASE   = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
+DEFAULT_MODEL = os.getenv("OLLAMA_MODEL", "krishimitra-llm")
+
+# ── Async client + per-model concurrency ─────────────────────────────────────
+# Ollama runs OLLAMA_NUM_PARALLEL generations per model; extra requests only
+# queue inside Ollama with no visibility.  Queue here instead, bounded.
+_MAX_CONCURRENCY = int(os.getenv("OLLAMA_MAX_CONCURRENCY", "2"))
+_MAX_QUEUE       = int(os.getenv("OLLAMA_MAX_QUEUE", "16"))
+_POOL_LIMITS     = int(os.getenv("OLLAMA_POOL_CONNECTIONS", "20"))
+
+_OFFLINE_MSG = (
+    "माफ़ करें, AI सेवा अभी ऑफलाइन है। "
+    "कृपया Kisan Helpline 1800-180-1551 पर कॉल करें (Free, 24x7).\n\n"
+    "Sorry, AI service is currently offline. "
+    "Please call Kisan Helpline 1800-180-1551 (Free, 24x7)."
+)
+_ERROR_MSG = "AI सेवा में त्रुटि। Kisan Helpline: 1800-180-1551 पर कॉल करें।"
 
 # ── Context compression constants (RAG-2) ────────────────────────────────────
 # Approximate tokens in a chunk = chars / 4  (rough but fast).
@@ -61,15 +108,6 @@ STRICT RULES:
 """
 
 
-def _ollama_available() -> bool:
-    try:
-        req = urllib.request.Request(f"{OLLAMA_BASE}/api/tags")
-        with urllib.request.urlopen(req, timeout=3):
-            return True
-    except Exception:
-        return False
-
-
 def _compress_chunks(chunks: List[str]) -> str:
     """
     RAG-2: Deduplicate and compress RAG chunks to stay within token budget.
@@ -198,6 +236,28 @@ def build_farming_prompt(
     return prompt
 
 
+def _chat_payload(
+    prompt: str,
+    system: str,
+    model: str,
+    temperature: float,
+    max_tokens: Optional[int] = None,
+    stream: bool = False,
+) -> dict:
+    options = {"temperature": temperature, "top_p": 0.9}
+    if max_tokens is not None:
+        options.update({"num_predict": max_tokens, "repeat_penalty": 1.1})
+    return {
+        "model": model,
+        "messages": [
+            {"role": "system", "content": system},
+            {"role": "user",   "content": prompt},
+        ],
+        "options": options,
+        "stream": stream,
+    }
+
+
 def chat(
     prompt: str,
     system: str = AGRI_SYSTEM_PROMPT,
@@ -207,29 +267,14 @@ def chat(
     timeout: int = 90,
 ) -> str:
     """Blocking chat — returns the full response as a string."""
-    if not _ollama_available():
-        logger.warning("Ollama unavailable — returning offline message")
-        return (
-            "माफ़ करें, AI सेवा अभी ऑफलाइन है। "
-            "कृपया Kisan Helpline 1800-180-1551 पर कॉल करें (Free, 24x7).\n\n"
-            "Sorry, AI service is currently offline. "
-            "Please call Kisan Helpline 1800-180-1551 (Free, 24x7)."
-        )
+    breaker = ollama_breaker()
+    if not breaker.allow():
+        logger.warning("Ollama circuit open — returning offline message")
+        return _OFFLINE_MSG
 
-    payload = json.dumps({
-        "model": model,
-        "messages": [
-            {"role": "system", "content": system},
-            {"role": "user",   "content": prompt},
-        ],
-        "options": {
-            "temperature":    temperature,
-            "num_predict":    max_tokens,
-            "top_p":          0.9,
-            "repeat_penalty": 1.1,
-        },
-        "stream": False,
-    }).encode("utf-8")
+    payload = json.dumps(
+        _chat_payload(prompt, system, model, temperature, max_tokens)
+    ).encode("utf-8")
 
     req = urllib.request.Request(
         f"{OLLAMA_BASE}/api/chat",
@@ -237,14 +282,18 @@ def chat(
         headers={"Content-Type": "application/json"},
         method="POST",
     )
+    t0 = time.monotonic()
     try:
         with urllib.request.urlopen(req, timeout=timeout) as resp:
             data = json.loads(resp.read().decode("utf-8"))
-            return data["message"]["content"].strip()
+        breaker.record_success(time.monotonic() - t0)
+        return data["message"]["content"].strip()
     except urllib.error.URLError as exc:
+        breaker.record_failure(time.monotonic() - t0)
         logger.error("Ollama request failed: %s", exc)
-        return "AI सेवा में त्रुटि। Kisan Helpline: 1800-180-1551 पर कॉल करें।"
+        return _ERROR_MSG
     except Exception as exc:
+        breaker.record_failure(time.monotonic() - t0)
         logger.error("Unexpected chat error: %s", exc)
         raise
 
@@ -259,19 +308,14 @@ def stream_chat(
     Streaming generator — yields text tokens as they arrive from Qwen.
     Use with StreamingResponse in FastAPI for real-time UX.
     """
-    if not _ollama_available():
+    breaker = ollama_breaker()
+    if not breaker.allow():
         yield "AI सेवा ऑफलाइन है। Kisan Helpline: 1800-180-1551"
         return
 
-    payload = json.dumps({
-        "model": model,
-        "messages": [
-            {"role": "system", "content": system},
-            {"role": "user",   "content": prompt},
-        ],
-        "options": {"temperature": temperature, "top_p": 0.9},
-        "stream": True,
-    }).encode("utf-8")
+    payload = json.dumps(
+        _chat_payload(prompt, system, model, temperature, stream=True)
+    ).encode("utf-8")
 
     req = urllib.request.Request(
         f"{OLLAMA_BASE}/api/chat",
@@ -279,8 +323,11 @@ def stream_chat(
         headers={"Content-Type": "application/json"},
         method="POST",
     )
+    t0 = time.monotonic()
     try:
         with urllib.request.urlopen(req, timeout=120) as resp:
+            breaker.record_success(time.monotonic() - t0)      # time to first byte
+            t0 = None
             for raw_line in resp:
                 line = raw_line.decode("utf-8").strip()
                 if not line:
@@ -294,6 +341,8 @@ def stream_chat(
                 except json.JSONDecodeError:
                     continue
     except Exception as exc:
+        if t0 is not None:
+            breaker.record_failure(time.monotonic() - t0)
         logger.error("Stream failed: %s", exc)
         yield "\n[Stream error — Kisan Helpline: 1800-180-1551]"
 
@@ -318,3 +367,174 @@ def get_model_info() -> dict:
             }
     except Exception:
         return {"available": False, "model": DEFAULT_MODEL}
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+#  ASYNC CLIENT
+# ─────────────────────────────────────────────────────────────────────────────
+class OllamaBusyError(RuntimeError):
+    """Raised when a model's wait queue is full — callers should answer 503."""
+
+
+class OllamaUnavailableError(RuntimeError):
+    """Raised by achat() when Ollama is down or failed — callers should answer 503."""
+
+
+class _ModelLimiter:
+    """At most ``concurrency`` in-flight generations, ``max_queue`` waiters."""
+
+    def __init__(self, concurrency: int, max_queue: int):
+        self._sem       = asyncio.Semaphore(concurrency)
+        self.concurrency = concurrency
+        self.max_queue  = max_queue
+        self.waiting    = 0
+        self.active     = 0
+
+    @asynccontextmanager
+    async def slot(self):
+        if self.waiting >= self.max_queue:
+            raise OllamaBusyError(f"{self.waiting} requests already queued")
+        self.waiting += 1
+        try:
+            await self._sem.acquire()
+        finally:
+            self.waiting -= 1
+        self.active += 1
+        try:
+            yield
+        finally:
+            self.active -= 1
+            self._sem.release()
+
+
+_limiters: Dict[str, _ModelLimiter] = {}
+_async_client: Optional["httpx.AsyncClient"] = None
+
+
+def _limiter(model: str) -> _ModelLimiter:
+    lim = _limiters.get(model)
+    if lim is None:
+        lim = _limiters[model] = _ModelLimiter(_MAX_CONCURRENCY, _MAX_QUEUE)
+    return lim
+
+
+def _client() -> "httpx.AsyncClient":
+    global _async_client
+    if _async_client is None or _async_client.is_closed:
+        _async_client = httpx.AsyncClient(
+            base_url=OLLAMA_BASE,
+            timeout=httpx.Timeout(120.0, connect=3.0),
+            limits=httpx.Limits(
+                max_connections=_POOL_LIMITS,
+                max_keepalive_connections=_POOL_LIMITS,
+            ),
+        )
+    return _async_client
+
+
+async def aclose() -> None:
+    """Close the pooled client (FastAPI shutdown hook)."""
+    global _async_client
+    if _async_client is not None:
+        await _async_client.aclose()
+        _async_client = None
+
+
+def queue_stats() -> Dict[str, dict]:
+    return {
+        model: {"active": lim.active, "waiting": lim.waiting,
+                "concurrency": lim.concurrency, "max_queue": lim.max_queue}
+        for model, lim in _limiters.items()
+    }
+
+
+async def achat(
+    prompt: str,
+    system: str = AGRI_SYSTEM_PROMPT,
+    model: str = DEFAULT_MODEL,
+    temperature: float = 0.25,
+    max_tokens: int = 1200,
+    timeout: int = 90,
+) -> str:
+    """
+    Non-blocking chat.  Raises OllamaBusyError when the model queue is full
+    and OllamaUnavailableError when Ollama is down or the request failed.
+    """
+    async with _limiter(model).slot():
+        if httpx is None:
+            text = await asyncio.to_thread(
+                chat, prompt, system, model, temperature, max_tokens, timeout
+            )
+            if text in (_OFFLINE_MSG, _ERROR_MSG):
+                raise OllamaUnavailableError("Ollama offline")
+            return text
+        breaker = ollama_breaker()
+        if not breaker.allow():
+            logger.warning("Ollama circuit open — rejecting chat")
+            raise OllamaUnavailableError("Ollama circuit open")
+        t0 = time.monotonic()
+        try:
+            resp = await _client().post(
+                "/api/chat",
+                json=_chat_payload(prompt, system, model, temperature, max_tokens),
+                timeout=timeout,
+            )
+            resp.raise_for_status()
+            text = resp.json()["message"]["content"].strip()
+        except httpx.HTTPError as exc:
+            breaker.record_failure(time.monotonic() - t0)
+            logger.error("Ollama request failed: %s", exc)
+            raise OllamaUnavailableError(str(exc)) from exc
+        breaker.record_success(time.monotonic() - t0)
+        return text
+
+
+async def astream_chat(
+    prompt: str,
+    system: str = AGRI_SYSTEM_PROMPT,
+    model: str = DEFAULT_MODEL,
+    temperature: float = 0.25,
+) -> AsyncIterator[str]:
+    """Non-blocking token stream; holds a model slot for the whole stream."""
+    try:
+        async with _limiter(model).slot():
+            if httpx is None:
+                tokens = await asyncio.to_thread(
+                    lambda: list(stream_chat(prompt, system, model, temperature))
+                )
+                for token in tokens:
+                    yield token
+                return
+            breaker = ollama_breaker()
+            if not breaker.allow():
+                yield "AI सेवा ऑफलाइन है। Kisan Helpline: 1800-180-1551"
+                return
+            payload = _chat_payload(prompt, system, model, temperature, stream=True)
+            t0 = time.monotonic()
+            try:
+                async with _client().stream("POST", "/api/chat", json=payload) as resp:
+                    if resp.status_code >= 500:
+                        breaker.record_failure(time.monotonic() - t0)
+                    else:
+                        breaker.record_success(time.monotonic() - t0)    # time to first byte
+                    t0 = None
+                    async for line in resp.aiter_lines():
+                        if not line.strip():
+                            continue
+                        try:
+                            chunk = json.loads(line)
+                        except json.JSONDecodeError:
+                            continue
+                        if not chunk.get("done"):
+                            token = chunk.get("message", {}).get("content", "")
+                            if token:
+                                yield token
+            except httpx.HTTPError:
+                if t0 is not None:
+                    breaker.record_failure(time.monotonic() - t0)
+                raise
+    except OllamaBusyError:
+        yield "AI सेवा अभी व्यस्त है। Kisan Helpline: 1800-180-1551"
+    except Exception as exc:
+        logger.error("Stream failed: %s", exc)
+        yield "\n[Stream error — Kisan Helpline: 1800-180-1551]"
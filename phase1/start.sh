@@ -60,6 +60,13 @@ if [ "$CHROMA_EXISTS" = "no" ]; then
 fi
 echo "✅  Vector store ready"
 
+# Keyword index (older vector stores were built before BM25 existed)
+if [ ! -f "bm25_index/meta.json" ]; then
+  echo "🔤  Building BM25 keyword index..."
+  python3 rag/ingest.py --bm25-only
+fi
+echo "✅  Keyword index ready"
+
 # Start FastAPI server
 echo ""
 echo "🚀  Starting KrishiMitra Phase 1 server on port 8001..."
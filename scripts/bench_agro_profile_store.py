@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmark + parity check for services/agro_profile_store.py.
+
+Compares, per lookup, the linear resolvers the store replaces with the
+shared AgroProfileStore:
+
+  place name      CropRecommendationEngine._resolve_location_profile (old
+                  exact → substring scan → state scan) vs store.resolve()
+  known city      LocationResolver._resolve_known_place(fuzzy=True) (old
+                  substring scan of KNOWN_INDIAN_PLACES) vs store.known_place()
+  GPS point       scalar haversine over every district HQ vs store.nearest()
+                  (0.25° grid → a couple of candidates per cell)
+
+The old text scans were cheap because the tables are small; the store's win
+there is word-aware matching (aliases, "Village, District, State" strings,
+state-consistent hits) at the same or better cost.  GPS lookups had no
+shared path before — field advisory and chat would each have needed a scan.
+
+Parity:
+  - every DISTRICT_PROFILES key resolves to the same profile both ways
+  - for random points across India, store.nearest() names the same district
+    as the full scan (within the store's max distance)
+  - every KNOWN_INDIAN_PLACES key resolves to the same entry
+
+Usage:
+  python3 scripts/bench_agro_profile_store.py
+  python3 scripts/bench_agro_profile_store.py --queries 50000 --points 20000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BACKEND = os.path.join(ROOT, "backend")
+sys.path.insert(0, BACKEND)
+os.chdir(BACKEND)
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+os.environ.setdefault("SECRET_KEY", "bench-agro-profile-store")
+os.environ.setdefault("DEBUG", "True")
+os.environ.setdefault("DATABASE_URL", "sqlite:///bench_agro_profile_store.sqlite3")
+
+import django
+
+django.setup()
+
+from advisory.services.agro_profile_store import (  # noqa: E402
+    DISTRICT_ALIASES, _GRID_MAX_KM, get_agro_profile_store,
+)
+from advisory.services.district_data import DISTRICT_COORDS, DISTRICT_PROFILES  # noqa: E402
+from advisory.services.location_context import (  # noqa: E402
+    INDIA_LAT_MAX, INDIA_LAT_MIN, INDIA_LON_MAX, INDIA_LON_MIN, KNOWN_INDIAN_PLACES,
+)
+
+
+# ── pre-store resolvers (reference) ───────────────────────────────────────
+
+def legacy_profile(location: str, state):
+    loc_lower = location.lower().strip()
+    if loc_lower in DISTRICT_PROFILES:
+        p = dict(DISTRICT_PROFILES[loc_lower])
+        p["_source"] = "district_exact"
+        p["region"] = p.get("state", "India")
+        return p
+    for district_key, profile in DISTRICT_PROFILES.items():
+        if district_key in loc_lower or loc_lower in district_key:
+            p = dict(profile)
+            p["_source"] = "district_fuzzy"
+            p["region"] = p.get("state", "India")
+            return p
+    state_lower = (state or "").lower()
+    for district_key, profile in DISTRICT_PROFILES.items():
+        if profile.get("state", "").lower() == state_lower:
+            p = dict(profile)
+            p["_source"] = "state_first_district"
+            p["region"] = p.get("state", "India")
+            return p
+    return None
+
+
+def _signature(p):
+    """Comparable identity of a resolved profile (legacy profiles carry no key)."""
+    return (p["state"], p["soil"], tuple(p["priority_crops"])) if p else None
+
+
+def legacy_known_place(query: str):
+    key = query.strip().lower()
+    entry = KNOWN_INDIAN_PLACES.get(key)
+    if not entry:
+        for name, data in KNOWN_INDIAN_PLACES.items():
+            if name in key or key in name:
+                return data
+    return entry
+
+
+def _haversine(lat1, lon1, lat2, lon2):
+    dlat = math.radians(lat2 - lat1)
+    dlon = math.radians(lon2 - lon1)
+    a = (math.sin(dlat / 2) ** 2
+         + math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) * math.sin(dlon / 2) ** 2)
+    return 6371 * 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+
+
+def legacy_nearest(lat, lon):
+    best = min(((_haversine(lat, lon, *c), k) for k, c in DISTRICT_COORDS.items()))
+    return (best[1], best[0]) if best[0] <= _GRID_MAX_KM else None
+
+
+# ── workload ──────────────────────────────────────────────────────────────
+
+def _queries(n: int, seed: int = 7) -> list:
+    rnd = random.Random(seed)
+    keys = list(DISTRICT_PROFILES)
+    aliases = list(DISTRICT_ALIASES)
+    out = []
+    for _ in range(n):
+        key = rnd.choice(keys)
+        state = DISTRICT_PROFILES[key]["state"]
+        kind = rnd.random()
+        if kind < 0.35:
+            out.append((key.title(), state))
+        elif kind < 0.65:
+            out.append((f"Village {rnd.randint(1, 999)}, {key.title()} district, {state}", state))
+        elif kind < 0.8:
+            out.append((rnd.choice(aliases).title(), None))
+        else:
+            out.append((f"Unlisted Town {rnd.randint(1, 999)}", state))
+    return out
+
+
+def _points(n: int, seed: int = 11) -> list:
+    rnd = random.Random(seed)
+    return [(rnd.uniform(INDIA_LAT_MIN, INDIA_LAT_MAX), rnd.uniform(INDIA_LON_MIN, INDIA_LON_MAX))
+            for _ in range(n)]
+
+
+def _rate(fn, items) -> float:
+    t0 = time.perf_counter()
+    for it in items:
+        fn(*it)
+    return len(items) / (time.perf_counter() - t0)
+
+
+def run(args) -> dict:
+    t0 = time.perf_counter()
+    store = get_agro_profile_store()
+    build_ms = (time.perf_counter() - t0) * 1000
+    failures: list = []
+
+    # ── parity ────────────────────────────────────────────────────────
+    for key in DISTRICT_PROFILES:
+        p = store.resolve(key, DISTRICT_PROFILES[key]["state"])
+        if not p or p["district"] != key or p["_source"] != "district_exact":
+            failures.append(f"district {key!r} resolved to {p and p['district']!r}")
+        elif any(p[f] != DISTRICT_PROFILES[key][f] for f in ("soil", "rainfall", "irrigation", "agro_zone")) \
+                or p["priority_crops"] != DISTRICT_PROFILES[key]["priority_crops"]:
+            failures.append(f"district {key!r}: profile fields differ")
+    for name, entry in KNOWN_INDIAN_PLACES.items():
+        if dict(store.known_place(name) or {}) != entry:
+            failures.append(f"known place {name!r} differs")
+    points = _points(args.points)
+    mismatches = sum(1 for lat, lon in points
+                     if (store.nearest(lat, lon) or (None,))[0] != (legacy_nearest(lat, lon) or (None,))[0])
+    if mismatches:
+        failures.append(f"{mismatches}/{len(points)} GPS points: grid nearest != full scan")
+
+    # ── throughput ────────────────────────────────────────────────────
+    queries = _queries(args.queries)
+    places = [(q,) for q, _ in queries]
+    places_fuzzy = [(q, True) for q, _ in queries]
+    agree = sum(1 for q, s in queries
+                if _signature(legacy_profile(q, s)) == _signature(store.resolve(q, s)))
+    rows = {
+        "place name": (_rate(legacy_profile, queries), _rate(store.resolve, queries)),
+        "known city (fuzzy)": (_rate(legacy_known_place, places),
+                               _rate(store.known_place, places_fuzzy)),
+        "GPS point": (_rate(legacy_nearest, points), _rate(store.nearest, points)),
+    }
+    return {
+        "build_ms": round(build_ms, 1),
+        "store": store.stats(),
+        "throughput_per_s": {name: {"linear": round(a), "store": round(b), "speedup": round(b / a, 1)}
+                             for name, (a, b) in rows.items()},
+        "place_name_agreement_with_linear": round(agree / len(queries), 3),
+        "gps_points_checked": len(points),
+        "failures": failures,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queries", type=int, default=20000, help="place-name lookups")
+    parser.add_argument("--points", type=int, default=10000, help="random GPS points")
+    parser.add_argument("--json", default=None, help="write results to this file")
+    args = parser.parse_args()
+
+    results = run(args)
+    s = results["store"]
+    print(f"store: {s['districts']} districts, {s['aliases']} aliases, {s['grid_cells_covered']}/"
+          f"{s['grid_cells']} grid cells (avg {s['grid_avg_candidates']} candidates), "
+          f"built in {results['build_ms']} ms")
+    print(f"{'lookup':22s} {'linear/s':>12s} {'store/s':>12s} {'speedup':>8s}")
+    for name, r in results["throughput_per_s"].items():
+        print(f"{name:22s} {r['linear']:>12,} {r['store']:>12,} {r['speedup']:>7}×")
+    print(f"place-name results matching the old scan: {results['place_name_agreement_with_linear']:.1%} "
+          f"(differences: aliases, state-consistent fuzzy hits)")
+    for f in results["failures"][:20]:
+        print(f"  ❌ {f}")
+    if not results["failures"]:
+        print(f"  ✅ all districts, known cities and {results['gps_points_checked']} GPS points match")
+
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump(results, fh, indent=2)
+    sys.exit(1 if results["failures"] else 0)
+
+
+if __name__ == "__main__":
+    main()
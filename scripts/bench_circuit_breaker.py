@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Outage behaviour of the shared circuit breakers (services/circuit_breaker.py),
+driven through phase1's Ollama client (phase1/services/ollama_service.py)
+against the local stub upstreams (scripts/stub_upstreams.py).
+
+Scenarios, one after the other on the "ollama" breaker:
+
+  healthy   --calls chats; no /api/tags ping per chat any more — the only
+            extra upstream traffic is the background probe
+  outage    Ollama answers 503; the breaker opens after min_calls failures
+            and later chats get the offline message without touching Ollama
+  recovery  Ollama comes back; the next probe moves the breaker to
+            half-open, one trial chat closes it
+  slow      Ollama answers, but slower than slow_call_s; the slow-call rate
+            opens the breaker
+  shared    a second breaker on the same store (another worker process in
+            production, sharing Redis) sees the first one's trip
+
+Checked: each of the above, plus refused chats answering in well under the
+upstream latency.
+
+Usage:
+  python3 scripts/bench_circuit_breaker.py
+  python3 scripts/bench_circuit_breaker.py --calls 200 --latency-ms 80
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "scripts"))
+sys.path.insert(0, os.path.join(ROOT, "phase1"))
+sys.path.insert(0, os.path.join(ROOT, "backend"))
+
+from stub_upstreams import StubUpstreams  # noqa: E402
+
+
+def timed_chats(chat, n: int):
+    times, answers = [], []
+    for i in range(n):
+        t0 = time.perf_counter()
+        answers.append(chat(f"gehu mein peela rog {i}", timeout=5))
+        times.append((time.perf_counter() - t0) * 1000)
+    times.sort()
+    return answers, {"calls": n, "p50_ms": round(times[n // 2], 1), "max_ms": round(times[-1], 1)}
+
+
+def ollama_calls(stubs) -> int:
+    return stubs.stats().get("ollama", {}).get("calls", 0)
+
+
+def wait_for(predicate, timeout_s: float) -> float:
+    t0 = time.perf_counter()
+    while time.perf_counter() - t0 < timeout_s:
+        if predicate():
+            return time.perf_counter() - t0
+        time.sleep(0.05)
+    return -1.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=60, help="chats per scenario")
+    parser.add_argument("--latency-ms", type=float, default=60.0, help="stub Ollama latency when healthy")
+    parser.add_argument("--slow-s", type=float, default=0.3, help="slow_call_s for the bench breaker")
+    parser.add_argument("--min-calls", type=int, default=5)
+    parser.add_argument("--open-s", type=float, default=30.0)
+    parser.add_argument("--probe-s", type=float, default=1.0, help="probe interval")
+    parser.add_argument("--json", default=None, help="write results to this file")
+    args = parser.parse_args()
+
+    stubs = StubUpstreams(latency_ms={"ollama": args.latency_ms}).start()
+    stubs.configure_env()
+
+    from advisory.services import circuit_breaker as cb
+    cb._STATE_MEMO_S = 0.0
+    base = os.environ["OLLAMA_BASE_URL"]
+    # First registration wins: bench-sized thresholds for the "ollama" breaker.
+    breaker = cb.get_breaker(
+        "ollama", min_calls=args.min_calls, slow_call_s=args.slow_s, open_s=args.open_s,
+        trial_ttl_s=5.0, probe_interval_s=args.probe_s,
+        probe=lambda: cb._http_ok(f"{base}/api/tags"),
+    )
+    from services.ollama_service import _OFFLINE_MSG, chat
+
+    failures, results = [], {}
+
+    # ── healthy ─────────────────────────────────────────────────
+    time.sleep(0.2)
+    stubs.reset_stats()
+    probes0 = breaker.stats()["probes"]
+    answers, results["healthy"] = timed_chats(chat, args.calls)
+    hits = ollama_calls(stubs)
+    probes = breaker.stats()["probes"] - probes0
+    results["healthy"].update(upstream_calls=hits, probes=probes)
+    if any(a == _OFFLINE_MSG for a in answers):
+        failures.append("healthy: offline message while Ollama was up")
+    if hits > args.calls + probes:
+        failures.append(f"healthy: {hits} upstream calls for {args.calls} chats + {probes} probes "
+                        f"(a per-chat ping is still being made)")
+
+    # ── outage ──────────────────────────────────────────────────
+    stubs.fail("ollama", 503)
+    stubs.reset_stats()
+    answers, results["outage"] = timed_chats(chat, args.calls)
+    hits = ollama_calls(stubs)
+    refused = sum(a == _OFFLINE_MSG for a in answers)
+    results["outage"].update(upstream_calls=hits, refused=refused, state=breaker.state())
+    if breaker.state() != cb.OPEN:
+        failures.append(f"outage: breaker {breaker.state()} after {args.calls} failed chats")
+    if hits > args.min_calls + 3:
+        failures.append(f"outage: {hits} calls reached Ollama (min_calls {args.min_calls})")
+    if results["outage"]["p50_ms"] >= args.latency_ms:
+        failures.append(f"outage: refused chats p50 {results['outage']['p50_ms']} ms, not fast-failed")
+
+    # ── shared ──────────────────────────────────────────────────
+    other = cb.CircuitBreaker("ollama", store=breaker.store)
+    results["shared"] = {"other_state": other.state(), "other_allows": other.allow()}
+    if other.state() != cb.OPEN or results["shared"]["other_allows"]:
+        failures.append(f"shared: second breaker on the same store is {other.state()}")
+
+    # ── recovery ────────────────────────────────────────────────
+    stubs.recover("ollama")
+    to_half_open = wait_for(lambda: breaker.state() == cb.HALF_OPEN, args.probe_s * 3 + 1)
+    answer = chat("trial", timeout=5)
+    results["recovery"] = {"probe_to_half_open_s": round(to_half_open, 2), "state": breaker.state()}
+    if to_half_open < 0:
+        failures.append(f"recovery: still {breaker.state()} {args.probe_s * 3 + 1:.0f}s after Ollama came back")
+    elif answer == _OFFLINE_MSG or breaker.state() != cb.CLOSED:
+        failures.append(f"recovery: trial chat did not close the breaker ({breaker.state()})")
+
+    # ── slow ────────────────────────────────────────────────────
+    stubs.latency_ms["ollama"] = args.slow_s * 1000 * 1.5
+    stubs.reset_stats()
+    answers, results["slow"] = timed_chats(chat, args.min_calls + 5)
+    results["slow"].update(upstream_calls=ollama_calls(stubs), state=breaker.state(),
+                           reason=breaker.stats().get("reason"))
+    if breaker.state() != cb.OPEN:
+        failures.append(f"slow: breaker {breaker.state()} after calls slower than {args.slow_s}s")
+
+    results["breaker"] = breaker.stats()
+    stubs.stop()
+
+    print(f"\nollama breaker: min_calls {args.min_calls}, slow {args.slow_s}s, probe every {args.probe_s}s")
+    for name in ("healthy", "outage", "slow"):
+        r = results[name]
+        print(f"  {name:9s} p50 {r['p50_ms']:>7} ms  max {r['max_ms']:>7} ms  "
+              f"upstream calls {r['upstream_calls']:>4} / {r['calls']} chats")
+    print(f"  recovery  half-open {results['recovery']['probe_to_half_open_s']}s after Ollama returned, "
+          f"then {results['recovery']['state']}")
+    for f in failures:
+        print(f"  ❌ {f}")
+    if not failures:
+        print("  ✅ no per-chat pings, fast-fail while open, shared trip, probe-led recovery, slow-call trip")
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump({"config": vars(args), "results": results, "failures": failures}, fh, indent=2,
+                      default=str)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
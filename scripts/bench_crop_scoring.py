@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Golden-output parity + benchmark for the vectorised crop scorers.
+
+Parity: for every district profile × season × weather risk (temperatures and
+mandi premiums cycled through), the vectorised CropRecommendationEngine and
+FieldSensorService rankings must equal the original per-crop Python loops —
+same crops, same order, same scores, same reasons.  Field scoring is also
+checked over a seeded grid of sensor readings (missing values included).
+
+Benchmark: per-request ranking and whole-country batch scoring, loop vs
+vectorised.
+
+Usage:
+  python3 scripts/bench_crop_scoring.py                  # parity + benchmark
+  python3 scripts/bench_crop_scoring.py --parity-only    # CI
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BACKEND = os.path.join(ROOT, "backend")
+sys.path.insert(0, BACKEND)
+os.chdir(BACKEND)
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+os.environ.setdefault("SECRET_KEY", "bench-crop-scoring")
+os.environ.setdefault("DEBUG", "True")
+os.environ.setdefault("DATABASE_URL", "sqlite:///bench_crop_scoring.sqlite3")
+
+import django
+
+django.setup()
+
+from advisory.services.comprehensive_crop_database import ALL_CROP_DATA  # noqa: E402
+from advisory.services.crop_recommendation_engine import CropRecommendationEngine  # noqa: E402
+from advisory.services.crop_scoring import get_crop_matrix, score_field  # noqa: E402
+from advisory.services.district_data import DISTRICT_PROFILES  # noqa: E402
+from advisory.services.field_sensor_service import field_sensor_service  # noqa: E402
+
+SEASONS = ("kharif", "rabi", "zaid")
+TEMPS = (4, 9.5, 17.25, 28, 33.3, 41.25, 46)
+# (current_weather, forecast) pairs that drive each _assess_weather_risk outcome
+WEATHER = {
+    "None":          ({"humidity": 65}, []),
+    "High Rainfall": ({"humidity": 85}, [{"rainfall_mm": 30, "max_temp": 30}] * 7),
+    "Drought":       ({"humidity": 20}, [{"rainfall_mm": 0, "max_temp": 34}] * 7),
+    "Heatwave":      ({"humidity": 40}, [{"rainfall_mm": 1, "max_temp": 44}] * 7),
+    "Cold":          ({"humidity": 60}, [{"rainfall_mm": 1, "max_temp": 6}] * 7),
+}
+MARKETS = (
+    {},
+    {"wheat": {"modal_price": 2600}, "gram": {"modal_price": 6100}, "cotton": {"modal_price": 6000},
+     "mustard": {"modal_price": 5600}, "rice": {"modal_price": 2100}, "onion": {"modal_price": 1800}},
+)
+
+
+# ── Reference: the pre-vectorisation loops, verbatim ──────────────────────
+
+def reference_regional(engine, profile, season_key, current_weather, forecast, market_price_map):
+    from advisory.services.crop_recommendation_engine import _irrigation_level
+
+    soil          = profile.get("soil", "Loamy")
+    rainfall_band = profile.get("rainfall", "Medium")
+    irrigation    = _irrigation_level(profile.get("irrigation", "Medium"))
+    priority_list = [c.lower() for c in profile.get("priority_crops", [])]
+    agro_zone     = profile.get("agro_zone", "")
+    weather_risk = engine._assess_weather_risk(forecast, current_weather)
+    curr_temp    = current_weather.get("temperature") or 28
+
+    results = []
+    for crop_key, crop in ALL_CROP_DATA.items():
+        score, reasons = engine._score_single_crop(
+            crop_key, crop, season_key, soil, rainfall_band, irrigation,
+            priority_list, agro_zone, weather_risk, curr_temp, market_price_map
+        )
+        if score > 0:
+            results.append((score, crop_key, crop, reasons))
+    results.sort(key=lambda x: x[0], reverse=True)
+    return results
+
+
+def reference_field(svc, soil, season_key, curr_temp, weather_risk):
+    results = []
+    for crop_key, crop in ALL_CROP_DATA.items():
+        score, reasons, npk_match = svc._score_with_sensors(
+            crop_key, crop, soil, season_key, curr_temp, weather_risk, 0
+        )
+        if score < 5:
+            continue
+        results.append((int(min(score, 99)), crop_key, reasons, npk_match))
+    results.sort(key=lambda x: x[0], reverse=True)
+    return results
+
+
+# ── Parity ────────────────────────────────────────────────────────────────
+
+def regional_cases(engine):
+    profiles = [(k, dict(p)) for k, p in DISTRICT_PROFILES.items()]
+    for state in ("rajasthan", "kerala", "assam", "himachal", "unknown place"):
+        profiles.append((state, engine._state_keyword_profile(state, state)))
+    combos = itertools.product(profiles, SEASONS, WEATHER)
+    for n, ((name, profile), season, risk) in enumerate(combos):
+        current, forecast = WEATHER[risk]
+        current = dict(current, temperature=TEMPS[n % len(TEMPS)])
+        yield name, profile, season, current, forecast, MARKETS[n % len(MARKETS)]
+
+
+def field_cases(n_cases: int, seed: int = 7):
+    rng = random.Random(seed)
+    crops = list(ALL_CROP_DATA)[:40] + ["", "unknown"]
+
+    def maybe(v):
+        return None if rng.random() < 0.15 else v
+
+    for _ in range(n_cases):
+        soil = {
+            "ph":               maybe(round(rng.uniform(4.5, 9.0), 1)),
+            "nitrogen_kg_ha":   maybe(round(rng.uniform(0, 300), 1)),
+            "phosphorus_kg_ha": maybe(round(rng.uniform(0, 90), 1)),
+            "potassium_kg_ha":  maybe(round(rng.uniform(0, 320), 1)),
+            "moisture_pct":     maybe(round(rng.uniform(2, 80), 1)),
+            "ec_ds_m":          maybe(round(rng.uniform(0, 6), 2)),
+            "organic_carbon":   maybe(round(rng.uniform(0.1, 2.5), 2)),
+            "previous_crop":    rng.choice(crops),
+        }
+        yield soil, rng.choice(SEASONS), rng.choice(TEMPS), rng.choice(list(WEATHER))
+
+
+def check_parity(field_n: int) -> int:
+    engine = CropRecommendationEngine()
+    matrix = get_crop_matrix()
+    failures, regional, field = 0, 0, 0
+
+    for name, profile, season, current, forecast, market in regional_cases(engine):
+        regional += 1
+        want = reference_regional(engine, profile, season, current, forecast, market)
+        got = engine._score_all_crops(profile, season, current, forecast, market)
+        if [(s, k, r) for s, k, _, r in want] != [(s, k, r) for s, k, _, r in got]:
+            failures += 1
+            if failures <= 5:
+                print(f"  ❌ regional {name}/{season}/{current}: "
+                      f"{[(s, k) for s, k, *_ in want[:5]]} != {[(s, k) for s, k, *_ in got[:5]]}")
+
+    from advisory.services import crop_recommendation_engine as cre
+    real_season = cre._current_season
+    try:
+        for soil, season, temp, risk in field_cases(field_n):
+            field += 1
+            cre._current_season = lambda s=season: s
+            weather = {"current_temp": temp, "risk": risk}
+            want = reference_field(field_sensor_service, soil, season, temp, risk)
+            got = field_sensor_service._score_crops_field_level(soil, weather, 0, 0, None)
+            got_rows = [(g["suitability_score"], g["crop_name"].lower(), g["scoring_reasons"], g["npk_match"])
+                        for g in got]
+            want_rows = [(s, k.title().lower(), r, m) for s, k, r, m in want]
+            raw_ok = all(
+                field_sensor_service._score_with_sensors(k, ALL_CROP_DATA[k], soil, season, temp, risk, 0)[0] == v
+                for k, v in zip(matrix.keys, score_field(
+                    [{"soil": soil, "season_key": season, "curr_temp": temp, "weather_risk": risk}],
+                    field_sensor_service._rotation_bonus, matrix)[0].tolist())
+            )
+            if got_rows != want_rows or not raw_ok:
+                failures += 1
+                if failures <= 5:
+                    print(f"  ❌ field {soil} {season} {temp} {risk}")
+    finally:
+        cre._current_season = real_season
+
+    status = "✅" if not failures else "❌"
+    print(f"{status} Crop scoring parity: {regional} regional + {field} field contexts, {failures} mismatches")
+    return failures
+
+
+# ── Benchmark ─────────────────────────────────────────────────────────────
+
+def _timeit(fn, repeat: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - t0) / repeat * 1000
+
+
+def benchmark(repeat: int) -> None:
+    engine = CropRecommendationEngine()
+    profile = engine._resolve_location_profile("delhi", "Delhi")
+    current, forecast = {"temperature": 31, "humidity": 55}, []
+    market = MARKETS[1]
+
+    rows = [
+        ("regional rank (all crops)",
+         lambda: reference_regional(engine, profile, "rabi", current, forecast, market),
+         lambda: engine._score_all_crops(profile, "rabi", current, forecast, market)),
+        ("regional rank (top 12)",
+         lambda: reference_regional(engine, profile, "rabi", current, forecast, market)[:12],
+         lambda: engine._score_all_crops(profile, "rabi", current, forecast, market, limit=12)),
+    ]
+    locations = [(k, p.get("state")) for k, p in DISTRICT_PROFILES.items()]
+    rows.append((
+        f"batch {len(locations)} districts (top 5)",
+        lambda: [reference_regional(engine, engine._resolve_location_profile(k, s), "rabi", {}, [], {})[:5]
+                 for k, s in locations],
+        lambda: engine.score_locations(locations, "rabi", top_n=5),
+    ))
+    soil = {"ph": 6.8, "nitrogen_kg_ha": 140, "phosphorus_kg_ha": 22, "potassium_kg_ha": 180,
+            "moisture_pct": 38, "ec_ds_m": 0.4, "organic_carbon": 0.65, "previous_crop": "gram"}
+    weather = {"current_temp": 26, "risk": "None"}
+    rows.append((
+        "field rank (top 10)",
+        lambda: [field_sensor_service._score_with_sensors(k, c, soil, "rabi", 26, "None", 0)
+                 for k, c in ALL_CROP_DATA.items()],
+        lambda: field_sensor_service._score_crops_field_level(soil, weather, 0, 0, None, limit=10),
+    ))
+    rows.append((
+        "field scores x1000 contexts",
+        lambda: [[field_sensor_service._score_with_sensors(k, c, soil, "rabi", t, "None", 0)
+                  for k, c in ALL_CROP_DATA.items()] for t in range(1000)],
+        lambda: score_field([{"soil": soil, "season_key": "rabi", "curr_temp": t, "weather_risk": "None"}
+                             for t in range(1000)], field_sensor_service._rotation_bonus),
+    ))
+
+    get_crop_matrix()
+    print(f"\n{'case':32s} {'loop ms':>9s} {'vector ms':>10s} {'speed-up':>9s}")
+    for label, loop_fn, vec_fn in rows:
+        n = max(1, repeat // 20) if "x1000" in label or "batch" in label else repeat
+        loop_ms, vec_ms = _timeit(loop_fn, n), _timeit(vec_fn, n)
+        print(f"{label:32s} {loop_ms:>9.2f} {vec_ms:>10.2f} {loop_ms / vec_ms:>8.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--parity-only", action="store_true")
+    parser.add_argument("--field-cases", type=int, default=3000)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    failures = check_parity(args.field_cases)
+    if not args.parity_only:
+        benchmark(args.repeat)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
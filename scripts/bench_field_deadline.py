@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Deadline check for FieldSensorService's upstream fan-out.
+
+Local fake Open-Meteo / Soil Health Card / NASA POWER (scripts/stub_upstreams.py)
+with injected, log-normally jittered latency.  Every request is a new field
+(no weather-cache hits).  Scenarios:
+
+  healthy       all upstreams fast — the old sequential chain (Open-Meteo,
+                then Soil Health Card) vs the fan-out; every source
+                contributes, NASA POWER not needed
+  slow meteo    Open-Meteo well past the deadline — NASA POWER is hedged,
+                p99 stays within the deadline, Soil Health Card still merged
+  shc down      Soil Health Card answering 503 — NASA POWER starts at once
+                instead of after the failure path
+  all stalled   every upstream past the deadline — p99 still within the
+                deadline, a partial (fallback) recommendation is returned
+
+p99 is measured on the full get_field_recommendation() call; --slack-ms
+covers crop scoring and the rest of the CPU work after the fetches.
+
+Usage:
+  python3 scripts/bench_field_deadline.py
+  python3 scripts/bench_field_deadline.py --requests 100 --deadline 1.5
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BACKEND = os.path.join(ROOT, "backend")
+sys.path.insert(0, BACKEND)
+sys.path.insert(0, os.path.join(ROOT, "scripts"))
+os.chdir(BACKEND)
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+os.environ.setdefault("SECRET_KEY", "bench-field-deadline")
+os.environ.setdefault("DEBUG", "True")
+os.environ.setdefault("DATABASE_URL", "sqlite:///bench_field_deadline.sqlite3")
+
+import django
+
+django.setup()
+
+from advisory.services import field_sensor_service as fss  # noqa: E402
+from stub_upstreams import StubUpstreams  # noqa: E402
+
+
+class JitterStubs(StubUpstreams):
+    """Stub server whose per-call latency is log-normal around the configured value."""
+
+    def __init__(self, *args, sigma: float = 0.35, seed: int = 5, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        self.sigma = sigma
+
+    def latency_s(self, upstream: str) -> float:
+        base = super().latency_s(upstream)
+        with self._rng_lock:
+            return base * self._rng.lognormvariate(0.0, self.sigma)
+
+
+def _pct(values, q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def _fields(n: int, seed: int) -> list:
+    rnd = random.Random(seed)
+    return [(round(rnd.uniform(21.0, 29.0), 4), round(rnd.uniform(74.0, 84.0), 4)) for _ in range(n)]
+
+
+def _legacy_sequential(service, lat, lon, state):
+    om = service._fetch_open_meteo_soil_weather(lat, lon)
+    gov = service._fetch_soil_health_card(lat, lon, state)
+    return service._merge_soil_data(om, gov, None)
+
+
+def _scenario(service, stubs, args, seed, latency, failing=()):
+    stubs.latency_ms.update(latency)
+    for upstream in failing:
+        stubs.fail(upstream)
+    fields = _fields(args.requests, seed)
+    reports = []
+
+    def _one(point):
+        t0 = time.perf_counter()
+        out = service.get_field_recommendation(point[0], point[1], location_name="", state="Uttar Pradesh",
+                                               language="en")
+        return (time.perf_counter() - t0) * 1000, out
+
+    try:
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            timed = list(pool.map(_one, fields))
+    finally:
+        stubs.recover()
+    latencies = [ms for ms, _ in timed]
+    for _, out in timed:
+        reports.append(out["upstreams"])
+    contributed = {}
+    for r in reports:
+        for name in r["contributed"]:
+            contributed[name] = contributed.get(name, 0) + 1
+    return {
+        "p50_ms": round(_pct(latencies, 0.50), 1),
+        "p99_ms": round(_pct(latencies, 0.99), 1),
+        "max_ms": round(max(latencies), 1),
+        "partial": sum(1 for r in reports if r["partial"]),
+        "contributed": contributed,
+        "nasa_started": sum(1 for r in reports if r["sources"]["nasa_power"]["status"] != "not_needed"),
+        "recommendations": sum(1 for _, out in timed if out.get("recommendations")),
+    }
+
+
+def run(args) -> dict:
+    fss.FIELD_FETCH_DEADLINE_S = args.deadline
+    fss.FIELD_NASA_HEDGE_S = args.hedge
+    deadline_ms = args.deadline * 1000
+    bound_ms = deadline_ms + args.slack_ms
+    fast = {"open_meteo": args.meteo_ms, "soil_health": args.shc_ms, "nasa_power": args.nasa_ms}
+    stalled_ms = deadline_ms * 2.5
+
+    stubs = JitterStubs(latency_ms=fast).start()
+    stubs.install()
+    failures: list = []
+    results: dict = {"deadline_ms": deadline_ms, "bound_ms": bound_ms}
+    try:
+        service = fss.FieldSensorService()
+        n = args.requests
+
+        # ── healthy: sequential chain vs fan-out ─────────────────────
+        t0 = time.perf_counter()
+        for lat, lon in _fields(min(n, 20), seed=1):
+            _legacy_sequential(service, lat, lon, "Uttar Pradesh")
+        seq_ms = (time.perf_counter() - t0) / min(n, 20) * 1000
+        t0 = time.perf_counter()
+        for lat, lon in _fields(min(n, 20), seed=2):
+            service.fetch_field_sources(lat, lon, "Uttar Pradesh")
+        fan_ms = (time.perf_counter() - t0) / min(n, 20) * 1000
+        healthy = _scenario(service, stubs, args, 3, fast)
+        healthy.update(sequential_fetch_ms=round(seq_ms, 1), fanout_fetch_ms=round(fan_ms, 1))
+        results["healthy"] = healthy
+        if fan_ms >= seq_ms:
+            failures.append(f"healthy: fan-out {fan_ms:.0f} ms not faster than sequential {seq_ms:.0f} ms")
+        if healthy["partial"] or healthy["contributed"].get("soil_health_card", 0) != n:
+            failures.append(f"healthy: {healthy['partial']} partial, contributed {healthy['contributed']}")
+
+        # ── degraded upstreams ────────────────────────────────────────
+        cases = (
+            ("slow_meteo", dict(fast, open_meteo=stalled_ms), (), ("soil_health_card", "nasa_power")),
+            ("shc_down", fast, ("soil_health",), ("open_meteo", "nasa_power")),
+            ("all_stalled", {k: stalled_ms for k in fast}, (), ()),
+        )
+        for i, (name, latency, failing, want) in enumerate(cases):
+            r = _scenario(service, stubs, args, 10 + i, latency, failing)
+            results[name] = r
+            if r["p99_ms"] > bound_ms:
+                failures.append(f"{name}: p99 {r['p99_ms']:.0f} ms over the {bound_ms:.0f} ms bound")
+            if r["recommendations"] != n:
+                failures.append(f"{name}: only {r['recommendations']}/{n} responses carry recommendations")
+            for source in want:
+                if r["contributed"].get(source, 0) < n * 0.95:
+                    failures.append(f"{name}: {source} contributed to {r['contributed'].get(source, 0)}/{n}")
+        if results["shc_down"]["p50_ms"] > args.shc_ms + args.nasa_ms * 2 + args.slack_ms:
+            failures.append(f"shc_down: p50 {results['shc_down']['p50_ms']:.0f} ms — NASA POWER not started at once")
+        results["service_stats"] = dict(service.stats)
+    finally:
+        stubs.stop()
+    results["failures"] = failures
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=60, help="field requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=4, help="concurrent requests")
+    parser.add_argument("--deadline", type=float, default=1.2, help="fetch deadline (s)")
+    parser.add_argument("--hedge", type=float, default=0.4, help="NASA POWER hedge delay (s)")
+    parser.add_argument("--slack-ms", type=float, default=250.0, help="allowance for post-fetch CPU work")
+    parser.add_argument("--meteo-ms", type=float, default=150.0, help="fake Open-Meteo latency")
+    parser.add_argument("--shc-ms", type=float, default=250.0, help="fake Soil Health Card latency")
+    parser.add_argument("--nasa-ms", type=float, default=200.0, help="fake NASA POWER latency")
+    parser.add_argument("--json", default=None, help="write results to this file")
+    args = parser.parse_args()
+
+    print(f"{args.requests} requests/scenario × {args.concurrency} concurrent, deadline {args.deadline:.2f} s, "
+          f"NASA hedge {args.hedge:.2f} s")
+    results = run(args)
+    for name in ("healthy", "slow_meteo", "shc_down", "all_stalled"):
+        if name in results:
+            print(f"  {name:12s} " + "  ".join(f"{k}={v}" for k, v in results[name].items()))
+    for f in results["failures"]:
+        print(f"  ❌ {f}")
+    if not results["failures"]:
+        print(f"  ✅ p99 within {results['bound_ms']:.0f} ms in every scenario, partial results merged")
+
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump(results, fh, indent=2)
+    sys.exit(1 if results["failures"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+"""
+Parity + throughput harness for the compiled chat query classifier.
+
+Parity: over a seeded corpus (hand-written farmer queries plus generated
+mixes of intent keywords, Hinglish variants, crop names/aliases, city names,
+numbers and punctuation), ChatIntelligenceService must return the same
+intent, the same crop entities and the same named location as the original
+per-pattern loops — and the Hinglish normaliser must produce the same text.
+
+Throughput: queries/sec for classify_query (+ location extraction), old vs
+compiled, with a per-stage breakdown.
+
+Usage:
+  python3 scripts/bench_intent_classifier.py                  # parity + benchmark
+  python3 scripts/bench_intent_classifier.py --parity-only    # CI
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BACKEND = os.path.join(ROOT, "backend")
+sys.path.insert(0, BACKEND)
+os.chdir(BACKEND)
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+os.environ.setdefault("SECRET_KEY", "bench-intent-classifier")
+os.environ.setdefault("DEBUG", "True")
+os.environ.setdefault("DATABASE_URL", "sqlite:///bench_intent_classifier.sqlite3")
+
+import django
+
+django.setup()
+
+from advisory.services import chat_intelligence_service as cis  # noqa: E402
+from advisory.services.city_catalog import _INDIAN_CITY_CATALOG, _WEATHER_STOPWORDS  # noqa: E402
+from advisory.services.crop_catalog import crop_catalog  # noqa: E402
+
+svc = cis.chat_intelligence_service
+
+
+# ── Reference: the pre-compilation implementations, verbatim ──────────────
+
+def ref_normalise(text):
+    t = text.lower()
+    for wrong, right in svc._HINGLISH_NORM.items():
+        t = t.replace(wrong, right)
+    return t
+
+
+def ref_catalog_search(query, limit=10):
+    query = (query or "").strip()
+    if len(query) < 1:
+        return crop_catalog.popular(limit)
+    q_lower = query.lower()
+    q_tokens = [t for t in re.split(r"[\s,/\-]+", query.lower()) if len(t) >= 2]
+    scored = []
+    for crop in crop_catalog._crops:
+        name_l = crop["name"].lower()
+        hindi_l = (crop["hindi"] or "").lower()
+        aliases_l = [a.lower() for a in crop["aliases"]]
+        score = 0.0
+        if name_l == q_lower or crop["id"] == q_lower:
+            score = 100.0
+        elif q_lower in name_l or name_l.startswith(q_lower):
+            score = 85.0 if len(q_lower) >= 4 else 0.0
+        elif hindi_l and (q_lower in hindi_l or hindi_l.startswith(q_lower)):
+            score = 80.0 if len(q_lower) >= 3 else 0.0
+        elif any(q_lower in a or a.startswith(q_lower) for a in aliases_l):
+            score = 75.0 if len(q_lower) >= 3 else 0.0
+        else:
+            for tok in q_tokens:
+                if len(tok) < 3 or tok in {"का", "की", "के", "में", "और", "लिए", "क्या", "बारे", "सब", "को", "से", "he", "she", "it", "they", "the", "and", "for", "with", "this", "that", "you", "your"}:
+                    continue
+                if tok in name_l or tok in crop["id"]:
+                    score += 25.0
+                if hindi_l and tok in hindi_l:
+                    score += 20.0
+                if any(tok in a for a in aliases_l):
+                    score += 18.0
+        if score > 0:
+            if crop["has_msp"]:
+                score += 3.0
+            scored.append((score, crop))
+    scored.sort(key=lambda x: (-x[0], x[1]["name"]))
+    return [{
+        "id": c["id"], "name": c["name"], "hindi": c["hindi"], "category": c["category"], "msp": c["msp"],
+        "label": f"{c['name']} ({c['hindi']})" if c["hindi"] else c["name"],
+        "search_term": c["name"], "commodity_filter": c["name"], "_score": s,
+    } for s, c in scored[:limit]]
+
+
+def ref_catalog_normalize(query):
+    if not query or not str(query).strip():
+        return None
+    q = str(query).lower().strip()
+    if q in crop_catalog._by_id:
+        return crop_catalog._by_id[q]
+    for crop in crop_catalog._crops:
+        if q == crop["name"].lower():
+            return crop
+        if q == crop["hindi"].lower():
+            return crop
+        if any(q == a.lower() for a in crop["aliases"]):
+            return crop
+    _STOPWORDS = {
+        "में", "और", "लिए", "क्या", "बारे", "सब", "को", "से", "की", "के", "का",
+        "मेरी", "मेरे", "मेरा", "हमारी", "हमारे", "meri", "mera", "mere",
+        "he", "she", "it", "they", "the", "and", "for", "with", "this",
+        "that", "you", "your", "my", "our", "is", "are", "was", "has",
+        "ki", "ke", "ka", "se", "ko", "me", "kya", "kab", "kaise",
+    }
+    if len(q) < 3 or q in _STOPWORDS:
+        return None
+    if len(q) >= 4:
+        results = ref_catalog_search(query, limit=1)
+        if results and results[0].get("_score", 0) >= 75:
+            return results[0]
+    return None
+
+
+def ref_detect_crops(text):
+    found, seen = [], set()
+    tokens = re.split(r"[\s,?.!;|]+", text.lower())
+    for length in (3, 2, 1):
+        for i in range(len(tokens) - length + 1):
+            phrase = " ".join(tokens[i:i + length])
+            if len(phrase) < 2:
+                continue
+            norm = ref_catalog_normalize(phrase)
+            if norm and norm.get("id") and norm["id"] not in seen:
+                seen.add(norm["id"])
+                found.append(norm)
+    if not found:
+        for r in ref_catalog_search(text, limit=3):
+            if r.get("id") and r["id"] not in seen:
+                seen.add(r["id"])
+                found.append(r)
+    return found[:5]
+
+
+def ref_classify(query):
+    raw_q = query.lower().strip()
+    q = ref_normalise(raw_q)
+    crops = ref_detect_crops(query)
+    if re.search(
+        r"\b(barish|baarish|rain|varsha)\s*(ke\s*baad|after|ke\s*bad)\b.{0,40}\b(sinchai|pani|irrigat|water)\b",
+        q, re.IGNORECASE
+    ) or re.search(
+        r"\b(sinchai|pani|irrigat)\b.{0,30}\b(barish|rain)\s*(ke\s*baad|after)\b",
+        q, re.IGNORECASE
+    ):
+        return cis.INTENT_IRRIGATION, crops
+    if re.search(r"\b(drip|sprinkler|micro\s*irrigation|borewell)\b", q, re.IGNORECASE) and \
+       re.search(r"\b(subsidy|scheme|yojana|milegi)\b", q, re.IGNORECASE) and \
+       not re.search(r"\b(apply|avedan|register|pm[- ]?kusum|kusum|form)\b", q, re.IGNORECASE):
+        return cis.INTENT_IRRIGATION, crops
+    if re.search(r"\b\d+\s*(din|days)\s*(baad|after)?\s*(khad|urea|dap|fertilizer|उर्वरक)", q, re.IGNORECASE):
+        return cis.INTENT_FERTILIZER, crops
+    if re.search(r"\b(aaj|today|abhi)\s*ka\s*\w+\s*ka\s*(rate|bhav|daam|price)\b", q, re.IGNORECASE):
+        return cis.INTENT_MARKET_PRICE, crops
+    for intent, patterns in cis._INTENT_PATTERNS:
+        for pat in patterns:
+            try:
+                if re.search(pat, q, re.IGNORECASE | re.UNICODE):
+                    if intent == cis.INTENT_GREETING and len(q) > 50:
+                        continue
+                    return intent, crops
+            except re.error:
+                continue
+    if crops:
+        q_words = set(q.split())
+        if q_words & {"kab", "when", "time", "samay", "date", "mahina", "month"}:
+            return cis.INTENT_SOWING, crops
+        if q_words & {"kat", "katai", "harvest", "ready", "pak", "paka"}:
+            return cis.INTENT_HARVEST, crops
+        if q_words & {"rakh", "store", "storage", "bhandar", "godown"}:
+            return cis.INTENT_STORAGE, crops
+        if q_words & {"labh", "profit", "kamayi", "lagat", "cost", "income"}:
+            return cis.INTENT_PROFIT_CALC, crops
+        return cis.INTENT_CROP_INFO, crops
+    return cis.INTENT_GENERAL, crops
+
+
+def ref_city(query):
+    q_lower = query.lower().strip()
+    q_clean = re.sub(r'[^\w\s]', ' ', q_lower)
+    if re.search(r'\b(mandi\s*(mein|me|ka|ki|se|bhav|price|rate)|apmc\s*mein|bazar\s*mein)\b', q_lower):
+        return None
+    for city_key in sorted((k for k in _INDIAN_CITY_CATALOG if ' ' in k), key=len, reverse=True):
+        if city_key in q_clean:
+            return _INDIAN_CITY_CATALOG[city_key][0]
+    for token in [t for t in q_clean.split() if t not in _WEATHER_STOPWORDS and len(t) >= 4]:
+        if token in _INDIAN_CITY_CATALOG:
+            return _INDIAN_CITY_CATALOG[token][0]
+    return None
+
+
+# ── Corpus ────────────────────────────────────────────────────────────────
+
+SEED_QUERIES = [
+    "", "   ", "?", "hi", "Namaste", "hello kisan bhai, mujhe gehu ki fasal ke baare mein poori jankari chahiye please",
+    "ok", "theek hai", "aur batao", "iske baad kya karna hai",
+    "gehu ki buwai kab kare", "kab bouwe chana", "beej rate per acre wheat", "sowing time for mustard in rabi",
+    "dhan ki katai kab karein", "fasal katne ka sahi waqt", "yield kitni aayegi", "pyaz ka bhandaran kaise karein",
+    "ghun se anaj kaise bachaye", "best variety of wheat HD 2967", "beej kahan milega", "pmfby claim kaise kare",
+    "fasal bima ka dawa", "jaivik kheti kaise karein", "vermicompost kaise banaye", "neem oil spray dose",
+    "profit per acre for tomato", "kheti ki lagat kitni", "which crop should I grow", "is season kya lagaun",
+    "kaunsi fasal lagaye kharif mein", "रबी में क्या लगाएं", "इस मौसम में कौन सी फसल", "aaj ka pyaz ka bhav",
+    "wheat price in lucknow mandi", "mandi mein bhav kya hai", "msp 2025 gehu", "tomato rate", "bechna kahan",
+    "kal barish hogi kya", "lucknow ka mausam", "rampur ka mausam kaisa rahega", "weather in new delhi tomorrow",
+    "monsoon kab aayega", "barish ke baad sinchai karein kya", "drip irrigation subsidy milegi", "pm kusum apply kaise kare",
+    "pm kisan ki kist kab aayegi", "kcc loan kaise milega", "gehu mein keede lag gaye", "patti pili ho rahi hai",
+    "cotton bollworm control", "tamatar mein rog", "mitti ki janch kahan hoti hai", "soil ph 8.5 kya kare",
+    "kitne din baad pani dena hai", "40 din baad urea kitna dalna hai", "dap kitni daale per bigha",
+    "baarish ka paani kheto mein bhar gaya", "kanda ka bhaav kay aahe", "havaman kasa aahe", "gahu peraniche",
+    "bhuimug pivna keva dyave", "dhaan ki fasal", "sarson ka tel", "makki ki kheti", "neer kitna", "mazhai varuma",
+    "आज गेहूँ का भाव क्या है", "धान / चावल का रेट", "मूँगफली की खेती", "टमाटर में कीड़े", "बारिश कब होगी",
+    "pattiyaan peeli pad rahi hai", "keede maarne ki dawai", "kitten din me paani de", "urvarak ki matra",
+    "green gram price", "black gram sowing", "pigeon pea mandi rate", "bell pepper in polyhouse", "lady finger",
+    "shimla mirch ki kheti", "phool gobhi ka beej", "red chilli rate guntur", "bitter gourd farming",
+    "sugarcane price up", "cauliflower pest", "finger millet karnataka", "pearl millet rajasthan",
+    "greater noida weather", "rae bareli mandi", "navi mumbai onion", "turmeric erode", "kinnow abohar",
+    "adamant carbonate dampness", "kandahar damage", "gramin bank loan", "programme for farmers",
+]
+
+FILLER = ["ki", "ka", "ke", "mein", "hai", "kya", "please", "batao", "the", "for", "my", "mera", "khet", "aaj",
+          "kal", "kaise", "kab", "kitna", "kitni", "?", "!", ",", ".", "2", "40", "100", "din", "baad", "bigha",
+          "acre", "per", "how", "what", "when", "is", "me", "and", "tell", "about", "price", "rate"]
+
+
+def _intent_words():
+    words = set()
+    for _, pats in cis._INTENT_PATTERNS:
+        for pat in pats:
+            for alt in re.split(r"[|()]", pat):
+                alt = re.sub(r"\\[sbdw][*+?]?|[\^$?*+]|\\.", " ", alt).strip()
+                if alt and not alt.startswith(("?:", "\\")):
+                    words.add(alt)
+    return sorted(words)
+
+
+def corpus(n: int, seed: int = 3):
+    rng = random.Random(seed)
+    intent_words = _intent_words()
+    hinglish = list(svc._HINGLISH_NORM) + list(svc._HINGLISH_NORM.values())
+    crops = []
+    for c in crop_catalog._crops:
+        crops += [c["id"], c["name"], c["hindi"], *c["aliases"]]
+    cities = list(_INDIAN_CITY_CATALOG)
+    pools = [(intent_words, 4), (hinglish, 2), (crops, 2), (cities, 1), (FILLER, 3)]
+    weights = [w for _, w in pools]
+    out = list(SEED_QUERIES)
+    for _ in range(n):
+        words = [rng.choice(rng.choices(pools, weights)[0][0]) for _ in range(rng.randint(1, 9))]
+        q = " ".join(words)
+        if rng.random() < 0.2:
+            q = q.title()
+        if rng.random() < 0.1:
+            q = q.replace(" ", "")[: rng.randint(3, 30)]         # run-together / truncated
+        if rng.random() < 0.05:
+            q = q + " " + " ".join(rng.choice(intent_words) for _ in range(12))   # long message
+        out.append(q)
+    return out
+
+
+# ── Parity / benchmark ────────────────────────────────────────────────────
+
+def _key(crops):
+    return [sorted(c.items(), key=lambda kv: kv[0]) for c in crops]
+
+
+def check_parity(queries) -> int:
+    failures = 0
+    counts = {"intent": 0, "crops": 0, "location": 0, "normalised": 0}
+    for q in queries:
+        want_intent, want_crops = ref_classify(q)
+        got_intent, got_crops = svc.classify_query(q)
+        loc = svc._extract_query_location(q)
+        checks = {
+            "intent":     want_intent == got_intent,
+            "crops":      _key(want_crops) == _key(got_crops),
+            "location":   ref_city(q) == (loc.city if loc else None),
+            "normalised": ref_normalise(q.lower().strip()) == svc._normalise_hinglish(q.lower().strip()),
+        }
+        bad = [k for k, ok in checks.items() if not ok]
+        for k in bad:
+            counts[k] += 1
+        if bad:
+            failures += 1
+            if failures <= 10:
+                print(f"  ❌ {q!r}: {bad} want={want_intent},{[c['id'] for c in want_crops]} "
+                      f"got={got_intent},{[c['id'] for c in got_crops]}")
+    status = "✅" if not failures else "❌"
+    print(f"{status} Intent classifier parity: {len(queries)} queries, {failures} mismatches {counts}")
+    return failures
+
+
+def _qps(fn, queries, repeat=1):
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        for q in queries:
+            fn(q)
+    return len(queries) * repeat / (time.perf_counter() - t0)
+
+
+def benchmark(queries) -> None:
+    stages = [
+        ("classify_query + location",
+         lambda q: (ref_classify(q), ref_city(q)),
+         lambda q: (svc.classify_query(q), svc._extract_query_location(q))),
+        ("  hinglish normalise", lambda q: ref_normalise(q), svc._normalise_hinglish),
+        ("  intent table", lambda q: ref_classify_intent_only(q), lambda q: cis._INTENT_MATCHER.match(q.lower())),
+        ("  crop detection", ref_detect_crops, svc._detect_crops),
+    ]
+    print(f"\n{'stage':28s} {'old q/s':>10s} {'compiled q/s':>13s} {'speed-up':>9s}")
+    for label, old_fn, new_fn in stages:
+        old, new = _qps(old_fn, queries), _qps(new_fn, queries)
+        print(f"{label:28s} {old:>10,.0f} {new:>13,.0f} {new / old:>8.1f}x")
+
+
+def ref_classify_intent_only(query):
+    q = query.lower()
+    for intent, patterns in cis._INTENT_PATTERNS:
+        for pat in patterns:
+            if re.search(pat, q, re.IGNORECASE | re.UNICODE):
+                if intent == cis.INTENT_GREETING and len(q) > 50:
+                    continue
+                return intent
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--parity-only", action="store_true")
+    parser.add_argument("--queries", type=int, default=20000)
+    args = parser.parse_args()
+
+    queries = corpus(args.queries)
+    failures = check_parity(queries)
+    if not args.parity_only:
+        benchmark(queries)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
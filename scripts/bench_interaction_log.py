@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+DB round-trips and throughput of FarmerInteractionLog writes, one INSERT per
+turn vs the batching sink (services/interaction_log_sink.py).
+
+--threads request threads log --rows interaction rows between them, each row
+shaped like a chat turn (query, answer, crops, sensor / weather / market
+JSON snapshots).  SQL statements are counted on every thread (request
+threads and the flusher) by wrapping Django's cursor.
+
+  per-row  FarmerInteractionLog.objects.create() per turn — what
+           log_interaction and the inline path did before the sink
+  sink     InteractionLogSink.add() per turn, bulk_create per batch,
+           every row spooled to disk until its batch commits
+
+Checked:
+
+  - every row logged through the sink is in the table exactly once
+  - a sink that dies without flushing (its lock released, spool left
+    behind) loses nothing: the next sink on the same spool recovers its
+    rows and writes them, and leaves no segments behind
+  - fewer statements per row than the per-row path
+
+Usage:
+  python3 scripts/bench_interaction_log.py
+  python3 scripts/bench_interaction_log.py --rows 20000 --threads 8 --batch 500
+"""
+
+from __future__ import annotations
+
+import argparse
+import glob
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BACKEND = os.path.join(ROOT, "backend")
+sys.path.insert(0, BACKEND)
+os.chdir(BACKEND)
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+os.environ.setdefault("SECRET_KEY", "bench-interaction-log")
+os.environ.setdefault("DEBUG", "False")
+os.environ.setdefault("DATABASE_URL", "sqlite:///bench_interaction_log.sqlite3")
+
+import django
+
+django.setup()
+
+from django.core.management import call_command  # noqa: E402
+from django.db import connections  # noqa: E402
+from django.db.backends import utils as db_utils  # noqa: E402
+
+from advisory.models import FarmerInteractionLog  # noqa: E402
+from advisory.services.interaction_log_sink import InteractionLogSink, interaction_row  # noqa: E402
+
+
+class StatementCounter:
+    """Counts SQL statements on every connection and thread."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.count = 0
+        self._orig = (db_utils.CursorWrapper._execute, db_utils.CursorWrapper._executemany)
+        counter = self
+
+        def _execute(cursor, *args, **kwargs):
+            with counter._lock:
+                counter.count += 1
+            return counter._orig[0](cursor, *args, **kwargs)
+
+        def _executemany(cursor, *args, **kwargs):
+            with counter._lock:
+                counter.count += 1
+            return counter._orig[1](cursor, *args, **kwargs)
+
+        db_utils.CursorWrapper._execute = _execute
+        db_utils.CursorWrapper._executemany = _executemany
+
+    def take(self) -> int:
+        with self._lock:
+            n, self.count = self.count, 0
+        return n
+
+
+def make_row(prefix: str, i: int) -> dict:
+    return interaction_row(
+        session_id=f"{prefix}-{i % 500:04d}",
+        query=f"{prefix} q{i}: gehu mein peela rog, kya karein?",
+        response="Propiconazole 25 EC 1 ml/litre ka chhidkav karein. " * 4,
+        location_name="Karnal",
+        state="Haryana",
+        latitude=29.69,
+        longitude=76.98,
+        intent="disease",
+        crops_detected=["wheat"],
+        ai_tier="qwen_rag",
+        data_source="bench",
+        season="rabi",
+        response_time_ms=800 + i % 400,
+        sensor_data={"soil_moisture": 31.5, "soil_ph": 7.2, "npk": [180, 22, 240]},
+        weather_data={"temp_c": 18.4, "humidity": 71, "rain_mm_24h": 0.0},
+        market_prices={"wheat": {"modal": 2275, "mandi": "Karnal"}},
+    )
+
+
+def run(log, args, counter: StatementCounter, prefix: str, flush=None):
+    def worker(indices):
+        try:
+            for i in indices:
+                log(make_row(prefix, i))
+        finally:
+            connections.close_all()
+
+    counter.take()
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.threads) as pool:
+        list(pool.map(worker, [range(t, args.rows, args.threads) for t in range(args.threads)]))
+    if flush:
+        flush()
+    elapsed = time.perf_counter() - t0
+    statements = counter.take()
+    return {
+        "rows": args.rows,
+        "seconds": round(elapsed, 2),
+        "rows_per_s": round(args.rows / elapsed, 1),
+        "statements": statements,
+        "statements_per_row": round(statements / args.rows, 3),
+    }
+
+
+def check_rows(prefix: str, expected: int) -> list:
+    queries = list(FarmerInteractionLog.objects.filter(data_source="bench", query__startswith=f"{prefix} ")
+                   .values_list("query", flat=True))
+    problems = []
+    if len(queries) != expected:
+        problems.append(f"{prefix}: {len(queries)} rows in the table, logged {expected}")
+    if len(set(queries)) != len(queries):
+        problems.append(f"{prefix}: {len(queries) - len(set(queries))} duplicate rows")
+    return problems
+
+
+def check_recovery(spool: str, args) -> tuple:
+    """A sink dies with rows spooled but not flushed; a fresh sink must write them."""
+    dead = InteractionLogSink(spool_dir=spool, batch_size=10 ** 9, flush_interval_ms=10 ** 9)
+    for i in range(args.recover_rows):
+        dead.add(make_row("bench-crash", i))
+    dead._segment.close()
+    dead._lock_fh.close()                                   # the process is gone: its flock is released
+
+    survivor = InteractionLogSink(spool_dir=spool, batch_size=args.batch, flush_interval_ms=args.flush_ms)
+    survivor.add(make_row("bench-after", 0))
+    survivor.flush()
+    stats = survivor.stats()
+    survivor.close()
+    problems = check_rows("bench-crash", args.recover_rows) + check_rows("bench-after", 1)
+    if stats["rows_recovered"] != args.recover_rows:
+        problems.append(f"recovered {stats['rows_recovered']} rows, spooled {args.recover_rows}")
+    leftovers = glob.glob(os.path.join(spool, "*"))
+    if leftovers:
+        problems.append(f"{len(leftovers)} files left in the spool: {leftovers[:3]}")
+    return stats, problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--batch", type=int, default=200, help="INTERACTION_LOG_BATCH_SIZE")
+    parser.add_argument("--flush-ms", type=int, default=200, help="INTERACTION_LOG_FLUSH_MS")
+    parser.add_argument("--recover-rows", type=int, default=300, help="rows left behind by the crashed sink")
+    parser.add_argument("--json", default=None, help="write results to this file")
+    args = parser.parse_args()
+
+    call_command("migrate", verbosity=0)
+    FarmerInteractionLog.objects.filter(data_source="bench").delete()
+    counter = StatementCounter()
+
+    per_row = run(lambda row: FarmerInteractionLog.objects.create(**row), args, counter, "bench-row")
+    with tempfile.TemporaryDirectory(prefix="interaction_spool_") as spool:
+        sink = InteractionLogSink(spool_dir=spool, batch_size=args.batch, flush_interval_ms=args.flush_ms)
+        sink_res = run(sink.add, args, counter, "bench-sink", flush=sink.flush)
+        sink_res["sink"] = sink.stats()
+        sink.close()
+        problems = check_rows("bench-sink", args.rows)
+        recovery, recovery_problems = check_recovery(spool, args)
+        problems += recovery_problems
+
+    print(f"\n{args.rows} interaction rows, {args.threads} threads, batch {args.batch} "
+          f"({connections['default'].vendor})")
+    print(f"{'path':9s} {'rows/s':>9s} {'SQL/row':>8s} {'SQL total':>10s}")
+    for name, r in (("per-row", per_row), ("sink", sink_res)):
+        print(f"{name:9s} {r['rows_per_s']:>9} {r['statements_per_row']:>8} {r['statements']:>10}")
+    s = sink_res["sink"]
+    print(f"flushes {s['flushes']}, batch size mean {s['batch_size_mean']} / max {s['batch_size_max']}, "
+          f"flush ms p50 {s['flush_ms_p50']} / p95 {s['flush_ms_p95']} / max {s['flush_ms_max']}")
+    print(f"recovery: {recovery['rows_recovered']} rows from {recovery['segments_recovered']} segments")
+
+    failures = problems[:8]
+    if len(problems) > len(failures):
+        failures.append(f"... {len(problems)} problems in total")
+    if sink_res["statements_per_row"] >= per_row["statements_per_row"]:
+        failures.append(f"sink {sink_res['statements_per_row']} statements/row "
+                        f"not below per-row {per_row['statements_per_row']}")
+    for f in failures:
+        print(f"  ❌ {f}")
+    if not failures:
+        print("  ✅ every row written once, crashed sink's spool recovered, fewer round-trips")
+    FarmerInteractionLog.objects.filter(data_source="bench").delete()
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump({"config": vars(args), "per_row": per_row, "sink": sink_res,
+                       "recovery": recovery, "failures": failures}, fh, indent=2)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
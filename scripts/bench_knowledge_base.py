@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""
+Parity + throughput harness for KnowledgeBase's compiled tier-0 lookup
+(services/knowledge_base.py, KeywordIndex in services/query_classifier.py).
+
+Parity: over a seeded corpus (every section keyword, crop alias and scheme
+word, mixed with Hindi/Hinglish filler, numbers and punctuation, plus
+chat-length sentences carrying zero to two of them), the
+compiled crop detection and KB routing must return byte-identical answers to
+the original per-keyword ``any(kw in q ...)`` loops — with and without an
+explicit crop, and with weather contexts that do and don't add a sowing
+temperature note.
+
+Throughput: queries/sec for crop detection + KB lookup, old vs compiled,
+for the keyword-dense and the chat-length halves of the corpus, and the
+one-off index build time.
+
+Django-free: knowledge_base only needs ``requests`` at import.
+
+Usage:
+  python3 scripts/bench_knowledge_base.py                  # parity + benchmark
+  python3 scripts/bench_knowledge_base.py --parity-only    # CI
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "backend"))
+
+from advisory.services import knowledge_base as kbm  # noqa: E402
+from advisory.services.knowledge_base import (  # noqa: E402
+    FERTILIZER_GUIDE, IRRIGATION_GUIDE, MSP_2024_25, PEST_GUIDE, SCHEME_KB, SOWING_CALENDAR,
+    _CROP_ALIASES, _CROP_ALIASES_REVERSE, _FERTILIZER_KW, _IRRIGATION_KW, _MSP_KW, _PEST_KW,
+    _SCHEME_KW, _SOWING_KW,
+)
+from advisory.services.query_classifier import KeywordIndex  # noqa: E402
+
+kb = kbm.knowledge_base
+
+
+# ── Reference: the pre-index implementations, verbatim ────────────────────
+
+def ref_detect_crop(q):
+    for alias, crop_id in _CROP_ALIASES.items():
+        if alias.lower() in q:
+            return crop_id
+    return None
+
+
+def ref_kb_lookup(q, crop, lang, weather):
+    # MSP query
+    if any(kw in q for kw in _MSP_KW):
+        if crop and crop in MSP_2024_25:
+            msp = MSP_2024_25[crop]
+            crop_hi = _CROP_ALIASES_REVERSE.get(crop, crop)
+            return (
+                f"💰 **{crop_hi} MSP 2024-25:** ₹{msp:,}/क्विंटल\n\n"
+                f"📌 यह केंद्र सरकार द्वारा घोषित न्यूनतम समर्थन मूल्य है।\n"
+                f"📞 नजदीकी मंडी/APMC से बाजार भाव जानें।\n"
+                f"💡 e-NAM (enam.gov.in) पर ऑनलाइन भाव देखें।"
+            )
+        # List all MSPs
+        lines = [f"💰 **MSP 2024-25 (₹/क्विंटल):**\n"]
+        for c, m in MSP_2024_25.items():
+            hi = _CROP_ALIASES_REVERSE.get(c, c)
+            lines.append(f"• {hi}: ₹{m:,}")
+        lines.append("\n📞 KVK हेल्पलाइन: 1800-180-1551")
+        return "\n".join(lines)
+
+    # Sowing time query
+    if any(kw in q for kw in _SOWING_KW):
+        if crop and crop in SOWING_CALENDAR:
+            s = SOWING_CALENDAR[crop]
+            crop_hi = _CROP_ALIASES_REVERSE.get(crop, crop)
+            temp_note = ""
+            if weather:
+                if isinstance(weather, dict):
+                    temp = weather.get("temperature_2m")
+                else:
+                    temp = getattr(weather, "temperature", None) or getattr(weather, "air_temp_c", None)
+
+                if temp is not None:
+                    if temp > 35 and s["season"] in ["रबी", "खरीफ/रबी"]:
+                        temp_note = f"\n\n⚠️ अभी तापमान {temp}°C है — रबी बुवाई के लिए तापमान 20°C से नीचे आने का इंतजार करें।"
+                    elif temp < 15 and "खरीफ" in s["season"]:
+                        temp_note = f"\n\n⚠️ अभी तापमान {temp}°C है — खरीफ फसल के लिए बहुत ठंडा। जून तक प्रतीक्षा करें।"
+            return (
+                f"🌱 **{crop_hi} की बुवाई:**\n\n"
+                f"🗓️ **बुवाई का समय:** {s['sow']}\n"
+                f"✂️ **कटाई:** {s['harvest']}\n"
+                f"🌿 **मौसम:** {s['season']}"
+                f"{temp_note}\n\n"
+                f"📞 स्थानीय KVK से किस्म की सलाह लें: 1800-180-1551"
+            )
+        # Generic sowing season answer
+        return (
+            "🌱 **बुवाई की जानकारी:**\n\n"
+            "• **रबी फसलें** (अक्टूबर–दिसंबर): गेहूं, सरसों, चना, जौ, मटर\n"
+            "• **खरीफ फसलें** (जून–जुलाई): धान, मक्का, बाजरा, सोयाबीन, कपास\n"
+            "• **जायद** (फरवरी–मार्च): मूँग, तरबूज, खरबूजा, खीरा\n\n"
+            "💡 फसल का नाम बताएं — सटीक तारीख बताऊँगा।"
+        )
+
+    # Fertilizer query
+    if any(kw in q for kw in _FERTILIZER_KW):
+        if crop and crop in FERTILIZER_GUIDE:
+            f = FERTILIZER_GUIDE[crop]
+            crop_hi = _CROP_ALIASES_REVERSE.get(crop, crop)
+            return (
+                f"🌿 **{crop_hi} उर्वरक सिफारिश (ICAR):**\n\n"
+                f"• **नाइट्रोजन (N):** {f['n']} kg/ha\n"
+                f"• **फास्फोरस (P):** {f['p']} kg/ha\n"
+                f"• **पोटाश (K):** {f['k']} kg/ha\n\n"
+                f"📋 **उपयोग विधि:** {f['notes']}\n\n"
+                f"💡 मिट्टी परीक्षण के बाद मात्रा में बदलाव करें।\n"
+                f"📞 मृदा स्वास्थ्य कार्ड: नजदीकी कृषि विभाग"
+            )
+
+    # Irrigation query
+    if any(kw in q for kw in _IRRIGATION_KW):
+        if crop and crop in IRRIGATION_GUIDE:
+            irr = IRRIGATION_GUIDE[crop]
+            crop_hi = _CROP_ALIASES_REVERSE.get(crop, crop)
+            stages = "\n".join(f"  • {s}" for s in irr["critical_stages"])
+            return (
+                f"💧 **{crop_hi} सिंचाई गाइड:**\n\n"
+                f"🔑 **महत्वपूर्ण अवस्थाएं:**\n{stages}\n\n"
+                f"📊 **कुल सिंचाई:** {irr['total']}\n"
+                f"🛠️ **विधि:** {irr['method']}\n\n"
+                f"💡 ड्रिप/स्प्रिंकलर पर 45-55% सरकारी सब्सिडी उपलब्ध।"
+            )
+
+    # Pest/disease query
+    if any(kw in q for kw in _PEST_KW):
+        if crop and crop in PEST_GUIDE:
+            pests = PEST_GUIDE[crop]
+            crop_hi = _CROP_ALIASES_REVERSE.get(crop, crop)
+            lines = [f"🐛 **{crop_hi} के प्रमुख कीट/रोग और उपचार:**\n"]
+            for pest, solution in pests.items():
+                lines.append(f"• **{pest.replace('_',' ').title()}:** {solution}")
+            lines.append("\n⚠️ दवाई का उपयोग अनुशंसित मात्रा में करें।")
+            lines.append("📞 KVK हेल्पलाइन: 1800-180-1551")
+            return "\n".join(lines)
+
+    # Government scheme query
+    if any(kw in q for kw in _SCHEME_KW):
+        # Try to match specific scheme
+        for scheme_id, info in SCHEME_KB.items():
+            if any(kw in q for kw in scheme_id.replace("_", " ").split() + [scheme_id]):
+                return (
+                    f"🏛️ **{info['full_name']}**\n\n"
+                    f"💰 **लाभ:** {info.get('benefit','')}\n"
+                    + (f"✅ **पात्रता:** {info.get('eligibility','')}\n" if info.get('eligibility') else "")
+                    + (f"📋 **आवेदन:** {info.get('apply','')}\n" if info.get('apply') else "")
+                    + (f"📞 **हेल्पलाइन:** {info.get('helpline','')}\n" if info.get('helpline') else "")
+                    + (f"⏰ **समयसीमा:** {info.get('deadline','')}\n" if info.get('deadline') else "")
+                )
+        # List all schemes
+        lines = ["🏛️ **किसानों के लिए प्रमुख सरकारी योजनाएं:**\n"]
+        for sid, info in SCHEME_KB.items():
+            lines.append(f"• **{info['full_name']}** — {info.get('benefit','').split('|')[0].strip()}")
+        lines.append("\n💡 किसी योजना के बारे में और जानकारी के लिए नाम बताएं।")
+        return "\n".join(lines)
+
+    return None  # No KB match — escalate
+
+
+# ── Corpus ─────────────────────────────────────────────────────────────────
+
+_FILLER = [
+    "मेरे", "खेत", "में", "क्या", "करें", "kab", "kaise", "bhai", "kitna", "hai", "ka", "ki",
+    "please", "batao", "sir", "aaj", "इस", "साल", "acre", "bigha", "2", "25", "?", ",", ".", "!",
+    "Wheat", "RICE", "Tur", "turmeric", "e", "PM", "Kisan", "health", "card", "nam",
+]
+_CURATED = [
+    "गेहूं की बुवाई कब करें?", "wheat msp kya hai", "dhan mein kitna paani dena hai",
+    "tur ki kheti mein kaunsa keet lagta hai", "turmeric fertilizer dose", "PM Kisan yojana kya hai",
+    "e-nam par kaise bechein", "soil health card scheme", "kcc loan subsidy", "mausam kaisa rahega",
+    "सरसों में कीट", "bt cotton pest spray", "pearl millet sowing time", "green gram msp",
+    "aaj mandi bhav kya hai", "", "   ", "!!!", "rust on wheat", "drip irrigation subsidy scheme",
+]
+
+
+_CHAT = (
+    "mere khet mein is baar bahut dikkat aa rahi hai kya karun bhai jaldi batao please ji haan "
+    "pichle hafte barish hui thi aur ab patte peele pad rahe hain mera gaon sirsa ke paas hai "
+    "मेरे खेत में इस बार पत्ते पीले हो रहे हैं कृपया बताइए क्या करना चाहिए"
+).split()
+
+
+def corpus(n: int, seed: int = 7):
+    """Keyword-dense mixes (half) and chat-length sentences with 0-2 keywords (half)."""
+    rng = random.Random(seed)
+    vocab = (_SOWING_KW + _FERTILIZER_KW + _IRRIGATION_KW + _PEST_KW + _MSP_KW + _SCHEME_KW
+             + list(_CROP_ALIASES) + [w for sid in SCHEME_KB for w in sid.replace("_", " ").split() + [sid]])
+    dense, chat = list(_CURATED), []
+    while len(dense) < n - n // 2:
+        words = [rng.choice(vocab if rng.random() < 0.45 else _FILLER) for _ in range(rng.randint(1, 12))]
+        sep = rng.choice([" ", " ", " ", "", "-"])
+        dense.append(sep.join(words))
+    while len(chat) < n // 2:
+        words = [rng.choice(_CHAT) for _ in range(rng.randint(8, 30))]
+        for _ in range(rng.choice([0, 0, 1, 1, 1, 2])):
+            words.insert(rng.randrange(len(words) + 1), rng.choice(vocab))
+        chat.append(" ".join(words))
+    return dense, chat
+
+
+_WEATHERS = [None, {}, {"temperature_2m": 38.5}, {"temperature_2m": 11.0}, {"temperature_2m": 24.0}]
+
+
+def cases(queries, seed: int = 11):
+    """(query, explicit crop, weather) triples the way answer() sees them."""
+    rng = random.Random(seed)
+    crops = [None, None, None, ""] + sorted(set(_CROP_ALIASES.values())) + ["dragonfruit"]
+    return [(q, rng.choice(crops), rng.choice(_WEATHERS)) for q in queries]
+
+
+# ── Checks ─────────────────────────────────────────────────────────────────
+
+def ref_answer(query, crop, weather):
+    q = query.lower()
+    detected = crop or ref_detect_crop(q)
+    return detected, ref_kb_lookup(q, detected, "hi", weather)
+
+
+def new_answer(query, crop, weather):
+    q = query.lower()
+    match = kbm._scan(q)
+    detected = crop or match.crop
+    return detected, kb._kb_lookup(q, detected, "hi", weather, match)
+
+
+def check_parity(triples) -> int:
+    failures = 0
+    counts = {"crop": 0, "answer": 0, "detect_crop": 0}
+    for query, crop, weather in triples:
+        want_crop, want = ref_answer(query, crop, weather)
+        got_crop, got = new_answer(query, crop, weather)
+        q = query.lower()
+        checks = {
+            "crop":        want_crop == got_crop,
+            "answer":      want == got,
+            "detect_crop": ref_detect_crop(q) == kb._detect_crop(q),
+        }
+        bad = [k for k, ok in checks.items() if not ok]
+        for k in bad:
+            counts[k] += 1
+        if bad:
+            failures += 1
+            if failures <= 10:
+                print(f"  ❌ {query!r} crop={crop!r}: {bad} want={want_crop},{(want or '')[:40]!r} "
+                      f"got={got_crop},{(got or '')[:40]!r}")
+    answered = sum(1 for q, c, w in triples if ref_answer(q, c, w)[1] is not None)
+    status = "✅" if not failures else "❌"
+    print(f"{status} Knowledge base parity: {len(triples)} queries ({answered} answered from the KB), "
+          f"{failures} mismatches {counts}")
+    return failures
+
+
+def _qps(fn, triples, repeat=1):
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        for q, c, w in triples:
+            fn(q, c, w)
+    return len(triples) * repeat / (time.perf_counter() - t0)
+
+
+def benchmark(groups) -> None:
+    t0 = time.perf_counter()
+    index = KeywordIndex(kbm._KEYWORD_TABLE)
+    build_ms = (time.perf_counter() - t0) * 1000
+    print(f"\nindex: {len(index)} keywords, built in {build_ms:.1f} ms")
+    print(f"{'stage':34s} {'old q/s':>10s} {'compiled q/s':>13s} {'speed-up':>9s}")
+    for name, triples in groups:
+        stages = [
+            (f"{name}: detect crop + KB lookup", ref_answer, new_answer),
+            (f"{name}:   crop detection",
+             lambda q, c, w: ref_detect_crop(q.lower()), lambda q, c, w: kb._detect_crop(q.lower())),
+        ]
+        for label, old_fn, new_fn in stages:
+            old, new = _qps(old_fn, triples), _qps(new_fn, triples)
+            print(f"{label:34s} {old:>10,.0f} {new:>13,.0f} {new / old:>8.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--parity-only", action="store_true")
+    parser.add_argument("--queries", type=int, default=20000)
+    args = parser.parse_args()
+
+    dense, chat = corpus(args.queries)
+    groups = [("dense", cases(dense)), ("chat", cases(chat))]
+    failures = check_parity([t for _, triples in groups for t in triples])
+    if not args.parity_only:
+        benchmark(groups)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
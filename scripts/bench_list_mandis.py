@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Cold / warm latency benchmark for MarketPricesService.list_mandis.
+
+A local fake data.gov.in (scripts/stub_upstreams.py) serves a state listing
+that spans --pages pages with --page-ms injected latency per call.  Compared:
+
+  sequential  page pool of 1 — the old one-page-at-a-time walk
+  parallel    page pool of --concurrency (DATA_GOV_PAGE_CONCURRENCY)
+  warm        a second location in the same state — assembled rows come
+              from market_cache, no page walk
+
+Both cold modes must return the same mandi list.  Runs on an explicit
+LocMemCache so the DEBUG DummyCache aliases do not turn the row cache off.
+
+Usage:
+  python3 scripts/bench_list_mandis.py
+  python3 scripts/bench_list_mandis.py --page-ms 400 --concurrency 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BACKEND = os.path.join(ROOT, "backend")
+sys.path.insert(0, BACKEND)
+sys.path.insert(0, os.path.join(ROOT, "scripts"))
+os.chdir(BACKEND)
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+os.environ.setdefault("SECRET_KEY", "bench-list-mandis")
+os.environ.setdefault("DEBUG", "True")
+os.environ.setdefault("DATABASE_URL", "sqlite:///bench_list_mandis.sqlite3")
+os.environ["DATA_GOV_IN_API_KEY"] = "stub-bench-data-gov-key"
+
+import django
+
+django.setup()
+
+from django.core.cache.backends.locmem import LocMemCache  # noqa: E402
+
+from advisory.services import unified_realtime_service as urs  # noqa: E402
+from stub_upstreams import StubUpstreams  # noqa: E402
+
+# (location, state) — same state; no GPS, so the full state list is compared
+LUCKNOW = ("Lucknow", "Uttar Pradesh")
+KANPUR = ("Kanpur", "Uttar Pradesh")
+
+
+def _service(cache) -> "urs.MarketPricesService":
+    svc = urs.MarketPricesService()
+    svc._rows_cache = cache
+    return svc
+
+
+def _timed(svc, where) -> tuple:
+    location, state = where
+    t0 = time.perf_counter()
+    out = svc.list_mandis(location, state=state, max_results=5000)
+    return time.perf_counter() - t0, out
+
+
+def _names(result) -> list:
+    return [(m["name"], m.get("district"), m.get("commodity_count")) for m in result.get("mandis", [])]
+
+
+def run(args) -> dict:
+    # 12 commodities per mandi, 10 seed mandis per state in the stub
+    extra = max(0, args.pages * 100 // 12 - 1)
+    stubs = StubUpstreams(latency_ms={"data_gov": args.page_ms, "agmarknet": 5},
+                          data_gov_extra_markets=extra).start()
+    stubs.install()
+    results: dict = {}
+    failures: list = []
+    default_pool = urs._DATA_GOV_PAGE_POOL
+    # One-time import/build of the mandi spatial index — keep it out of the first timing.
+    from advisory.services.mandi_index import get_mandi_index
+    get_mandi_index()
+    try:
+        for mode, workers in (("sequential", 1), ("parallel", args.concurrency)):
+            urs._DATA_GOV_PAGE_POOL = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bench-datagov")
+            cache = LocMemCache(f"bench-mandis-{mode}", {"MAX_ENTRIES": 1000})
+            svc = _service(cache)
+            stubs.reset_stats()
+            cold_s, cold = _timed(svc, LUCKNOW)
+            calls = stubs.stats().get("data_gov", {}).get("calls", 0)
+            stubs.reset_stats()
+            warm_s, _ = _timed(svc, KANPUR)
+            warm_calls = stubs.stats().get("data_gov", {}).get("calls", 0)
+            urs._DATA_GOV_PAGE_POOL.shutdown(wait=True)
+            results[mode] = {"cold_ms": round(cold_s * 1000, 1), "cold_data_gov_calls": calls,
+                             "warm_ms": round(warm_s * 1000, 1), "warm_data_gov_calls": warm_calls,
+                             "mandis": len(cold.get("mandis", [])),
+                             "_list": _names(cold)}
+    finally:
+        urs._DATA_GOV_PAGE_POOL = default_pool
+        stubs.stop()
+
+    seq, par = results["sequential"], results["parallel"]
+    if seq.pop("_list") != par.pop("_list"):
+        failures.append("parallel walk returned a different mandi list than the sequential walk")
+    if par["warm_data_gov_calls"]:
+        failures.append(f"warm listing made {par['warm_data_gov_calls']} data.gov calls (want 0)")
+    if par["cold_ms"] >= seq["cold_ms"]:
+        failures.append("parallel cold listing was not faster than sequential")
+    results["speedup_cold"] = round(seq["cold_ms"] / max(par["cold_ms"], 1e-9), 1)
+    results["failures"] = failures
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=25, help="data.gov pages per state listing")
+    parser.add_argument("--page-ms", type=float, default=200.0, help="fake data.gov latency per page")
+    parser.add_argument("--concurrency", type=int, default=urs._DATA_GOV_PAGE_CONCURRENCY)
+    parser.add_argument("--json", default=None, help="write results to this file")
+    args = parser.parse_args()
+
+    print(f"{args.pages} pages × {args.page_ms:.0f} ms, concurrency {args.concurrency}")
+    results = run(args)
+    for mode in ("sequential", "parallel"):
+        print(f"  {mode:10s} " + "  ".join(f"{k}={v}" for k, v in results[mode].items()))
+    print(f"  cold speedup ×{results['speedup_cold']}")
+    for f in results["failures"]:
+        print(f"  ❌ {f}")
+    if not results["failures"]:
+        print("  ✅ same mandi list, warm listing served from the row cache")
+
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump(results, fh, indent=2)
+    sys.exit(1 if results["failures"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark + parity check for the shared mandi spatial index.
+
+Compares, per query, the pre-index path (rebuild the reference list, scalar
+haversine over every mandi, sort) with services/mandi_index.py for:
+
+  nearest 10            get_nearest_mandis()
+  nearest 5 (onion)     commodity-filtered k-NN (legacy side: substring
+                        filter on specialty, timing only)
+  within 150 km         radius query (list_mandis GPS trim)
+  enrich 60 names       _enrich_and_sort_mandis() on live data.gov rows
+
+Parity: for random points across India, the index's nearest-10 must name
+the same mandis in the same order, with the same rounded distances, as the
+scalar loop.
+
+Usage:
+  python3 scripts/bench_mandi_index.py
+  python3 scripts/bench_mandi_index.py --queries 5000
+"""
+
+from __future__ import annotations
+
+import argparse
+import math
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BACKEND = os.path.join(ROOT, "backend")
+sys.path.insert(0, BACKEND)
+os.chdir(BACKEND)
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+os.environ.setdefault("SECRET_KEY", "bench-mandi-index")
+os.environ.setdefault("DEBUG", "True")
+os.environ.setdefault("DATABASE_URL", "sqlite:///bench_mandi_index.sqlite3")
+
+import django
+
+django.setup()
+
+from advisory.services.enhanced_market_prices import EnhancedMarketPricesService  # noqa: E402
+from advisory.services.location_context import (  # noqa: E402
+    INDIA_LAT_MAX, INDIA_LAT_MIN, INDIA_LON_MAX, INDIA_LON_MIN,
+)
+from advisory.services.mandi_index import get_mandi_index  # noqa: E402
+
+
+def _haversine(lat1, lon1, lat2, lon2):
+    dlat = math.radians(lat2 - lat1)
+    dlon = math.radians(lon2 - lon1)
+    a = (math.sin(dlat / 2) ** 2
+         + math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) * math.sin(dlon / 2) ** 2)
+    return 6371 * 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+
+
+def legacy_nearest(lat, lon, k, commodity=None, radius_km=None):
+    rows = EnhancedMarketPricesService._nationwide_mandi_rows()     # rebuilt per call, as before
+    out = []
+    for m in rows:
+        if commodity and not ("all crops" in m["specialty"].lower() or commodity in m["specialty"].lower()):
+            continue
+        d = _haversine(lat, lon, m["latitude"], m["longitude"])
+        if radius_km is None or d <= radius_km:
+            out.append((d, m))
+    out.sort(key=lambda x: x[0])
+    return out[:k] if k else out
+
+
+def legacy_enrich(lat, lon, names):
+    lookup = {m["name"].lower(): (m["latitude"], m["longitude"])
+              for m in EnhancedMarketPricesService._nationwide_mandi_rows()}
+    return [_haversine(lat, lon, *lookup[n.lower()]) if n.lower() in lookup else None for n in names]
+
+
+def _points(n, seed=11):
+    rng = random.Random(seed)
+    return [(rng.uniform(max(INDIA_LAT_MIN, 8.0), min(INDIA_LAT_MAX, 34.0)),
+             rng.uniform(max(INDIA_LON_MIN, 69.0), min(INDIA_LON_MAX, 95.0))) for _ in range(n)]
+
+
+def _per_query_us(fn, points):
+    t0 = time.perf_counter()
+    for lat, lon in points:
+        fn(lat, lon)
+    return (time.perf_counter() - t0) / len(points) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queries", type=int, default=2000)
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    index = get_mandi_index()
+    build_ms = (time.perf_counter() - t0) * 1000
+    points = _points(args.queries)
+
+    mismatches = 0
+    for lat, lon in points[:500]:
+        want = [(m["name"], round(d, 1)) for d, m in legacy_nearest(lat, lon, 10)]
+        got = [(m["name"], round(d, 1)) for d, m in index.nearest(lat, lon, k=10)]
+        mismatches += want != got
+    print(f"{'✅' if not mismatches else '❌'} nearest-10 parity on 500 points: {mismatches} mismatches")
+
+    names = [m["name"] for m in index.rows[::3]][:55] + ["Unknown APMC"] * 5
+    cases = [
+        ("nearest 10", lambda la, lo: legacy_nearest(la, lo, 10), lambda la, lo: index.nearest(la, lo, k=10)),
+        ("nearest 5 (onion)", lambda la, lo: legacy_nearest(la, lo, 5, commodity="onion"),
+         lambda la, lo: index.nearest(la, lo, k=5, commodity="onion")),
+        ("within 150 km", lambda la, lo: legacy_nearest(la, lo, None, radius_km=150),
+         lambda la, lo: index.within(la, lo, 150)),
+        ("enrich 60 names", lambda la, lo: legacy_enrich(la, lo, names),
+         lambda la, lo: index.distances(la, lo, names)),
+    ]
+    print(f"\nindex: {len(index)} mandis, {index.stats()['backend']}, built in {build_ms:.1f} ms")
+    print(f"{'query':20s} {'legacy µs':>10s} {'index µs':>10s} {'speed-up':>9s}")
+    for label, legacy_fn, index_fn in cases:
+        index_fn(*points[0])            # build commodity sub-index outside the timing
+        legacy_us = _per_query_us(legacy_fn, points)
+        index_us = _per_query_us(index_fn, points)
+        print(f"{label:20s} {legacy_us:>10.1f} {index_us:>10.1f} {legacy_us / index_us:>8.1f}x")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
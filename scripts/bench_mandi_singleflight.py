@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Concurrency check for the DataGovMandiClient cache layer.
+
+Several client instances (one per simulated Gunicorn worker, each with its
+own in-process cache and single-flight table) share one cache backend and
+hammer the same national-price keys from many threads, against a local fake
+data.gov.in (scripts/stub_upstreams.py).  Counted at the fake server:
+
+  cold        a burst on an empty cache          → exactly 1 data.gov fetch
+  expiry      a burst after the entry expired    → exactly 1 more, and every
+                                                   other caller gets the stale
+                                                   copy without waiting
+  outage      data.gov.in failing                → seed prices negative-cached:
+                                                   1 fetch per negative TTL,
+                                                   not 1 per request
+  steady      continuous load across several TTLs → ~1 fetch per TTL (minus the
+                                                   XFetch lead), refreshed early
+                                                   in the background so no
+                                                   request waits on upstream
+
+Runs on an explicit LocMemCache so the DEBUG DummyCache aliases do not turn
+the cache off.
+
+Usage:
+  python3 scripts/bench_mandi_singleflight.py
+  python3 scripts/bench_mandi_singleflight.py --workers 8 --threads 32 --ttl 3
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import os
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BACKEND = os.path.join(ROOT, "backend")
+sys.path.insert(0, BACKEND)
+sys.path.insert(0, os.path.join(ROOT, "scripts"))
+os.chdir(BACKEND)
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+os.environ.setdefault("SECRET_KEY", "bench-mandi-singleflight")
+os.environ.setdefault("DEBUG", "True")
+os.environ.setdefault("DATABASE_URL", "sqlite:///bench_mandi_singleflight.sqlite3")
+os.environ["DATA_GOV_IN_API_KEY"] = "stub-bench-data-gov-key"
+
+import django
+
+django.setup()
+
+from django.core.cache.backends.locmem import LocMemCache  # noqa: E402
+
+from advisory.services.data_gov_mandi_client import DataGovMandiClient  # noqa: E402
+from stub_upstreams import StubUpstreams  # noqa: E402
+
+
+class Fleet:
+    """N client instances ("workers") over one shared cache."""
+
+    def __init__(self, workers: int, ttl: float, negative_ttl: float):
+        self.cache = LocMemCache(f"bench-mandi-{time.time_ns()}", {"MAX_ENTRIES": 10000})
+        self.clients = [
+            DataGovMandiClient(cache=self.cache, ttl=ttl, fallback_ttl=ttl, negative_ttl=negative_ttl)
+            for _ in range(workers)
+        ]
+
+    def burst(self, threads_per_worker: int, commodity: str) -> dict:
+        """Every thread of every worker asks for ``commodity`` at the same instant."""
+        n = len(self.clients) * threads_per_worker
+        barrier = threading.Barrier(n)
+        latencies, sources, errors = [], [], []
+        lock = threading.Lock()
+
+        def _one(client):
+            barrier.wait()
+            t0 = time.perf_counter()
+            try:
+                result = client.get_national_prices(commodity=commodity)
+            except Exception as exc:                    # never expected
+                with lock:
+                    errors.append(repr(exc))
+                return
+            with lock:
+                latencies.append(time.perf_counter() - t0)
+                sources.append(result.get("is_live"))
+
+        threads = [threading.Thread(target=_one, args=(c,)) for c in self.clients
+                   for _ in range(threads_per_worker)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        latencies.sort()
+        return {"requests": n, "errors": errors, "live": sum(1 for s in sources if s),
+                "p50_ms": round(latencies[len(latencies) // 2] * 1000, 1),
+                "max_ms": round(latencies[-1] * 1000, 1)}
+
+    def stats(self) -> dict:
+        out: dict = {}
+        for c in self.clients:
+            for k, v in c.stats.items():
+                out[k] = out.get(k, 0) + v
+        return out
+
+
+def _calls(stubs: StubUpstreams, upstream: str = "data_gov") -> int:
+    return stubs.stats().get(upstream, {}).get("calls", 0)
+
+
+def run(args) -> dict:
+    stubs = StubUpstreams(latency_ms={"data_gov": args.upstream_ms, "agmarknet": 20}).start()
+    stubs.install()
+    failures: list = []
+    results: dict = {}
+    try:
+        # ── cold start ────────────────────────────────────────────────
+        fleet = Fleet(args.workers, args.ttl, args.negative_ttl)
+        stubs.reset_stats()
+        b = fleet.burst(args.threads, "wheat")
+        results["cold"] = dict(b, upstream_fetches=_calls(stubs))
+        if results["cold"]["upstream_fetches"] != 1:
+            failures.append(f"cold burst: {results['cold']['upstream_fetches']} data.gov fetches (want 1)")
+
+        # ── expiry ────────────────────────────────────────────────────
+        time.sleep(args.ttl + 0.2)
+        stubs.reset_stats()
+        before = fleet.stats()
+        b = fleet.burst(args.threads, "wheat")
+        after = fleet.stats()
+        time.sleep(args.upstream_ms / 1000 + 0.2)        # let the winner's write land
+        results["expiry"] = dict(b, upstream_fetches=_calls(stubs),
+                                 stale_served=after["stale_hits"] - before["stale_hits"],
+                                 waited=after["lease_waits"] - before["lease_waits"])
+        if results["expiry"]["upstream_fetches"] != 1:
+            failures.append(f"expiry burst: {results['expiry']['upstream_fetches']} data.gov fetches (want 1)")
+        if results["expiry"]["waited"]:
+            failures.append(f"expiry burst: {results['expiry']['waited']} callers waited despite a stale copy")
+
+        # ── outage → negative cache ───────────────────────────────────
+        stubs.fail("data_gov", 403)
+        stubs.reset_stats()
+        windows = 3
+        for _ in range(windows):
+            for _ in range(args.bursts_per_window):
+                b = fleet.burst(args.threads, "maize")
+                if b["errors"]:
+                    failures.append(f"outage burst raised: {b['errors'][:1]}")
+                time.sleep(args.negative_ttl / (args.bursts_per_window + 1))
+            time.sleep(args.negative_ttl / (args.bursts_per_window + 1) + 0.2)
+        stubs.recover("data_gov")
+        fetched = _calls(stubs)
+        results["outage"] = {"negative_ttl_s": args.negative_ttl, "windows": windows,
+                             "requests": windows * args.bursts_per_window * args.workers * args.threads,
+                             "upstream_fetches": fetched}
+        if not 1 <= fetched <= windows + 1:
+            failures.append(f"outage: {fetched} data.gov fetches over {windows} negative-TTL windows")
+
+        # ── steady load ───────────────────────────────────────────────
+        fleet = Fleet(args.workers, args.ttl, args.negative_ttl)
+        fleet.burst(1, "onion")                            # warm
+        stubs.reset_stats()
+        before = fleet.stats()
+        stop = time.monotonic() + args.steady_s
+        slow = [0]
+        served = [0]
+        lock = threading.Lock()
+
+        def _loop(client):
+            while time.monotonic() < stop:
+                t0 = time.perf_counter()
+                client.get_national_prices(commodity="onion")
+                dt = time.perf_counter() - t0
+                with lock:
+                    served[0] += 1
+                    if dt * 1000 >= args.upstream_ms * 0.8:
+                        slow[0] += 1
+                time.sleep(0.005)
+
+        threads = [threading.Thread(target=_loop, args=(c,)) for c in fleet.clients for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        time.sleep(args.upstream_ms / 1000 + 0.1)
+        after = fleet.stats()
+        fetched = _calls(stubs)
+        # XFetch refreshes about delta·ln(rate·delta) before expiry (delta =
+        # fetch time, rate = hits/s on the key): one fetch per (ttl - lead).
+        delta = args.upstream_ms / 1000
+        lead = delta * math.log(max(served[0] / args.steady_s * delta, 1.0))
+        expected = math.ceil(args.steady_s / max(args.ttl - lead, delta))
+        results["steady"] = {
+            "seconds": args.steady_s, "requests": served[0], "upstream_fetches": fetched,
+            "expected_about": expected, "refresh_lead_s": round(lead, 2),
+            "early_refreshes": after["early_refreshes"] - before["early_refreshes"],
+            "misses": after["misses"] - before["misses"],
+            "requests_waiting_on_upstream": slow[0],
+        }
+        if fetched > expected + 1:
+            failures.append(f"steady: {fetched} data.gov fetches in {args.steady_s}s at ttl {args.ttl}s")
+        if slow[0] > expected:
+            failures.append(f"steady: {slow[0]} requests waited on upstream")
+    finally:
+        stubs.stop()
+    results["failures"] = failures
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=4, help="client instances sharing the cache")
+    parser.add_argument("--threads", type=int, default=16, help="threads per worker in each burst")
+    parser.add_argument("--ttl", type=float, default=4.0, help="fresh TTL (s) for the test")
+    parser.add_argument("--negative-ttl", type=float, default=1.0)
+    parser.add_argument("--bursts-per-window", type=int, default=3)
+    parser.add_argument("--steady-s", type=float, default=12.0)
+    parser.add_argument("--upstream-ms", type=float, default=250.0, help="fake data.gov.in latency")
+    parser.add_argument("--json", default=None, help="write results to this file")
+    args = parser.parse_args()
+
+    print(f"{args.workers} workers × {args.threads} threads, ttl {args.ttl}s, "
+          f"negative ttl {args.negative_ttl}s, upstream {args.upstream_ms:.0f} ms")
+    results = run(args)
+    for name in ("cold", "expiry", "outage", "steady"):
+        if name in results:
+            print(f"  {name:7s} " + "  ".join(f"{k}={v}" for k, v in results[name].items() if k != "errors"))
+    for f in results["failures"]:
+        print(f"  ❌ {f}")
+    if not results["failures"]:
+        print("  ✅ one upstream fetch per key per expiry")
+
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump(results, fh, indent=2)
+    sys.exit(1 if results["failures"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Hit-rate / latency benchmark + safety check for the LLM response cache.
+
+Replays a synthetic chat workload through services/response_cache.py the
+way ChatIntelligenceService.answer() drives it (bucket_for → get → put on a
+miss), with a simulated LLM generation cost per miss:
+
+  workload    farmers in --cells location cells ask --questions distinct
+              questions, Zipf-distributed, each in one of several surface
+              forms (case/punctuation changes, Hinglish spelling drift,
+              word-order swaps)
+  safety      different questions that share a bucket must never be served
+              each other's answer — including near-identical ones that only
+              differ in a number ("20 din" vs "40 din"), a negation
+              ("sinchai karu" vs "sinchai na karu"), an input ("urea" vs
+              "potash"), a pest or a symptom colour ("safed" vs "kale
+              keede", "yellow" vs "brown" leaves)
+
+Runs on an explicit LocMemCache so the DEBUG DummyCache aliases do not turn
+the cache off.
+
+Usage:
+  python3 scripts/bench_response_cache.py
+  python3 scripts/bench_response_cache.py --requests 20000 --llm-ms 2500 --threshold 0.88
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BACKEND = os.path.join(ROOT, "backend")
+sys.path.insert(0, BACKEND)
+os.chdir(BACKEND)
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+os.environ.setdefault("SECRET_KEY", "bench-response-cache")
+os.environ.setdefault("DEBUG", "True")
+os.environ.setdefault("DATABASE_URL", "sqlite:///bench_response_cache.sqlite3")
+
+import django
+
+django.setup()
+
+from django.core.cache.backends.locmem import LocMemCache  # noqa: E402
+
+from advisory.services.response_cache import ResponseCache  # noqa: E402
+
+# (intent, crop, [surface forms of one question])
+QUESTIONS = [
+    ("sowing", "wheat", ["gehu ki buvai kab kare", "Gehu ki buvai kab karein?", "gehun ki buwai kab kare",
+                         "buvai gehu ki kab kare"]),
+    ("sowing", "mustard", ["sarso ki buvai ka sahi samay", "Sarson ki buvai ka sahi samay kya hai?",
+                           "sarso buvai ka sahi samay"]),
+    ("fertilizer", "wheat", ["gehu me urea kitna dale", "Gehu mein urea kitna dalein?",
+                             "gehun me urea kitna daale"]),
+    ("fertilizer", "wheat", ["gehu me 20 din baad urea", "gehu me 20 din baad urea?"]),
+    ("fertilizer", "wheat", ["gehu me 40 din baad urea", "Gehu me 40 din baad urea"]),
+    ("pest_disease", "cotton", ["kapas me gulabi sundi ka ilaj", "Kapas mein gulabi sundi ka ilaaj?",
+                                "gulabi sundi kapas me ilaj"]),
+    ("pest_disease", "tomato", ["tamatar ke patte murjha rahe hai", "Tamatar ke patte murjha rahe hain",
+                                "tamatar ke patte murza rahe hai"]),
+    ("irrigation", "rice", ["dhan me pani kab dena chahiye", "Dhan mein paani kab dena chahiye?",
+                            "dhan me pani kab dena chaiye"]),
+    ("government_scheme", "", ["pm kisan ki kist kab aayegi", "PM Kisan ki kisht kab aayegi?",
+                               "pm kisan kist kab aayegi"]),
+    ("government_scheme", "", ["fasal bima kaise kare", "Fasal bima kaise karein?", "fasal beema kaise kare"]),
+    ("crop_info", "onion", ["pyaz ki unnat kisme", "Pyaz ki unnat kismein", "pyaj ki unnat kisme"]),
+    ("harvest", "wheat", ["gehu ki katai kab kare", "Gehu ki katai kab karein?", "gehun ki katai kab kare"]),
+]
+
+# Same bucket, different question — must never cross-serve.
+NEGATIVES = [
+    ("fertilizer", "wheat", "gehu me 20 din baad urea", "gehu me 40 din baad urea"),
+    ("fertilizer", "wheat", "gehu me urea kitna dale", "gehu me dap kitna dale"),
+    ("sowing", "wheat", "gehu ki buvai kab kare", "gehu ki katai kab kare"),
+    ("pest_disease", "cotton", "kapas me gulabi sundi ka ilaj", "kapas me safed makhi ka ilaj"),
+    ("government_scheme", "", "pm kisan ki kist kab aayegi", "pm kisan ka paisa kaise check kare"),
+    ("irrigation", "rice", "dhan me pani kab dena chahiye", "dhan me pani kab band karna chahiye"),
+    ("irrigation", "wheat", "should i irrigate wheat today", "should i not irrigate wheat today"),
+    ("irrigation", "wheat", "should i not irrigate wheat today", "should i irrigate wheat today"),
+    ("irrigation", "wheat", "should i irrigate wheat today", "shouldn't i irrigate wheat today"),
+    ("irrigation", "wheat", "kya aaj sinchai karu", "kya aaj sinchai na karu"),
+    ("irrigation", "wheat", "kya aaj sinchai na karu", "kya aaj sinchai karu"),
+    ("irrigation", "wheat", "kya aaj sinchai karu", "kya aaj sinchai nahi karu"),
+    ("pest_disease", "wheat", "gehu me spray karu", "gehu me spray mat karu"),
+    ("irrigation", "wheat", "क्या आज सिंचाई करूं", "क्या आज सिंचाई नहीं करूं"),
+    ("fertilizer", "wheat", "gehu ki fasal me prati acre kitna urea dalna chahiye",
+     "gehu ki fasal me prati acre kitna potash dalna chahiye"),
+    ("fertilizer", "wheat", "how much urea should i apply per acre in my wheat crop",
+     "how much potash should i apply per acre in my wheat crop"),
+    ("pest_disease", "cotton", "there are small white insects under the cotton leaves what should i spray",
+     "there are small black insects under the cotton leaves what should i spray"),
+    ("pest_disease", "cotton", "kapas ke patto ke niche chhote safed keede hai kya spray kare",
+     "kapas ke patto ke niche chhote kale keede hai kya spray kare"),
+    ("pest_disease", "wheat", "my wheat crop leaves are turning yellow from the tips what is the reason",
+     "my wheat crop leaves are turning brown from the tips what is the reason"),
+    ("pest_disease", "wheat", "gehu ki fasal ke patte upar se peele pad rahe hai kya kare",
+     "gehu ki fasal ke patte upar se bhure pad rahe hai kya kare"),
+]
+
+CELLS = [(26.85, 80.95), (28.61, 77.21), (25.59, 85.14), (23.26, 77.41), (30.73, 76.78),
+         (21.15, 79.09), (17.39, 78.49), (26.91, 75.79)]
+
+
+def _bucket(rc: ResponseCache, intent: str, crop: str, cell, context=("rabi", "None")):
+    return rc.bucket_for(intent=intent, crops=[crop] if crop else [], lat=cell[0], lon=cell[1],
+                         region="", lang="hi", context=context)
+
+
+def run_workload(args) -> dict:
+    rng = random.Random(args.seed)
+    rc = ResponseCache(LocMemCache("bench-rc", {"MAX_ENTRIES": 100000}), threshold=args.threshold)
+    cells = CELLS[:args.cells]
+    weights = [1.0 / (i + 1) for i in range(len(QUESTIONS))]     # Zipf
+
+    generated = 0
+    wrong = 0
+    lookup_s = 0.0
+    served_s = 0.0
+    for _ in range(args.requests):
+        qi = rng.choices(range(len(QUESTIONS)), weights)[0]
+        intent, crop, forms = QUESTIONS[qi]
+        query = rng.choice(forms)
+        cell = rng.choice(cells)
+
+        t0 = time.perf_counter()
+        bucket = _bucket(rc, intent, crop, cell)
+        hit = rc.get(query, bucket)
+        lookup_s += time.perf_counter() - t0
+        if hit:
+            if hit["response"] != f"answer:{qi}":
+                wrong += 1
+            continue
+        generated += 1
+        served_s += args.llm_ms / 1000.0
+        rc.put(query, bucket, f"answer:{qi}", "krishimitra-llm (fine-tuned KCC model)", intent)
+
+    s = rc.stats()
+    total_uncached = args.requests * args.llm_ms / 1000.0
+    return {
+        "requests": args.requests,
+        "llm_generations": generated,
+        "hit_rate": s["hit_rate"],
+        "exact_hits": s["exact_hits"],
+        "semantic_hits": s["semantic_hits"],
+        "avg_semantic_similarity": s["avg_semantic_similarity"],
+        "wrong_answers": wrong,
+        "lookup_us_avg": round(lookup_s / args.requests * 1e6, 1),
+        "llm_seconds_uncached": round(total_uncached, 1),
+        "llm_seconds_cached": round(served_s + lookup_s, 1),
+    }
+
+
+def run_safety(threshold: float) -> list:
+    failures = []
+    cell = CELLS[0]
+    for i, (intent, crop, stored, asked) in enumerate(NEGATIVES):
+        # A fresh cache per pair: the reversed pairs would otherwise find
+        # their own query stored by the pair before and hit it exactly.
+        rc = ResponseCache(LocMemCache(f"bench-rc-safety-{i}", {}), threshold=threshold)
+        bucket = _bucket(rc, intent, crop, cell)
+        rc.put(stored, bucket, f"answer:{stored}", "test", intent)
+        hit = rc.get(asked, bucket)
+        if hit is not None:
+            failures.append(f"{asked!r} served the answer for {stored!r} (sim {hit['similarity']})")
+
+    # Context isolation: a new weather alert or another cell is a new bucket.
+    rc = ResponseCache(LocMemCache("bench-rc-safety", {}), threshold=threshold)
+    intent, crop, stored = "sowing", "wheat", "gehu ki buvai kab kare"
+    rc.put(stored, _bucket(rc, intent, crop, cell), "answer", "test", intent)
+    if rc.get(stored, _bucket(rc, intent, crop, cell, context=("rabi", "Heavy rain alert"))):
+        failures.append("answer reused across a changed weather context")
+    if rc.get(stored, _bucket(rc, intent, crop, CELLS[1])):
+        failures.append("answer reused across location cells")
+    rc.invalidate(lat=cell[0], lon=cell[1])
+    if rc.get(stored, _bucket(rc, intent, crop, cell)):
+        failures.append("answer survived invalidate()")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--cells", type=int, default=len(CELLS))
+    parser.add_argument("--llm-ms", type=float, default=3000.0, help="simulated generation cost per miss")
+    parser.add_argument("--threshold", type=float, default=None, help="semantic similarity threshold")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", default=None, help="write results to this file")
+    args = parser.parse_args()
+    if args.threshold is None:
+        args.threshold = ResponseCache().threshold
+
+    print(f"Workload: {args.requests} requests, {len(QUESTIONS)} questions, {args.cells} cells, "
+          f"threshold {args.threshold}")
+    results = run_workload(args)
+    for k, v in results.items():
+        print(f"  {k:26s} {v}")
+    speedup = results["llm_seconds_uncached"] / max(results["llm_seconds_cached"], 1e-9)
+    print(f"  LLM time saved ×{speedup:.1f}")
+
+    print("\nSafety")
+    failures = run_safety(args.threshold)
+    if results["wrong_answers"]:
+        failures.append(f"{results['wrong_answers']} workload hits returned another question's answer")
+    for f in failures:
+        print(f"  ❌ {f}")
+    if not failures:
+        print("  ✅ no cross-question or cross-context reuse")
+    results["failures"] = failures
+
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump(results, fh, indent=2)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
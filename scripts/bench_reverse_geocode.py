@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Latency + behaviour check for LocationResolver's GPS path.
+
+A local fake BigDataCloud / Nominatim (scripts/stub_upstreams.py) with
+--bdc-ms / --nominatim-ms injected latency.  Checked:
+
+  cold        new cells: the old sequential walk (BigDataCloud, then
+              Nominatim) vs the race — the race must be faster
+  late merge  the slower provider finishing after the race upgrades the
+              cached cell to the merged answer
+  warm        the same cells again → no provider calls
+  worker 2    another resolver sharing the geo_cache tier → no provider calls
+  restart     a fresh resolver with empty in-process and shared tiers, same
+              SQLite file → no provider calls
+  burst       --threads concurrent requests for one new cell → one call per
+              provider
+  bounded     the in-process tier never holds more than its size
+  offline     a coarse fix (5 km accuracy) next to a catalog town → answered
+              offline, no provider calls
+  outage      both providers failing → nearest catalog town, not bare
+              coordinates
+
+Runs on an explicit LocMemCache (DEBUG uses DummyCache) and a temporary
+SQLite file.
+
+Usage:
+  python3 scripts/bench_reverse_geocode.py
+  python3 scripts/bench_reverse_geocode.py --cells 20 --nominatim-ms 800
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BACKEND = os.path.join(ROOT, "backend")
+sys.path.insert(0, BACKEND)
+sys.path.insert(0, os.path.join(ROOT, "scripts"))
+os.chdir(BACKEND)
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+os.environ.setdefault("SECRET_KEY", "bench-reverse-geocode")
+os.environ.setdefault("DEBUG", "True")
+os.environ.setdefault("DATABASE_URL", "sqlite:///bench_reverse_geocode.sqlite3")
+
+import django
+
+django.setup()
+
+from django.core.cache.backends.locmem import LocMemCache  # noqa: E402
+
+from advisory.services import location_context as lc  # noqa: E402
+from advisory.services.geocode_cache import ReverseGeocodeCache  # noqa: E402
+from stub_upstreams import StubUpstreams  # noqa: E402
+
+# Farm-ish points around Lucknow / Kanpur (not on a catalog town centre)
+_BASE = (26.62, 80.62)
+
+
+def _cells(n: int, seed: int) -> list:
+    rnd = random.Random(seed)
+    return [(round(_BASE[0] + rnd.uniform(-0.3, 0.3), 5), round(_BASE[1] + rnd.uniform(-0.3, 0.3), 5))
+            for _ in range(n)]
+
+
+def _resolver(shared, db_path: str, l1_size: int = 2048) -> "lc.LocationResolver":
+    return lc.LocationResolver(geo_cache=ReverseGeocodeCache(l1_size=l1_size, cache=shared, db_path=db_path))
+
+
+def _calls(stubs: StubUpstreams) -> int:
+    st = stubs.stats()
+    return st.get("bigdatacloud", {}).get("calls", 0) + st.get("nominatim", {}).get("calls", 0)
+
+
+def _legacy_sequential(resolver, lat, lon, acc):
+    bdc = resolver._reverse_bigdatacloud(lat, lon, acc)
+    nom = resolver._reverse_nominatim(lat, lon, acc)
+    if bdc and nom:
+        return resolver._merge_reverse_results(bdc, nom, acc)
+    return bdc or nom
+
+
+def run(args) -> dict:
+    stubs = StubUpstreams(latency_ms={"bigdatacloud": args.bdc_ms, "nominatim": args.nominatim_ms}).start()
+    stubs.install()
+    tmp = tempfile.mkdtemp(prefix="bench-revgeo-")
+    db_path = os.path.join(tmp, "reverse_geocode.sqlite3")
+    failures: list = []
+    results: dict = {}
+    try:
+        shared = LocMemCache("bench-revgeo-1", {"MAX_ENTRIES": 10000})
+        resolver = _resolver(shared, db_path)
+        cells = _cells(args.cells, seed=3)
+        acc = 15.0
+
+        # ── cold: sequential (old) vs race ────────────────────────────
+        t0 = time.perf_counter()
+        for lat, lon in _cells(args.cells, seed=4):
+            _legacy_sequential(resolver, lat, lon, acc)
+        seq_ms = (time.perf_counter() - t0) / args.cells * 1000
+        stubs.reset_stats()
+        t0 = time.perf_counter()
+        sources = [resolver.resolve(latitude=lat, longitude=lon, accuracy_meters=acc).source for lat, lon in cells]
+        race_ms = (time.perf_counter() - t0) / args.cells * 1000
+        results["cold"] = {"sequential_ms": round(seq_ms, 1), "race_ms": round(race_ms, 1),
+                           "first_answer_sources": sorted(set(sources))}
+        if race_ms >= seq_ms:
+            failures.append(f"cold: race {race_ms:.0f} ms not faster than sequential {seq_ms:.0f} ms")
+
+        # ── late merge ────────────────────────────────────────────────
+        # Nominatim calls are serialised by its rate-limit lock: let the queue drain.
+        time.sleep(args.cells * args.nominatim_ms / 1000 + 0.3)
+        merged = sum(1 for lat, lon in cells
+                     if resolver._geo_cache.get(lc.cell_key(lat, lon))["source"].startswith("gps_merged"))
+        results["late_merge"] = {"cells_merged": merged, "of": len(cells),
+                                 "late_upgrades": resolver.stats["late_upgrades"]}
+        if merged != len(cells):
+            failures.append(f"late merge: only {merged}/{len(cells)} cached cells upgraded to merged")
+
+        # ── warm / worker 2 / restart ─────────────────────────────────
+        for name, r in (("warm", resolver),
+                        ("worker_2", _resolver(shared, db_path)),
+                        ("restart", _resolver(LocMemCache("bench-revgeo-2", {}), db_path))):
+            stubs.reset_stats()
+            t0 = time.perf_counter()
+            out = [r.resolve(latitude=lat, longitude=lon, accuracy_meters=acc) for lat, lon in cells]
+            results[name] = {"ms_per_resolve": round((time.perf_counter() - t0) / len(cells) * 1000, 2),
+                             "provider_calls": _calls(stubs),
+                             "merged_labels": sum(1 for c in out if c.source.startswith("gps_merged"))}
+            if results[name]["provider_calls"]:
+                failures.append(f"{name}: {results[name]['provider_calls']} provider calls (want 0)")
+
+        # ── burst on one new cell ─────────────────────────────────────
+        stubs.reset_stats()
+        lat, lon = 26.9, 80.1
+        barrier = threading.Barrier(args.threads)
+
+        def _one():
+            barrier.wait()
+            resolver.resolve(latitude=lat, longitude=lon, accuracy_meters=acc)
+
+        threads = [threading.Thread(target=_one) for _ in range(args.threads)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        time.sleep(args.nominatim_ms / 1000 + 0.2)
+        st = stubs.stats()
+        per = {u: st.get(u, {}).get("calls", 0) for u in ("bigdatacloud", "nominatim")}
+        results["burst"] = dict(requests=args.threads, **per)
+        if per != {"bigdatacloud": 1, "nominatim": 1}:
+            failures.append(f"burst: {per} provider calls for one cell (want 1 each)")
+
+        # ── bounded L1 ────────────────────────────────────────────────
+        small = ReverseGeocodeCache(l1_size=50, cache=LocMemCache("bench-revgeo-3", {}), db_path=None)
+        for i in range(500):
+            small.set(f"{i}", {"display_name": str(i)})
+        results["bounded"] = {"inserted": 500, "l1_size": small.l1_size(), "limit": 50}
+        if small.l1_size() > 50:
+            failures.append(f"bounded: L1 holds {small.l1_size()} entries (limit 50)")
+
+        # ── offline ───────────────────────────────────────────────────
+        stubs.reset_stats()
+        ctx = resolver.resolve(latitude=26.46, longitude=80.34, accuracy_meters=5000)
+        results["offline"] = {"source": ctx.source, "display_name": ctx.display_name,
+                              "district": ctx.district, "provider_calls": _calls(stubs)}
+        if ctx.source != "offline_city_catalog" or _calls(stubs):
+            failures.append(f"offline: {ctx.source} with {_calls(stubs)} provider calls")
+
+        # ── outage ────────────────────────────────────────────────────
+        stubs.fail("bigdatacloud")
+        stubs.fail("nominatim")
+        ctx = resolver.resolve(latitude=26.2, longitude=81.1, accuracy_meters=acc)
+        stubs.recover()
+        results["outage"] = {"source": ctx.source, "display_name": ctx.display_name}
+        if ctx.source != "offline_city_catalog":
+            failures.append(f"outage: answered with {ctx.source}")
+        results["resolver_stats"] = dict(resolver.stats)
+    finally:
+        stubs.stop()
+        shutil.rmtree(tmp, ignore_errors=True)
+    results["failures"] = failures
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cells", type=int, default=10, help="distinct GPS cells")
+    parser.add_argument("--threads", type=int, default=32, help="concurrent requests in the burst")
+    parser.add_argument("--bdc-ms", type=float, default=80.0, help="fake BigDataCloud latency")
+    parser.add_argument("--nominatim-ms", type=float, default=500.0, help="fake Nominatim latency")
+    parser.add_argument("--json", default=None, help="write results to this file")
+    args = parser.parse_args()
+
+    print(f"{args.cells} cells, BigDataCloud {args.bdc_ms:.0f} ms, Nominatim {args.nominatim_ms:.0f} ms")
+    results = run(args)
+    for name in ("cold", "late_merge", "warm", "worker_2", "restart", "burst", "bounded", "offline", "outage"):
+        if name in results:
+            print(f"  {name:10s} " + "  ".join(f"{k}={v}" for k, v in results[name].items()))
+    for f in results["failures"]:
+        print(f"  ❌ {f}")
+    if not results["failures"]:
+        print("  ✅ raced providers, cells served from cache / file / offline catalog")
+
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump(results, fh, indent=2)
+    sys.exit(1 if results["failures"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+DB round-trips and throughput of SessionMemoryService.save_turn(), synchronous
+vs write-behind (services/session_memory_service.py).
+
+--sessions farmers chat concurrently from --threads request threads; every
+turn is what the chatbot does: load_history() for the session, then
+save_turn() with the answer.  Each thread interleaves its sessions, so many
+sessions are active at once.  SQL statements are counted on every thread
+(request threads and the flusher) by wrapping Django's cursor.
+
+  sync          SESSION_WRITE_BEHIND=0 — two INSERTs, the ChatSession
+                upsert, keep-ids SELECT and DELETE per turn
+  write-behind  buffered turns, bulk_create + one session upsert per flush,
+                lazy trim every TRIM_SLACK rows per session
+
+Checked (write-behind):
+
+  - read-your-writes: every turn's load_history() ends with the previous
+    turn of that session, flushed or not
+  - after flush, each session holds its newest turns in order (created_at
+    is the turn time) and fewer than MAX_HISTORY_TURNS + TRIM_SLACK rows
+    (one process); every session has a ChatSession
+  - the per-session trim counts stay within SESSION_TRIM_TRACK
+  - fewer statements per turn than the synchronous path
+
+Usage:
+  python3 scripts/bench_session_memory.py
+  python3 scripts/bench_session_memory.py --sessions 500 --turns 30 --threads 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BACKEND = os.path.join(ROOT, "backend")
+sys.path.insert(0, BACKEND)
+os.chdir(BACKEND)
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+os.environ.setdefault("SECRET_KEY", "bench-session-memory")
+os.environ.setdefault("DEBUG", "False")
+os.environ.setdefault("DATABASE_URL", "sqlite:///bench_session_memory.sqlite3")
+
+import django
+
+django.setup()
+
+from django.core.management import call_command  # noqa: E402
+from django.db import connections  # noqa: E402
+from django.db.backends import utils as db_utils  # noqa: E402
+
+from advisory.models import ChatHistory, ChatSession  # noqa: E402
+from advisory.services import session_memory_service as sms  # noqa: E402
+
+
+class StatementCounter:
+    """Counts SQL statements on every connection and thread."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.count = 0
+        self._orig = (db_utils.CursorWrapper._execute, db_utils.CursorWrapper._executemany)
+        counter = self
+
+        def _execute(cursor, *args, **kwargs):
+            with counter._lock:
+                counter.count += 1
+            return counter._orig[0](cursor, *args, **kwargs)
+
+        def _executemany(cursor, *args, **kwargs):
+            with counter._lock:
+                counter.count += 1
+            return counter._orig[1](cursor, *args, **kwargs)
+
+        db_utils.CursorWrapper._execute = _execute
+        db_utils.CursorWrapper._executemany = _executemany
+
+    def take(self) -> int:
+        with self._lock:
+            n, self.count = self.count, 0
+        return n
+
+
+def run(service, args, counter: StatementCounter, prefix: str):
+    sessions = [f"{prefix}-{i:05d}" for i in range(args.sessions)]
+    errors = []
+    lock = threading.Lock()
+
+    def worker(mine):
+        try:
+            for turn in range(args.turns):
+                for sid in mine:
+                    history = service.load_history(sid)          # chatbot window (HISTORY_WINDOW)
+                    if args.check and turn and (not history or history[-1]["content"] != f"a{turn - 1}"):
+                        with lock:
+                            errors.append(f"{sid} turn {turn}: last turn not visible ({history[-1:]})")
+                    service.save_turn(sid, f"user-{sid}", f"q{turn}", f"a{turn}", "general", "hi", "bench")
+        finally:
+            connections.close_all()
+
+    counter.take()
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.threads) as pool:
+        list(pool.map(worker, [sessions[i::args.threads] for i in range(args.threads)]))
+    service.flush()
+    elapsed = time.perf_counter() - t0
+    statements = counter.take()
+    turns = args.sessions * args.turns
+    return sessions, errors, {
+        "turns": turns,
+        "seconds": round(elapsed, 2),
+        "turns_per_s": round(turns / elapsed, 1),
+        "statements": statements,
+        "statements_per_turn": round(statements / turns, 2),
+    }
+
+
+def verify(sessions, args):
+    problems = []
+    expected_rows = min(args.turns * 2, sms.MAX_HISTORY_TURNS)
+    rows = {}
+    for sid, content in (ChatHistory.objects.filter(session_id__in=sessions)
+                         .order_by("session_id", "created_at", "id").values_list("session_id", "message_content")):
+        rows.setdefault(sid, []).append(content)
+    have_session = set(ChatSession.objects.filter(session_id__in=sessions).values_list("session_id", flat=True))
+    for sid in sessions:
+        got = rows.get(sid, [])
+        want = [x for t in range(args.turns) for x in (f"q{t}", f"a{t}")][-expected_rows:]
+        if got[-expected_rows:] != want:
+            problems.append(f"{sid}: newest rows {got[-4:]} != {want[-4:]}")
+        if len(got) > sms.MAX_HISTORY_TURNS + sms.TRIM_SLACK:
+            problems.append(f"{sid}: {len(got)} rows, bound {sms.MAX_HISTORY_TURNS + sms.TRIM_SLACK}")
+        if sid not in have_session:
+            problems.append(f"{sid}: no ChatSession")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--turns", type=int, default=25, help="turns per session")
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--flush-ms", type=int, default=100)
+    parser.add_argument("--no-check", dest="check", action="store_false",
+                        help="skip the per-turn read-your-writes check")
+    parser.add_argument("--json", default=None, help="write results to this file")
+    args = parser.parse_args()
+
+    call_command("migrate", verbosity=0)
+    ChatHistory.objects.filter(session_id__startswith="bench-").delete()
+    ChatSession.objects.filter(session_id__startswith="bench-").delete()
+    counter = StatementCounter()
+
+    sync = sms.SessionMemoryService(write_behind=False)
+    _, _, sync_res = run(sync, args, counter, "bench-sync")
+    wb = sms.SessionMemoryService(write_behind=True, flush_interval_ms=args.flush_ms)
+    sessions, errors, wb_res = run(wb, args, counter, "bench-wb")
+    problems = verify(sessions, args)
+    wb_res["buffer"] = wb.stats()
+    if wb_res["buffer"]["trim_tracked_sessions"] > sms.SESSION_TRIM_TRACK:
+        problems.append(f"{wb_res['buffer']['trim_tracked_sessions']} sessions tracked for trimming, "
+                        f"cap {sms.SESSION_TRIM_TRACK}")
+
+    print(f"\n{args.sessions} sessions × {args.turns} turns, {args.threads} threads "
+          f"({connections['default'].vendor})")
+    print(f"{'path':14s} {'turns/s':>9s} {'SQL/turn':>9s} {'SQL total':>10s}")
+    for name, r in (("sync", sync_res), ("write-behind", wb_res)):
+        print(f"{name:14s} {r['turns_per_s']:>9} {r['statements_per_turn']:>9} {r['statements']:>10}")
+    b = wb_res["buffer"]
+    print(f"flushes {b['flushes']} ({b['rows_per_flush']} rows each), trims {b['trims']} "
+          f"({b['rows_trimmed']} rows), max buffered {b['max_buffered']}, inline flushes {b['inline_flushes']}")
+
+    failures = errors[:5] + problems[:5]
+    if len(errors) + len(problems) > len(failures):
+        failures.append(f"... {len(errors) + len(problems)} problems in total")
+    if wb_res["statements_per_turn"] >= sync_res["statements_per_turn"]:
+        failures.append(f"write-behind {wb_res['statements_per_turn']} statements/turn "
+                        f"not below sync {sync_res['statements_per_turn']}")
+    for f in failures:
+        print(f"  ❌ {f}")
+    if not failures:
+        print("  ✅ read-your-writes every turn, newest turns kept in order, history bounded, fewer round-trips")
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump({"config": vars(args), "sync": sync_res, "write_behind": wb_res,
+                       "failures": failures}, fh, indent=2)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Latency / synthesis-count benchmark for the TTS audio store
+(services/tts_audio_cache.py) behind /api/tts/generate/.
+
+A local stub synthesiser stands in for gTTS: one "request" per started 100
+characters (gTTS's own split) at --request-ms each, returning deterministic
+fake MP3 bytes per chunk.  The workload mixes, per language (hi / en):
+
+  greeting   fixed lines (helpline, welcome) — the same every call
+  advisory   2–4 sentences drawn Zipf-style from a pool of advisory lines
+  long       a 10–16 sentence answer (streamed when not fully stored)
+
+Passes, all through the Django test client:
+
+  uncached   every request synthesised in one call (the previous _render_tts)
+  cached     the audio store on a temp disk dir + LocMemCache (standing in
+             for the shared Redis alias); first-byte time recorded for
+             streamed answers
+  presynth   a fresh store pre-synthesised from the cached pass's counters
+             (presynthesize_tts), then every greeting request again
+
+Checked:
+
+  - cached audio is byte-identical to synthesising the same sentences
+  - hit rate ≥ --min-hit-rate and fewer synthesis calls than uncached
+  - streamed long answers start (first byte) faster than the uncached
+    response completes
+  - after pre-synthesis, every greeting is served from the store
+  - the disk tier stays under its byte bound (--disk-kb) with evictions
+
+Usage:
+  python3 scripts/bench_tts_cache.py
+  python3 scripts/bench_tts_cache.py --requests 600 --request-ms 150
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import math
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BACKEND = os.path.join(ROOT, "backend")
+sys.path.insert(0, BACKEND)
+os.chdir(BACKEND)
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+os.environ.setdefault("SECRET_KEY", "bench-tts-cache")
+os.environ.setdefault("DEBUG", "True")
+os.environ.setdefault("DATABASE_URL", "sqlite:///bench_tts_cache.sqlite3")
+
+import django
+
+django.setup()
+
+from django.conf import settings as django_settings  # noqa: E402
+from django.core.cache.backends.locmem import LocMemCache  # noqa: E402
+from rest_framework.test import APIClient  # noqa: E402
+
+from advisory.api.viewsets import misc  # noqa: E402
+from advisory.services import tts_audio_cache as tac  # noqa: E402
+
+# APIClient uses Host: testserver
+if "testserver" not in django_settings.ALLOWED_HOSTS:
+    django_settings.ALLOWED_HOSTS = [*django_settings.ALLOWED_HOSTS, "testserver"]
+
+GREETINGS = {
+    "hi": ["नमस्ते किसान भाई! Kisan Helpline: 1800-180-1551",
+           "माफ़ करें, कृपया फिर से पूछें। Kisan Helpline: 1800-180-1551"],
+    "en": ["Hello farmer! Kisan Helpline: 1800-180-1551", "Thank you for using KrishiMitra."],
+}
+ADVISORY = {
+    "hi": ["गेहूं में पहली सिंचाई बुवाई के 20 से 25 दिन बाद करें।",
+           "यूरिया की आधी मात्रा बुवाई के समय और आधी पहली सिंचाई पर डालें।",
+           "सरसों में माहू दिखने पर इमिडाक्लोप्रिड 0.5 मिली प्रति लीटर पानी में छिड़कें।",
+           "धान की रोपाई के बाद खेत में 5 सेंटीमीटर पानी बनाए रखें।",
+           "टमाटर में झुलसा रोग के लिए मैंकोजेब 2 ग्राम प्रति लीटर का छिड़काव करें।",
+           "अगले तीन दिन बारिश की संभावना है, छिड़काव टाल दें।",
+           "मंडी में आज गेहूं का भाव न्यूनतम समर्थन मूल्य से ऊपर है।",
+           "मिट्टी की जांच हर तीन साल में एक बार जरूर कराएं।",
+           "पीएम किसान की अगली किस्त के लिए ई-केवाईसी पूरा करें।",
+           "फसल बीमा के लिए बुवाई के दस दिन के भीतर आवेदन करें।",
+           "कपास में गुलाबी सुंडी के लिए फेरोमोन ट्रैप लगाएं।",
+           "प्याज की रोपाई से पहले खेत की गहरी जुताई करें।"],
+    "en": ["Give the first irrigation to wheat 20 to 25 days after sowing.",
+           "Apply half the urea at sowing and half at the first irrigation.",
+           "Spray imidacloprid at 0.5 ml per litre when aphids appear on mustard.",
+           "Keep 5 cm of standing water in the paddy field after transplanting.",
+           "Rain is likely for the next three days, postpone spraying.",
+           "Test your soil at least once every three years.",
+           "Complete e-KYC to receive the next PM Kisan instalment.",
+           "Apply for crop insurance within ten days of sowing.",
+           "Install pheromone traps against pink bollworm in cotton."],
+}
+
+
+class StubSynth:
+    """gTTS stand-in: --request-ms per started 100 characters, fake MP3 bytes per text."""
+
+    def __init__(self, request_ms: float):
+        self.request_ms = request_ms
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, text: str, language: str, voice: str = tac.DEFAULT_VOICE) -> bytes:
+        with self._lock:
+            self.calls += 1
+        time.sleep(math.ceil(len(text) / 100) * self.request_ms / 1000)
+        return b"".join(self.segment(chunk, language) for chunk in tac.split_chunks(text))
+
+    @staticmethod
+    def segment(chunk: str, language: str) -> bytes:
+        digest = hashlib.sha256(f"{language}:{chunk}".encode()).digest()
+        return b"\xff\xfb" + digest * 64                # ~2 KB "frame" per sentence
+
+
+class OldPath(tac.TTSAudioStore):
+    """The previous _render_tts: the whole text in one synthesis, nothing stored."""
+
+    def render(self, text, language, voice=tac.DEFAULT_VOICE):
+        return True, [self.synthesizer(text, tac._LANGUAGES.get(language, "hi"), voice)]
+
+
+def _zipf(rng: random.Random, n: int, s: float = 1.1) -> int:
+    weights = [1 / (i + 1) ** s for i in range(n)]
+    return rng.choices(range(n), weights=weights)[0]
+
+
+def workload(args):
+    rng = random.Random(args.seed)
+    out = []
+    for _ in range(args.requests):
+        lang = "hi" if rng.random() < 0.7 else "en"
+        roll = rng.random()
+        pool = ADVISORY[lang]
+        if roll < 0.3:
+            out.append(("greeting", lang, rng.choice(GREETINGS[lang])))
+        elif roll < 0.85:
+            out.append(("advisory", lang, " ".join(pool[_zipf(rng, len(pool))] for _ in range(rng.randint(2, 4)))))
+        else:
+            out.append(("long", lang, " ".join(pool[_zipf(rng, len(pool))] for _ in range(rng.randint(10, 16)))))
+    return out
+
+
+def run_pass(store, requests):
+    misc.tts_audio_store = store
+    client = APIClient()
+    timings, first_byte, bodies = {}, {}, []
+    for kind, lang, text in requests:
+        t0 = time.perf_counter()
+        resp = client.post("/api/tts/generate/", {"text": text, "language": lang}, format="json")
+        assert resp.status_code == 200, resp.status_code
+        if resp.streaming:
+            it = iter(resp.streaming_content)
+            body = next(it)
+            first_byte.setdefault(kind, []).append((time.perf_counter() - t0) * 1000)
+            body += b"".join(it)
+        else:
+            body = resp.content
+        timings.setdefault(kind, []).append((time.perf_counter() - t0) * 1000)
+        bodies.append(body)
+    return timings, first_byte, bodies
+
+
+def _summary(values):
+    values = sorted(values)
+    return {"n": len(values), "mean_ms": round(statistics.mean(values), 1),
+            "p95_ms": round(values[min(len(values) - 1, int(0.95 * len(values)))], 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--request-ms", type=float, default=60, help="stub cost per started 100 characters")
+    parser.add_argument("--min-hit-rate", type=float, default=0.8)
+    parser.add_argument("--disk-kb", type=int, default=40, help="disk bound for the eviction check")
+    parser.add_argument("--seed", type=int, default=21)
+    parser.add_argument("--json", default=None, help="write results to this file")
+    args = parser.parse_args()
+
+    requests = workload(args)
+    failures = []
+    results = {"config": vars(args)}
+    with tempfile.TemporaryDirectory(prefix="km-tts-") as tmp:
+        old_synth = StubSynth(args.request_ms)
+        old = OldPath(synthesizer=old_synth, enabled=False)
+        t_old, _, _ = run_pass(old, requests)
+
+        synth = StubSynth(args.request_ms)
+        store = tac.TTSAudioStore(synthesizer=synth, disk_dir=os.path.join(tmp, "a"),
+                                  cache=LocMemCache("bench-tts", {"OPTIONS": {"MAX_ENTRIES": 10000}}))
+        t_new, ttfb, bodies = run_pass(store, requests)
+        st = store.stats()
+
+        for (kind, lang, text), body in zip(requests, bodies):
+            want = b"".join(StubSynth.segment(c, lang) for c in tac.split_chunks(text))
+            if body != want:
+                failures.append(f"{kind} audio differs from its sentences' synthesis")
+                break
+        if (st["hit_rate"] or 0) < args.min_hit_rate:
+            failures.append(f"hit rate {st['hit_rate']} below {args.min_hit_rate}")
+        if synth.calls >= old_synth.calls:
+            failures.append(f"synthesis calls {synth.calls} not below uncached {old_synth.calls}")
+        if "long" in ttfb and statistics.mean(ttfb["long"]) >= statistics.mean(t_old["long"]):
+            failures.append("streamed long answers do not start before the uncached response completes")
+
+        # Pre-synthesis on a fresh disk + cache, from the counters the cached pass flushed.
+        store.flush_counters()
+        fresh_synth = StubSynth(args.request_ms)
+        fresh = tac.TTSAudioStore(synthesizer=fresh_synth, disk_dir=os.path.join(tmp, "b"),
+                                  cache=LocMemCache("bench-tts-fresh", {"OPTIONS": {"MAX_ENTRIES": 10000}}))
+        fresh._disk.save_json("freq-hi.json", store._flushed_counts("hi"))
+        fresh._disk.save_json("freq-en.json", store._flushed_counts("en"))
+        t0 = time.perf_counter()
+        presynth = fresh.presynthesize(["hi", "en"], top=args.requests)
+        presynth_s = time.perf_counter() - t0
+        calls_before = fresh_synth.calls
+        greetings = [r for r in requests if r[0] == "greeting"]
+        run_pass(fresh, greetings)
+        if fresh_synth.calls != calls_before:
+            failures.append(f"{fresh_synth.calls - calls_before} greeting sentences synthesised after pre-synthesis")
+
+        # Disk bound: a store whose disk tier holds only a few sentences.
+        small = tac.TTSAudioStore(synthesizer=StubSynth(0), disk_dir=os.path.join(tmp, "c"),
+                                  disk_max_bytes=args.disk_kb * 1024,
+                                  cache=LocMemCache("bench-tts-small", {"OPTIONS": {"MAX_ENTRIES": 10}}))
+        run_pass(small, requests[:100])
+        disk = small.stats()["disk"]
+        if disk["bytes"] > args.disk_kb * 1024 or not disk["evictions"]:
+            failures.append(f"disk tier {disk['bytes']} B (bound {args.disk_kb * 1024}), "
+                            f"{disk['evictions']} evictions")
+
+    results.update(
+        uncached={k: _summary(v) for k, v in t_old.items()},
+        cached={k: _summary(v) for k, v in t_new.items()},
+        first_byte={k: _summary(v) for k, v in ttfb.items()},
+        synth_calls={"uncached": old_synth.calls, "cached": synth.calls},
+        store=st,
+        presynthesis=dict(presynth, seconds=round(presynth_s, 2)),
+        disk_bound=disk,
+        failures=failures,
+    )
+
+    print(f"\n{args.requests} TTS requests, stub {args.request_ms:.0f} ms per 100 chars")
+    print(f"{'kind':10s} {'n':>4s} {'uncached ms':>12s} {'cached ms':>10s} {'first byte ms':>14s}")
+    for kind in ("greeting", "advisory", "long"):
+        if kind not in t_old:
+            continue
+        u, c = results["uncached"][kind], results["cached"][kind]
+        fb = results["first_byte"].get(kind, {}).get("mean_ms", "-")
+        print(f"{kind:10s} {u['n']:>4} {u['mean_ms']:>12} {c['mean_ms']:>10} {fb:>14}")
+    print(f"synthesis calls: {old_synth.calls} → {synth.calls}; hit rate {st['hit_rate']} "
+          f"(disk {st['disk_hits']}, shared {st['shared_hits']}), full hits {st['full_hits']}, "
+          f"streamed {st['streamed']}")
+    print(f"pre-synthesis: {presynth} in {presynth_s:.1f} s; disk bound: {disk}")
+    for f in failures:
+        print(f"  ❌ {f}")
+    if not failures:
+        print("  ✅ identical audio, fewer syntheses, streamed first byte early, greetings pre-synthesised, "
+              "disk bounded")
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump(results, fh, indent=2)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,396 @@
+#!/usr/bin/env python3
+"""
+Load test for the asynchronous WhatsApp webhook (services/whatsapp_inbox.py).
+
+Meta's deliveries are POSTed to /api/sms-ivr/whatsapp/ through the Django
+test client; the Cloud API (media + send) and Groq Whisper are a local fake
+provider (scripts/stub_upstreams.py), and so are the chat pipeline's LLM
+tiers.  Scenarios:
+
+  sync baseline  a few messages answered inline, the way the webhook used
+                 to before acknowledging — what Meta waited for per delivery
+  load           --senders farmers each send --messages messages in order
+                 (text and voice notes), every delivery redelivered once;
+                 senders post concurrently
+  celery         the load again through the Celery path: tasks go to a
+                 local broker whose workers take them in no particular
+                 order and re-queue busy ones after a countdown, the way
+                 Celery does; answer_in_order must still answer each
+                 farmer's messages in sequence
+  backpressure   a full queue answers 503; Meta's redelivery is queued and
+                 answered after the queue drains
+
+Checked:
+
+  - webhook ack p99 within --ack-budget-ms and below the sync baseline
+  - every message answered exactly once (redeliveries dropped)
+  - each farmer's messages handled in arrival order, never two at a time,
+    in process and on the Celery path
+  - every voice note transcribed
+  - 503 under backpressure, redelivered message answered afterwards
+
+Usage:
+  python3 scripts/bench_whatsapp_webhook.py
+  python3 scripts/bench_whatsapp_webhook.py --senders 40 --messages 5 --latency-scale 0.5
+"""
+
+from __future__ import annotations
+
+import argparse
+import heapq
+import json
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BACKEND = os.path.join(ROOT, "backend")
+sys.path.insert(0, BACKEND)
+sys.path.insert(0, os.path.join(ROOT, "scripts"))
+os.chdir(BACKEND)
+
+from stub_upstreams import StubUpstreams  # noqa: E402
+
+STUBS = StubUpstreams().start()
+STUBS.configure_env()                       # WhatsApp / Groq / LLM bases — read at import time
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+os.environ.setdefault("SECRET_KEY", "bench-whatsapp-webhook")
+os.environ.setdefault("DEBUG", "True")
+os.environ.setdefault("DATABASE_URL", "sqlite:///bench_whatsapp_webhook.sqlite3")
+os.environ["WHATSAPP_TOKEN"] = "stub-bench-whatsapp-token"
+os.environ["WHATSAPP_PHONE_ID"] = "100000000000001"
+os.environ["WHATSAPP_APP_SECRET"] = ""
+os.environ["GROQ_API_KEY"] = "stub-bench-groq-key"
+os.environ["WHATSAPP_QUEUE_BACKEND"] = "in_process"
+
+import django
+
+django.setup()
+
+from django.conf import settings as django_settings  # noqa: E402
+from django.core.cache.backends.locmem import LocMemCache  # noqa: E402
+from django.core.management import call_command  # noqa: E402
+from rest_framework.test import APIClient  # noqa: E402
+
+from advisory.api.viewsets import misc  # noqa: E402
+from advisory.services.whatsapp_inbox import WhatsAppInbox, answer_in_order  # noqa: E402
+
+# APIClient uses Host: testserver
+if "testserver" not in django_settings.ALLOWED_HOSTS:
+    django_settings.ALLOWED_HOSTS = [*django_settings.ALLOWED_HOSTS, "testserver"]
+
+WEBHOOK = "/api/sms-ivr/whatsapp/"
+QUESTIONS = ["gehu me urea kitna dale", "dhan me pani kab dena chahiye", "tamatar ke patte murjha rahe hai",
+             "pm kisan ki kist kab aayegi", "sarso ki buvai ka sahi samay"]
+
+
+def _pct(values, q):
+    values = sorted(values)
+    return round(values[min(len(values) - 1, int(q * len(values)))], 1) if values else None
+
+
+def _message(sender: str, seq: int, voice: bool) -> dict:
+    msg = {"from": sender, "id": f"wamid.{sender}.{seq}", "timestamp": str(int(time.time()))}
+    if voice:
+        msg.update(type="audio", audio={"id": f"media-{sender}-{seq}", "mime_type": "audio/ogg"})
+    else:
+        msg.update(type="text", text={"body": f"{QUESTIONS[seq % len(QUESTIONS)]} ({seq})"})
+    return msg
+
+
+def _delivery(*messages) -> dict:
+    return {"object": "whatsapp_business_account", "entry": [{"id": "bench", "changes": [{
+        "field": "messages",
+        "value": {"messaging_product": "whatsapp", "messages": list(messages)},
+    }]}]}
+
+
+class Tracker:
+    """Wraps the real handler: records order, overlap and counts per sender."""
+
+    def __init__(self, gate: threading.Event = None):
+        self.gate = gate
+        self._lock = threading.Lock()
+        self.handled = {}            # message id → times handled
+        self.order = {}              # sender → [seq, ...] in handling order
+        self.active = set()
+        self.overlaps = 0
+
+    def __call__(self, message: dict):
+        if self.gate is not None:
+            self.gate.wait()
+        sender = message["from"]
+        with self._lock:
+            if sender in self.active:
+                self.overlaps += 1
+            self.active.add(sender)
+            self.handled[message["id"]] = self.handled.get(message["id"], 0) + 1
+            self.order.setdefault(sender, []).append(int(message["id"].rsplit(".", 1)[1]))
+        try:
+            return misc.process_whatsapp_message(message)
+        finally:
+            with self._lock:
+                self.active.discard(sender)
+
+
+class Broker:
+    """
+    Stands in for Celery + its workers: a task runs on any free worker after
+    a random delivery delay, so one farmer's tasks are picked up out of order,
+    and a task answer_in_order sends back is re-queued after a countdown.
+    """
+
+    def __init__(self, handler, cache, workers: int, jitter_ms: float, countdown_ms: float,
+                 max_retries: int = 120):
+        self.handler, self.cache = handler, cache
+        self.jitter, self.countdown = jitter_ms / 1000, countdown_ms / 1000
+        self.max_retries = max_retries
+        self._cond = threading.Condition()
+        self._heap = []              # (due, tiebreak, message, seq, retries)
+        self._running = 0
+        self._n = 0
+        self.retries = 0
+        for i in range(workers):
+            threading.Thread(target=self._work, name=f"bench-celery-{i}", daemon=True).start()
+
+    def _push(self, delay: float, message: dict, seq, retries: int):
+        with self._cond:
+            self._n += 1
+            heapq.heappush(self._heap, (time.monotonic() + delay, self._n, message, seq, retries))
+            self._cond.notify()
+
+    def delay(self, message: dict, seq=None):          # process_whatsapp_message.delay
+        self._push(random.uniform(0, self.jitter), message, seq, 0)
+
+    def _work(self):
+        while True:
+            with self._cond:
+                while not self._heap or self._heap[0][0] > time.monotonic():
+                    self._cond.wait(self._heap[0][0] - time.monotonic() if self._heap else None)
+                _, _, message, seq, retries = heapq.heappop(self._heap)
+                self._running += 1
+            try:
+                answered = answer_in_order(self.cache, message, seq, self.handler,
+                                           last_try=retries >= self.max_retries)
+            except Exception:
+                answered = True
+            if not answered:
+                self.retries += 1
+                self._push(self.countdown + random.uniform(0, self.jitter), message, seq, retries + 1)
+            with self._cond:
+                self._running -= 1
+                self._cond.notify_all()
+
+    def drain(self, timeout: float) -> bool:
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while self._heap or self._running:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+
+def _shared_cache() -> LocMemCache:
+    # LocMemCache instances with one name share storage: a fresh name per
+    # scenario, or the next one finds every message id already claimed.
+    return LocMemCache(f"bench-wa-{uuid.uuid4().hex}", {"OPTIONS": {"MAX_ENTRIES": 100000}})
+
+
+def _inbox(handler, **kwargs) -> WhatsAppInbox:
+    kwargs.setdefault("use_celery", False)
+    kwargs.setdefault("cache", _shared_cache())
+    return WhatsAppInbox(handler=handler, **kwargs)
+
+
+def _post(client: APIClient, body: dict):
+    t0 = time.perf_counter()
+    resp = client.post(WEBHOOK, body, format="json")
+    return resp.status_code, resp.content, (time.perf_counter() - t0) * 1000
+
+
+def sync_baseline(args):
+    timings = []
+    for i in range(args.baseline):
+        msg = _message(f"91990000{i:04d}", 0, voice=(i % 2 == 1))
+        t0 = time.perf_counter()
+        misc.process_whatsapp_message(msg)
+        timings.append((time.perf_counter() - t0) * 1000)
+    return {"n": len(timings), "p50_ms": _pct(timings, 0.5), "p99_ms": _pct(timings, 0.99)}
+
+
+def load(args, celery: bool = False):
+    tracker = Tracker()
+    broker = None
+    if celery:
+        cache = _shared_cache()
+        broker = Broker(tracker, cache, workers=args.workers, jitter_ms=args.celery_jitter_ms,
+                        countdown_ms=args.celery_countdown_ms)
+        inbox = _inbox(tracker, use_celery=True, dispatch=broker.delay, cache=cache)
+    else:
+        inbox = _inbox(tracker, workers=args.workers)
+    misc.whatsapp_inbox = inbox
+    STUBS.reset_stats()
+    senders = [f"9198{i:08d}" for i in range(args.senders)]
+    voice_ids = set()
+
+    def farmer(sender):
+        client = APIClient()
+        acks, codes = [], []
+        for seq in range(args.messages):
+            voice = (seq % args.voice_every == args.voice_every - 1)
+            msg = _message(sender, seq, voice)
+            if voice:
+                voice_ids.add(msg["id"])
+            for _ in range(2):                     # Meta redelivers: same message id twice
+                code, _, ms = _post(client, _delivery(msg))
+                acks.append(ms)
+                codes.append(code)
+            time.sleep(args.gap_ms / 1000)
+        return acks, codes
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        results = list(pool.map(farmer, senders))
+    posted_s = time.perf_counter() - t0
+    drained = (broker or inbox).drain(timeout=args.drain_timeout)
+    total_s = time.perf_counter() - t0
+
+    acks = [ms for a, _ in results for ms in a]
+    codes = [c for _, cs in results for c in cs]
+    expected = {f"wamid.{s}.{i}" for s in senders for i in range(args.messages)}
+    groq_calls = STUBS.stats().get("groq", {}).get("calls", 0)
+    return {
+        "deliveries": len(acks),
+        "non_200": sum(1 for c in codes if c != 200),
+        "ack_p50_ms": _pct(acks, 0.5),
+        "ack_p99_ms": _pct(acks, 0.99),
+        "posted_s": round(posted_s, 2),
+        "drained": drained,
+        "total_s": round(total_s, 2),
+        "answered_once": sum(1 for m in expected if tracker.handled.get(m) == 1),
+        "answered_twice": sum(1 for n in tracker.handled.values() if n > 1),
+        "expected": len(expected),
+        "out_of_order_senders": sum(1 for s in senders if tracker.order.get(s) != sorted(tracker.order.get(s, []))),
+        "overlaps": tracker.overlaps,
+        "voice_notes": len(voice_ids),
+        "transcriptions": groq_calls,
+        "replies_sent": len(STUBS.sent_messages()),
+        "celery_retries": broker.retries if broker else None,
+        "inbox": inbox.stats(),
+    }
+
+
+def backpressure(args):
+    gate = threading.Event()
+    tracker = Tracker(gate)
+    misc.whatsapp_inbox = inbox = _inbox(tracker, workers=2, max_pending=args.max_pending)
+    client = APIClient()
+    codes = []
+    msgs = [_message(f"91970000{i:04d}", 0, voice=False) for i in range(args.max_pending + 3)]
+    for msg in msgs:
+        code, _, _ = _post(client, _delivery(msg))
+        codes.append(code)
+    rejected = [m for m, c in zip(msgs, codes) if c == 503]
+    gate.set()
+    inbox.drain(timeout=args.drain_timeout)
+    redelivered = [_post(client, _delivery(m))[0] for m in rejected]
+    drained = inbox.drain(timeout=args.drain_timeout)
+    return {
+        "accepted": codes.count(200),
+        "rejected_503": len(rejected),
+        "redelivery_codes": redelivered,
+        "answered": sum(1 for m in msgs if tracker.handled.get(m["id"]) == 1),
+        "sent": len(msgs),
+        "drained": drained,
+        "inbox": inbox.stats(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--senders", type=int, default=30)
+    parser.add_argument("--messages", type=int, default=4, help="messages per sender")
+    parser.add_argument("--voice-every", type=int, default=3, help="every Nth message is a voice note")
+    parser.add_argument("--concurrency", type=int, default=16, help="senders posting at once")
+    parser.add_argument("--gap-ms", type=float, default=20, help="pause between one sender's messages")
+    parser.add_argument("--workers", type=int, default=8, help="inbox worker threads")
+    parser.add_argument("--celery-jitter-ms", type=float, default=30,
+                        help="Celery scenario: random delivery delay per task")
+    parser.add_argument("--celery-countdown-ms", type=float, default=5,
+                        help="Celery scenario: retry countdown (1 s in production)")
+    parser.add_argument("--max-pending", type=int, default=6, help="queue bound in the backpressure scenario")
+    parser.add_argument("--baseline", type=int, default=4, help="messages answered inline for the baseline")
+    parser.add_argument("--latency-scale", type=float, default=0.2, help="scale every stub latency")
+    parser.add_argument("--ack-budget-ms", type=float, default=250)
+    parser.add_argument("--drain-timeout", type=float, default=120)
+    parser.add_argument("--json", default=None, help="write results to this file")
+    args = parser.parse_args()
+
+    STUBS.latency_scale = args.latency_scale
+    STUBS.install()
+    call_command("migrate", verbosity=0)
+
+    results = {"config": vars(args)}
+    results["sync_baseline"] = base = sync_baseline(args)
+    results["load"] = ld = load(args)
+    results["celery"] = cel = load(args, celery=True)
+    results["backpressure"] = bp = backpressure(args)
+    STUBS.stop()
+
+    print(f"\nsync (old inline) handling   p50 {base['p50_ms']} ms   p99 {base['p99_ms']} ms")
+    print(f"load: {ld['deliveries']} deliveries from {args.senders} senders — ack p50 {ld['ack_p50_ms']} ms, "
+          f"p99 {ld['ack_p99_ms']} ms; all answered in {ld['total_s']} s")
+    st = ld["inbox"]
+    print(f"inbox: max depth {st['max_depth']}, queue wait p95 {st['queue_wait_p95_ms']} ms, "
+          f"handling p95 {st['handling_p95_ms']} ms, duplicates {st['duplicates']}")
+
+    print(f"celery: {cel['answered_once']}/{cel['expected']} messages answered once in {cel['total_s']} s, "
+          f"{cel['celery_retries']} tasks re-queued to wait their turn")
+
+    failures = []
+    if ld["non_200"]:
+        failures.append(f"{ld['non_200']} deliveries not acknowledged with 200")
+    if ld["ack_p99_ms"] > args.ack_budget_ms:
+        failures.append(f"ack p99 {ld['ack_p99_ms']} ms over budget {args.ack_budget_ms} ms")
+    if ld["ack_p99_ms"] >= base["p50_ms"]:
+        failures.append(f"ack p99 {ld['ack_p99_ms']} ms not below the inline p50 {base['p50_ms']} ms")
+    if not ld["drained"] or ld["answered_once"] != ld["expected"] or ld["answered_twice"]:
+        failures.append(f"answered once {ld['answered_once']}/{ld['expected']}, twice {ld['answered_twice']}")
+    if ld["out_of_order_senders"] or ld["overlaps"]:
+        failures.append(f"per-sender order broken ({ld['out_of_order_senders']} senders, "
+                        f"{ld['overlaps']} overlaps)")
+    if not cel["drained"] or cel["answered_once"] != cel["expected"] or cel["answered_twice"]:
+        failures.append(f"celery: answered once {cel['answered_once']}/{cel['expected']}, "
+                        f"twice {cel['answered_twice']}")
+    if cel["out_of_order_senders"] or cel["overlaps"]:
+        failures.append(f"celery: per-sender order broken ({cel['out_of_order_senders']} senders, "
+                        f"{cel['overlaps']} overlaps)")
+    if ld["transcriptions"] != ld["voice_notes"]:
+        failures.append(f"voice notes transcribed {ld['transcriptions']}/{ld['voice_notes']}")
+    if ld["replies_sent"] < ld["expected"]:
+        failures.append(f"replies sent {ld['replies_sent']}/{ld['expected']}")
+    if not bp["rejected_503"] or any(c != 200 for c in bp["redelivery_codes"]) or bp["answered"] != bp["sent"]:
+        failures.append(f"backpressure: {bp['rejected_503']} rejected, redelivery {bp['redelivery_codes']}, "
+                        f"answered {bp['answered']}/{bp['sent']}")
+
+    for f in failures:
+        print(f"  ❌ {f}")
+    if not failures:
+        print(f"  ✅ acks within {args.ack_budget_ms:.0f} ms, every message answered once, in order per sender")
+        print("  ✅ celery: in order per sender despite out-of-order delivery and retries")
+        print(f"  ✅ backpressure: {bp['rejected_503']} × 503, all redeliveries answered")
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump(results, fh, indent=2, default=str)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
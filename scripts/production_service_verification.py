@@ -9,6 +9,18 @@ Usage:
     python scripts/production_service_verification.py
     python scripts/production_service_verification.py --json report.json
     python scripts/production_service_verification.py --markdown docs/PRODUCTION_TEST_REPORT.md
+
+Benchmark mode (--bench) replays the same cases — plus a JSONL request log,
+scripts/bench_requests.jsonl by default — at --concurrency against local stub
+upstreams (scripts/stub_upstreams.py: fake Open-Meteo, data.gov.in,
+Nominatim, Phase 1, Ollama, Gemini), so it needs no network and no keys.
+It records p50/p95/p99 and throughput overall, per domain and per chat
+answer tier, plus per-upstream call counts, and writes them as JSON:
+
+    python scripts/production_service_verification.py --bench --json bench.json
+    python scripts/production_service_verification.py --bench --concurrency 16 --rounds 5 \
+        --compare bench_baseline.json --max-regression 0.20
+    python scripts/production_service_verification.py --bench --latency-scale 0   # app overhead only
 """
 
 from __future__ import annotations
@@ -16,8 +28,13 @@ from __future__ import annotations
 import argparse
 import json
 import os
+import random
+import subprocess
 import sys
+import threading
+import time
 import traceback
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from typing import Any, Callable, Dict, List, Optional, Tuple
@@ -34,10 +51,22 @@ os.environ.setdefault("DATABASE_URL", "sqlite:///production_verify.sqlite3")
 os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
 os.environ.setdefault("PHASE1_TIMEOUT_S", "25")
 
+# Benchmark mode: stub upstreams must be configured before services read env.
+_BENCH = "--bench" in sys.argv
+_STUBS = None
+if _BENCH:
+    from stub_upstreams import StubUpstreams
+
+    _STUBS = StubUpstreams().start()
+    _STUBS.configure_env()
+
 import django
 
 django.setup()
 
+if _STUBS is not None:
+    _STUBS.install()
+
 from django.conf import settings as django_settings  # noqa: E402
 
 # APIClient uses Host: testserver
@@ -135,6 +164,7 @@ class Case:
     fn: Callable[["Runner"], None]
     requires_network: bool = False
     network_reason: str = "External API (Nominatim, Open-Meteo, data.gov.in, Gemini)"
+    bench: bool = True  # False: mutates global settings, not safe to replay concurrently
 
 
 @dataclass
@@ -147,9 +177,36 @@ class CaseResult:
     requires_network: bool = False
 
 
+class TimedAPIClient(APIClient):
+    """APIClient that keeps (method, path, status, seconds, data_source) per request."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.calls: List[Dict[str, Any]] = []
+
+    def request(self, **request):
+        t0 = time.perf_counter()
+        resp = super().request(**request)
+        elapsed = time.perf_counter() - t0
+        data_source = None
+        if "json" in (resp.get("Content-Type") or ""):
+            try:
+                data_source = json.loads(resp.content).get("data_source")
+            except Exception:
+                pass
+        self.calls.append({
+            "method": request.get("REQUEST_METHOD"),
+            "path": request.get("PATH_INFO"),
+            "status": resp.status_code,
+            "seconds": elapsed,
+            "data_source": data_source if isinstance(data_source, str) else None,
+        })
+        return resp
+
+
 class Runner:
-    def __init__(self):
-        self.client = APIClient()
+    def __init__(self, client: Optional[APIClient] = None):
+        self.client = client if client is not None else APIClient()
         self.results: List[CaseResult] = []
 
     def record(self, case: Case, status: str, message: str = ""):
@@ -767,6 +824,7 @@ def build_security_cases() -> List[Case]:
     cases.append(Case(
         "security", "sec_no_traceback", "no stack traces when DEBUG=False",
         no_tracebacks_prod,
+        bench=False,
     ))
 
     def health_public(r: Runner):
@@ -913,11 +971,267 @@ def render_markdown(results: List[CaseResult], started: str) -> str:
     return "\n".join(lines)
 
 
+# ── Benchmark mode ────────────────────────────────────────────────────────────
+
+DEFAULT_REPLAY = os.path.join(ROOT, "scripts", "bench_requests.jsonl")
+
+
+def load_replay_cases(path: str) -> List[Case]:
+    """
+    One Case per JSONL line:
+      {"name": "...", "method": "GET", "path": "/api/weather/", "params": {...}}
+      {"method": "POST", "path": "/api/chatbot/query/", "json": {...}, "expect_status": 200}
+    expect_status may be an int or a list; by default anything below 500 passes.
+    """
+    cases: List[Case] = []
+    with open(path, encoding="utf-8") as fh:
+        for n, line in enumerate(fh, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            spec = json.loads(line)
+
+            def fn(r: Runner, spec=spec):
+                method = spec.get("method", "GET").upper()
+                if method == "GET":
+                    resp = r.client.get(spec["path"], spec.get("params") or {})
+                else:
+                    resp = r.client.generic(
+                        method, spec["path"], json.dumps(spec.get("json") or {}),
+                        content_type="application/json",
+                    )
+                expect = spec.get("expect_status")
+                if expect is None:
+                    assert resp.status_code < 500, f"HTTP {resp.status_code}"
+                else:
+                    allowed = expect if isinstance(expect, list) else [expect]
+                    assert resp.status_code in allowed, f"HTTP {resp.status_code}, expected {allowed}"
+
+            cases.append(Case(
+                spec.get("domain", "replay"), f"replay_{n:03d}",
+                spec.get("name") or f"{spec.get('method', 'GET')} {spec['path']}", fn,
+            ))
+    return cases
+
+
+def _latency_stats(seconds: List[float]) -> Dict[str, Any]:
+    if not seconds:
+        return {"n": 0}
+    ms = sorted(x * 1000 for x in seconds)
+
+    def pct(p: float) -> float:
+        return round(ms[min(len(ms) - 1, int(round(p / 100 * (len(ms) - 1))))], 1)
+
+    return {
+        "n": len(ms),
+        "p50_ms": pct(50), "p95_ms": pct(95), "p99_ms": pct(99),
+        "mean_ms": round(sum(ms) / len(ms), 1), "max_ms": round(ms[-1], 1),
+    }
+
+
+def _answer_tier(data_source: Optional[str]) -> str:
+    ds = (data_source or "").lower()
+    if "kb" in ds:
+        return "knowledge_base"
+    if "krishimitra-llm" in ds or "qwen" in ds:
+        return "llm"
+    if "gemini" in ds:
+        return "gemini"
+    return "rule_based"
+
+
+def _git_commit() -> Dict[str, Any]:
+    try:
+        sha = subprocess.run(["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True,
+                             text=True, timeout=10).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=ROOT,
+                                    capture_output=True, text=True, timeout=30).stdout.strip())
+        return {"commit": sha or None, "dirty": dirty}
+    except Exception:
+        return {"commit": None, "dirty": None}
+
+
+def run_bench(cases: List[Case], args) -> Dict[str, Any]:
+    from django.core.management import call_command
+    from django.db import connections
+
+    call_command("migrate", interactive=False, verbosity=0)
+    _STUBS.latency_scale = args.latency_scale
+    cases = [c for c in cases if c.bench]
+    local = threading.local()
+
+    def run_one(case: Case) -> Dict[str, Any]:
+        runner = getattr(local, "runner", None)
+        if runner is None:
+            runner = local.runner = Runner(TimedAPIClient())
+        runner.client.calls = []
+        t0 = time.perf_counter()
+        runner.run_case(case)
+        elapsed = time.perf_counter() - t0
+        result = runner.results.pop()
+        return {"case": case.case_id, "domain": case.domain, "status": result.status,
+                "message": result.message, "seconds": elapsed, "requests": runner.client.calls}
+
+    def replay(schedule: List[Case]) -> Tuple[List[Dict[str, Any]], float]:
+        t0 = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency, thread_name_prefix="bench") as pool:
+            out = list(pool.map(run_one, schedule))
+            list(pool.map(lambda _: connections.close_all(), range(args.concurrency)))
+        return out, time.perf_counter() - t0
+
+    rng = random.Random(args.seed)
+    for _ in range(args.warmup):
+        replay(cases)
+    _STUBS.reset_stats()
+
+    schedule = [c for _ in range(args.rounds) for c in cases]
+    rng.shuffle(schedule)
+    runs, wall = replay(schedule)
+
+    requests_ = [req for run in runs for req in run["requests"]]
+    by_domain: Dict[str, List[Dict[str, Any]]] = {}
+    by_case: Dict[str, List[Dict[str, Any]]] = {}
+    for run in runs:
+        by_domain.setdefault(run["domain"], []).append(run)
+        by_case.setdefault(run["case"], []).append(run)
+    by_tier: Dict[str, List[float]] = {}
+    for req in requests_:
+        if req["path"] == "/api/chatbot/query/" and req["status"] == 200:
+            by_tier.setdefault(_answer_tier(req["data_source"]), []).append(req["seconds"])
+
+    failed = [r for r in runs if r["status"] == "failed"]
+    overall = _latency_stats([r["seconds"] for r in runs])
+    overall.update({
+        "cases": len(runs), "requests": len(requests_), "failed": len(failed),
+        "wall_s": round(wall, 2),
+        "cases_per_s": round(len(runs) / wall, 2) if wall else None,
+        "requests_per_s": round(len(requests_) / wall, 2) if wall else None,
+    })
+    domains = {}
+    for name, items in sorted(by_domain.items()):
+        st = _latency_stats([r["seconds"] for r in items])
+        st["failed"] = sum(1 for r in items if r["status"] == "failed")
+        domains[name] = st
+    case_stats = {}
+    for cid, items in by_case.items():
+        st = _latency_stats([r["seconds"] for r in items])
+        st["domain"] = items[0]["domain"]
+        st["failed"] = sum(1 for r in items if r["status"] == "failed")
+        case_stats[cid] = st
+
+    return {
+        "meta": {
+            "started": datetime.now(timezone.utc).isoformat(),
+            **_git_commit(),
+            "python": sys.version.split()[0],
+            "concurrency": args.concurrency, "rounds": args.rounds, "warmup": args.warmup,
+            "latency_scale": args.latency_scale, "seed": args.seed,
+            "replay": args.replay if args.replay and os.path.exists(args.replay) else None,
+            "distinct_cases": len(cases),
+        },
+        "overall": overall,
+        "by_domain": domains,
+        "by_tier": {k: _latency_stats(v) for k, v in sorted(by_tier.items())},
+        "upstreams": _STUBS.stats(),
+        "slowest": sorted(
+            ({"case": cid, **st} for cid, st in case_stats.items()),
+            key=lambda x: x.get("p95_ms", 0), reverse=True,
+        )[:10],
+        "failures": [{"case": r["case"], "message": r["message"][:200]} for r in failed[:20]],
+        "cases": case_stats,
+    }
+
+
+def compare_bench(result: Dict[str, Any], baseline: Dict[str, Any], max_regression: float) -> List[str]:
+    """Regressions of overall / per-domain p95 beyond max_regression (ignores sub-5 ms noise)."""
+    regressions: List[str] = []
+    print(f"\nvs baseline {str((baseline.get('meta') or {}).get('commit'))[:10]}")
+    pairs = []
+    if (baseline.get("meta") or {}).get("distinct_cases") == result["meta"]["distinct_cases"]:
+        pairs.append(("overall", result["overall"], baseline.get("overall") or {}))
+    else:
+        print("  (case sets differ — overall not compared, per-domain only)")
+    pairs += [(f"domain {d}", st, (baseline.get("by_domain") or {}).get(d) or {})
+              for d, st in result["by_domain"].items()]
+    for label, new, old in pairs:
+        if not old.get("p95_ms") or not new.get("p95_ms"):
+            continue
+        delta = (new["p95_ms"] - old["p95_ms"]) / old["p95_ms"]
+        print(f"  {label:22s} p95 {old['p95_ms']:9.1f} → {new['p95_ms']:9.1f} ms  ({delta:+.0%})")
+        if delta > max_regression and new["p95_ms"] - old["p95_ms"] > 5:
+            regressions.append(f"{label}: p95 {old['p95_ms']} → {new['p95_ms']} ms ({delta:+.0%})")
+    return regressions
+
+
+def print_bench(result: Dict[str, Any]) -> None:
+    o, m = result["overall"], result["meta"]
+    print(f"Benchmark @ {str(m['commit'])[:10]}{' (dirty)' if m['dirty'] else ''} — "
+          f"{m['distinct_cases']} cases × {m['rounds']} rounds, concurrency {m['concurrency']}, "
+          f"upstream latency ×{m['latency_scale']}")
+    print(f"  overall  p50 {o['p50_ms']} ms  p95 {o['p95_ms']} ms  p99 {o['p99_ms']} ms  "
+          f"{o['cases_per_s']} cases/s  {o['requests_per_s']} req/s  failed {o['failed']}/{o['cases']}")
+    print(f"\n  {'domain':14s} {'n':>5s} {'p50':>9s} {'p95':>9s} {'p99':>9s} {'failed':>7s}")
+    for name, st in result["by_domain"].items():
+        print(f"  {name:14s} {st['n']:5d} {st['p50_ms']:9.1f} {st['p95_ms']:9.1f} {st['p99_ms']:9.1f} {st['failed']:7d}")
+    if result["by_tier"]:
+        print(f"\n  {'chat tier':14s} {'n':>5s} {'p50':>9s} {'p95':>9s} {'p99':>9s}")
+        for name, st in result["by_tier"].items():
+            print(f"  {name:14s} {st['n']:5d} {st['p50_ms']:9.1f} {st['p95_ms']:9.1f} {st['p99_ms']:9.1f}")
+    if result["upstreams"]:
+        print(f"\n  {'upstream':30s} {'calls':>6s} {'errors':>6s} {'p50':>9s} {'total s':>8s}")
+        for name, st in result["upstreams"].items():
+            print(f"  {name:30s} {st['calls']:6d} {st['errors']:6d} {st['p50_ms']:9.1f} {st['total_s']:8.2f}")
+    for f in result["failures"][:5]:
+        print(f"  ✗ {f['case']}: {f['message']}")
+
+
+def bench_main(args, all_cases: List[Case]) -> int:
+    if args.domains:
+        wanted = set(args.domains.split(","))
+        all_cases = [c for c in all_cases if c.domain in wanted]
+    if args.replay and os.path.exists(args.replay):
+        all_cases.extend(load_replay_cases(args.replay))
+    try:
+        result = run_bench(all_cases, args)
+    finally:
+        _STUBS.stop()
+    print_bench(result)
+
+    out_path = args.json or os.path.join(ROOT, "bench_results.json")
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2)
+    print(f"\n... results written to {out_path}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            regressions = compare_bench(result, json.load(f), args.max_regression)
+        for r in regressions:
+            print(f"  ❌ regression: {r}")
+        if regressions:
+            return 1
+    if result["failures"]:
+        print(f"  ❌ {result['overall']['failed']} case(s) failed")
+        return 1
+    return 0
+
+
 def main():
     parser = argparse.ArgumentParser(description="Production service verification")
     parser.add_argument("--json", help="Write JSON results to path")
     parser.add_argument("--markdown", help="Write markdown report to path")
     parser.add_argument("--fail-fast", action="store_true")
+    bench = parser.add_argument_group("benchmark mode")
+    bench.add_argument("--bench", action="store_true", help="Replay cases for latency against stub upstreams")
+    bench.add_argument("--concurrency", type=int, default=8)
+    bench.add_argument("--rounds", type=int, default=3, help="Recorded passes over the case list")
+    bench.add_argument("--warmup", type=int, default=1, help="Unrecorded passes before measuring")
+    bench.add_argument("--latency-scale", type=float, default=1.0,
+                       help="Multiply stub upstream latencies (0 = application overhead only)")
+    bench.add_argument("--domains", help="Comma-separated domains to replay (default: all)")
+    bench.add_argument("--replay", default=DEFAULT_REPLAY, help="JSONL request log to replay as well")
+    bench.add_argument("--compare", help="Baseline bench JSON; exit 1 on p95 regression")
+    bench.add_argument("--max-regression", type=float, default=0.20)
+    bench.add_argument("--seed", type=int, default=7)
     args = parser.parse_args()
 
     started = datetime.now(timezone.utc).isoformat()
@@ -926,6 +1240,9 @@ def main():
     for builder in ALL_BUILDERS:
         all_cases.extend(builder())
 
+    if args.bench:
+        return bench_main(args, all_cases)
+
     for case in all_cases:
         runner.run_case(case)
         if args.fail_fast and runner.results[-1].status == "failed":
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Memory soak for FieldSensorService's per-cell caches.
+
+Replays --requests synthetic field requests (default 1,000,000) over
+--fields distinct field coordinates with a skewed popularity (a few hot
+villages, a long tail of one-off fields), going through the service's own
+weather / soil-history caches exactly as the fetch methods do: get() on the
+FieldSoilHistory grid key, on a miss set() a fresh payload shaped like the
+real one (one Open-Meteo answer taken from the local stub, copied per cell).
+
+The old per-worker dicts would have held one entry per distinct cell for the
+life of the worker.  Checked:
+
+  - the L1 tiers never exceed their size
+  - RSS after the warm-up (first 30 %) grows by less than --max-growth-mb
+  - hit / miss / eviction / expiry counters add up
+  - a second service instance (another worker) finds recently fetched
+    cells in the shared tier
+
+The shared tier is an explicit LocMemCache (DEBUG uses DummyCache), bounded
+by MAX_ENTRIES like the Redis alias is by memory policy.
+
+Usage:
+  python3 scripts/soak_field_caches.py
+  python3 scripts/soak_field_caches.py --requests 200000 --fields 50000
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import os
+import pickle
+import random
+import resource
+import sys
+import time
+from collections import deque
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BACKEND = os.path.join(ROOT, "backend")
+sys.path.insert(0, BACKEND)
+sys.path.insert(0, os.path.join(ROOT, "scripts"))
+os.chdir(BACKEND)
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+os.environ.setdefault("SECRET_KEY", "soak-field-caches")
+os.environ.setdefault("DEBUG", "True")
+os.environ.setdefault("DATABASE_URL", "sqlite:///soak_field_caches.sqlite3")
+
+import django
+
+django.setup()
+
+from django.core.cache.backends.locmem import LocMemCache  # noqa: E402
+
+from advisory.services import field_sensor_service as fss  # noqa: E402
+from stub_upstreams import StubUpstreams  # noqa: E402
+
+
+def _rss_mb() -> float:
+    try:
+        with open("/proc/self/statm") as fh:
+            return int(fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1e6
+    except OSError:                      # not Linux: peak RSS is the best we have
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1e3
+
+
+def _templates() -> tuple:
+    """One real-shaped Open-Meteo / Soil Health Card answer from the stub."""
+    stubs = StubUpstreams(latency_ms={"open_meteo": 0, "soil_health": 0}).start()
+    stubs.install()
+    try:
+        probe = fss.FieldSensorService(shared_cache=LocMemCache("soak-probe", {}))
+        weather = probe._fetch_open_meteo_soil_weather(26.85, 80.95)
+        soil = probe._fetch_soil_health_card(26.85, 80.95, "Uttar Pradesh", nasa_fallback=False)
+    finally:
+        stubs.stop()
+    if not weather.get("is_live") or not soil:
+        raise SystemExit("stub did not answer — cannot build payload templates")
+    return pickle.dumps(weather, pickle.HIGHEST_PROTOCOL), pickle.dumps(soil, pickle.HIGHEST_PROTOCOL)
+
+
+def run(args) -> dict:
+    weather_blob, soil_blob = _templates()
+    fss.FIELD_WEATHER_TTL_S = args.weather_ttl
+    shared = LocMemCache("soak-field", {"OPTIONS": {"MAX_ENTRIES": args.shared_entries}})
+    service = fss.FieldSensorService(shared_cache=shared)
+    wx, soil = service._weather_cache, service._soil_history_cache
+
+    rnd = random.Random(args.seed)
+    fields = [(rnd.uniform(8.0, 35.0), rnd.uniform(68.0, 97.0)) for _ in range(args.fields)]
+    distinct = set()
+    recent = deque(maxlen=200)
+    checkpoints = []
+    every = max(1, args.requests // 10)
+    gc.collect()
+    rss0 = _rss_mb()
+    t0 = time.perf_counter()
+
+    for i in range(1, args.requests + 1):
+        # rnd.random() ** 3 → a few hot fields, long tail of rare ones
+        lat, lon = fields[int(args.fields * rnd.random() ** 3)]
+        key = fss.field_grid_key(lat, lon)
+        distinct.add(key)
+        if wx.get(key) is None:
+            wx.set(key, pickle.loads(weather_blob))
+            recent.append(key)
+        if soil.get("shc:" + key) is None:
+            soil.set("shc:" + key, pickle.loads(soil_blob))
+        if i % every == 0:
+            gc.collect()
+            checkpoints.append({"requests": i, "rss_mb": round(_rss_mb(), 1), "weather_l1": len(wx),
+                                "soil_l1": len(soil), "distinct_cells": len(distinct)})
+
+    elapsed = time.perf_counter() - t0
+    warm = checkpoints[max(0, len(checkpoints) * 3 // 10 - 1)]
+    growth = checkpoints[-1]["rss_mb"] - warm["rss_mb"]
+    stats = service.cache_stats()
+    failures = []
+    for name, st in stats.items():
+        if st["size"] > st["maxsize"]:
+            failures.append(f"{name}: L1 holds {st['size']} entries (limit {st['maxsize']})")
+        # Every L1 miss went to the shared tier; each request does one get() per cache.
+        if st["hits"] + st["misses"] != args.requests:
+            failures.append(f"{name}: hits {st['hits']} + misses {st['misses']} != {args.requests} requests")
+        if st["shared_hits"] + st["shared_misses"] + st["shared_errors"] != st["misses"]:
+            failures.append(f"{name}: shared tier lookups do not add up to L1 misses")
+    # A second worker sharing the tier finds the recently fetched cells.
+    worker_2 = fss.FieldSensorService(shared_cache=shared)
+    shared_found = sum(1 for key in recent if worker_2._weather_cache.get(key) is not None)
+    if shared_found != len(recent):
+        failures.append(f"worker 2: {shared_found}/{len(recent)} recent cells found in the shared tier")
+    if growth > args.max_growth_mb:
+        failures.append(f"RSS grew {growth:.1f} MB after warm-up (limit {args.max_growth_mb:.0f} MB)")
+
+    return {
+        "requests": args.requests,
+        "distinct_cells": len(distinct),
+        "req_per_s": round(args.requests / elapsed),
+        "rss_start_mb": round(rss0, 1),
+        "rss_after_warmup_mb": warm["rss_mb"],
+        "rss_end_mb": checkpoints[-1]["rss_mb"],
+        "rss_growth_after_warmup_mb": round(growth, 1),
+        "checkpoints": checkpoints,
+        "cache_stats": stats,
+        "worker_2_shared_hits": f"{shared_found}/{len(recent)}",
+        "failures": failures,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=1_000_000, help="synthetic field requests")
+    parser.add_argument("--fields", type=int, default=200_000, help="distinct field coordinates")
+    parser.add_argument("--weather-ttl", type=int, default=30,
+                        help="weather TTL (s) for the soak, short so expiry is exercised")
+    parser.add_argument("--shared-entries", type=int, default=5000, help="shared LocMem tier MAX_ENTRIES")
+    parser.add_argument("--max-growth-mb", type=float, default=24.0, help="allowed RSS growth after warm-up")
+    parser.add_argument("--seed", type=int, default=16)
+    parser.add_argument("--json", default=None, help="write results to this file")
+    args = parser.parse_args()
+
+    print(f"{args.requests:,} requests over {args.fields:,} fields")
+    results = run(args)
+    for cp in results["checkpoints"]:
+        print(f"  {cp['requests']:>10,}  rss {cp['rss_mb']:>7.1f} MB  weather L1 {cp['weather_l1']:>5}  "
+              f"soil L1 {cp['soil_l1']:>5}  distinct cells {cp['distinct_cells']:>7,}")
+    for name, st in results["cache_stats"].items():
+        print(f"  {name:12s} " + "  ".join(f"{k}={v}" for k, v in st.items()))
+    print(f"  worker 2 found {results['worker_2_shared_hits']} recently fetched cells in the shared tier")
+    print(f"  {results['req_per_s']:,} req/s, RSS growth after warm-up {results['rss_growth_after_warmup_mb']} MB "
+          f"({results['distinct_cells']:,} distinct cells — the old dicts would hold all of them)")
+    for f in results["failures"]:
+        print(f"  ❌ {f}")
+    if not results["failures"]:
+        print("  ✅ caches bounded, memory flat after warm-up")
+
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump(results, fh, indent=2)
+    sys.exit(1 if results["failures"] else 0)
+
+
+if __name__ == "__main__":
+    main()
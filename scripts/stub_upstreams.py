@@ -0,0 +1,476 @@
+"""
+Local stub upstreams for hermetic benchmarks.
+
+One threaded HTTP server on 127.0.0.1 impersonates every external service the
+backend talks to — Open-Meteo, data.gov.in, Nominatim / BigDataCloud,
+NASA POWER, the Soil Health Card portal, the Phase 1 RAG server, Ollama,
+Gemini, the WhatsApp Cloud API and Groq Whisper — with deterministic payloads
+shaped like the real ones and a configurable per-upstream latency.
+
+    stubs = StubUpstreams(latency_ms={"ollama": 1200, "gemini": 700}).start()
+    stubs.configure_env()          # PHASE1_URL / OLLAMA_BASE_URL / API keys — before django.setup()
+    stubs.install()                # route requests' outbound HTTP to the stub
+    ...
+    stubs.stats()                  # per-upstream call counts + server-side latency
+    stubs.fail("data_gov", 403)    # simulate an outage until stubs.recover("data_gov")
+    stubs.sent_messages()          # WhatsApp replies the backend sent, in order
+    stubs.stop()
+
+install() patches requests' HTTPAdapter.send, so every requests.Session in
+the process (per-thread sessions included) reaches the stub instead of the
+internet.  Hosts without a stub get a fast 404 — a bench run never leaves
+the machine.  Phase 1, Ollama, WhatsApp and Groq are reached through urllib
+and are pointed at the stub by configure_env() instead.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import math
+import random
+import threading
+import time
+from datetime import date, timedelta
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlsplit
+
+# host → upstream name (URL prefix on the stub server)
+HOSTS: Dict[str, str] = {
+    "api.open-meteo.com":                "open_meteo",
+    "archive-api.open-meteo.com":        "open_meteo",
+    "api.data.gov.in":                   "data_gov",
+    "api.agmarknet.gov.in":              "agmarknet",
+    "agmarknet.gov.in":                  "agmarknet",
+    "nominatim.openstreetmap.org":       "nominatim",
+    "api.bigdatacloud.net":              "bigdatacloud",
+    "power.larc.nasa.gov":               "nasa_power",
+    "soilhealth.dac.gov.in":             "soil_health",
+    "generativelanguage.googleapis.com": "gemini",
+    "api.openweathermap.org":            "openweathermap",
+}
+
+# Typical production latencies (ms); scale all of them with latency_scale.
+DEFAULT_LATENCY_MS: Dict[str, float] = {
+    "open_meteo":   80,
+    "data_gov":     250,
+    "agmarknet":    40,
+    "nominatim":    150,
+    "bigdatacloud": 60,
+    "nasa_power":   400,
+    "soil_health":  300,
+    "phase1":       1500,
+    "ollama":       1200,
+    "gemini":       700,
+    "whatsapp":     150,
+    "groq":         900,
+}
+
+_LOCAL_HOSTS = ("127.0.0.1", "localhost", "testserver", "::1")
+
+_CITY_COORDS = {
+    "delhi": (28.6139, 77.2090, "Delhi"), "mumbai": (19.0760, 72.8777, "Maharashtra"),
+    "bangalore": (12.9716, 77.5946, "Karnataka"), "hyderabad": (17.3850, 78.4867, "Telangana"),
+    "chennai": (13.0827, 80.2707, "Tamil Nadu"), "kolkata": (22.5726, 88.3639, "West Bengal"),
+    "pune": (18.5204, 73.8567, "Maharashtra"), "jaipur": (26.9124, 75.7873, "Rajasthan"),
+    "lucknow": (26.8467, 80.9462, "Uttar Pradesh"), "patna": (25.5941, 85.1376, "Bihar"),
+    "bhopal": (23.2599, 77.4126, "Madhya Pradesh"), "chandigarh": (30.7333, 76.7794, "Chandigarh"),
+    "ludhiana": (30.9010, 75.8573, "Punjab"), "punjab": (30.9010, 75.8573, "Punjab"),
+}
+
+_COMMODITIES = [
+    ("Wheat", 2275), ("Paddy(Dhan)(Common)", 2300), ("Maize", 2090), ("Mustard", 5650),
+    ("Tomato", 1800), ("Onion", 2200), ("Potato", 1200), ("Cotton", 7020), ("Soyabean", 4600),
+    ("Bengal Gram(Gram)(Whole)", 5440), ("Bajra(Pearl Millet/Cumbu)", 2625), ("Jowar(Sorghum)", 3180),
+]
+_MARKETS = [
+    ("Delhi", "Delhi", "Azadpur"), ("Uttar Pradesh", "Lucknow", "Lucknow"), ("Punjab", "Ludhiana", "Khanna"),
+    ("Haryana", "Karnal", "Karnal"), ("Rajasthan", "Jaipur", "Jaipur (Grain)"),
+    ("Madhya Pradesh", "Indore", "Indore"), ("Maharashtra", "Nashik", "Lasalgaon"),
+    ("Bihar", "Patna", "Patna"), ("Gujarat", "Ahmedabad", "Ahmedabad"), ("Karnataka", "Bangalore", "Binny Mill"),
+]
+
+_LLM_ANSWER = (
+    "**Salah:** Beej upchar ke baad line mein buwai karein. Pehli sinchai 20-25 din par, "
+    "urea ki doosri khuraak sinchai ke saath dein. Mausam saaf rahe to dawa ka chhidkav subah karein."
+)
+
+
+def _seed(*parts) -> random.Random:
+    return random.Random(int(hashlib.md5(repr(parts).encode()).hexdigest()[:8], 16))
+
+
+def _meteo_value(var: str, i: int, rng: random.Random) -> float:
+    v = var.lower()
+    if "time" == v:
+        return 0.0
+    if "probability" in v:
+        return float(rng.randint(0, 60))
+    if "precipitation" in v or "rain" in v or "showers" in v:
+        return round(max(0.0, rng.gauss(1.0, 2.0)), 1)
+    if "humidity" in v:
+        return float(rng.randint(35, 85))
+    if "soil_moisture" in v:
+        return round(rng.uniform(0.15, 0.40), 3)
+    if "temperature" in v or "apparent" in v:
+        base = 30.0 + 4.0 * math.sin(i / 3.0)
+        return round(base + (-8 if "min" in v else 0) + rng.uniform(-1.5, 1.5), 1)
+    if "weather_code" in v or "weathercode" in v:
+        return float(rng.choice([0, 1, 2, 3, 61]))
+    if "wind" in v:
+        return round(rng.uniform(4, 18), 1)
+    if "uv" in v:
+        return round(rng.uniform(3, 10), 1)
+    if "et0" in v or "evapotranspiration" in v:
+        return round(rng.uniform(2, 6), 2)
+    if "cloud" in v:
+        return float(rng.randint(0, 100))
+    if "pressure" in v:
+        return round(rng.uniform(1002, 1016), 1)
+    return round(rng.uniform(0, 10), 2)
+
+
+def open_meteo_payload(params: Dict[str, str]) -> dict:
+    lat = float(params.get("latitude", 28.6))
+    lon = float(params.get("longitude", 77.2))
+    rng = _seed("om", round(lat, 2), round(lon, 2))
+    days = int(params.get("forecast_days", 7)) + int(params.get("past_days", 0))
+    start = date.today() - timedelta(days=int(params.get("past_days", 0)))
+    out: dict = {"latitude": lat, "longitude": lon, "timezone": params.get("timezone", "GMT"), "elevation": 200.0}
+    if params.get("current"):
+        out["current"] = {"time": f"{date.today().isoformat()}T12:00", "interval": 900}
+        for var in params["current"].split(","):
+            out["current"][var] = _meteo_value(var, 0, rng)
+    if params.get("daily"):
+        out["daily"] = {"time": [(start + timedelta(days=d)).isoformat() for d in range(days)]}
+        for var in params["daily"].split(","):
+            out["daily"][var] = [_meteo_value(var, d, rng) for d in range(days)]
+    if params.get("hourly"):
+        hours = days * 24
+        out["hourly"] = {"time": [f"{(start + timedelta(days=h // 24)).isoformat()}T{h % 24:02d}:00"
+                                  for h in range(hours)]}
+        for var in params["hourly"].split(","):
+            out["hourly"][var] = [_meteo_value(var, h // 24, rng) for h in range(hours)]
+    return out
+
+
+@lru_cache(maxsize=64)
+def _data_gov_records(commodity: str, state: str, extra_markets: int) -> tuple:
+    today = date.today().strftime("%d/%m/%Y")
+    records: List[dict] = []
+    markets = list(_MARKETS)
+    for st, dist, _ in _MARKETS:
+        markets.extend((st, f"{dist} Rural {i // 8 + 1}", f"{dist} Mandi {i + 1}") for i in range(extra_markets))
+    for st, dist, market in markets:
+        if state and state not in st.lower():
+            continue
+        for name, base in _COMMODITIES:
+            if commodity and commodity not in name.lower():
+                continue
+            rng = _seed("dg", market, name)
+            modal = int(base * rng.uniform(0.9, 1.15))
+            records.append({
+                "state": st, "district": dist, "market": market, "commodity": name,
+                "variety": "Other", "grade": "FAQ", "arrival_date": today,
+                "min_price": str(int(modal * 0.92)), "max_price": str(int(modal * 1.08)),
+                "modal_price": str(modal),
+            })
+    return tuple(records)
+
+
+def data_gov_payload(params: Dict[str, str], extra_markets: int = 0) -> dict:
+    """
+    Agmarknet-shaped records.  ``extra_markets`` adds that many synthetic
+    mandis per state, so state listings span several pages.
+    """
+    commodity = (params.get("filters[commodity]") or "").lower()
+    state = (params.get("filters[state]") or params.get("filters[state.keyword]") or "").lower()
+    limit = int(params.get("limit", 100) or 100)
+    records = _data_gov_records(commodity, state, extra_markets)
+    offset = int(params.get("offset", 0) or 0)
+    page = list(records[offset:offset + limit])
+    return {"status": "ok", "total": len(records), "count": len(page), "limit": str(limit),
+            "offset": str(offset), "records": page}
+
+
+def _place(q: str) -> tuple:
+    key = (q or "").strip().lower()
+    for name, (lat, lon, state) in _CITY_COORDS.items():
+        if name in key:
+            return lat, lon, name.title(), state
+    rng = _seed("geo", key)
+    return round(rng.uniform(20.0, 29.0), 4), round(rng.uniform(73.0, 86.0), 4), (q or "Rampur").title(), "Uttar Pradesh"
+
+
+def nominatim_search_payload(params: Dict[str, str]) -> list:
+    lat, lon, city, state = _place(params.get("q", ""))
+    return [{
+        "lat": str(lat), "lon": str(lon), "display_name": f"{city}, {state}, India",
+        "class": "place", "type": "city", "importance": 0.7,
+        "address": {"city": city, "state_district": city, "state": state,
+                    "country": "India", "country_code": "in", "postcode": "110001"},
+    }]
+
+
+def nominatim_reverse_payload(params: Dict[str, str]) -> dict:
+    lat, lon = float(params.get("lat", 28.6)), float(params.get("lon", 77.2))
+    best = min(_CITY_COORDS.items(), key=lambda kv: (kv[1][0] - lat) ** 2 + (kv[1][1] - lon) ** 2)
+    city, state = best[0].title(), best[1][2]
+    return {
+        "lat": str(lat), "lon": str(lon), "display_name": f"Sector 12, {city}, {state}, India",
+        "address": {"suburb": "Sector 12", "city": city, "state_district": city, "state": state,
+                    "country": "India", "country_code": "in", "postcode": "110001"},
+    }
+
+
+def bigdatacloud_payload(params: Dict[str, str]) -> dict:
+    rev = nominatim_reverse_payload({"lat": params.get("latitude", 28.6), "lon": params.get("longitude", 77.2)})
+    addr = rev["address"]
+    return {"latitude": float(rev["lat"]), "longitude": float(rev["lon"]), "city": addr["city"],
+            "locality": addr["suburb"], "principalSubdivision": addr["state"], "countryName": "India",
+            "countryCode": "IN", "postcode": addr["postcode"]}
+
+
+def nasa_power_payload(params: Dict[str, str]) -> dict:
+    start = int(str(params.get("start", "2020"))[:4])       # YYYY or YYYYMMDD
+    end = int(str(params.get("end", "2023"))[:4])
+    rng = _seed("power", params.get("latitude"), params.get("longitude"))
+    param: dict = {}
+    for name in (params.get("parameters") or "T2M,PRECTOTCORR").split(","):
+        param[name] = {f"{y}{m:02d}": round(rng.uniform(1, 35), 2)
+                       for y in range(start, end + 1) for m in range(1, 14)}
+    return {"type": "Feature", "properties": {"parameter": param}}
+
+
+def soil_health_payload(params: Dict[str, str]) -> dict:
+    rng = _seed("shc", params.get("lat"), params.get("lon"))
+    return {"N": rng.randint(110, 320), "P": round(rng.uniform(8, 30), 1), "K": rng.randint(100, 320),
+            "pH": round(rng.uniform(6.0, 8.2), 1), "EC": round(rng.uniform(0.2, 1.5), 2),
+            "OC": round(rng.uniform(0.3, 0.9), 2), "S": round(rng.uniform(5, 20), 1),
+            "Zn": round(rng.uniform(0.4, 1.5), 2), "B": round(rng.uniform(0.3, 1.0), 2)}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "KrishiMitraStub/1.0"
+    protocol_version = "HTTP/1.1"
+    # Headers and body are separate writes: without TCP_NODELAY every reused
+    # keep-alive connection pays a ~40 ms Nagle/delayed-ACK stall.
+    disable_nagle_algorithm = True
+
+    def log_message(self, fmt, *args):       # silence per-request logging
+        pass
+
+    def _send(self, code: int, body) -> None:
+        data = body if isinstance(body, bytes) else json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        try:
+            self.end_headers()
+            self.wfile.write(data)
+        except (BrokenPipeError, ConnectionResetError):
+            pass                                 # client hit its timeout and went away
+
+    def _handle(self) -> None:
+        t0 = time.perf_counter()
+        parts = urlsplit(self.path)
+        upstream, _, rest = parts.path.lstrip("/").partition("/")
+        rest = "/" + rest
+        # Repeated keys (requests encodes list params as current=a&current=b) → "a,b"
+        params = {k: ",".join(v) for k, v in parse_qs(parts.query).items()}
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        stubs: StubUpstreams = self.server.stubs          # type: ignore[attr-defined]
+
+        delay = stubs.latency_s(upstream)
+        if delay:
+            time.sleep(delay)
+        code, payload = stubs.route(upstream, rest, params, body)
+        # Record before replying so a caller that got its answer is always counted.
+        stubs.record(upstream, code, time.perf_counter() - t0)
+        self._send(code, payload)
+
+    do_GET = _handle
+    do_POST = _handle
+
+
+class StubUpstreams:
+    """Threaded stub server + requests redirection (see module docstring)."""
+
+    def __init__(self, latency_ms: Optional[Dict[str, float]] = None, latency_scale: float = 1.0,
+                 host: str = "127.0.0.1", port: int = 0, data_gov_extra_markets: int = 0):
+        self.latency_ms = dict(DEFAULT_LATENCY_MS, **(latency_ms or {}))
+        self.latency_scale = latency_scale
+        self.data_gov_extra_markets = data_gov_extra_markets
+        self._server = ThreadingHTTPServer((host, port), _Handler)
+        self._server.daemon_threads = True
+        self._server.stubs = self                          # type: ignore[attr-defined]
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._calls: Dict[str, List[float]] = {}
+        self._errors: Dict[str, int] = {}
+        self._failing: Dict[str, int] = {}
+        self._sent: List[dict] = []
+        self._orig_send = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "StubUpstreams":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="stub-upstreams", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.uninstall()
+        self._server.shutdown()
+        self._server.server_close()
+
+    def configure_env(self, environ=None) -> None:
+        """Point the urllib-based tiers at the stub and enable keyed providers."""
+        import os
+        env = os.environ if environ is None else environ
+        env["PHASE1_URL"] = f"{self.url}/phase1/chat"
+        env["OLLAMA_BASE_URL"] = f"{self.url}/ollama"
+        env["WHATSAPP_API_BASE"] = f"{self.url}/whatsapp"
+        env["GROQ_API_BASE"] = f"{self.url}/groq"
+        env.setdefault("GOOGLE_AI_API_KEY", "AIzaStubBenchKey0000000000000000000000")
+        env.setdefault("DATA_GOV_IN_API_KEY", "stub-bench-data-gov-key")
+
+    # ── requests redirection ──────────────────────────────────────────
+    def install(self) -> None:
+        import requests.adapters
+
+        if self._orig_send is not None:
+            return
+        orig = requests.adapters.HTTPAdapter.send
+        base = self.url
+
+        def send(adapter, request, *args, **kwargs):
+            parts = urlsplit(request.url)
+            host = (parts.hostname or "").lower()
+            if host not in _LOCAL_HOSTS:
+                upstream = HOSTS.get(host, f"unknown:{host}")
+                request.url = f"{base}/{upstream}{parts.path or '/'}" + (f"?{parts.query}" if parts.query else "")
+                kwargs.pop("proxies", None)
+            return orig(adapter, request, *args, **kwargs)
+
+        requests.adapters.HTTPAdapter.send = send
+        self._orig_send = orig
+
+    def uninstall(self) -> None:
+        if self._orig_send is not None:
+            import requests.adapters
+            requests.adapters.HTTPAdapter.send = self._orig_send
+            self._orig_send = None
+
+    # ── failure injection ─────────────────────────────────────────────
+    def fail(self, upstream: str, status: int = 503) -> None:
+        """Answer every request to ``upstream`` with ``status`` until recover()."""
+        with self._lock:
+            self._failing[upstream] = status
+
+    def recover(self, upstream: Optional[str] = None) -> None:
+        with self._lock:
+            if upstream is None:
+                self._failing.clear()
+            else:
+                self._failing.pop(upstream, None)
+
+    # ── server side ───────────────────────────────────────────────────
+    def latency_s(self, upstream: str) -> float:
+        return self.latency_ms.get(upstream, 0.0) * self.latency_scale / 1000.0
+
+    def record(self, upstream: str, code: int, seconds: float) -> None:
+        with self._lock:
+            self._calls.setdefault(upstream, []).append(seconds)
+            if code >= 400:
+                self._errors[upstream] = self._errors.get(upstream, 0) + 1
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self._calls.clear()
+            self._errors.clear()
+            self._sent.clear()
+
+    def sent_messages(self) -> List[dict]:
+        """WhatsApp messages POSTed to the Cloud API stub: {"to", "body", "at"}."""
+        with self._lock:
+            return list(self._sent)
+
+    def stats(self) -> Dict[str, dict]:
+        with self._lock:
+            calls = {k: sorted(v) for k, v in self._calls.items()}
+            errors = dict(self._errors)
+        out = {}
+        for name, times in sorted(calls.items()):
+            out[name] = {
+                "calls":   len(times),
+                "errors":  errors.get(name, 0),
+                "p50_ms":  round(times[len(times) // 2] * 1000, 1),
+                "max_ms":  round(times[-1] * 1000, 1),
+                "total_s": round(sum(times), 2),
+            }
+        return out
+
+    def route(self, upstream: str, path: str, params: Dict[str, str], body: bytes):
+        with self._lock:
+            failing = self._failing.get(upstream)
+        if failing:
+            return failing, {"error": f"stub: {upstream} failing (injected)"}
+        if upstream == "open_meteo":
+            return 200, open_meteo_payload(params)
+        if upstream == "data_gov":
+            return 200, data_gov_payload(params, self.data_gov_extra_markets)
+        if upstream == "nominatim":
+            if path.startswith("/reverse"):
+                return 200, nominatim_reverse_payload(params)
+            return 200, nominatim_search_payload(params)
+        if upstream == "bigdatacloud":
+            return 200, bigdatacloud_payload(params)
+        if upstream == "nasa_power":
+            return 200, nasa_power_payload(params)
+        if upstream == "soil_health":
+            return 200, soil_health_payload(params)
+        if upstream == "phase1":
+            if path.endswith("/health"):
+                return 200, {"status": "healthy", "rag": True, "ollama": True}
+            return 200, {"response": _LLM_ANSWER, "rag_chunks": 3, "model": "krishimitra-llm"}
+        if upstream == "ollama":
+            if path.endswith("/api/tags"):
+                return 200, {"models": [{"name": "krishimitra-llm:latest"}, {"name": "qwen2.5:7b"}]}
+            if path.endswith("/api/generate"):
+                return 200, {"response": _LLM_ANSWER, "done": True}
+            return 200, {"message": {"role": "assistant", "content": _LLM_ANSWER}, "done": True}
+        if upstream == "gemini":
+            return 200, {"candidates": [{"content": {"role": "model", "parts": [{"text": _LLM_ANSWER}]},
+                                         "finishReason": "STOP"}]}
+        if upstream == "whatsapp":
+            return self._whatsapp(path, body)
+        if upstream == "groq":
+            # The stub media bytes name their media id; "transcribe" it back.
+            marker = body.find(b"stub-voice:")
+            media_id = body[marker + 11:].split(b"\r\n", 1)[0].decode() if marker >= 0 else "unknown"
+            return 200, {"text": f"voice note {media_id}: गेहूं में कौन सा खाद डालें?"}
+        if upstream == "agmarknet":
+            # 404, not 503: a 503 sends urllib3 into retry back-off on every call.
+            return 404, {"error": "stub: agmarknet not stubbed, data.gov.in is the live feed"}
+        return 404, {"error": f"no stub for {upstream}{path}"}
+
+    def _whatsapp(self, path: str, body: bytes):
+        if path.endswith("/messages"):
+            msg = json.loads(body or b"{}")
+            with self._lock:
+                self._sent.append({"to": msg.get("to"), "body": (msg.get("text") or {}).get("body", ""),
+                                   "at": time.perf_counter()})
+                n = len(self._sent)
+            return 200, {"messaging_product": "whatsapp", "messages": [{"id": f"wamid.stub{n}"}]}
+        if path.startswith("/media/"):
+            return 200, f"OggS stub-voice:{path[len('/media/'):]}\r\n".encode()
+        # GET /v18.0/<media id> → media metadata with a download URL
+        media_id = path.rsplit("/", 1)[-1]
+        return 200, {"id": media_id, "mime_type": "audio/ogg", "url": f"{self.url}/whatsapp/media/{media_id}"}